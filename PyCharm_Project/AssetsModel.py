@@ -3,11 +3,13 @@ import typing
 from datetime import datetime
 from PyQt6 import QtCore
 from tinkoff.invest import AssetInstrument, AssetType, InstrumentType, Asset, AssetFull
+from AsyncRequests import AsyncJob, AsyncRequestsEngine, getHelperLimits
 from Classes import Column, TokenClass, print_slot
-from LimitClasses import LimitPerMinuteSemaphore
+from DatabaseWriter import DatabaseWriterThread
+from LimitClasses import MyUnaryLimit, RequestPriority
 from MyDatabase import MainConnection
-from MyDateTime import getMoscowDateTime, getUtcDateTime
-from MyRequests import MyResponse, getAssetBy, RequestTryClass
+from MyDateTime import getMoscowDateTime
+from MyRequests import MyResponse
 
 
 class AssetClass(QtCore.QObject):
@@ -34,7 +36,6 @@ class AssetsThread(QtCore.QThread):
 
     '''------------------------Сигналы------------------------'''
     printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
-    releaseSemaphore_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(LimitPerMinuteSemaphore, int)  # Сигнал для освобождения ресурсов семафора из основного потока.
     '''-------------------------------------------------------'''
 
     '''-----------------Сигналы progressBar'а-----------------'''
@@ -42,9 +43,11 @@ class AssetsThread(QtCore.QThread):
     setProgressBarValue_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(int)  # Сигнал для изменения прогресса в progressBar'е.
     '''-------------------------------------------------------'''
 
-    def __init__(self, token_class: TokenClass, assets: list[AssetClass], parent: QtCore.QObject | None = None):
+    def __init__(self, token_class: TokenClass, assets: list[AssetClass], parent: QtCore.QObject | None = None,
+                 tokens_pool: list[TokenClass] | None = None):
         super().__init__(parent=parent)
         self.__token: TokenClass = token_class
+        self.__tokens_pool: list[TokenClass] = [] if tokens_pool is None else tokens_pool  # Дополнительные токены для распределения запросов.
         self.__assets: list[AssetClass] = assets
 
         '''------------Статистические переменные------------'''
@@ -52,8 +55,7 @@ class AssetsThread(QtCore.QThread):
         self.__control_point: datetime | None = None  # Начальная точка отсчёта времени.
         '''-------------------------------------------------'''
 
-        self.releaseSemaphore_signal.connect(lambda semaphore, n: semaphore.release(n))  # Освобождаем ресурсы семафора из основного потока.
-        self.assetFullReceived.connect(MainConnection.insertAssetFull)
+        DatabaseWriterThread.getWriter().connectSignal(self.assetFullReceived, MainConnection.insertAssetFull)
         self.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
         self.started.connect(lambda: print('{0}: Поток запущен. ({1})'.format(self.__class__.__name__, getMoscowDateTime())))
         self.finished.connect(lambda: print('{0}: Поток завершён. ({1})'.format(self.__class__.__name__, getMoscowDateTime())))
@@ -62,63 +64,46 @@ class AssetsThread(QtCore.QThread):
         def printInConsole(text: str):
             self.printText_signal.emit('{0}: {1}'.format(self.__class__.__name__, text))
 
-        def ifFirstIteration() -> bool:
-            """Возвращает True, если поток не сделал ни одного запроса. Иначе возвращает False."""
-            return self.__request_count > 0
-
-        semaphore: LimitPerMinuteSemaphore | None = self.__token.unary_limits_manager.getSemaphore(self.receive_assetfulls_method_name)
-        if semaphore is None:
+        unary_limit: MyUnaryLimit | None = self.__token.unary_limits_manager.getMyUnaryLimit(self.receive_assetfulls_method_name)
+        if unary_limit is None:
             printInConsole('Лимит для метода {0} не найден.'.format(self.receive_assetfulls_method_name))
         else:
             assets_count: int = len(self.__assets)  # Количество активов.
             self.setProgressBarRange_signal.emit(0, assets_count)  # Задаёт минимум и максимум progressBar'а.
 
-            for i, asset_class in enumerate(self.__assets):
-                if self.isInterruptionRequested():
-                    printInConsole('Поток прерван.')
-                    break
-
-                asset_number: int = i + 1  # Номер текущего актива.
-                self.setProgressBarValue_signal.emit(asset_number)  # Отображаем прогресс в progressBar.
-
-                assetfull_try_count: RequestTryClass = RequestTryClass()
-                assetfull_response: MyResponse = MyResponse()
-                while assetfull_try_count and not assetfull_response.ifDataSuccessfullyReceived():
-                    if self.isInterruptionRequested():
-                        printInConsole('Поток прерван.')
-                        break
-
-                    """------------------------------Выполнение запроса------------------------------"""
-                    semaphore.acquire(1)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
-
-                    '''----------------Подсчёт статистических параметров----------------'''
-                    if ifFirstIteration():  # Не выполняется до второго запроса.
-                        delta: float = (getUtcDateTime() - self.__control_point).total_seconds()  # Секунд прошло с последнего запроса.
-                        printInConsole('{0} из {1} ({2:.2f}с)'.format(asset_number, assets_count, delta))
-                    else:
-                        printInConsole('{0} из {1}'.format(asset_number, assets_count))
-                    self.__control_point = getUtcDateTime()  # Промежуточная точка отсчёта времени.
-                    '''-----------------------------------------------------------------'''
-
-                    assetfull_response = getAssetBy(self.__token.token, asset_class.asset.uid)
-                    assert assetfull_response.request_occurred, 'Запрос информации об активе не был произведён!'
-                    self.__request_count += 1  # Подсчитываем запрос.
-                    self.releaseSemaphore_signal.emit(semaphore, 1)  # Освобождаем ресурсы семафора из основного потока.
-
-                    '''------------------------Сообщаем об ошибке------------------------'''
-                    if assetfull_response.request_error_flag:
-                        printInConsole('RequestError {0}'.format(assetfull_response.request_error))
-                    elif assetfull_response.exception_flag:
-                        printInConsole('Exception {0}'.format(assetfull_response.exception))
-                    '''------------------------------------------------------------------'''
-                    """------------------------------------------------------------------------------"""
-                    assetfull_try_count += 1
-
-                assetfull: AssetFull | None = assetfull_response.response_data.asset if assetfull_response.ifDataSuccessfullyReceived() else None
-                if assetfull is None: continue  # Если поток был прерван или если информация не была получена.
+            jobs: list[AsyncJob] = [AsyncJob(asset_class, 'instruments', 'get_asset_by', {'id': asset_class.asset.uid}) for asset_class in self.__assets]
+
+            def onError(job: AsyncJob, assetfull_response: MyResponse):
+                """Сообщает об ошибке."""
+                if assetfull_response.request_error_flag:
+                    printInConsole('RequestError {0}'.format(assetfull_response.request_error))
+                elif assetfull_response.exception_flag:
+                    printInConsole('Exception {0}'.format(assetfull_response.exception))
+
+            def onResult(job: AsyncJob, assetfull_response: MyResponse):
+                """Обрабатывает результаты в порядке завершения запросов."""
+                self.setProgressBarValue_signal.emit(engine.completed_count)  # Отображаем прогресс в progressBar.
+                if not assetfull_response.ifDataSuccessfullyReceived(): return  # Если поток был прерван или если информация не была получена.
+                asset_class: AssetClass = job.key
+                assetfull: AssetFull = assetfull_response.response_data.asset
                 asset_class.setAssetFull(assetfull)  # Записываем информацию об активе в AssetClass.
                 self.assetFullReceived.emit(assetfull)
 
+            engine: AsyncRequestsEngine = AsyncRequestsEngine(token=self.__token.token,
+                                                              unary_limit=unary_limit,
+                                                              interruption_function=self.isInterruptionRequested,
+                                                              priority=RequestPriority.BACKGROUND,
+                                                              helper_limits=getHelperLimits(self.__tokens_pool, self.receive_assetfulls_method_name))
+            engine.run(jobs, onResult, onError)
+
+            if self.isInterruptionRequested():
+                printInConsole('Поток прерван.')
+
+            self.__request_count = engine.request_count  # Общее количество запросов.
+            printInConsole('{0} из {1} за {2:.2f}с (запросов: {3}, повторов: {4}, ожидание повторов: {5:.2f}с).'.format(engine.completed_count, assets_count, engine.total_time, self.__request_count, engine.retry_count, engine.backoff_time))
+            if engine.tokens_count > 1:
+                printInConsole('Заданий по токенам: {0}.'.format(', '.join(str(count) for count in engine.getCompletedByTokens())))
+
 
 class AssetColumn(Column):
     """Класс столбца таблицы активов."""
@@ -287,7 +272,7 @@ class AssetsTreeModel(QtCore.QAbstractItemModel):
 
         self.endResetModel()  # Завершает операцию сброса модели.
 
-    def setAssets(self, token: TokenClass, assets: list[AssetClass]):
+    def setAssets(self, token: TokenClass, assets: list[AssetClass], tokens_pool: list[TokenClass] | None = None):
         """Устанавливает данные модели."""
         self.beginResetModel()  # Начинает операцию сброса модели.
         self.__stopThread()
@@ -315,7 +300,7 @@ class AssetsTreeModel(QtCore.QAbstractItemModel):
                     # self.__update_connections.append(asset_class.onAssetFullChanged.connect(lambda ind=index: self.dataChanged.emit(ind, ind)))  # Подключаем слот обновления.
                     # asset_class.setAssetFull_signal.connect(update_class(self, index, index))  # Подключаем слот обновления.
 
-        self.__full_assets_thread = AssetsThread(token_class=token, assets=self.__assets, parent=self)
+        self.__full_assets_thread = AssetsThread(token_class=token, assets=self.__assets, parent=self, tokens_pool=tokens_pool)
         self.__progressbar_range_connection = self.__full_assets_thread.setProgressBarRange_signal.connect(self.setProgressBarRange_signal.emit)
         self.__progressbar_value_connection = self.__full_assets_thread.setProgressBarValue_signal.connect(self.setProgressBarValue_signal.emit)
 
@@ -27,7 +27,7 @@ class GroupBox_AssetsRequest(QtWidgets.QGroupBox):
         verticalLayout_main.addLayout(self.titlebar, 0)
 
         '''---------------------------Токен---------------------------'''
-        self.token_bar = TokenSelectionBar(tokens_model=tokens_model, parent=self)
+        self.token_bar = TokenSelectionBar(tokens_model=tokens_model, parent=self, pool_option=True)
         verticalLayout_main.addLayout(self.token_bar, 0)
         '''-----------------------------------------------------------'''
 
@@ -71,6 +71,10 @@ class GroupBox_AssetsRequest(QtWidgets.QGroupBox):
     def token(self) -> TokenClass | None:
         return self.token_bar.token
 
+    @property
+    def tokens_pool(self) -> list[TokenClass]:
+        return self.token_bar.tokens_pool
+
     @property
     def instrument_type(self) -> InstrumentType:
         def getInstrumentType(instrument_type: str) -> InstrumentType:
@@ -171,9 +175,9 @@ class GroupBox_AssetsTreeView(QtWidgets.QGroupBox):
         self.treeView_assets.resizeColumnsToContents()  # Авторазмер всех столбцов под содержимое.
         '''---------------------------------------------------------'''
 
-    def setAssets(self, token: TokenClass, assets: list[AssetClass]):
+    def setAssets(self, token: TokenClass, assets: list[AssetClass], tokens_pool: list[TokenClass] | None = None):
         """Устанавливает активы для отображения."""
-        self.treeView_assets.model().setAssets(token, assets)
+        self.treeView_assets.model().setAssets(token, assets, tokens_pool)
         self.treeView_assets.expandAll()  # Разворачивает все элементы.
         self.treeView_assets.resizeColumnsToContents()  # Авторазмер всех столбцов под содержимое.
 
@@ -241,9 +245,10 @@ class AssetsPage(QtWidgets.QWidget):
         assets_try_count: RequestTryClass = RequestTryClass(max_request_try_count=2)
         assets_response: MyResponse = MyResponse()
         while assets_try_count and not assets_response.ifDataSuccessfullyReceived():
+            assets_try_count.backoff()  # Задержка перед повторной попыткой.
             assets_response: MyResponse = getAssets(token.token, instruments_type)  # Получение активов.
             assert assets_response.request_occurred, 'Запрос активов не был произведён.'
-            assets_try_count += 1
+            assets_try_count.registerResponse(assets_response)
 
         if assets_response.ifDataSuccessfullyReceived():  # Если список активов был получен.
             assets: list[Asset] = assets_response.response_data  # Извлекаем список активов.
@@ -252,7 +257,7 @@ class AssetsPage(QtWidgets.QWidget):
 
                 assets_list: list[AssetClass] = [AssetClass(asset=asset, parent=self) for asset in assets]
 
-                self.groupBox_view.setAssets(token=token, assets=assets_list)  # Передаём в исходную модель данные.
+                self.groupBox_view.setAssets(token=token, assets=assets_list, tokens_pool=self.groupBox_request.tokens_pool)  # Передаём в исходную модель данные.
                 self.groupBox_request.setCount(len(assets_list))  # Количество полученных активов.
             else:
                 self.__resetData()
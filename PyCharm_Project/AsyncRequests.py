@@ -0,0 +1,240 @@
+from __future__ import annotations
+import asyncio
+import contextlib
+import time
+import typing
+from tinkoff.invest import AsyncClient, RequestError
+from tinkoff.invest.async_services import AsyncServices
+from Classes import TokenClass
+from ClientsPool import ClientsPool
+from LimitClasses import LimitPerMinuteSemaphore, MyUnaryLimit, RequestPriority
+from MyRequests import MyResponse, RequestTryClass, RetryPolicy
+
+
+class AsyncJob:
+    """Задание для асинхронного движка запросов: метод сервиса, его аргументы и связанный с заданием объект."""
+    def __init__(self, key, service: str, method: str, kwargs: dict | None = None, max_request_try_count: int = -1,
+                 policy: RetryPolicy | None = None):
+        self.key = key  # Объект, к которому относится задание (облигация, акция, uid и т.д.).
+        self.service: str = service  # Название сервиса AsyncServices (например, 'instruments').
+        self.method: str = method  # Название метода сервиса (например, 'get_bond_coupons').
+        self.kwargs: dict = {} if kwargs is None else kwargs  # Аргументы метода.
+        self.max_request_try_count: int = max_request_try_count  # Максимальное количество попыток запроса.
+        self.policy: RetryPolicy | None = policy  # Политика повторных попыток.
+
+    @property
+    def method_name(self) -> str:
+        return '{0}()'.format(self.method)
+
+
+def getHelperLimits(tokens_pool: list[TokenClass] | None, method_name: str) -> list[tuple[str, MyUnaryLimit]]:
+    """Возвращает токены из tokens_pool, для которых известен лимит метода method_name, вместе с этими лимитами."""
+    if tokens_pool is None: return []
+    helper_limits: list[tuple[str, MyUnaryLimit]] = []
+    for token_class in tokens_pool:
+        unary_limit: MyUnaryLimit | None = token_class.unary_limits_manager.getMyUnaryLimit(method_name)
+        if unary_limit is not None:
+            helper_limits.append((token_class.token, unary_limit))
+    return helper_limits
+
+
+class AsyncTokenSlot:
+    """Токен, участвующий в выполнении заданий движка, и его unary-лимит."""
+    def __init__(self, token: str, unary_limit: MyUnaryLimit):
+        self.token: str = token
+        self.semaphore: LimitPerMinuteSemaphore = unary_limit.semaphore
+        self.limit_per_minute: int = unary_limit.limit_per_minute
+        self.completed_count: int = 0  # Количество заданий, выполненных через этот токен.
+        self.requests_count: int = 0  # Количество запросов через канал токена в текущем вызове run().
+
+    def getWeight(self) -> int:
+        """Возвращает вес токена - количество запросов, оставшихся в пределах его лимита."""
+        return self.semaphore.available()
+
+
+class AsyncRequestsEngine:
+    """Движок, выполняющий запросы одновременно через AsyncClient в пределах unary-лимита.
+    Задания могут распределяться между несколькими токенами пропорционально их оставшимся лимитам.
+    Каждый вызов run() открывает по одному каналу AsyncClient на токен и выполняет через него все задания вызова.
+    Эти каналы привязаны к циклу событий вызова, поэтому не берутся из ClientsPool, а только учитываются им."""
+    MAX_CONCURRENT_REQUESTS: int = 50  # Максимальное количество одновременно выполняемых запросов.
+    MIN_ACQUIRE_INTERVAL: float = 0.01  # Минимальный интервал (в секундах) между попытками захвата семафора.
+    MAX_ACQUIRE_INTERVAL: float = 1.0  # Максимальный интервал (в секундах) между попытками захвата семафора.
+
+    def __init__(self, token: str, unary_limit: MyUnaryLimit,
+                 interruption_function: typing.Callable[[], bool],
+                 pause_function: typing.Callable[[], None] | None = None,
+                 priority: RequestPriority = RequestPriority.BACKGROUND,
+                 helper_limits: list[tuple[str, MyUnaryLimit]] | None = None):
+        self.__slots: list[AsyncTokenSlot] = [AsyncTokenSlot(token, unary_limit)]  # Токены, через которые выполняются задания.
+        if helper_limits is not None:
+            for helper_token, helper_limit in helper_limits:
+                if all(slot.token != helper_token for slot in self.__slots):
+                    self.__slots.append(AsyncTokenSlot(helper_token, helper_limit))
+        self.__isInterrupted: typing.Callable[[], bool] = interruption_function  # Функция проверки прерывания.
+        self.__checkPause: typing.Callable[[], None] | None = pause_function  # Функция приостановки.
+        self.__priority: RequestPriority = priority  # Приоритет запросов.
+
+        '''------------Статистические переменные------------'''
+        self.request_count: int = 0  # Общее количество запросов.
+        self.exception_count: int = 0  # Количество исключений.
+        self.request_error_count: int = 0  # Количество RequestError.
+        self.completed_count: int = 0  # Количество завершённых заданий.
+        self.retry_count: int = 0  # Количество повторных попыток.
+        self.backoff_time: float = 0.0  # Суммарное время ожидания перед повторными попытками, в секундах.
+        self.requests_time: float = 0.0  # Суммарная длительность запросов, в секундах.
+        self.total_time: float = 0.0  # Длительность работы движка, в секундах.
+        '''-------------------------------------------------'''
+
+    @property
+    def tokens_count(self) -> int:
+        """Количество токенов, между которыми распределяются задания."""
+        return len(self.__slots)
+
+    def getCompletedByTokens(self) -> list[int]:
+        """Возвращает количество заданий, выполненных через каждый из токенов."""
+        return [slot.completed_count for slot in self.__slots]
+
+    def __getWorkersCounts(self, jobs_count: int) -> list[int]:
+        """Распределяет одновременно выполняемые запросы между токенами пропорционально их оставшимся лимитам.
+        Каждому токену достаётся хотя бы один исполнитель."""
+        concurrency: int = max(1, min(sum(slot.limit_per_minute for slot in self.__slots), self.MAX_CONCURRENT_REQUESTS, jobs_count))
+        weights: list[int] = [max(slot.getWeight(), 1) for slot in self.__slots]
+        total_weight: int = sum(weights)
+        return [max(1, min(round(concurrency * weight / total_weight), slot.limit_per_minute)) for slot, weight in zip(self.__slots, weights)]
+
+    def run(self, jobs: list[AsyncJob],
+            result_function: typing.Callable[[AsyncJob, MyResponse], None],
+            error_function: typing.Callable[[AsyncJob, MyResponse], None] | None = None):
+        """Выполняет задания и передаёт результаты в result_function в порядке завершения.
+        error_function вызывается после каждой неудачной попытки запроса. Блокирует вызов до завершения всех заданий."""
+        start_time: float = time.perf_counter()
+        asyncio.run(self.__main(jobs, result_function, error_function))
+        self.total_time = time.perf_counter() - start_time
+
+    async def __main(self, jobs: list[AsyncJob], result_function, error_function):
+        queue: asyncio.Queue[AsyncJob] = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        opened_slots: list[AsyncTokenSlot] = []  # Токены, для которых открыт асинхронный канал.
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                workers: list[typing.Coroutine] = []
+                for slot, workers_count in zip(self.__slots, self.__getWorkersCounts(len(jobs))):
+                    client: AsyncServices = await stack.enter_async_context(AsyncClient(slot.token))
+                    slot.requests_count = 0
+                    opened_slots.append(slot)
+                    workers.extend(self.__worker(client, slot, queue, result_function, error_function) for _ in range(workers_count))
+                await asyncio.gather(*workers)
+        finally:
+            for slot in opened_slots:
+                ClientsPool.registerAsyncChannel(slot.token, slot.requests_count)
+
+    async def __worker(self, client: AsyncServices, slot: AsyncTokenSlot, queue: asyncio.Queue[AsyncJob], result_function, error_function):
+        """Берёт задания из общей очереди только после захвата ресурса своего токена,
+        поэтому токены с большим оставшимся лимитом выполняют больше заданий."""
+        while not queue.empty():
+            if self.__isInterrupted():
+                return
+            if not await self.__acquire(slot.semaphore):
+                return
+            if queue.empty():  # Пока ресурс ожидался, задания могли разобрать другие исполнители.
+                slot.semaphore.release(1)  # Ресурс не потрачен на запрос, поэтому возвращается в лимит.
+                return
+            job: AsyncJob = queue.get_nowait()
+            response: MyResponse = await self.__processJob(client, slot, job, error_function)
+            self.completed_count += 1  # Подсчитываем завершённое задание.
+            slot.completed_count += 1
+            result_function(job, response)
+
+    async def __acquire(self, semaphore: LimitPerMinuteSemaphore) -> bool:
+        """Захватывает ресурс семафора, не блокируя цикл событий. Возвращает False, если поток был прерван."""
+        with semaphore.waiting(self.__priority):
+            while not semaphore.tryAcquire(1, self.__priority):
+                if self.__isInterrupted():
+                    return False
+                await asyncio.sleep(min(max(semaphore.getWaitTime(1), self.MIN_ACQUIRE_INTERVAL), self.MAX_ACQUIRE_INTERVAL))
+        return True
+
+    async def __processJob(self, client: AsyncServices, slot: AsyncTokenSlot, job: AsyncJob, error_function) -> MyResponse:
+        """Выполняет задание. Ресурс семафора для первой попытки уже захвачен исполнителем."""
+        semaphore: LimitPerMinuteSemaphore = slot.semaphore
+        try_count: RequestTryClass = RequestTryClass(max_request_try_count=job.max_request_try_count, policy=job.policy)
+        response: MyResponse = MyResponse()
+        acquired: bool = True  # Флаг захваченного ресурса семафора.
+        while try_count and not response.ifDataSuccessfullyReceived():
+            '''-----------------Задержка перед повторной попыткой-----------------'''
+            delay: float = try_count.getBackoffDelay()
+            if delay > 0.0:
+                await self.__sleep(delay)
+                try_count.registerBackoff(delay)
+                self.retry_count += 1
+                self.backoff_time += delay
+            '''-------------------------------------------------------------------'''
+
+            if self.__isInterrupted():
+                break
+
+            if self.__checkPause is not None:
+                self.__checkPause()  # Приостанавливает весь цикл событий, если поток поставлен на паузу.
+
+            if not acquired and not await self.__acquire(semaphore):
+                break
+            acquired = False
+
+            before: float = time.perf_counter()
+            response = await self.__request(client, job)
+            self.requests_time += time.perf_counter() - before
+            self.request_count += 1  # Подсчитываем запрос.
+            slot.requests_count += 1
+            if response.request_error_flag:
+                semaphore.updateFromRequestError(response.request_error)  # Корректируем ограничитель по данным сервера.
+
+            '''------------------------Подсчёт ошибок------------------------'''
+            if response.request_error_flag:
+                self.request_error_count += 1  # Количество RequestError.
+            elif response.exception_flag:
+                self.exception_count += 1  # Количество исключений.
+            '''--------------------------------------------------------------'''
+
+            if not response.ifDataSuccessfullyReceived() and error_function is not None:
+                error_function(job, response)
+            try_count.registerResponse(response)
+        return response
+
+    async def __sleep(self, delay: float):
+        """Ожидает delay секунд, не блокируя цикл событий. Ожидание прекращается досрочно при прерывании потока."""
+        end_time: float = time.monotonic() + delay
+        while not self.__isInterrupted():
+            remaining: float = end_time - time.monotonic()
+            if remaining <= 0.0:
+                break
+            await asyncio.sleep(min(remaining, RequestTryClass.INTERRUPTION_CHECK_INTERVAL))
+
+    @staticmethod
+    async def __request(client: AsyncServices, job: AsyncJob) -> MyResponse:
+        """Выполняет один запрос и возвращает результат в виде MyResponse."""
+        response_data = None
+        exception_flag: bool | None = None  # Флаг наличия исключения.
+        exception: Exception | None = None  # Исключение.
+        request_error_flag: bool | None = None  # Флаг наличия RequestError.
+        request_error: RequestError | None = None  # RequestError.
+        try:
+            response_data = await getattr(getattr(client, job.service), job.method)(**job.kwargs)
+        except RequestError as error:
+            request_error_flag = True  # Флаг наличия RequestError.
+            request_error = error  # RequestError.
+        except Exception as error:
+            exception_flag = True  # Флаг наличия исключения.
+            exception = error  # Исключение.
+        else:  # Если исключения не было.
+            exception_flag = False  # Флаг наличия исключения.
+            request_error_flag = False  # Флаг наличия RequestError.
+        return MyResponse(method_name=job.method_name,
+                          request_occurred=True,
+                          response_data=response_data,
+                          exception_flag=exception_flag,
+                          exception=exception,
+                          request_error_flag=request_error_flag,
+                          request_error=request_error)
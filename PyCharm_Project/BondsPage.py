@@ -8,6 +8,8 @@ from old_BondsModel import BondsModel, BondsProxyModel
 from Classes import TokenClass, print_slot
 from CouponsModel import CouponsModel, CouponsProxyModel
 from CouponsThread import CouponsThread
+from DatabaseWriter import DatabaseWriterThread
+from LastPricesStream import LastPricesSubscription
 from MyBondClass import MyBondClass, MyBond
 from MyDatabase import MainConnection
 from MyDateTime import getMoscowDateTime
@@ -547,6 +549,7 @@ class BondsPage(QtWidgets.QWidget):
 
         """-----------------------------------------------------------------------"""
         self.__token: TokenClass | None = None
+        self.last_prices_subscription: LastPricesSubscription | None = None  # Подписка на последние цены.
         self.bonds: list[Bond] = []
         # self.coupons_thread: DividendsThread | None = None  # Поток получения дивидендов.
         """-----------------------------------------------------------------------"""
@@ -559,6 +562,7 @@ class BondsPage(QtWidgets.QWidget):
         def onFilterChanged():
             """Функция, выполняемая при изменении фильтра."""
             self._stopCouponsThread()  # Останавливаем поток получения купонов.
+            self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
             token: TokenClass | None = self.token
             if token is None:
                 self.bonds = []
@@ -581,6 +585,7 @@ class BondsPage(QtWidgets.QWidget):
                 self.groupBox_coupons.setData(None)  # Сбрасываем модель купонов.
                 if bond_class_list:  # Если список не пуст.
                     self._startCouponsThread(bond_class_list)  # Запускает поток получения купонов.
+                    self._startLastPricesStream(bond_class_list)  # Подписывается на последние цены облигаций.
 
         # Фильтры инструментов.
         self.groupBox_filters.groupBox_instruments_filters.comboBox_api_trade_available_flag.currentIndexChanged.connect(lambda index: onFilterChanged())
@@ -633,6 +638,7 @@ class BondsPage(QtWidgets.QWidget):
     def onStatusChanged(self, instrument_status: InstrumentStatus):
         """Функция, выполняемая при изменении выбранного статуса инструмента."""
         self._stopCouponsThread()  # Останавливаем поток получения купонов.
+        self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
         token: TokenClass | None = self.token
         if token is None:
             '''
@@ -657,6 +663,7 @@ class BondsPage(QtWidgets.QWidget):
                 self.groupBox_coupons.setData(None)  # Сбрасываем модель купонов.
                 if bond_class_list:  # Если список не пуст.
                     self._startCouponsThread(bond_class_list)  # Запускает поток получения купонов.
+                    self._startLastPricesStream(bond_class_list)  # Подписывается на последние цены облигаций.
             else:
                 self.__reset()  # Сбрасывает облигации.
 
@@ -664,6 +671,7 @@ class BondsPage(QtWidgets.QWidget):
     def onTokenReset(self):
         """Функция, выполняемая при выборе пустого значения вместо токена."""
         self._stopCouponsThread()  # Останавливаем поток получения купонов.
+        self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
         self.token = None
         self.__reset()  # Сбрасывает облигации.
 
@@ -671,14 +679,16 @@ class BondsPage(QtWidgets.QWidget):
     def onTokenChanged(self, token: TokenClass, instrument_status: InstrumentStatus):
         """Функция, выполняемая при изменении выбранного токена."""
         self._stopCouponsThread()  # Останавливаем поток получения купонов.
+        self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
         self.token = token
 
         bonds_try_count: RequestTryClass = RequestTryClass(2)
         bonds_response: MyResponse = MyResponse()
         while bonds_try_count and not bonds_response.ifDataSuccessfullyReceived():
+            bonds_try_count.backoff()  # Задержка перед повторной попыткой.
             bonds_response: MyResponse = getBonds(token.token, instrument_status)  # Получение облигаций.
             assert bonds_response.request_occurred, 'Запрос облигаций не был произведён.'
-            bonds_try_count += 1
+            bonds_try_count.registerResponse(bonds_response)
 
         if bonds_response.ifDataSuccessfullyReceived():  # Если список облигаций был получен.
             bonds: list[Bond] = bonds_response.response_data  # Извлекаем список облигаций.
@@ -694,6 +704,7 @@ class BondsPage(QtWidgets.QWidget):
             self.groupBox_coupons.setData(None)  # Сбрасываем модель купонов.
             if bond_class_list:  # Если список не пуст.
                 self._startCouponsThread(bond_class_list)  # Запускает поток получения купонов.
+                self._startLastPricesStream(bond_class_list)  # Подписывается на последние цены облигаций.
         else:
             self.__reset()  # Сбрасывает облигации.
 
@@ -701,7 +712,8 @@ class BondsPage(QtWidgets.QWidget):
         """Запускает поток получения купонов."""
         assert self.groupBox_view.sourceModel().coupons_receiving_thread is None, 'Поток получения купонов должен быть завершён!'
 
-        self.groupBox_view.sourceModel().coupons_receiving_thread = CouponsThread(token_class=self.token, bond_class_list=bonds)
+        self.groupBox_view.sourceModel().coupons_receiving_thread = CouponsThread(token_class=self.token, bond_class_list=bonds,
+                                                                                 tokens_pool=self.groupBox_request.getTokensPool())
         """---------------------Подключаем сигналы потока к слотам---------------------"""
         # self.groupBox_view.sourceModel().coupons_receiving_thread.printText_signal.connect(print)  # Сигнал для отображения сообщений в консоли.
         self.groupBox_view.sourceModel().coupons_receiving_thread.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
@@ -712,9 +724,8 @@ class BondsPage(QtWidgets.QWidget):
         # self.groupBox_view.sourceModel().coupons_receiving_thread.showRequestError_signal.connect(self.showRequestError)
         # self.groupBox_view.sourceModel().coupons_receiving_thread.showException_signal.connect(self.showException)
 
-        self.groupBox_view.sourceModel().coupons_receiving_thread.couponsReceived.connect(MainConnection.setCoupons)
+        DatabaseWriterThread.getWriter().connectSignal(self.groupBox_view.sourceModel().coupons_receiving_thread.couponsReceived, MainConnection.setCoupons)
 
-        self.groupBox_view.sourceModel().coupons_receiving_thread.releaseSemaphore_signal.connect(lambda semaphore, n: semaphore.release(n))  # Освобождаем ресурсы семафора из основного потока.
 
         self.groupBox_view.sourceModel().coupons_receiving_thread.started.connect(lambda: print('{0}: Поток запущен. ({1})'.format(CouponsThread.__name__, getMoscowDateTime())))
         self.groupBox_view.sourceModel().coupons_receiving_thread.finished.connect(lambda: print('{0}: Поток завершён. ({1})'.format(CouponsThread.__name__, getMoscowDateTime())))
@@ -724,3 +735,15 @@ class BondsPage(QtWidgets.QWidget):
     def _stopCouponsThread(self):
         """Останавливаем поток получения купонов."""
         self.groupBox_view.sourceModel().stopCouponsThread()
+
+    def _startLastPricesStream(self, bonds: list[MyBondClass]):
+        """Подписывается на последние цены облигаций."""
+        assert self.last_prices_subscription is None, 'Подписка на последние цены должна быть отменена!'
+        self.last_prices_subscription = LastPricesSubscription(token=self.token, instruments=bonds, parent=self)
+        self.last_prices_subscription.subscribe()
+
+    def _stopLastPricesStream(self):
+        """Отменяет подписку на последние цены."""
+        if self.last_prices_subscription is not None:  # Если подписка была создана.
+            self.last_prices_subscription.unsubscribe()
+            self.last_prices_subscription = None
@@ -0,0 +1,52 @@
+"""
+Сравнение скорости пакетной вставки строк (строк в секунду) в зависимости от количества строк в одном запросе.
+Используется для выбора MyConnection.BULK_VARIABLES_PER_STATEMENT.
+Запуск: python BulkInsertBenchmark.py [количество строк]
+"""
+import sqlite3
+import sys
+import time
+
+CHUNK_SIZES: tuple[int, ...] = (1, 10, 50, 100, 200, 500, 1000)  # Проверяемые количества строк в одном запросе.
+COLUMNS_COUNTS: tuple[int, ...] = (4, 9, 55)  # Количества столбцов (последние цены, свечи, облигации).
+
+
+def createTable(connection: sqlite3.Connection, columns_count: int):
+    """Создаёт таблицу с уникальным первым столбцом и columns_count - 1 целочисленными столбцами."""
+    columns: str = ', '.join('\"c{0}\" INTEGER NOT NULL'.format(i) for i in range(1, columns_count))
+    connection.execute('CREATE TABLE \"T\" (\"c0\" INTEGER NOT NULL UNIQUE, {0});'.format(columns))
+
+
+def measure(columns_count: int, chunk_size: int, rows_count: int) -> float:
+    """Возвращает скорость вставки (строк в секунду) upsert-запросами по chunk_size строк."""
+    connection: sqlite3.Connection = sqlite3.connect(':memory:')
+    createTable(connection, columns_count)
+    row_placeholders: str = '({0})'.format(', '.join('?' * columns_count))
+    conflict_clause: str = ' ON CONFLICT(\"c0\") DO UPDATE SET \"c1\" = \"excluded\".\"c1\"'
+    rows: list[tuple[int, ...]] = [(i,) + (i,) * (columns_count - 1) for i in range(rows_count)]
+
+    start_time: float = time.perf_counter()
+    for i in range(0, rows_count, chunk_size):
+        chunk: list[tuple[int, ...]] = rows[i:(i + chunk_size)]
+        sql_command: str = 'INSERT INTO \"T\" VALUES {0}{1};'.format(', '.join([row_placeholders] * len(chunk)), conflict_clause)
+        connection.execute(sql_command, [value for row in chunk for value in row])
+    connection.commit()
+    elapsed: float = time.perf_counter() - start_time
+    connection.close()
+    return rows_count / elapsed
+
+
+def main(rows_count: int):
+    variable_limit: int = sqlite3.connect(':memory:').getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    print('Строк: {0}, лимит переменных: {1}.'.format(rows_count, variable_limit))
+    for columns_count in COLUMNS_COUNTS:
+        max_chunk_size: int = variable_limit // columns_count
+        for chunk_size in sorted({min(size, max_chunk_size) for size in CHUNK_SIZES} | {max_chunk_size}):
+            rows_per_second: float = measure(columns_count, chunk_size, rows_count)
+            print('Столбцов: {0}, строк в запросе: {1} ({2} переменных): {3:.0f} строк/с.'.format(
+                columns_count, chunk_size, chunk_size * columns_count, rows_per_second
+            ))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
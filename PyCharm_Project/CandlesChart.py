@@ -23,6 +23,15 @@ class Candlestick(QtCharts.QCandlestickSet):
     def historic_candle(self) -> HistoricCandle:
         return self.__historic_candle
 
+    def setHistoricCandle(self, candle: HistoricCandle):
+        """Обновляет значения свечи (например, формирующейся свечи, полученной из подписки)."""
+        assert candle.time == self.__historic_candle.time, 'Время обновлённой свечи должно совпадать со временем свечи!'
+        self.__historic_candle = candle
+        self.setOpen(MyQuotation.getFloat(candle.open))
+        self.setHigh(MyQuotation.getFloat(candle.high))
+        self.setLow(MyQuotation.getFloat(candle.low))
+        self.setClose(MyQuotation.getFloat(candle.close))
+
 
 class CandlesChart(QtCharts.QChart):
     class CandlestickSeries(QtCharts.QCandlestickSeries):
@@ -31,6 +40,10 @@ class CandlesChart(QtCharts.QChart):
             self.setDecreasingColor(QtCore.Qt.GlobalColor.red)
             self.setIncreasingColor(QtCore.Qt.GlobalColor.green)
 
+    CANDLES_SQL_COMMAND: str = '''SELECT \"instrument_id\", \"interval\", \"open\", \"high\", \"low\", 
+    \"close\", \"volume\", \"time\", \"is_complete\" FROM \"{0}\" WHERE \"instrument_id\" = :instrument_id AND 
+    \"interval\" = :interval AND \"time\" BETWEEN :min_time AND :max_time;'''.format(MyConnection.CANDLES_TABLE)  # Свечи окна графика.
+
     def __init__(self, instrument_uid: str | None, interval: CandleInterval, parent: QtWidgets.QGraphicsItem | None = None):
         super().__init__(parent=parent)
 
@@ -45,6 +58,8 @@ class CandlesChart(QtCharts.QChart):
         self.__instrument_uid: str | None = instrument_uid
         self.__interval: CandleInterval = interval
         self.__candlestick_series: CandlesChart.CandlestickSeries | None = None
+        self.__axisX: QtCharts.QDateTimeAxis | None = None
+        self.__axisY: QtCharts.QValueAxis | None = None
 
         self.__max_datetime: datetime = getUtcDateTime()
 
@@ -121,19 +136,14 @@ class CandlesChart(QtCharts.QChart):
     def __getCandlesFromDb(self) -> list[HistoricCandle]:
         db: QtSql.QSqlDatabase = MainConnection.getDatabase()
         if db.transaction():
-            select_candles_command: str = '''SELECT \"instrument_id\", \"interval\", \"open\", \"high\", \"low\", 
-            \"close\", \"volume\", \"time\", \"is_complete\" FROM \"{0}\" WHERE \"instrument_id\" = :instrument_id AND 
-            \"interval\" = :interval AND DATETIME(\"time\") >= DATETIME(:min_dt) AND DATETIME(\"time\") <= 
-            DATETIME(:max_dt);'''.format(MyConnection.CANDLES_TABLE)
-
             query = QtSql.QSqlQuery(db)
             query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            prepare_flag: bool = query.prepare(select_candles_command)
+            prepare_flag: bool = query.prepare(self.CANDLES_SQL_COMMAND)
             assert prepare_flag, query.lastError().text()
             query.bindValue(':instrument_id', self.__instrument_uid)
             query.bindValue(':interval', self.__interval.name)
-            query.bindValue(':min_dt', MyConnection.convertDateTimeToText(self.min_datetime))
-            query.bindValue(':max_dt', MyConnection.convertDateTimeToText(self.max_datetime))
+            query.bindValue(':min_time', MyConnection.convertDateTimeToMicroseconds(self.min_datetime))
+            query.bindValue(':max_time', MyConnection.convertDateTimeToMicroseconds(self.max_datetime))
             exec_flag: bool = query.exec()
             assert exec_flag, query.lastError().text()
 
@@ -188,9 +198,11 @@ class CandlesChart(QtCharts.QChart):
 
         axisX: QtCharts.QDateTimeAxis = self.__createAxisX(self.min_datetime, self.max_datetime)
         self.addAxis(axisX, QtCore.Qt.AlignmentFlag.AlignBottom)
+        self.__axisX = axisX
 
         axisY: QtCharts.QValueAxis = self.__createAxisY(self.min_value, self.max_value)
         self.addAxis(axisY, QtCore.Qt.AlignmentFlag.AlignLeft)
+        self.__axisY = axisY
 
         self.addSeries(self.__candlestick_series)
 
@@ -206,6 +218,31 @@ class CandlesChart(QtCharts.QChart):
         #         ts: datetime = datetime.fromtimestamp(cs.timestamp() / 1000)
         #         print('{0}. time={1}, timestamp={2}, low={3}, high={4}'.format(i, hc.time, ts, MyQuotation.__repr__(hc.low), MyQuotation.__repr__(hc.high)))
 
+    @QtCore.pyqtSlot(str, CandleInterval, list)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
+    def appendCandles(self, instrument_uid: str, interval: CandleInterval, candles: list[HistoricCandle]):
+        """Добавляет на график новые свечи и обновляет уже отображаемые без повторного чтения из базы данных."""
+        if not candles or instrument_uid != self.__instrument_uid or interval != self.__interval: return
+        if self.__candlestick_series is None or self.__axisX is None or self.__axisY is None: return
+
+        candlesticks: dict[float, Candlestick] = {candlestick.timestamp(): candlestick for candlestick in self.__candlestick_series.sets()}
+        new_candlesticks: list[Candlestick] = []
+        for candle in candles:
+            candlestick: Candlestick | None = candlesticks.get(candle.time.timestamp() * 1000)
+            if candlestick is None:
+                new_candlesticks.append(Candlestick(candle=candle, parent=self))
+            else:
+                candlestick.setHistoricCandle(candle)
+        if new_candlesticks:
+            self.__candlestick_series.append(new_candlesticks)
+
+        '''-------------------------Сдвиг осей-------------------------'''
+        last_time: datetime = max(candle.time for candle in candles)
+        if last_time > self.__max_datetime:
+            self.__max_datetime = last_time  # Сдвигаем окно графика без перезагрузки свечей.
+            self.__axisX.setRange(self.min_datetime, self.max_datetime)
+        self.__axisY.setRange(self.min_value, self.max_value)
+        '''------------------------------------------------------------'''
+
     def setInstrument(self, instrument_uid: str | None):
         self.__instrument_uid = instrument_uid
         self.max_datetime = getMoscowDateTime()
@@ -242,3 +279,7 @@ class GroupBox_Chart(QtWidgets.QGroupBox):
 
     def setInterval(self, interval: CandleInterval):
         self.chart.setInterval(interval)
+
+    @QtCore.pyqtSlot(str, CandleInterval, list)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
+    def appendCandles(self, instrument_uid: str, interval: CandleInterval, candles: list[HistoricCandle]):
+        self.chart.appendCandles(instrument_uid, interval, candles)
@@ -7,7 +7,7 @@ from tinkoff.invest.schemas import Share, HistoricCandle, CandleInterval
 from tinkoff.invest.utils import candle_interval_to_timedelta
 from CandlesView import CandlesChartView
 from Classes import MyConnection, TokenClass, print_slot, ColumnWithHeader, Header
-from LimitClasses import LimitPerMinuteSemaphore
+from LimitClasses import LimitPerMinuteSemaphore, RequestPriority
 from MyBondClass import MyBondClass
 from MyDatabase import MainConnection
 from MyDateTime import getUtcDateTime, getMoscowDateTime, ifDateTimeIsEmpty
@@ -470,49 +470,9 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
 
     class CandlesThread(QtCore.QThread):
         """Поток получения исторических свечей."""
-        class CandlesConnection(MyConnection):
-            CONNECTION_NAME: str = 'InvestmentViewer_CandlesThread'
-
-            @classmethod
-            def insertHistoricCandles(cls, uid: str, interval: CandleInterval, candles: list[HistoricCandle]):
-                """Добавляет свечи в таблицу исторических свечей."""
-                if candles:  # Если список не пуст.
-                    '''------------------------Добавляем свечи в таблицу исторических свечей------------------------'''
-                    db: QtSql.QSqlDatabase = cls.getDatabase()
-                    query = QtSql.QSqlQuery(db)
-
-                    sql_command: str = 'INSERT OR IGNORE INTO \"{0}\" (\"instrument_id\", \"interval\", \"open\", \"high\", \"low\", \"close\", \"volume\", \"time\", \"is_complete\") VALUES '.format(MyConnection.CANDLES_TABLE)
-                    candles_count: int = len(candles)
-                    for i in range(candles_count):
-                        if i > 0: sql_command += ', '  # Если добавляемая свеча не первая.
-                        sql_command += '(:uid, :interval, :open{0}, :high{0}, :low{0}, :close{0}, :volume{0}, :time{0}, :is_complete{0})'.format(i)
-                    sql_command += ' ON CONFLICT (\"instrument_id\", \"interval\", \"time\") DO UPDATE SET ' \
-                                   '\"open\" = \"excluded\".\"open\", \"high\" = \"excluded\".\"high\", ' \
-                                   '\"low\" = \"excluded\".\"low\", \"close\" = \"excluded\".\"close\", ' \
-                                   '\"volume\" = \"excluded\".\"volume\", \"is_complete\" = \"excluded\".\"is_complete\";'
-
-                    prepare_flag: bool = query.prepare(sql_command)
-                    assert prepare_flag, query.lastError().text()
-
-                    query.bindValue(':uid', uid)
-                    query.bindValue(':interval', interval.name)
-                    for i, candle in enumerate(candles):
-                        query.bindValue(':open{0}'.format(i), MyQuotation.__repr__(candle.open))
-                        query.bindValue(':high{0}'.format(i), MyQuotation.__repr__(candle.high))
-                        query.bindValue(':low{0}'.format(i), MyQuotation.__repr__(candle.low))
-                        query.bindValue(':close{0}'.format(i), MyQuotation.__repr__(candle.close))
-                        query.bindValue(':volume{0}'.format(i), candle.volume)
-                        query.bindValue(':time{0}'.format(i), MyConnection.convertDateTimeToText(candle.time))
-                        query.bindValue(':is_complete{0}'.format(i), MyConnection.convertBoolToBlob(candle.is_complete))
-
-                    exec_flag: bool = query.exec()
-                    assert exec_flag, query.lastError().text()
-                    '''---------------------------------------------------------------------------------------------'''
-
         receive_candles_method_name: str = 'GetCandles'
 
         printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
-        releaseSemaphore_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(LimitPerMinuteSemaphore, int)  # Сигнал для освобождения ресурсов семафора из основного потока.
 
         '''-----------------Сигналы progressBar'а-----------------'''
         setProgressBarRange_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(int, int)  # Сигнал для установления минимума и максимума progressBar'а заполнения купонов.
@@ -527,13 +487,6 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
             self._interval: CandleInterval = interval
             self.semaphore: LimitPerMinuteSemaphore | None = self.token.unary_limits_manager.getSemaphore(self.receive_candles_method_name)
 
-            if self.semaphore is not None:
-                @QtCore.pyqtSlot(LimitPerMinuteSemaphore, int)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
-                def __releaseSemaphore(semaphore: LimitPerMinuteSemaphore, n: int):
-                    semaphore.release(n)
-
-                self.releaseSemaphore_signal.connect(__releaseSemaphore)  # Освобождаем ресурсы семафора из основного потока.
-
             '''------------Статистические переменные------------'''
             self.request_count: int = 0  # Общее количество запросов.
             self._success_request_count: int = 0  # Количество успешных запросов.
@@ -603,6 +556,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                         try_count: RequestTryClass = RequestTryClass()
                         response: MyResponse = MyResponse()
                         while try_count and not response.ifDataSuccessfullyReceived():
+                            try_count.backoff(self.isInterruptionRequested)  # Задержка перед повторной попыткой.
                             if self.isInterruptionRequested():
                                 printInConsole('Поток прерван.')
                                 break
@@ -610,7 +564,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                             checkPause()
 
                             """==============================Выполнение запроса=============================="""
-                            self.semaphore.acquire(1)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
+                            self.semaphore.acquire(1, RequestPriority.BACKGROUND)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
 
                             '''----------------Подсчёт статистических параметров----------------'''
                             if ifFirstIteration():  # Не выполняется до второго запроса.
@@ -629,16 +583,15 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                             assert response.request_occurred, 'Запрос свечей не был произведён.'
                             self.request_count += 1  # Подсчитываем запрос.
 
-                            self.releaseSemaphore_signal.emit(self.semaphore, 1)  # Освобождаем ресурсы семафора из основного потока.
-
                             '''-----------------------Сообщаем об ошибке-----------------------'''
                             if response.request_error_flag:
+                                self.semaphore.updateFromRequestError(response.request_error)  # Корректируем ограничитель по данным сервера.
                                 printInConsole('RequestError {0}'.format(response.request_error))
                             elif response.exception_flag:
                                 printInConsole('Exception {0}'.format(response.exception))
                             '''----------------------------------------------------------------'''
                             """=============================================================================="""
-                            try_count += 1
+                            try_count.registerResponse(response)
 
                         candles: list[HistoricCandle] | None
                         if response.ifDataSuccessfullyReceived():
@@ -652,7 +605,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                                 self.instrument.candles = candles
                             else:
                                 self.instrument.candles.extend(candles)
-                            self.CandlesConnection.insertHistoricCandles(uid, self._interval, candles)
+                            MainConnection.insertHistoricCandles(uid, self._interval, candles)  # Соединение потока создаётся автоматически.
 
                         self.setProgressBarValue_signal.emit(request_number)  # Отображаем прогресс в progressBar.
 
@@ -667,8 +620,6 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                     self.setProgressBarRange_signal.emit(0, requests_count)  # Задаёт минимум и максимум progressBar'а.
                     dt_to: datetime = dt_from + max_interval
 
-                    self.CandlesConnection.open()  # Открываем соединение с БД.
-
                     while dt_to < current_dt:
                         if self.isInterruptionRequested():
                             printInConsole('Поток прерван.')
@@ -702,8 +653,6 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                                 self.setProgressBarRange_signal.emit(0, request_number)  # Увеличиваем максимум progressBar'а.
                             requestCandles(dt_from, current_dt, self._interval)
 
-                    self.CandlesConnection.removeConnection()  # Удаляем соединение с БД.
-
     class ThreadStatus(Enum):
         """Статус потока."""
         START_NOT_POSSIBLE = 0  # Поток не запущен. Запуск потока невозможен.
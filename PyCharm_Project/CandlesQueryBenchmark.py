@@ -0,0 +1,99 @@
+"""
+Сравнение времени выборки окна графика свечей из таблицы исторических свечей
+при хранении времени в виде TEXT (ISO 8601) и в виде INTEGER (микросекунды с начала эпохи).
+Запуск: python CandlesQueryBenchmark.py [количество лет истории]
+"""
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+EPOCH: datetime = datetime(1970, 1, 1, tzinfo=timezone.utc)
+INSTRUMENTS_COUNT: int = 3  # Количество инструментов в таблице.
+SESSION_START: timedelta = timedelta(hours=7)  # Начало торговой сессии (UTC).
+SESSION_MINUTES: int = 9 * 60  # Длительность торговой сессии, в минутах.
+WINDOW: timedelta = timedelta(days=1)  # Ширина окна графика.
+REPEATS: int = 50  # Количество выборок окна.
+
+CREATE_TABLE_COMMAND: str = '''CREATE TABLE \"HistoricCandles\" (
+\"instrument_id\" TEXT NOT NULL,
+\"interval\" TEXT NOT NULL,
+\"open\" INTEGER NOT NULL,
+\"high\" INTEGER NOT NULL,
+\"low\" INTEGER NOT NULL,
+\"close\" INTEGER NOT NULL,
+\"volume\" INTEGER NOT NULL,
+\"time\" {0} NOT NULL,
+\"is_complete\" BLOB NOT NULL,
+UNIQUE (\"instrument_id\", \"interval\", \"time\")
+);'''
+
+TEXT_SELECT_COMMAND: str = '''SELECT \"open\", \"high\", \"low\", \"close\", \"volume\", \"time\", \"is_complete\"
+FROM \"HistoricCandles\" WHERE \"instrument_id\" = :instrument_id AND \"interval\" = :interval AND
+DATETIME(\"time\") >= DATETIME(:min_dt) AND DATETIME(\"time\") <= DATETIME(:max_dt);'''
+
+INTEGER_SELECT_COMMAND: str = '''SELECT \"open\", \"high\", \"low\", \"close\", \"volume\", \"time\", \"is_complete\"
+FROM \"HistoricCandles\" WHERE \"instrument_id\" = :instrument_id AND \"interval\" = :interval AND
+\"time\" BETWEEN :min_dt AND :max_dt;'''
+
+
+def getCandlesTimes(start: datetime, years: int) -> list[datetime]:
+    """Возвращает время начала минутных свечей за торговые сессии рабочих дней."""
+    times: list[datetime] = []
+    day: datetime = start
+    while day < start + timedelta(days=365 * years):
+        if day.weekday() < 5:
+            session_start: datetime = day + SESSION_START
+            times.extend(session_start + timedelta(minutes=i) for i in range(SESSION_MINUTES))
+        day += timedelta(days=1)
+    return times
+
+
+def convertDateTimeToMicroseconds(dt: datetime) -> int:
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def createDatabase(column_type: str, times: list[datetime], convert) -> sqlite3.Connection:
+    """Создаёт базу данных в памяти и заполняет таблицу свечей."""
+    connection: sqlite3.Connection = sqlite3.connect(':memory:')
+    connection.execute(CREATE_TABLE_COMMAND.format(column_type))
+    for i in range(INSTRUMENTS_COUNT):
+        connection.executemany(
+            'INSERT INTO \"HistoricCandles\" VALUES (?, \'CANDLE_INTERVAL_1_MIN\', 100, 110, 90, 105, 1000, ?, 1);',
+            (('instrument_{0}'.format(i), convert(dt)) for dt in times)
+        )
+    connection.commit()
+    return connection
+
+
+def measure(connection: sqlite3.Connection, select_command: str, windows: list[tuple[datetime, datetime]], convert) -> tuple[float, int, str]:
+    """Возвращает среднее время выборки окна (в миллисекундах), количество свечей в последнем окне и план запроса."""
+    rows_count: int = 0
+    start_time: float = time.perf_counter()
+    for min_dt, max_dt in windows:
+        rows_count = len(connection.execute(select_command, {'instrument_id': 'instrument_0', 'interval': 'CANDLE_INTERVAL_1_MIN', 'min_dt': convert(min_dt), 'max_dt': convert(max_dt)}).fetchall())
+    average: float = (time.perf_counter() - start_time) * 1000 / len(windows)
+    min_dt, max_dt = windows[-1]
+    plan: str = '; '.join(row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + select_command, {'instrument_id': 'instrument_0', 'interval': 'CANDLE_INTERVAL_1_MIN', 'min_dt': convert(min_dt), 'max_dt': convert(max_dt)}))
+    return average, rows_count, plan
+
+
+def main(years: int):
+    start: datetime = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    times: list[datetime] = getCandlesTimes(start, years)
+    end: datetime = times[-1]
+    windows: list[tuple[datetime, datetime]] = [(end - WINDOW * (i + 1), end - WINDOW * i) for i in range(REPEATS)]
+    print('Свечей на инструмент: {0}, инструментов: {1}, окно: {2}.'.format(len(times), INSTRUMENTS_COUNT, WINDOW))
+
+    for title, column_type, select_command, convert in (
+        ('TEXT + DATETIME()', 'TEXT', TEXT_SELECT_COMMAND, lambda dt: dt.isoformat()),
+        ('INTEGER + BETWEEN', 'INTEGER', INTEGER_SELECT_COMMAND, convertDateTimeToMicroseconds)
+    ):
+        connection: sqlite3.Connection = createDatabase(column_type, times, convert)
+        average, rows_count, plan = measure(connection, select_command, windows, convert)
+        connection.close()
+        print('{0}: {1:.3f} мс на окно ({2} свечей). План: {3}.'.format(title, average, rows_count, plan))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from PyQt6 import QtCore
+from tinkoff.invest import CandleInterval, HistoricCandle
+from Classes import TokenClass
+from StreamMultiplexer import StreamMultiplexer, SubscriptionKey, SubscriptionType, getSubscriptionInterval
+
+
+class CandlesSubscription(QtCore.QObject):
+    """Подписка на свечи инструмента через мультиплексор stream-соединений токена.
+    Свечи записываются в таблицу исторических свечей мультиплексором и передаются подписчику пакетами."""
+    candlesReceived: QtCore.pyqtSignal = QtCore.pyqtSignal(str, CandleInterval, list)  # Сигнал, передающий пакет свечей (list[HistoricCandle]).
+
+    def __init__(self, token: TokenClass, instrument_uid: str, interval: CandleInterval, parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.__multiplexer: StreamMultiplexer = StreamMultiplexer.getMultiplexer(token)
+        self.__key: SubscriptionKey = SubscriptionKey(SubscriptionType.CANDLE, instrument_uid, interval)
+        self.__active: bool = False  # Флаг действующей подписки.
+
+    @property
+    def instrument_uid(self) -> str:
+        return self.__key.instrument_uid
+
+    @property
+    def interval(self) -> CandleInterval:
+        return self.__key.interval
+
+    def subscribe(self) -> bool:
+        """Подписывается на свечи. Возвращает False, если подписка на интервал невозможна."""
+        if self.__active: return True
+        if getSubscriptionInterval(self.__key.interval) is None:
+            print('{0}: Подписка на свечи с интервалом {1} невозможна.'.format(self.__class__.__name__, self.__key.interval.name))
+            return False
+        self.__multiplexer.candlesReceived.connect(self.__onCandlesReceived)
+        self.__multiplexer.subscribe(self, [self.__key])
+        self.__active = True
+        return True
+
+    def unsubscribe(self):
+        """Отписывается от свечей."""
+        if not self.__active: return
+        self.__multiplexer.unsubscribe(self)
+        self.__multiplexer.candlesReceived.disconnect(self.__onCandlesReceived)
+        self.__active = False
+
+    @QtCore.pyqtSlot(str, CandleInterval, list)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
+    def __onCandlesReceived(self, instrument_uid: str, interval: CandleInterval, candles: list[HistoricCandle]):
+        """Передаёт подписчику свечи своего инструмента и интервала."""
+        if instrument_uid == self.__key.instrument_uid and interval == self.__key.interval:
+            self.candlesReceived.emit(instrument_uid, interval, candles)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import threading
+from PyQt6 import QtCore, QtSql
+from Classes import MyConnection
+
+
+class ChangeFeed(QtCore.QObject):
+    """Лента изменений базы данных.
+    Драйвер SQLite присылает по одному уведомлению на каждую изменённую строку. Лента накапливает rowid
+    изменённых строк для каждого соединения и после фиксации транзакции испускает по одной группе на таблицу."""
+
+    """------------------------Сигналы------------------------"""
+    rowsChanged: QtCore.pyqtSignal = QtCore.pyqtSignal(str, list)  # Сигнал, передающий название таблицы и список rowid изменённых строк.
+    """-------------------------------------------------------"""
+
+    TABLES: tuple[str, ...] = (
+        MyConnection.TOKENS_TABLE,
+        MyConnection.BONDS_TABLE,
+        MyConnection.COUPONS_TABLE,
+        MyConnection.LAST_PRICES_TABLE
+    )  # Таблицы, изменения которых отслеживаются.
+
+    __feed: ChangeFeed | None = None  # Общая лента изменений приложения.
+
+    @classmethod
+    def getFeed(cls) -> ChangeFeed:
+        """Возвращает общую ленту изменений, создавая её при первом обращении.
+        Лента принадлежит главному потоку, поэтому слоты получателей выполняются в нём."""
+        if cls.__feed is None:
+            cls.__feed = ChangeFeed()
+            cls.__feed.moveToThread(QtCore.QCoreApplication.instance().thread())
+        return cls.__feed
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.__pending: dict[str, dict[str, set[int]]] = {}  # Накопленные rowid для каждого соединения и каждой таблицы.
+        self.__lock: threading.Lock = threading.Lock()
+
+        """------------Статистические переменные------------"""
+        self.notifications_count: int = 0  # Количество полученных уведомлений драйвера.
+        self.batches_count: int = 0  # Количество испущенных групп.
+        """-------------------------------------------------"""
+
+    def watch(self, db: QtSql.QSqlDatabase, auto_flush: bool = False):
+        """Подписывается на уведомления драйвера соединения db. Должна вызываться в потоке этого соединения.
+        Драйвер доставляет уведомления через очередь событий своего потока, поэтому после фиксации транзакции
+        поток должен обработать события и вызвать flush(). Если auto_flush=True, то flush() вызывается
+        автоматически после обработки всех уведомлений, уже находящихся в очереди событий."""
+        connection_name: str = db.connectionName()
+        driver: QtSql.QSqlDriver = db.driver()
+
+        def collect(name: str, source: QtSql.QSqlDriver.NotificationSource, rowid: int):
+            with self.__lock:
+                self.notifications_count += 1
+                tables: dict[str, set[int]] = self.__pending.setdefault(connection_name, {})
+                first_flag: bool = not tables  # Первое уведомление после последнего flush().
+                tables.setdefault(name, set()).add(rowid)
+            if auto_flush and first_flag:
+                QtCore.QTimer.singleShot(0, lambda: self.flush(connection_name))
+
+        driver.notification.connect(collect, QtCore.Qt.ConnectionType.DirectConnection)
+        for table in self.TABLES:
+            subscribe_flag: bool = driver.subscribeToNotification(table)
+            assert subscribe_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}! driver.lastError().text(): \'{1}\'.'.format(table, driver.lastError().text())
+
+    def flush(self, connection_name: str):
+        """Испускает накопленные для соединения rowid, по одной группе на каждую таблицу."""
+        with self.__lock:
+            tables: dict[str, set[int]] = self.__pending.pop(connection_name, {})
+            self.batches_count += len(tables)
+        for name, rowids in tables.items():
+            self.rowsChanged.emit(name, sorted(rowids))
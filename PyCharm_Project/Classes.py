@@ -1,6 +1,10 @@
+import json
+import os
+import threading
+from time import perf_counter
 import typing
 from abc import ABC
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from PyQt6 import QtWidgets, QtGui, QtSql, QtCore
 from tinkoff.invest import Account, AccessLevel, AccountType, AccountStatus, SecurityTradingStatus, Quotation, MoneyValue, Bond, RealExchange
 from tinkoff.invest.schemas import RiskLevel, Share, ShareType, Coupon, CouponType, LastPrice, Dividend, HistoricCandle, \
@@ -264,6 +268,13 @@ class TokenClass:
     def stream_limits(self, stream_limits: list[MyStreamLimit]):
         self.__stream_limits = stream_limits
 
+    def getMyStreamLimit(self, method_name: str) -> MyStreamLimit | None:
+        """Находит и возвращает stream-лимит, включающий метод с переданным кратким названием."""
+        for stream_limit in self.__stream_limits:
+            if any(my_method.method_name == method_name for my_method in stream_limit.methods):
+                return stream_limit
+        return None
+
 
 def reportAccountAccessLevel(access_level: AccessLevel) -> str:
     """Расшифровывает уровень доступа к текущему счёту."""
@@ -345,6 +356,7 @@ class MyConnection(ABC):
     BONDS_TABLE: str = 'Bonds'
     BRANDS_TABLE: str = 'Brands'
     LAST_PRICES_TABLE: str = 'LastPrices'
+    CURRENT_LAST_PRICES_TABLE: str = 'CurrentLastPrices'
     COUPONS_TABLE: str = 'Coupons'
     CANDLES_TABLE: str = 'HistoricCandles'
     SHARES_TABLE: str = 'Shares'
@@ -363,13 +375,24 @@ class MyConnection(ABC):
     ASSET_CURRENCIES_TABLE: str = 'AssetCurrencies'
     BRANDS_DATA_TABLE: str = 'BrandsData'
 
-    LAST_PRICES_VIEW: str = 'LastPricesView'
+    HISTORY_SCHEMA: str = 'history'  # Имя присоединённого файла БД, хранящего историю цен.
+    HISTORY_TABLES: dict[str, str] = {
+        CANDLES_TABLE: 'instrument_id',
+        LAST_PRICES_TABLE: 'instrument_uid'
+    }  # Таблицы истории цен и их столбцы uid инструмента.
+
+    LAST_PRICES_VIEW: str = 'LastPricesView'  # Устаревшее представление, заменено таблицей CURRENT_LAST_PRICES_TABLE.
 
     ASSETS_BEFORE_UPDATE_TRIGGER: str = 'Assets_on_update_trigger'
     SHARES_TRIGGER_BEFORE_INSERT: str = 'Shares_before_insert_trigger'
     BONDS_TRIGGER_BEFORE_INSERT: str = 'Bonds_before_insert_trigger'
     CANDLES_TRIGGER_BEFORE_INSERT: str = 'Candles_before_insert_trigger'
     INSTRUMENT_UIDS_BEFORE_UPDATE_TRIGGER: str = 'InstrumentUniqueIdentifiers_before_update_trigger'
+
+    INSTRUMENTS_STATUS_STATUS_INDEX: str = 'InstrumentsStatus_status_index'
+    TARGET_ITEMS_CONSENSUS_INDEX: str = 'TargetItems_consensus_index'
+    ASSET_INSTRUMENTS_UID_INDEX: str = 'AssetInstruments_uid_index'
+    CONSENSUS_FORECASTS_ASSET_INDEX: str = 'ConsensusForecasts_asset_index'
     '''------------------------------------------------'''
 
     SQLITE_DRIVER: str = 'QSQLITE'
@@ -377,30 +400,87 @@ class MyConnection(ABC):
 
     DATABASE_NAME: str = 'tinkoff_invest.db'
     CONNECTION_NAME: str  # "Абстрактная" переменная класса, должна быть определена в наследуемом классе.
+    _owner_thread_id: int | None = None  # Идентификатор потока, открывшего соединение CONNECTION_NAME.
+
+    '''-----------------Параметры соединений-----------------'''
+    PRAGMAS: tuple[str, ...] = (
+        'PRAGMA auto_vacuum = INCREMENTAL;',  # Действует только до создания таблиц (или после VACUUM). Свободные страницы возвращаются PRAGMA incremental_vacuum.
+        'PRAGMA journal_mode = WAL;',  # Читатели не блокируют писателя, а писатель не блокирует читателей.
+        'PRAGMA synchronous = NORMAL;',  # В режиме WAL не нарушает целостность БД и не синхронизирует диск при каждой фиксации.
+        'PRAGMA cache_size = -65536;',  # Размер кэша страниц соединения, КиБ (64 МиБ).
+        'PRAGMA mmap_size = 268435456;'  # Размер файла БД, читаемого через отображение в память, байт (256 МиБ).
+    )
+    HISTORY_PRAGMAS: tuple[str, ...] = (
+        'PRAGMA \"{0}\".page_size = 16384;',  # Действует только до создания файла. Крупные страницы ускоряют просмотр диапазонов свечей.
+        'PRAGMA \"{0}\".auto_vacuum = INCREMENTAL;',
+        'PRAGMA \"{0}\".journal_mode = WAL;',
+        'PRAGMA \"{0}\".synchronous = NORMAL;',
+        'PRAGMA \"{0}\".cache_size = -32768;'  # Размер кэша страниц истории, КиБ (32 МиБ).
+    )  # Параметры присоединённого файла истории цен. Его кэш страниц отделён от кэша основного файла.
+    '''------------------------------------------------------'''
 
     @staticmethod
-    def _getSQLiteLimitVariableNumber(database_name: str):
-        """Получает и возвращает лимит на количество переменных в одном запросе."""
+    def _getSQLiteLimitVariableNumber() -> int:
+        """Получает и возвращает лимит на количество переменных в одном запросе.
+        Лимит задаётся при сборке библиотеки SQLite и не зависит от файла БД, поэтому он читается
+        у соединения с базой данных в памяти, не открывая файл DATABASE_NAME."""
         from sqlite3 import connect, Connection, SQLITE_LIMIT_VARIABLE_NUMBER
-        connection: Connection = connect(database_name)  # Создаем подключение к базе данных (файл DATABASE_NAME будет создан).
-
-        # sqlite3_update_hook()
-        # connection.set
-
+        connection: Connection = connect(':memory:')
         limit: int = connection.getlimit(SQLITE_LIMIT_VARIABLE_NUMBER)
         connection.close()
         return limit
 
-    VARIABLE_LIMIT: int = _getSQLiteLimitVariableNumber(DATABASE_NAME)  # Лимит на количество переменных в одном запросе.
+    VARIABLE_LIMIT: int = _getSQLiteLimitVariableNumber()  # Лимит на количество переменных в одном запросе (вычисляется один раз).
+
+    @classmethod
+    def getHistoryDatabaseName(cls) -> str:
+        """Возвращает имя файла истории цен, расположенного рядом с файлом DATABASE_NAME."""
+        root, extension = os.path.splitext(cls.DATABASE_NAME)
+        return '{0}_{1}{2}'.format(root, cls.HISTORY_SCHEMA, extension)
 
     @classmethod
     def open(cls):
-        """Открывает соединение с базой данных."""
-        db: QtSql.QSqlDatabase = QtSql.QSqlDatabase.addDatabase(cls.SQLITE_DRIVER, cls.CONNECTION_NAME)
+        """Открывает соединение с базой данных. Соединение CONNECTION_NAME принадлежит вызывающему потоку."""
+        cls._openDatabase(cls.CONNECTION_NAME)
+        cls._owner_thread_id = threading.get_ident()
+
+    @classmethod
+    def _openDatabase(cls, connection_name: str):
+        """Открывает соединение с базой данных с указанным именем и настраивает его."""
+        db: QtSql.QSqlDatabase = QtSql.QSqlDatabase.addDatabase(cls.SQLITE_DRIVER, connection_name)
         db.setDatabaseName(cls.DATABASE_NAME)
         open_flag: bool = db.open()
         assert open_flag and db.isOpen()
 
+        '''------------------Присоединяем файл истории цен------------------'''
+        """
+        Свечи и последние цены занимают большую часть объёма БД, поэтому хранятся в отдельном файле.
+        Обслуживание и резервное копирование этого файла не затрагивают справочные таблицы, а просмотр истории
+        не вытесняет их страницы из кэша. Имена таблиц уникальны, поэтому запросы обращаются к ним без имени файла.
+        Внешние ключи и триггеры не действуют между файлами БД.
+        """
+        attach_query = QtSql.QSqlQuery(db)
+        attach_prepare_flag: bool = attach_query.prepare('ATTACH DATABASE :file_name AS \"{0}\";'.format(cls.HISTORY_SCHEMA))
+        assert attach_prepare_flag, attach_query.lastError().text()
+        attach_query.bindValue(':file_name', cls.getHistoryDatabaseName())
+        attach_exec_flag: bool = attach_query.exec()
+        assert attach_exec_flag, attach_query.lastError().text()
+        for pragma in cls.HISTORY_PRAGMAS:
+            history_pragma_query = QtSql.QSqlQuery(db)
+            history_pragma_exec_flag: bool = history_pragma_query.exec(pragma.format(cls.HISTORY_SCHEMA))
+            assert history_pragma_exec_flag, history_pragma_query.lastError().text()
+        '''-----------------------------------------------------------------'''
+
+        '''-----------------Настраиваем журнал и кэш соединения-----------------'''
+        """
+        Режим журнала нельзя изменить внутри транзакции, поэтому эти параметры задаются до её начала.
+        """
+        for pragma in cls.PRAGMAS:
+            pragma_query = QtSql.QSqlQuery(db)
+            pragma_exec_flag: bool = pragma_query.exec(pragma)
+            assert pragma_exec_flag, pragma_query.lastError().text()
+        '''--------------------------------------------------------------------'''
+
         if db.transaction():
             '''----Включаем использование внешних ключей для соединения----'''
             """
@@ -430,13 +510,210 @@ class MyConnection(ABC):
     @classmethod
     def removeConnection(cls):
         """Удаляет соединение с базой данных."""
-        db: QtSql.QSqlDatabase = cls.getDatabase()
-        db.close()  # Для удаления соединения с базой данных, надо сначала закрыть базу данных.
-        db.removeDatabase(cls.CONNECTION_NAME)
+        cls._closeDatabase(cls.CONNECTION_NAME)
+        cls._owner_thread_id = None
+
+    @classmethod
+    def _closeDatabase(cls, connection_name: str):
+        """Закрывает и удаляет соединение с указанным именем, если оно существует."""
+        cls._clearPreparedQueries(connection_name)  # Подготовленные запросы должны быть удалены до закрытия соединения.
+        if QtSql.QSqlDatabase.contains(connection_name):
+            db: QtSql.QSqlDatabase = QtSql.QSqlDatabase.database(connection_name, False)
+            db.close()  # Для удаления соединения с базой данных, надо сначала закрыть базу данных.
+            del db
+            QtSql.QSqlDatabase.removeDatabase(connection_name)
+
+    @classmethod
+    def getConnectionName(cls) -> str:
+        """Возвращает имя соединения текущего потока.
+        Поток, открывший соединение методом open(), использует CONNECTION_NAME, остальные потоки - собственные соединения."""
+        thread_id: int = threading.get_ident()
+        return cls.CONNECTION_NAME if thread_id == cls._owner_thread_id else '{0}_thread_{1}'.format(cls.CONNECTION_NAME, thread_id)
 
     @classmethod
     def getDatabase(cls) -> QtSql.QSqlDatabase:
-        return QtSql.QSqlDatabase.database(cls.CONNECTION_NAME)
+        """Возвращает соединение текущего потока.
+        Соединение QThread'а создаётся при первом обращении и удаляется при завершении потока,
+        потому что QSqlDatabase можно использовать только в создавшем его потоке."""
+        connection_name: str = cls.getConnectionName()
+        if connection_name != cls.CONNECTION_NAME and not QtSql.QSqlDatabase.contains(connection_name):
+            cls._openDatabase(connection_name)
+            QtCore.QThread.currentThread().finished.connect(lambda: cls._closeDatabase(connection_name), QtCore.Qt.ConnectionType.DirectConnection)
+        return QtSql.QSqlDatabase.database(connection_name)
+
+    '''-----------------------Групповые транзакции-----------------------'''
+    """
+    Групповая транзакция объединяет записи нескольких методов в одну фиксацию.
+    Пока она открыта, beginTransaction() и commitTransaction() не начинают и не фиксируют собственных транзакций.
+    Соединение используется только создавшим его потоком, поэтому множество не требует блокировки.
+    """
+    _group_transactions: set[str] = set()  # Имена соединений, в которых открыта групповая транзакция.
+
+    @classmethod
+    def beginGroupTransaction(cls, db: QtSql.QSqlDatabase) -> bool:
+        """Начинает групповую транзакцию."""
+        if not db.transaction(): return False
+        cls._group_transactions.add(db.connectionName())
+        return True
+
+    @classmethod
+    def commitGroupTransaction(cls, db: QtSql.QSqlDatabase) -> bool:
+        """Фиксирует групповую транзакцию."""
+        cls._group_transactions.discard(db.connectionName())
+        return db.commit()
+
+    @classmethod
+    def rollbackGroupTransaction(cls, db: QtSql.QSqlDatabase) -> bool:
+        """Откатывает групповую транзакцию."""
+        cls._group_transactions.discard(db.connectionName())
+        return db.rollback()
+
+    @classmethod
+    def beginTransaction(cls, db: QtSql.QSqlDatabase) -> bool:
+        """Начинает транзакцию, если соединение не находится внутри групповой транзакции."""
+        return True if db.connectionName() in cls._group_transactions else db.transaction()
+
+    @classmethod
+    def commitTransaction(cls, db: QtSql.QSqlDatabase) -> bool:
+        """Фиксирует транзакцию, если соединение не находится внутри групповой транзакции."""
+        return True if db.connectionName() in cls._group_transactions else db.commit()
+    '''------------------------------------------------------------------'''
+
+    '''-------------------Кэш подготовленных запросов-------------------'''
+    """
+    Подготовленный запрос принадлежит соединению, поэтому кэш ведётся отдельно для каждого соединения.
+    Соединение используется только создавшим его потоком, поэтому кэш соединения не требует блокировки.
+    """
+    class PreparedQueriesCache:
+        """Кэш подготовленных запросов одного соединения, ключом которого является текст SQL-запроса."""
+        def __init__(self):
+            self.queries: dict[str, QtSql.QSqlQuery] = {}
+
+            """------------Статистические переменные------------"""
+            self.hits: int = 0  # Количество запросов, найденных в кэше.
+            self.misses: int = 0  # Количество запросов, подготовленных заново.
+            """-------------------------------------------------"""
+
+        def clear(self):
+            for query in self.queries.values():
+                query.finish()
+            self.queries.clear()
+
+    _prepared_queries_caches: dict[str, PreparedQueriesCache] = {}  # Кэши подготовленных запросов по именам соединений.
+    _prepared_queries_caches_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def getPreparedQuery(cls, db: QtSql.QSqlDatabase, sql_command: str) -> QtSql.QSqlQuery:
+        """Возвращает подготовленный запрос соединения db, подготавливая его только при первом обращении.
+        Запрос предназначен для последовательного чтения (forwardOnly). После чтения результата
+        следует вызывать finish(), чтобы запрос не удерживал снимок базы данных до следующего выполнения."""
+        connection_name: str = db.connectionName()
+        with cls._prepared_queries_caches_lock:
+            cache: MyConnection.PreparedQueriesCache | None = cls._prepared_queries_caches.get(connection_name)
+            if cache is None:
+                cache = MyConnection.PreparedQueriesCache()
+                cls._prepared_queries_caches[connection_name] = cache
+
+        query: QtSql.QSqlQuery | None = cache.queries.get(sql_command)
+        if query is None:
+            cache.misses += 1
+            query = QtSql.QSqlQuery(db)
+            query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+            prepare_flag: bool = query.prepare(sql_command)
+            assert prepare_flag, query.lastError().text()
+            cache.queries[sql_command] = query
+        else:
+            cache.hits += 1
+            query.finish()  # Сбрасывает результат предыдущего выполнения, если он не был дочитан.
+        return query
+
+    @classmethod
+    def _clearPreparedQueries(cls, connection_name: str):
+        """Удаляет подготовленные запросы соединения."""
+        with cls._prepared_queries_caches_lock:
+            cache: MyConnection.PreparedQueriesCache | None = cls._prepared_queries_caches.pop(connection_name, None)
+        if cache is not None: cache.clear()
+
+    @classmethod
+    def getPreparedQueriesStatistics(cls) -> dict[str, tuple[int, int]]:
+        """Возвращает количество попаданий и промахов кэша подготовленных запросов для каждого соединения."""
+        with cls._prepared_queries_caches_lock:
+            return {connection_name: (cache.hits, cache.misses) for connection_name, cache in cls._prepared_queries_caches.items()}
+    '''-----------------------------------------------------------------'''
+
+    '''-----------------------Пакетная вставка строк-----------------------'''
+    """
+    Запрос из нескольких строк VALUES вставляет строки быстрее, чем отдельные запросы, но слишком большие запросы
+    долго подготавливаются и не должны превышать VARIABLE_LIMIT переменных. Наибольшая скорость вставки достигается
+    при нескольких тысячах переменных в одном запросе (см. BulkInsertBenchmark.py).
+    """
+    BULK_VARIABLES_PER_STATEMENT: int = 4096  # Желаемое количество переменных в одном запросе пакетной вставки.
+    _bulk_statistics: dict[str, tuple[int, float]] = {}  # Количество вставленных строк и затраченное время (с) для каждой таблицы.
+    _bulk_statistics_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def getBulkChunkSize(cls, columns_count: int) -> int:
+        """Возвращает количество строк в одном запросе пакетной вставки."""
+        assert 0 < columns_count <= cls.VARIABLE_LIMIT, 'Количество столбцов ({0}) превышает лимит переменных ({1})!'.format(columns_count, cls.VARIABLE_LIMIT)
+        return max(1, min(cls.BULK_VARIABLES_PER_STATEMENT, cls.VARIABLE_LIMIT) // columns_count)
+
+    @classmethod
+    def bulkInsert(cls, db: QtSql.QSqlDatabase, table_name: str, columns: tuple[str, ...], rows: list[tuple], conflict_clause: str = ''):
+        """Вставляет строки в таблицу частями по getBulkChunkSize() строк.
+        Запрос подготавливается один раз для всех полных частей и ещё раз для последней неполной части,
+        а при повторных вызовах берётся из кэша подготовленных запросов соединения.
+        conflict_clause - необязательное продолжение запроса (например, ON CONFLICT ... DO UPDATE ...).
+        Должна вызываться внутри транзакции вызывающего метода."""
+        if not rows: return
+        columns_count: int = len(columns)
+        chunk_size: int = cls.getBulkChunkSize(columns_count)
+        sql_command_begin: str = 'INSERT INTO \"{0}\" ({1}) VALUES '.format(table_name, ', '.join('\"{0}\"'.format(column) for column in columns))
+        row_placeholders: str = '({0})'.format(', '.join('?' * columns_count))
+
+        start_time: float = perf_counter()
+        query: QtSql.QSqlQuery | None = None
+        query_rows_count: int = 0  # Количество строк в подготовленном запросе.
+        for chunk in partition(rows, chunk_size):
+            if query is None or len(chunk) != query_rows_count:
+                query_rows_count = len(chunk)
+                query = cls.getPreparedQuery(db, '{0}{1}{2};'.format(sql_command_begin, ', '.join([row_placeholders] * query_rows_count), conflict_clause))
+
+            for i, row in enumerate(chunk):
+                assert len(row) == columns_count, 'Количество значений ({0}) не совпадает с количеством столбцов ({1})!'.format(len(row), columns_count)
+                for j, value in enumerate(row):
+                    query.bindValue(i * columns_count + j, value)
+
+            exec_flag: bool = query.exec()
+            assert exec_flag, query.lastError().text()
+
+        elapsed: float = perf_counter() - start_time
+        with cls._bulk_statistics_lock:
+            rows_count, seconds = cls._bulk_statistics.get(table_name, (0, 0.0))
+            cls._bulk_statistics[table_name] = (rows_count + len(rows), seconds + elapsed)
+
+    @classmethod
+    def getBulkInsertThroughput(cls) -> dict[str, float]:
+        """Возвращает среднюю скорость пакетной вставки (строк в секунду) для каждой таблицы."""
+        with cls._bulk_statistics_lock:
+            return {table_name: rows_count / seconds for table_name, (rows_count, seconds) in cls._bulk_statistics.items() if seconds > 0}
+    '''--------------------------------------------------------------------'''
+
+    '''--------------------Поиск по множеству значений--------------------'''
+    """
+    Список IN (?, ?, ...) ограничен VARIABLE_LIMIT переменными, а каждая новая длина списка требует подготовки
+    нового запроса. Табличная функция json_each разворачивает JSON-массив, переданный одной переменной, в таблицу,
+    поэтому поиск по любому количеству значений выполняется одним запросом с неизменным текстом.
+    """
+    @staticmethod
+    def getValuesTable(placeholder: str) -> str:
+        """Возвращает подзапрос, выбирающий значения JSON-массива, переданного в параметре placeholder."""
+        return '(SELECT \"value\" FROM json_each({0}))'.format(placeholder)
+
+    @staticmethod
+    def convertValuesToJson(values: typing.Iterable) -> str:
+        """Конвертирует значения в JSON-массив для параметра подзапроса getValuesTable()."""
+        return json.dumps(list(values), ensure_ascii=False)
+    '''-------------------------------------------------------------------'''
 
     @staticmethod
     def convertDateTimeToText(dt: datetime, sep: str = 'T', timespec: str = 'auto') -> str:
@@ -448,6 +725,55 @@ class MyConnection(ABC):
         """Конвертирует TEXT в datetime при извлечении из БД."""
         return datetime.fromisoformat(text)
 
+    '''-----------------Хранение времени в целочисленных столбцах-----------------'''
+    EPOCH: datetime = datetime(1970, 1, 1, tzinfo=timezone.utc)  # Начало эпохи.
+    MICROSECOND: timedelta = timedelta(microseconds=1)
+
+    @classmethod
+    def convertDateTimeToMicroseconds(cls, dt: datetime) -> int:
+        """Конвертирует datetime в количество микросекунд с начала эпохи (INTEGER) для хранения в БД.
+        Время без часового пояса считается временем UTC."""
+        if dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
+        return (dt - cls.EPOCH) // cls.MICROSECOND
+
+    @classmethod
+    def convertMicrosecondsToDateTime(cls, microseconds: int) -> datetime:
+        """Конвертирует количество микросекунд с начала эпохи (INTEGER) в datetime (UTC) при извлечении из БД."""
+        return cls.EPOCH + timedelta(microseconds=microseconds)
+    '''---------------------------------------------------------------------------'''
+
+    '''---------------Хранение Quotation и MoneyValue в целочисленных столбцах---------------'''
+    NANO_SCALE: int = 1_000_000_000  # Quotation хранится в БД как одно целое число units * NANO_SCALE + nano.
+    CURRENCY_COLUMN_SUFFIX: str = '_currency'  # Суффикс столбца валюты, сопровождающего столбец MoneyValue.
+
+    @classmethod
+    def convertQuotationToInteger(cls, quotation: Quotation) -> int:
+        """Конвертирует Quotation (или MoneyValue) в INTEGER для хранения в БД."""
+        return quotation.units * cls.NANO_SCALE + quotation.nano
+
+    @classmethod
+    def convertIntegerToQuotation(cls, value: int) -> Quotation:
+        """Конвертирует INTEGER в Quotation при извлечении из БД. Знаки units и nano совпадают."""
+        units, nano = divmod(abs(value), cls.NANO_SCALE)
+        return Quotation(units, nano) if value >= 0 else Quotation(-units, -nano)
+
+    @classmethod
+    def convertIntegerToMoneyValue(cls, value: int, currency: str) -> MoneyValue:
+        """Конвертирует INTEGER и валюту в MoneyValue при извлечении из БД."""
+        quotation: Quotation = cls.convertIntegerToQuotation(value)
+        return MoneyValue(currency=currency, units=quotation.units, nano=quotation.nano)
+
+    @classmethod
+    def getQuotationValue(cls, query: QtSql.QSqlQuery, column: str) -> Quotation:
+        """Извлекает Quotation из целочисленного столбца текущей строки запроса."""
+        return cls.convertIntegerToQuotation(query.value(column))
+
+    @classmethod
+    def getMoneyValue(cls, query: QtSql.QSqlQuery, column: str) -> MoneyValue:
+        """Извлекает MoneyValue из целочисленного столбца и столбца валюты текущей строки запроса."""
+        return cls.convertIntegerToMoneyValue(query.value(column), query.value(column + cls.CURRENCY_COLUMN_SUFFIX))
+    '''--------------------------------------------------------------------------------------'''
+
     @staticmethod
     def extractUnitsAndNanoFromText(text: str) -> tuple[int, int]:
         """Извлекает units и nano из строки Quotation."""
@@ -530,12 +856,12 @@ class MyConnection(ABC):
         isin: str = query.value('isin')
         lot: int = query.value('lot')
         currency: str = query.value('currency')
-        klong: Quotation = cls.convertTextToQuotation(query.value('klong'))
-        kshort: Quotation = cls.convertTextToQuotation(query.value('kshort'))
-        dlong: Quotation = cls.convertTextToQuotation(query.value('dlong'))
-        dshort: Quotation = cls.convertTextToQuotation(query.value('dshort'))
-        dlong_min: Quotation = cls.convertTextToQuotation(query.value('dlong_min'))
-        dshort_min: Quotation = cls.convertTextToQuotation(query.value('dshort_min'))
+        klong: Quotation = cls.getQuotationValue(query, 'klong')
+        kshort: Quotation = cls.getQuotationValue(query, 'kshort')
+        dlong: Quotation = cls.getQuotationValue(query, 'dlong')
+        dshort: Quotation = cls.getQuotationValue(query, 'dshort')
+        dlong_min: Quotation = cls.getQuotationValue(query, 'dlong_min')
+        dshort_min: Quotation = cls.getQuotationValue(query, 'dshort_min')
         short_enabled_flag: bool = bool(query.value('short_enabled_flag'))
         name: str = query.value('name')
         exchange: str = query.value('exchange')
@@ -545,14 +871,14 @@ class MyConnection(ABC):
         country_of_risk_name: str = query.value('country_of_risk_name')
         sector: str = query.value('sector')
         issue_size_plan: int = query.value('issue_size_plan')
-        nominal: MoneyValue = cls.convertTextToMoneyValue(query.value('nominal'))
+        nominal: MoneyValue = cls.getMoneyValue(query, 'nominal')
         trading_status: SecurityTradingStatus = SecurityTradingStatus.from_string(query.value('trading_status'))
         otc_flag: bool = bool(query.value('otc_flag'))
         buy_available_flag: bool = bool(query.value('buy_available_flag'))
         sell_available_flag: bool = bool(query.value('sell_available_flag'))
         div_yield_flag: bool = bool(query.value('div_yield_flag'))
         share_type: ShareType = ShareType.from_string(query.value('share_type'))
-        min_price_increment: Quotation = cls.convertTextToQuotation(query.value('min_price_increment'))
+        min_price_increment: Quotation = cls.getQuotationValue(query, 'min_price_increment')
         api_trade_available_flag: bool = bool(query.value('api_trade_available_flag'))
         uid: str = query.value('uid')
         real_exchange: RealExchange = RealExchange.from_string(query.value('real_exchange'))
@@ -587,23 +913,23 @@ class MyConnection(ABC):
         isin: str = query.value('isin')
         lot: int = query.value('lot')
         currency: str = query.value('currency')
-        klong: Quotation = cls.convertTextToQuotation(query.value('klong'))
-        kshort: Quotation = cls.convertTextToQuotation(query.value('kshort'))
-        dlong: Quotation = cls.convertTextToQuotation(query.value('dlong'))
-        dshort: Quotation = cls.convertTextToQuotation(query.value('dshort'))
-        dlong_min: Quotation = cls.convertTextToQuotation(query.value('dlong_min'))
-        dshort_min: Quotation = cls.convertTextToQuotation(query.value('dshort_min'))
+        klong: Quotation = cls.getQuotationValue(query, 'klong')
+        kshort: Quotation = cls.getQuotationValue(query, 'kshort')
+        dlong: Quotation = cls.getQuotationValue(query, 'dlong')
+        dshort: Quotation = cls.getQuotationValue(query, 'dshort')
+        dlong_min: Quotation = cls.getQuotationValue(query, 'dlong_min')
+        dshort_min: Quotation = cls.getQuotationValue(query, 'dshort_min')
         short_enabled_flag: bool = bool(query.value('short_enabled_flag'))
         name: str = query.value('name')
         exchange: str = query.value('exchange')
         coupon_quantity_per_year: int = query.value('coupon_quantity_per_year')
         maturity_date: datetime = cls.convertTextToDateTime(query.value('maturity_date'))
-        nominal: MoneyValue = cls.convertTextToMoneyValue(query.value('nominal'))
-        initial_nominal: MoneyValue = cls.convertTextToMoneyValue(query.value('initial_nominal'))
+        nominal: MoneyValue = cls.getMoneyValue(query, 'nominal')
+        initial_nominal: MoneyValue = cls.getMoneyValue(query, 'initial_nominal')
         state_reg_date: datetime = cls.convertTextToDateTime(query.value('state_reg_date'))
         placement_date: datetime = cls.convertTextToDateTime(query.value('placement_date'))
-        placement_price: MoneyValue = cls.convertTextToMoneyValue(query.value('placement_price'))
-        aci_value: MoneyValue = cls.convertTextToMoneyValue(query.value('aci_value'))
+        placement_price: MoneyValue = cls.getMoneyValue(query, 'placement_price')
+        aci_value: MoneyValue = cls.getMoneyValue(query, 'aci_value')
         country_of_risk: str = query.value('country_of_risk')
         country_of_risk_name: str = query.value('country_of_risk_name')
         sector: str = query.value('sector')
@@ -617,7 +943,7 @@ class MyConnection(ABC):
         floating_coupon_flag: bool = bool(query.value('floating_coupon_flag'))
         perpetual_flag: bool = bool(query.value('perpetual_flag'))
         amortization_flag: bool = bool(query.value('amortization_flag'))
-        min_price_increment: Quotation = cls.convertTextToQuotation(query.value('min_price_increment'))
+        min_price_increment: Quotation = cls.getQuotationValue(query, 'min_price_increment')
         api_trade_available_flag: bool = bool(query.value('api_trade_available_flag'))
         uid: str = query.value('uid')
         real_exchange: RealExchange = RealExchange.from_string(query.value('real_exchange'))
@@ -656,7 +982,7 @@ class MyConnection(ABC):
         coupon_date: datetime = cls.convertTextToDateTime(coupons_query.value('coupon_date'))
         coupon_number: int = coupons_query.value('coupon_number')
         fix_date: datetime = cls.convertTextToDateTime(coupons_query.value('fix_date'))
-        pay_one_bond: MoneyValue = cls.convertTextToMoneyValue(coupons_query.value('pay_one_bond'))
+        pay_one_bond: MoneyValue = cls.getMoneyValue(coupons_query, 'pay_one_bond')
         coupon_type: CouponType = CouponType.from_string(coupons_query.value('coupon_type'))
         coupon_start_date: datetime = cls.convertTextToDateTime(coupons_query.value('coupon_start_date'))
         coupon_end_date: datetime = cls.convertTextToDateTime(coupons_query.value('coupon_end_date'))
@@ -683,12 +1009,9 @@ class MyConnection(ABC):
 
     @classmethod
     def getLastPrice(cls, db: QtSql.QSqlDatabase, instrument_uid: str) -> LastPrice | None:
-        last_price_sql_command: str = 'SELECT \"figi\", \"price\", \"time\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid;'.format(cls.LAST_PRICES_VIEW)
+        last_price_sql_command: str = 'SELECT \"figi\", \"price\", \"time\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid;'.format(cls.CURRENT_LAST_PRICES_TABLE)
 
-        last_price_query = QtSql.QSqlQuery(db)
-        last_price_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-        last_price_prepare_flag: bool = last_price_query.prepare(last_price_sql_command)
-        assert last_price_prepare_flag, last_price_query.lastError().text()
+        last_price_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, last_price_sql_command)
         last_price_query.bindValue(':instrument_uid', instrument_uid)
         last_price_exec_flag: bool = last_price_query.exec()
         assert last_price_exec_flag, last_price_query.lastError().text()
@@ -699,11 +1022,10 @@ class MyConnection(ABC):
             last_price_rows_count += 1
             assert last_price_rows_count < 2, 'Не должно быть нескольких строк с одним и тем же instrument_uid (\'{0}\')!'.format(instrument_uid)
             figi: str = last_price_query.value('figi')
-            price_str: str = last_price_query.value('price')
-            time_str: str = last_price_query.value('time')
-            price: Quotation = cls.convertTextToQuotation(price_str)
-            time: datetime = cls.convertTextToDateTime(time_str)
+            price: Quotation = cls.getQuotationValue(last_price_query, 'price')
+            time: datetime = cls.convertMicrosecondsToDateTime(last_price_query.value('time'))
             last_price = LastPrice(figi=figi, price=price, time=time, instrument_uid=instrument_uid)
+        last_price_query.finish()
         return last_price
 
     @classmethod
@@ -721,12 +1043,12 @@ class MyConnection(ABC):
     @classmethod
     def getHistoricCandle(cls, query: QtSql.QSqlQuery) -> HistoricCandle:
         """Создаёт и возвращает экземпляр класса HistoricCandle."""
-        open_: Quotation = cls.convertTextToQuotation(query.value('open'))
-        high: Quotation = cls.convertTextToQuotation(query.value('high'))
-        low: Quotation = cls.convertTextToQuotation(query.value('low'))
-        close: Quotation = cls.convertTextToQuotation(query.value('close'))
+        open_: Quotation = cls.getQuotationValue(query, 'open')
+        high: Quotation = cls.getQuotationValue(query, 'high')
+        low: Quotation = cls.getQuotationValue(query, 'low')
+        close: Quotation = cls.getQuotationValue(query, 'close')
         volume: int = query.value('volume')
-        time: datetime = cls.convertTextToDateTime(query.value('time'))
+        time: datetime = cls.convertMicrosecondsToDateTime(query.value('time'))
         is_complete: bool = cls.convertBlobToBool(query.value('is_complete'))
         return HistoricCandle(open=open_, high=high, low=low, close=close, volume=volume, time=time, is_complete=is_complete)
 
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import threading
+import time
+from grpc import StatusCode
+from tinkoff.invest import Client, RequestError
+from tinkoff.invest.services import Services
+
+
+class PooledChannel:
+    """Открытый grpc-канал (клиент) токена, который повторно используется разными запросами."""
+    def __init__(self, token: str):
+        self.__client: Client = Client(token)
+        self.services: Services = self.__client.__enter__()  # Открывает grpc-канал.
+        self.created_at: float = time.monotonic()  # Время создания канала.
+        self.requests_count: int = 0  # Количество запросов, выполненных через канал.
+        self.active_count: int = 0  # Количество запросов, выполняемых через канал в данный момент.
+        self.first_request_time: float | None = None  # Длительность первого запроса (включает установку соединения), в секундах.
+        self.requests_time: float = 0.0  # Суммарная длительность последующих запросов, в секундах.
+        self.broken: bool = False  # Флаг неисправного канала.
+
+    @property
+    def reuse_count(self) -> int:
+        """Возвращает количество повторных использований канала."""
+        return max(self.requests_count - 1, 0)
+
+    def getAverageRequestTime(self) -> float | None:
+        """Возвращает среднюю длительность запроса через уже установленное соединение."""
+        return None if self.reuse_count == 0 else self.requests_time / self.reuse_count
+
+    def getSavedTime(self) -> float:
+        """Оценивает время (в секундах), сэкономленное за счёт повторного использования канала."""
+        average_time: float | None = self.getAverageRequestTime()
+        if self.first_request_time is None or average_time is None:
+            return 0.0
+        return max(self.first_request_time - average_time, 0.0) * self.reuse_count
+
+    def registerRequest(self, duration: float):
+        """Учитывает выполненный через канал запрос."""
+        if self.requests_count == 0:
+            self.first_request_time = duration
+        else:
+            self.requests_time += duration
+        self.requests_count += 1
+
+    def close(self):
+        """Закрывает grpc-канал."""
+        self.__client.__exit__(None, None, None)
+
+
+class ClientsPool:
+    """
+    Потокобезопасный пул grpc-каналов, по одному каналу на токен.
+    Асинхронный движок запросов (AsyncRequests.py) открывает собственный канал AsyncClient на каждый вызов run():
+    асинхронный канал привязан к циклу событий, который asyncio.run создаёт заново, поэтому такой канал не хранится в пуле.
+    Пул лишь учитывает эти каналы (registerAsyncChannel), и их запросы не входят в оценку сэкономленного времени.
+    """
+    __lock: threading.Lock = threading.Lock()
+    __channels: dict[str, PooledChannel] = {}  # Открытые каналы токенов.
+    __broken_channels: list[PooledChannel] = []  # Неисправные каналы, которые ещё используются запросами.
+    __reconnects: dict[str, int] = {}  # Количество переподключений по токенам.
+    __async_channels: dict[str, int] = {}  # Количество асинхронных каналов, открытых движком, по токенам.
+    __async_requests: dict[str, int] = {}  # Количество запросов через асинхронные каналы по токенам.
+
+    @staticmethod
+    def ifChannelBroken(error: Exception) -> bool:
+        """Возвращает True, если исключение означает, что канал необходимо пересоздать."""
+        if isinstance(error, RequestError):
+            return error.code == StatusCode.UNAVAILABLE
+        elif isinstance(error, ValueError):
+            return 'closed channel' in str(error)  # grpc: "Cannot invoke RPC on closed channel!".
+        return False
+
+    @classmethod
+    def acquire(cls, token: str) -> PooledChannel:
+        """Возвращает открытый канал токена, при необходимости создавая его."""
+        with cls.__lock:
+            channel: PooledChannel | None = cls.__channels.get(token)
+            if channel is None:
+                channel = PooledChannel(token)
+                cls.__channels[token] = channel
+            channel.active_count += 1
+            return channel
+
+    @classmethod
+    def release(cls, token: str, channel: PooledChannel, duration: float, error: Exception | None = None):
+        """Возвращает канал в пул после выполнения запроса. Неисправный канал удаляется из пула."""
+        with cls.__lock:
+            channel.active_count -= 1
+            channel.registerRequest(duration)
+            if error is not None and not channel.broken and cls.ifChannelBroken(error):
+                channel.broken = True
+                if cls.__channels.get(token) is channel:
+                    cls.__channels.pop(token)
+                    cls.__reconnects[token] = cls.__reconnects.get(token, 0) + 1
+                cls.__broken_channels.append(channel)
+
+            '''-----Закрываем неисправные каналы, которые больше не используются-----'''
+            for broken_channel in [c for c in cls.__broken_channels if c.active_count == 0]:
+                cls.__broken_channels.remove(broken_channel)
+                broken_channel.close()
+            '''----------------------------------------------------------------------'''
+
+    @classmethod
+    def registerAsyncChannel(cls, token: str, requests_count: int):
+        """Учитывает закрытый асинхронный канал токена и количество выполненных через него запросов."""
+        with cls.__lock:
+            cls.__async_channels[token] = cls.__async_channels.get(token, 0) + 1
+            cls.__async_requests[token] = cls.__async_requests.get(token, 0) + requests_count
+
+    @classmethod
+    def getReconnectsCount(cls, token: str) -> int:
+        """Возвращает количество переподключений токена."""
+        with cls.__lock:
+            return cls.__reconnects.get(token, 0)
+
+    @classmethod
+    def getChannel(cls, token: str) -> PooledChannel | None:
+        """Возвращает открытый канал токена, если он есть."""
+        with cls.__lock:
+            return cls.__channels.get(token)
+
+    @classmethod
+    def getStatisticsText(cls) -> str:
+        """Возвращает статистику повторного использования каналов по токенам.
+        Токены сокращаются до последних символов, чтобы не выводить их полностью.
+        Асинхронные каналы движка запросов приводятся отдельно и в сэкономленное время не входят."""
+        with cls.__lock:
+            texts: list[str] = []
+            for token in sorted(cls.__channels.keys() | cls.__reconnects.keys() | cls.__async_channels.keys()):
+                channel: PooledChannel | None = cls.__channels.get(token)
+                requests_count: int = 0 if channel is None else channel.requests_count
+                reuse_count: int = 0 if channel is None else channel.reuse_count
+                saved_time: float = 0.0 if channel is None else channel.getSavedTime()
+                texts.append('токен ...{0}: запросов {1}, повторных использований канала {2} (сэкономлено {3:.2f}с), переподключений {4}, асинхронных каналов вне пула {5} (запросов {6})'.format(
+                    token[-4:], requests_count, reuse_count, saved_time, cls.__reconnects.get(token, 0),
+                    cls.__async_channels.get(token, 0), cls.__async_requests.get(token, 0)
+                ))
+            return '; '.join(texts) if texts else 'каналы не открывались'
+
+    @classmethod
+    def closeAll(cls):
+        """Выводит статистику каналов и закрывает все каналы пула."""
+        print('{0}: {1}.'.format(cls.__name__, cls.getStatisticsText()))
+        with cls.__lock:
+            for channel in cls.__channels.values():
+                channel.close()
+            cls.__channels.clear()
+            for channel in cls.__broken_channels:
+                channel.close()
+            cls.__broken_channels.clear()
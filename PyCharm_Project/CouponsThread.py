@@ -1,11 +1,11 @@
 from datetime import datetime
 from PyQt6 import QtCore
 from tinkoff.invest import Coupon, RequestError
+from AsyncRequests import AsyncJob, AsyncRequestsEngine, getHelperLimits
 from Classes import TokenClass
-from LimitClasses import LimitPerMinuteSemaphore
-from MyDateTime import getUtcDateTime
+from LimitClasses import LimitPerMinuteSemaphore, MyUnaryLimit, RequestPriority
 from MyBondClass import MyBondClass
-from MyRequests import getCoupons, MyResponse, RequestTryClass
+from MyRequests import MyResponse
 
 
 class CouponsThread(QtCore.QThread):
@@ -29,11 +29,11 @@ class CouponsThread(QtCore.QThread):
     showException_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str, Exception)  # Сигнал для отображения исключения.
     """--------------------------------------------------------"""
 
-    releaseSemaphore_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(LimitPerMinuteSemaphore, int)  # Сигнал для освобождения ресурсов семафора из основного потока.
-
-    def __init__(self, token_class: TokenClass, bond_class_list: list[MyBondClass], parent: QtCore.QObject | None = None):
+    def __init__(self, token_class: TokenClass, bond_class_list: list[MyBondClass], parent: QtCore.QObject | None = None,
+                 tokens_pool: list[TokenClass] | None = None):
         super().__init__(parent=parent)
         self.token: TokenClass = token_class
+        self.tokens_pool: list[TokenClass] = [] if tokens_pool is None else tokens_pool  # Дополнительные токены для распределения запросов.
         self.semaphore: LimitPerMinuteSemaphore | None = self.token.unary_limits_manager.getSemaphore(self.receive_coupons_method_name)
         self.bonds: list[MyBondClass] = bond_class_list
 
@@ -50,77 +50,47 @@ class CouponsThread(QtCore.QThread):
         def printInConsole(text: str):
             self.printText_signal.emit('{0}: {1}'.format(CouponsThread.__name__, text))
 
-        def ifFirstIteration() -> bool:
-            """Возвращает True, если поток не сделал ни одного запроса. Иначе возвращает False."""
-            return self.request_count > 0
-
-        if self.semaphore is None:
+        unary_limit: MyUnaryLimit | None = self.token.unary_limits_manager.getMyUnaryLimit(self.receive_coupons_method_name)
+        if unary_limit is None:
             printInConsole('Лимит для метода {0} не найден.'.format(self.receive_coupons_method_name))
         else:
             bonds_count: int = len(self.bonds)  # Количество облигаций.
             self.setProgressBarRange_signal.emit(0, bonds_count)  # Задаёт минимум и максимум progressBar'а заполнения купонов.
 
-            for i, bond_class in enumerate(self.bonds):
-                if self.isInterruptionRequested():
-                    printInConsole('Поток прерван.')
-                    break
-
-                bond_number: int = i + 1  # Номер текущей облигации.
-                self.setProgressBarValue_signal.emit(bond_number)  # Отображаем прогресс в progressBar.
-
-                # '------------Выбор временного интервала------------'
-                # qdt_from: datetime = bond_class.bond.state_reg_date
-                # qdt_to: datetime = getUtcDateTime() if ifDateTimeIsEmpty(bond_class.bond.maturity_date) else bond_class.bond.maturity_date
-                # '--------------------------------------------------'
-
-                coupons_try_count: RequestTryClass = RequestTryClass()
-                coupons_response: MyResponse = MyResponse()
-                while coupons_try_count and not coupons_response.ifDataSuccessfullyReceived():
-                    if self.isInterruptionRequested():
-                        printInConsole('Поток прерван.')
-                        break
-
-                    """---------------------------Выполнение запроса---------------------------"""
-                    self.semaphore.acquire(1)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
-
-                    '''----------------Подсчёт статистических параметров----------------'''
-                    if ifFirstIteration():  # Не выполняется до второго запроса.
-                        delta: float = (getUtcDateTime() - self.control_point).total_seconds()  # Секунд прошло с последнего запроса.
-                        printInConsole('{0} из {1} ({2:.2f}с)'.format(bond_number, bonds_count, delta))
-                    else:
-                        printInConsole('{0} из {1}'.format(bond_number, bonds_count))
-                    self.control_point = getUtcDateTime()  # Промежуточная точка отсчёта времени.
-                    '''-----------------------------------------------------------------'''
-
-                    before_dt: datetime = getUtcDateTime()
-                    # coupons_response = getCoupons(token=self.token.token,
-                    #                               from_=qdt_from,
-                    #                               to=qdt_to,
-                    #                               instrument_id=bond_class.bond.uid)
-                    coupons_response = getCoupons(token=self.token.token, instrument_id=bond_class.bond.uid)
-                    delta: float = (getUtcDateTime() - before_dt).total_seconds()
-                    self.requests_time += delta
-                    # printInConsole('delta: {0} с.'.format(delta))
-
-                    assert coupons_response.request_occurred, 'Запрос купонов не был произведён!'
-                    self.request_count += 1  # Подсчитываем запрос.
-                    self.releaseSemaphore_signal.emit(self.semaphore, 1)  # Освобождаем ресурсы семафора из основного потока.
-
-                    '''------------------------Сообщаем об ошибке------------------------'''
-                    if coupons_response.request_error_flag:
-                        self.request_error_count += 1  # Количество RequestError.
-                        printInConsole('RequestError {0}'.format(coupons_response.request_error))
-                    elif coupons_response.exception_flag:
-                        self.exception_count += 1  # Количество исключений.
-                        printInConsole('Exception {0}'.format(coupons_response.exception))
-                    '''------------------------------------------------------------------'''
-                    """------------------------------------------------------------------------"""
-                    coupons_try_count += 1
-
-                coupons: list[Coupon] | None = coupons_response.response_data if coupons_response.ifDataSuccessfullyReceived() else None
-                if coupons is None: continue  # Если поток был прерван или если информация не была получена.
-
+            jobs: list[AsyncJob] = [AsyncJob(bond_class, 'instruments', 'get_bond_coupons', {'instrument_id': bond_class.bond.uid}) for bond_class in self.bonds]
+
+            def onError(job: AsyncJob, coupons_response: MyResponse):
+                """Сообщает об ошибке."""
+                if coupons_response.request_error_flag:
+                    printInConsole('RequestError {0}'.format(coupons_response.request_error))
+                elif coupons_response.exception_flag:
+                    printInConsole('Exception {0}'.format(coupons_response.exception))
+
+            def onResult(job: AsyncJob, coupons_response: MyResponse):
+                """Обрабатывает результаты в порядке завершения запросов."""
+                self.setProgressBarValue_signal.emit(engine.completed_count)  # Отображаем прогресс в progressBar.
+                if not coupons_response.ifDataSuccessfullyReceived(): return  # Если поток был прерван или если информация не была получена.
+                bond_class: MyBondClass = job.key
+                coupons: list[Coupon] = coupons_response.response_data.events
                 bond_class.setCoupons(coupons)  # Записываем список купонов в облигацию.
                 self.couponsReceived.emit(bond_class.bond.uid, coupons)  # Добавляем купоны в таблицу купонов.
 
-            printInConsole('seconds: {0}'.format(self.requests_time / bonds_count))
+            engine: AsyncRequestsEngine = AsyncRequestsEngine(token=self.token.token,
+                                                              unary_limit=unary_limit,
+                                                              interruption_function=self.isInterruptionRequested,
+                                                              priority=RequestPriority.VISIBLE_ROWS,
+                                                              helper_limits=getHelperLimits(self.tokens_pool, self.receive_coupons_method_name))
+            engine.run(jobs, onResult, onError)
+
+            if self.isInterruptionRequested():
+                printInConsole('Поток прерван.')
+
+            '''----------------Статистические параметры----------------'''
+            self.request_count = engine.request_count  # Общее количество запросов.
+            self.exception_count = engine.exception_count  # Количество исключений.
+            self.request_error_count = engine.request_error_count  # Количество RequestError.
+            self.requests_time = engine.requests_time
+            '''--------------------------------------------------------'''
+            printInConsole('{0} из {1} за {2:.2f}с (запросов: {3}, повторов: {4}, ожидание повторов: {5:.2f}с).'.format(engine.completed_count, bonds_count, engine.total_time, self.request_count, engine.retry_count, engine.backoff_time))
+            if engine.tokens_count > 1:
+                printInConsole('Заданий по токенам: {0}.'.format(', '.join(str(count) for count in engine.getCompletedByTokens())))
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import os
+from PyQt6 import QtCore
+from Classes import MyConnection, print_slot
+from DatabaseWriter import DatabaseWriterThread
+from MyDatabase import MainConnection
+
+
+class MaintenancePolicy:
+    """Параметры фонового обслуживания базы данных: проход выполняется раз в check_interval секунд,
+    а каждый его шаг - только после idle_delay секунд без записей потока записи."""
+    def __init__(self, check_interval: float = 3600.0, idle_delay: float = 5.0, vacuum_pages_per_step: int = 256, step_pause: int = 50):
+        self.check_interval: float = check_interval  # Интервал между проходами обслуживания, в секундах.
+        self.idle_delay: float = idle_delay  # Время без записей, после которого выполняется шаг обслуживания, в секундах.
+        self.vacuum_pages_per_step: int = vacuum_pages_per_step  # Количество страниц, освобождаемых одной транзакцией.
+        self.step_pause: int = step_pause  # Пауза между шагами обслуживания, в миллисекундах.
+
+
+DEFAULT_MAINTENANCE_POLICY: MaintenancePolicy = MaintenancePolicy()  # Параметры обслуживания базы данных по умолчанию.
+
+
+class DatabaseMaintenanceThread(QtCore.QThread):
+    """Фоновый поток обслуживания базы данных.
+    Каждый проход удаляет строки истории цен удалённых инструментов, обновляет статистику планировщика
+    (ANALYZE, PRAGMA optimize) и возвращает файловой системе свободные страницы (PRAGMA incremental_vacuum).
+    Каждый шаг выполняется короткой транзакцией и только во время простоя потока записи,
+    поэтому обслуживание не задерживает запись данных, получаемых потоками."""
+
+    """------------------------Сигналы------------------------"""
+    printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
+    """-------------------------------------------------------"""
+
+    INTERRUPTION_CHECK_INTERVAL: int = 100  # Интервал проверки прерывания во время ожидания, в миллисекундах.
+    SCHEMAS: tuple[str, ...] = ('main', MyConnection.HISTORY_SCHEMA)  # Обслуживаемые файлы БД.
+
+    def __init__(self, policy: MaintenancePolicy | None = None, parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.policy: MaintenancePolicy = DEFAULT_MAINTENANCE_POLICY if policy is None else policy
+        self.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
+
+        """------------Статистические переменные------------"""
+        self.passes_count: int = 0  # Количество завершённых проходов.
+        self.orphans_count: int = 0  # Общее количество удалённых строк истории цен удалённых инструментов.
+        self.vacuumed_pages_count: int = 0  # Общее количество возвращённых файловой системе страниц.
+        """-------------------------------------------------"""
+
+    def stop(self):
+        """Прерывает поток и ждёт его завершения."""
+        self.requestInterruption()
+        self.wait()
+
+    def __printInConsole(self, text: str):
+        self.printText_signal.emit('{0}: {1}'.format(DatabaseMaintenanceThread.__name__, text))
+
+    def run(self) -> None:
+        while not self.isInterruptionRequested():
+            if self.__maintain():
+                self.passes_count += 1
+
+            '''---------------Ожидание следующего прохода---------------'''
+            end_time: QtCore.QDeadlineTimer = QtCore.QDeadlineTimer(int(self.policy.check_interval * 1000))
+            while not end_time.hasExpired() and not self.isInterruptionRequested():
+                self.msleep(self.INTERRUPTION_CHECK_INTERVAL)
+            '''---------------------------------------------------------'''
+
+    def __waitForIdle(self) -> bool:
+        """Ждёт простоя потока записи. Возвращает False, если поток обслуживания прерван."""
+        self.msleep(self.policy.step_pause)
+        writer: DatabaseWriterThread = DatabaseWriterThread.getWriter()
+        while not self.isInterruptionRequested():
+            if writer.getIdleSeconds() >= self.policy.idle_delay: return True
+            self.msleep(self.INTERRUPTION_CHECK_INTERVAL)
+        return False
+
+    @staticmethod
+    def __getFileName(schema_name: str) -> str:
+        return MainConnection.getHistoryDatabaseName() if schema_name == MyConnection.HISTORY_SCHEMA else MainConnection.DATABASE_NAME
+
+    def __getSizesText(self) -> str:
+        """Возвращает размеры файлов БД и их свободных страниц."""
+        texts: list[str] = []
+        for schema_name in self.SCHEMAS:
+            file_name: str = self.__getFileName(schema_name)
+            file_size: int = os.path.getsize(file_name) if os.path.isfile(file_name) else 0
+            freelist_size: int = MainConnection.getPragmaValue(schema_name, 'freelist_count') * MainConnection.getPragmaValue(schema_name, 'page_size')
+            texts.append('{0} — {1:.1f} МиБ (свободно {2:.1f} МиБ)'.format(file_name, file_size / 2 ** 20, freelist_size / 2 ** 20))
+        return ', '.join(texts)
+
+    def __maintain(self) -> bool:
+        """Выполняет один проход обслуживания. Возвращает False, если проход прерван."""
+        if not self.__waitForIdle(): return False
+        self.__printInConsole('Начало обслуживания: {0}.'.format(self.__getSizesText()))
+
+        '''-------------Удаление истории цен удалённых инструментов-------------'''
+        orphans_count: int = 0
+        for table_name in MyConnection.HISTORY_TABLES:
+            for from_rowid, to_rowid in MainConnection.getHistoryRowidRanges(table_name):
+                if not self.__waitForIdle(): return False
+                rowids: list[int] = MainConnection.getHistoryOrphanRowids(table_name, from_rowid, to_rowid)  # Читающий запрос не блокирует писателей.
+                if rowids: orphans_count += MainConnection.deleteHistoryOrphanRows(table_name, rowids)
+        self.orphans_count += orphans_count
+        '''---------------------------------------------------------------------'''
+
+        '''------------------Обновление статистики планировщика------------------'''
+        for schema_name in self.SCHEMAS:
+            if not self.__waitForIdle(): return False
+            MainConnection.optimizeSchema(schema_name)
+        '''----------------------------------------------------------------------'''
+
+        '''-----------------Возвращение свободных страниц-----------------'''
+        vacuumed_pages_count: int = 0
+        for schema_name in self.SCHEMAS:
+            freelist_count: int = MainConnection.getPragmaValue(schema_name, 'freelist_count')
+            if freelist_count > 0 and MainConnection.getPragmaValue(schema_name, 'auto_vacuum') != 2:  # 2 - INCREMENTAL.
+                self.__printInConsole('Файл {0} создан без PRAGMA auto_vacuum = INCREMENTAL, его свободные страницы возвращает только VACUUM (HistoryDatabaseMigration.py).'.format(self.__getFileName(schema_name)))
+                continue
+            while freelist_count > 0:
+                if not self.__waitForIdle(): return False
+                remaining_count: int = MainConnection.incrementalVacuum(schema_name, self.policy.vacuum_pages_per_step)
+                if remaining_count >= freelist_count: break  # Страницы не освобождаются.
+                vacuumed_pages_count += freelist_count - remaining_count
+                freelist_count = remaining_count
+            MainConnection.checkpoint(schema_name)
+        self.vacuumed_pages_count += vacuumed_pages_count
+        '''---------------------------------------------------------------'''
+
+        self.__printInConsole('Конец обслуживания: {0}. Удалено строк истории цен: {1}, возвращено страниц: {2}.'.format(
+            self.__getSizesText(), orphans_count, vacuumed_pages_count
+        ))
+        return True
@@ -67,7 +67,7 @@ class TokenSelectionBar(QtWidgets.QHBoxLayout):
     tokenSelected = QtCore.pyqtSignal(TokenClass)  # Сигнал испускается при выборе токена.
     tokenReset = QtCore.pyqtSignal()  # Сигнал испускается при сбросе токена.
 
-    def __init__(self, tokens_model: TokenListModel, parent: QtWidgets.QWidget | None = None):
+    def __init__(self, tokens_model: TokenListModel, parent: QtWidgets.QWidget | None = None, pool_option: bool = False):
         super().__init__(parent)
         self.setSpacing(0)
 
@@ -89,6 +89,15 @@ class TokenSelectionBar(QtWidgets.QHBoxLayout):
         self.__comboBox.currentIndexChanged.connect(__setCurrentToken)
         self.addWidget(self.__comboBox, 0)
 
+        '''------------------Распределение запросов по токенам------------------'''
+        self.__checkBox_pool: QtWidgets.QCheckBox | None = None
+        if pool_option:
+            self.addSpacing(4)
+            self.__checkBox_pool = QtWidgets.QCheckBox(text='Все токены', parent=parent)
+            self.__checkBox_pool.setToolTip('Распределять запросы между всеми токенами пропорционально их оставшимся лимитам.')
+            self.addWidget(self.__checkBox_pool, 0)
+        '''---------------------------------------------------------------------'''
+
         self.addStretch(1)
 
     @property
@@ -103,6 +112,12 @@ class TokenSelectionBar(QtWidgets.QHBoxLayout):
         else:
             self.tokenSelected.emit(self.token)
 
+    @property
+    def tokens_pool(self) -> list[TokenClass]:
+        """Дополнительные токены, между которыми распределяются запросы выбранного токена."""
+        if self.__checkBox_pool is None or not self.__checkBox_pool.isChecked(): return []
+        return self.__comboBox.model().getTokensPool(self.token)
+
 
 class InstrumentItem:
     def __init__(self, uid: str, name: str):
@@ -125,7 +140,7 @@ class ComboBox_Status(QtWidgets.QComboBox):
         """Модель статусов инструментов."""
         __ANY_STATUS: str = 'Любой'
         __PARAMETER: str = 'status'
-        __sql_command: str = 'SELECT DISTINCT \"{1}\" FROM \"{0}\" WHERE \"{0}\".\"token\" = :token;'.format(
+        SQL_COMMAND: str = 'SELECT DISTINCT \"{1}\" FROM \"{0}\" WHERE \"{0}\".\"token\" = :token;'.format(
             MyConnection.INSTRUMENT_STATUS_TABLE,
             __PARAMETER
         )
@@ -147,7 +162,7 @@ class ComboBox_Status(QtWidgets.QComboBox):
                     '''---------------Получение статусов инструментов из бд---------------'''
                     statuses_query = QtSql.QSqlQuery(db)
                     statuses_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                    statuses_prepare_flag: bool = statuses_query.prepare(self.__sql_command)
+                    statuses_prepare_flag: bool = statuses_query.prepare(self.SQL_COMMAND)
                     assert statuses_prepare_flag, statuses_query.lastError().text()
                     statuses_query.bindValue(':token', self.__token.token)
                     statuses_exec_flag: bool = statuses_query.exec()
@@ -239,6 +254,20 @@ class ComboBox_InstrumentType(QtWidgets.QComboBox):
         """Модель типов инструментов."""
         __ANY_TYPE: str = 'Любой'
         __PARAMETER: str = 'instrument_type'
+        TOKEN_SQL_COMMAND: str = '''SELECT DISTINCT \"{0}\".\"{2}\" FROM \"{0}\",
+        (SELECT DISTINCT \"{1}\".\"uid\" FROM \"{1}\" WHERE \"{1}\".\"token\" = :token) AS \"S\"
+        WHERE \"{0}\".\"uid\" = \"S\".\"uid\";'''.format(
+            MyConnection.INSTRUMENT_UIDS_TABLE,
+            MyConnection.INSTRUMENT_STATUS_TABLE,
+            __PARAMETER
+        )  # Типы инструментов, полученных с помощью токена.
+        TOKEN_STATUS_SQL_COMMAND: str = '''SELECT DISTINCT \"{0}\".\"{2}\" FROM \"{0}\",
+        (SELECT \"{1}\".\"uid\" FROM \"{1}\" WHERE \"{1}\".\"token\" = :token AND \"{1}\".\"status\" = :status) AS \"S\"
+        WHERE \"{0}\".\"uid\" = \"S\".\"uid\";'''.format(
+            MyConnection.INSTRUMENT_UIDS_TABLE,
+            MyConnection.INSTRUMENT_STATUS_TABLE,
+            __PARAMETER
+        )  # Типы инструментов, соответствующих токену и статусу.
 
         def __init__(self, token: TokenClass | None = None, status: str | None = None, parent: QtCore.QObject | None = None):
             super().__init__(parent=parent)
@@ -300,21 +329,11 @@ class ComboBox_InstrumentType(QtWidgets.QComboBox):
             else:
                 if self.__status is None:
                     """Находим все типы инструментов, полученных с помощью переданного токена."""
-                    select_uids_str: str = 'SELECT DISTINCT {0}.\"uid\" FROM {0} WHERE {0}.\"token\" = :token'.format(
-                        '\"{0}\"'.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-                    )
-                    sql_command: str = 'SELECT DISTINCT {0}.\"{1}\" FROM {0}, ({2}) AS {3} WHERE {0}.\"uid\" = {3}.\"uid\";'.format(
-                        '\"{0}\"'.format(MyConnection.INSTRUMENT_UIDS_TABLE),
-                        self.__PARAMETER,
-                        select_uids_str,
-                        '\"S\"'
-                    )
-
                     db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                     if db.transaction():
                         types_query = QtSql.QSqlQuery(db)
                         types_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                        types_prepare_flag: bool = types_query.prepare(sql_command)
+                        types_prepare_flag: bool = types_query.prepare(self.TOKEN_SQL_COMMAND)
                         assert types_prepare_flag, types_query.lastError().text()
                         types_query.bindValue(':token', self.__token.token)
                         types_exec_flag: bool = types_query.exec()
@@ -329,21 +348,11 @@ class ComboBox_InstrumentType(QtWidgets.QComboBox):
                         raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
                 else:
                     """Находим все типы инструментов, соответствующих текущим токену и статусу."""
-                    select_uids_str: str = '''SELECT {0}.\"uid\" FROM {0} WHERE {0}.\"token\" = :token AND {0}.\"status\" = :status'''.format(
-                        '\"{0}\"'.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-                    )
-                    sql_command: str = '''SELECT DISTINCT {0}.\"{1}\" FROM {0}, ({2}) AS {3} WHERE {0}.\"uid\" = {3}.\"uid\";'''.format(
-                        '\"{0}\"'.format(MyConnection.INSTRUMENT_UIDS_TABLE),
-                        self.__PARAMETER,
-                        select_uids_str,
-                        '\"S\"'
-                    )
-
                     db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                     if db.transaction():
                         types_query = QtSql.QSqlQuery(db)
                         types_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                        types_prepare_flag: bool = types_query.prepare(sql_command)
+                        types_prepare_flag: bool = types_query.prepare(self.TOKEN_STATUS_SQL_COMMAND)
                         assert types_prepare_flag, types_query.lastError().text()
                         types_query.bindValue(':token', self.__token.token)
                         types_query.bindValue(':status', self.__status)
@@ -448,6 +457,26 @@ class ComboBox_Instrument(QtWidgets.QComboBox):
         def __show(item: InstrumentItem) -> str:
             return '{0} | {1}'.format(item.uid, item.name)
 
+        @staticmethod
+        def getTypeInstrumentsSelectCommand(instrument_type: str, status_flag: bool) -> str:
+            """Возвращает запрос имён и uid инструментов типа instrument_type, полученных с помощью токена :token
+            (и статуса :status, если status_flag). Запрос также проверяется скриптом QueryPlanCheck.py."""
+            if instrument_type == 'share':
+                instruments_table: str = '\"{0}\"'.format(MyConnection.SHARES_TABLE)
+            elif instrument_type == 'bond':
+                instruments_table: str = '\"{0}\"'.format(MyConnection.BONDS_TABLE)
+            else:
+                raise ValueError('Неизвестный тип инструмента ({0})!'.format(instrument_type))
+
+            if status_flag:
+                uids_select: str = 'SELECT \"uid\" FROM \"{0}\" WHERE \"token\" = :token AND \"status\" = :status'.format(MyConnection.INSTRUMENT_STATUS_TABLE)
+            else:
+                uids_select: str = 'SELECT DISTINCT \"uid\" FROM \"{0}\" WHERE \"token\" = :token'.format(MyConnection.INSTRUMENT_STATUS_TABLE)
+            return 'SELECT {1}.\"name\", {1}.\"uid\" FROM ({0}) AS \"S\", {1} WHERE \"S\".\"uid\" = {1}.\"uid\" ORDER BY \"name\";'.format(
+                uids_select,
+                instruments_table
+            )
+
         def data(self, index: QtCore.QModelIndex, role: int = ...) -> typing.Any:
             if role == QtCore.Qt.ItemDataRole.DisplayRole:
                 row: int = index.row()
@@ -629,23 +658,7 @@ class ComboBox_Instrument(QtWidgets.QComboBox):
                         raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
                 else:
                     if status is None:
-                        uids_select: str = 'SELECT DISTINCT \"uid\" FROM \"{0}\" WHERE \"token\" = :token'.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-                        instruments_select: str = 'SELECT {2}.\"name\", {2}.\"uid\" FROM ({0}) AS {1}, {2} WHERE {1}.\"uid\" = {2}.\"uid\" ORDER BY \"name\";'
-
-                        if instrument_type == 'share':
-                            sql_command: str = instruments_select.format(
-                                uids_select,
-                                '\"S\"',
-                                '\"{0}\"'.format(MyConnection.SHARES_TABLE)
-                            )
-                        elif instrument_type == 'bond':
-                            sql_command: str = instruments_select.format(
-                                uids_select,
-                                '\"B\"',
-                                '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-                            )
-                        else:
-                            raise ValueError('Неизвестный тип инструмента ({0})!'.format(instrument_type))
+                        sql_command: str = self.getTypeInstrumentsSelectCommand(instrument_type, False)
 
                         db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                         if db.transaction():
@@ -667,23 +680,7 @@ class ComboBox_Instrument(QtWidgets.QComboBox):
                         else:
                             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
                     else:
-                        uids_select: str = 'SELECT \"uid\" FROM \"{0}\" WHERE \"token\" = :token AND \"status\" = :status'.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-                        instruments_select: str = 'SELECT {2}.\"name\", {2}.\"uid\" FROM ({0}) AS {1}, {2} WHERE {2}.\"uid\" = {1}.\"uid\" ORDER BY \"name\";'
-
-                        if instrument_type == 'share':
-                            sql_command: str = instruments_select.format(
-                                uids_select,
-                                '\"S\"',
-                                '\"{0}\"'.format(MyConnection.SHARES_TABLE)
-                            )
-                        elif instrument_type == 'bond':
-                            sql_command: str = instruments_select.format(
-                                uids_select,
-                                '\"B\"',
-                                '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-                            )
-                        else:
-                            raise ValueError('Неизвестный тип инструмента ({0})!'.format(instrument_type))
+                        sql_command: str = self.getTypeInstrumentsSelectCommand(instrument_type, True)
 
                         db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                         if db.transaction():
@@ -0,0 +1,191 @@
+from __future__ import annotations
+import queue
+import threading
+import typing
+from time import perf_counter
+from PyQt6 import QtCore, QtSql
+from ChangeFeed import ChangeFeed
+from Classes import print_slot
+from MyDatabase import MainConnection
+from MyDateTime import getMoscowDateTime
+
+
+class DatabaseWriterThread(QtCore.QThread):
+    """Единственный поток записи в базу данных.
+    Записи всех потоков получения данных ставятся в ограниченную очередь и фиксируются группами:
+    группа завершается, когда в ней набирается max_batch_size записей или проходит max_batch_delay секунд.
+    Если очередь заполнена, вызывающий поток ждёт освобождения места (обратное давление)."""
+
+    """------------------------Сигналы------------------------"""
+    printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
+    """-------------------------------------------------------"""
+
+    SAVEPOINT_NAME: str = 'writer_item'  # Точка сохранения, ограничивающая изменения одной записи.
+
+    __writer: DatabaseWriterThread | None = None  # Общий поток записи приложения.
+
+    @classmethod
+    def getWriter(cls) -> DatabaseWriterThread:
+        """Возвращает общий поток записи, создавая и запуская его при первом обращении."""
+        if cls.__writer is None:
+            cls.__writer = DatabaseWriterThread()
+            cls.__writer.start()
+        return cls.__writer
+
+    def __init__(self, max_queue_size: int = 1000, max_batch_size: int = 200, max_batch_delay: float = 0.05,
+                 parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.max_batch_size: int = max_batch_size  # Наибольшее количество записей в одной транзакции.
+        self.max_batch_delay: float = max_batch_delay  # Наибольшее время накопления группы, в секундах.
+        self.__queue: queue.Queue[tuple[float, typing.Callable, tuple] | None] = queue.Queue(maxsize=max_queue_size)
+        self.__stopped: bool = False  # Флаг остановки потока записи.
+        self.__statistics_lock: threading.Lock = threading.Lock()
+        self.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
+        self.started.connect(lambda: print('{0}: Поток запущен. ({1})'.format(self.__class__.__name__, getMoscowDateTime())))
+        self.finished.connect(lambda: print('{0}: Поток завершён. ({1})'.format(self.__class__.__name__, getMoscowDateTime())))
+
+        """------------Статистические переменные------------"""
+        self.items_count: int = 0  # Количество выполненных записей.
+        self.failed_count: int = 0  # Количество записей, завершившихся ошибкой.
+        self.batches_count: int = 0  # Количество зафиксированных групп.
+        self.total_latency: float = 0.0  # Суммарное время от постановки записей в очередь до их фиксации, в секундах.
+        self.max_latency: float = 0.0  # Наибольшее время от постановки записи в очередь до её фиксации, в секундах.
+        self.blocked_count: int = 0  # Количество записей, ожидавших освобождения места в очереди.
+        self.blocked_seconds: float = 0.0  # Суммарное время ожидания места в очереди, в секундах.
+        self.last_commit_time: float = perf_counter()  # Время фиксации последней группы (perf_counter).
+        """-------------------------------------------------"""
+
+    def submit(self, function: typing.Callable, *args):
+        """Ставит запись function(*args) в очередь. Если очередь заполнена, блокирует вызывающий поток.
+        После остановки потока записи выполняет запись в вызывающем потоке."""
+        if self.__stopped:
+            function(*args)
+            return
+        item: tuple[float, typing.Callable, tuple] = (perf_counter(), function, args)
+        try:
+            self.__queue.put_nowait(item)
+        except queue.Full:
+            self.__queue.put(item)
+            with self.__statistics_lock:
+                self.blocked_count += 1
+                self.blocked_seconds += perf_counter() - item[0]
+
+    def connectSignal(self, signal: QtCore.pyqtBoundSignal, function: typing.Callable) -> QtCore.QMetaObject.Connection:
+        """Подключает сигнал к записи function(*args) через очередь.
+        Слот выполняется в потоке, испустившем сигнал, поэтому при заполненной очереди ждёт именно этот поток."""
+        return signal.connect(lambda *args: self.submit(function, *args), QtCore.Qt.ConnectionType.DirectConnection)
+
+    def stop(self):
+        """Записывает оставшиеся в очереди записи и завершает поток."""
+        if self.__stopped: return
+        self.__stopped = True
+        self.__queue.put(None)
+        self.wait()
+
+        '''------Выполняем записи, поставленные в очередь одновременно с остановкой------'''
+        while True:
+            try:
+                item: tuple[float, typing.Callable, tuple] | None = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None: item[1](*item[2])
+        '''------------------------------------------------------------------------------'''
+
+        self.printText_signal.emit('{0}: {1}'.format(self.__class__.__name__, self.getStatisticsText()))
+
+    def getAverageLatency(self) -> float:
+        """Возвращает среднее время от постановки записи в очередь до её фиксации, в секундах."""
+        return self.total_latency / self.items_count if self.items_count > 0 else 0.0
+
+    def getIdleSeconds(self) -> float:
+        """Возвращает время, прошедшее с фиксации последней группы, в секундах. Если очередь не пуста, то возвращает 0."""
+        if not self.__queue.empty(): return 0.0
+        with self.__statistics_lock:
+            return perf_counter() - self.last_commit_time
+
+    def getStatisticsText(self) -> str:
+        with self.__statistics_lock:
+            return 'Записей: {0} (ошибок: {1}), групп: {2}, задержка: средняя {3:.3f}с, наибольшая {4:.3f}с, ожиданий места в очереди: {5} ({6:.2f}с).'.format(
+                self.items_count, self.failed_count, self.batches_count, self.getAverageLatency(), self.max_latency,
+                self.blocked_count, self.blocked_seconds
+            )
+
+    def run(self) -> None:
+        db: QtSql.QSqlDatabase = MainConnection.getDatabase()  # Соединение потока записи.
+        ChangeFeed.getFeed().watch(db)  # Изменения, внесённые потоком записи, передаются в ленту изменений.
+        stop_flag: bool = False
+        while not stop_flag:
+            item: tuple[float, typing.Callable, tuple] | None = self.__queue.get()
+            if item is None: break
+
+            '''---------------------Накопление группы записей---------------------'''
+            batch: list[tuple[float, typing.Callable, tuple]] = [item]
+            deadline: float = perf_counter() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                timeout: float = deadline - perf_counter()
+                if timeout <= 0: break
+                try:
+                    item = self.__queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop_flag = True
+                    break
+                batch.append(item)
+            '''-------------------------------------------------------------------'''
+
+            try:
+                self.__commitBatch(db, batch)
+            except Exception as error:  # Ошибка фиксации не должна завершать поток записи.
+                with self.__statistics_lock:
+                    self.failed_count += len(batch)
+                self.printText_signal.emit('{0}: Группа из {1} записей не зафиксирована: {2}'.format(self.__class__.__name__, len(batch), error))
+
+            '''-----------Передача изменений зафиксированной группы-----------'''
+            QtCore.QCoreApplication.processEvents()  # Доставляет уведомления драйвера, поставленные в очередь потока.
+            ChangeFeed.getFeed().flush(db.connectionName())
+            '''---------------------------------------------------------------'''
+
+    def __commitBatch(self, db: QtSql.QSqlDatabase, batch: list[tuple[float, typing.Callable, tuple]]):
+        """Выполняет группу записей в одной транзакции.
+        Каждая запись ограничена точкой сохранения, поэтому ошибка одной записи не отменяет остальные.
+        Если группу не удалось зафиксировать, то транзакция откатывается."""
+        def executeSavepointCommand(sql_command: str):
+            savepoint_query = QtSql.QSqlQuery(db)
+            savepoint_exec_flag: bool = savepoint_query.exec(sql_command.format(self.SAVEPOINT_NAME))
+            assert savepoint_exec_flag, savepoint_query.lastError().text()
+
+        failed_count: int = 0
+        if MainConnection.beginGroupTransaction(db):
+            commit_flag: bool = False
+            try:
+                for enqueued_time, function, args in batch:
+                    executeSavepointCommand('SAVEPOINT \"{0}\";')
+                    try:
+                        function(*args)
+                    except Exception as error:
+                        executeSavepointCommand('ROLLBACK TO \"{0}\";')
+                        failed_count += 1
+                        self.printText_signal.emit('{0}: Ошибка записи {1}: {2}'.format(self.__class__.__name__, getattr(function, '__name__', function), error))
+                    executeSavepointCommand('RELEASE \"{0}\";')
+
+                commit_flag = MainConnection.commitGroupTransaction(db)  # Фиксирует транзакцию в базу данных.
+                assert commit_flag, db.lastError().text()
+            finally:
+                if not commit_flag:
+                    MainConnection.rollbackGroupTransaction(db)
+        else:
+            raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
+
+        '''----------------Статистические параметры----------------'''
+        committed_time: float = perf_counter()
+        with self.__statistics_lock:
+            self.last_commit_time = committed_time
+            self.batches_count += 1
+            self.items_count += len(batch)
+            self.failed_count += failed_count
+            for enqueued_time, function, args in batch:
+                latency: float = committed_time - enqueued_time
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+        '''--------------------------------------------------------'''
@@ -4,13 +4,16 @@ from datetime import datetime
 from enum import Enum, StrEnum
 from PyQt6 import QtCore, QtWidgets, QtGui, QtSql
 from grpc import StatusCode
-from tinkoff.invest.schemas import GetForecastResponse, TargetItem, Quotation, Recommendation
+from tinkoff.invest.schemas import GetForecastRequest, GetForecastResponse, TargetItem, Quotation, Recommendation
+from AsyncRequests import AsyncJob, AsyncRequestsEngine, getHelperLimits
 from Classes import TokenClass, Header, MyTreeView, ColumnWithoutHeader, ConsensusFull, MyConnection
 from DatabaseWidgets import TokenSelectionBar, ComboBox_Status, ComboBox_InstrumentType
+from DatabaseWriter import DatabaseWriterThread
+from LimitClasses import RequestPriority
 from MyDatabase import MainConnection
-from MyDateTime import getUtcDateTime, reportSignificantInfoFromDateTime
+from MyDateTime import reportSignificantInfoFromDateTime
 from MyQuotation import MyQuotation
-from MyRequests import MyResponse, RequestTryClass, getForecast
+from MyRequests import MyResponse
 from PagesClasses import TitleWithCount, ProgressBar_DataReceiving, TitleLabel
 from ReceivingThread import ManagedReceivingThread
 from TokenModel import TokenListModel
@@ -59,6 +62,31 @@ class InstrumentsModel(QtCore.QAbstractListModel):
             row: int = index.row()
             return self.__EMPTY if row == 0 else __show(self.__instruments[row - 1])
 
+    @staticmethod
+    def getInstrumentsSelectCommand(instrument_type: str | None, status_condition: str | None, only_with_forecasts: bool) -> str:
+        """Возвращает запрос имён и uid инструментов типа instrument_type (None - акций и облигаций).
+        status_condition - условие отбора строк таблицы запросов инструментов (None - без отбора).
+        Запрос также проверяется скриптом QueryPlanCheck.py."""
+        if instrument_type is None:
+            select_uids_and_names: str = '(SELECT \"name\", \"uid\" FROM \"{0}\" UNION ALL SELECT \"name\", \"uid\" FROM \"{1}\")'.format(
+                MyConnection.SHARES_TABLE,
+                MyConnection.BONDS_TABLE
+            )
+        elif instrument_type == 'share':
+            select_uids_and_names: str = '\"{0}\"'.format(MyConnection.SHARES_TABLE)
+        elif instrument_type == 'bond':
+            select_uids_and_names: str = '\"{0}\"'.format(MyConnection.BONDS_TABLE)
+        else:
+            raise ValueError('Неизвестный тип инструмента ({0})!'.format(instrument_type))
+
+        conditions: list[str] = []
+        if status_condition is not None:
+            conditions.append('\"I\".\"uid\" IN (SELECT \"uid\" FROM \"{0}\" WHERE {1})'.format(MyConnection.INSTRUMENT_STATUS_TABLE, status_condition))
+        if only_with_forecasts:  # Прогнозы инструмента ищутся по индексу таблицы ConsensusItems, без её полного просмотра.
+            conditions.append('EXISTS (SELECT 1 FROM \"{0}\" WHERE \"{0}\".\"instrument_uid\" = \"I\".\"uid\")'.format(MyConnection.CONSENSUS_ITEMS_TABLE))
+        where_clause: str = ' WHERE {0}'.format(' AND '.join(conditions)) if conditions else ''
+        return 'SELECT \"I\".\"name\", \"I\".\"uid\" FROM {0} AS \"I\"{1} ORDER BY \"I\".\"name\";'.format(select_uids_and_names, where_clause)
+
     def __update(self, token: TokenClass | None, status: str | None, instrument_type: str | None, only_with_forecasts: bool):
         """Обновляет данные модели."""
         self.beginResetModel()
@@ -72,37 +100,9 @@ class InstrumentsModel(QtCore.QAbstractListModel):
 
         self.__instruments.clear()
 
-        __select_consensuses_uids: str = 'SELECT DISTINCT \"instrument_uid\" AS \"uid\" FROM \"{0}\"'.format(
-            MyConnection.CONSENSUS_ITEMS_TABLE
-        )
-        __select_all_uids_and_names: str = '''SELECT \"name\", \"uid\" FROM \"{0}\" UNION ALL SELECT \"name\", \"uid\" 
-        FROM \"{1}\"'''.format(
-            MyConnection.SHARES_TABLE,
-            MyConnection.BONDS_TABLE
-        )
-
         if self.__token is None:
             if self.__status is None:
-                if self.__type is None:
-                    __select_uids_and_names: str = '({0})'.format(__select_all_uids_and_names)
-                else:
-                    if self.__type == 'share':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.SHARES_TABLE)
-                    elif self.__type == 'bond':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-                    else:
-                        raise ValueError('Неизвестный тип инструмента ({0})!'.format(self.__type))
-
-                if self.__only_with_forecasts:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN {1} 
-                    ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_consensuses_uids)
-                    )
-                else:
-                    select_instruments_command: str = 'SELECT \"name\", \"uid\" FROM {0} ORDER BY \"name\";'.format(
-                        __select_uids_and_names
-                    )
+                select_instruments_command: str = self.getInstrumentsSelectCommand(self.__type, None, self.__only_with_forecasts)
 
                 db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                 if db.transaction():
@@ -123,34 +123,7 @@ class InstrumentsModel(QtCore.QAbstractListModel):
                 else:
                     raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
             else:
-                if self.__type is None:
-                    __select_uids_and_names: str = '({0})'.format(__select_all_uids_and_names)
-                else:
-                    if self.__type == 'share':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.SHARES_TABLE)
-                    elif self.__type == 'bond':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-                    else:
-                        raise ValueError('Неизвестный тип инструмента ({0})!'.format(self.__type))
-
-                __select_statuses_uids: str = 'SELECT \"uid\" FROM \"{0}\" WHERE \"status\" = :status'.format(
-                    MyConnection.INSTRUMENT_STATUS_TABLE
-                )
-
-                if self.__only_with_forecasts:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN 
-                    (SELECT \"a\".\"uid\" FROM {1} AS \"a\" INNER JOIN {2} AS \"b\" ON \"a\".\"uid\" = \"b\".\"uid\") 
-                    ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_statuses_uids),
-                        '({0})'.format(__select_consensuses_uids)
-                    )
-                else:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN {1} 
-                    ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_statuses_uids)
-                    )
+                select_instruments_command: str = self.getInstrumentsSelectCommand(self.__type, '\"status\" = :status', self.__only_with_forecasts)
 
                 db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                 if db.transaction():
@@ -173,34 +146,7 @@ class InstrumentsModel(QtCore.QAbstractListModel):
                     raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
         else:
             if status is None:
-                if self.__type is None:
-                    __select_uids_and_names: str = '({0})'.format(__select_all_uids_and_names)
-                else:
-                    if self.__type == 'share':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.SHARES_TABLE)
-                    elif self.__type == 'bond':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-                    else:
-                        raise ValueError('Неизвестный тип инструмента ({0})!'.format(self.__type))
-
-                __select_statuses_uids: str = 'SELECT \"uid\" FROM \"{0}\" WHERE \"token\" = :token'.format(
-                    MyConnection.INSTRUMENT_STATUS_TABLE
-                )
-
-                if self.__only_with_forecasts:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN 
-                    (SELECT \"a\".\"uid\" FROM {1} AS \"a\" INNER JOIN {2} AS \"b\" ON \"a\".\"uid\" = \"b\".\"uid\") 
-                    ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_statuses_uids),
-                        '({0})'.format(__select_consensuses_uids)
-                    )
-                else:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN 
-                    {1} ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_statuses_uids)
-                    )
+                select_instruments_command: str = self.getInstrumentsSelectCommand(self.__type, '\"token\" = :token', self.__only_with_forecasts)
 
                 db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                 if db.transaction():
@@ -222,35 +168,7 @@ class InstrumentsModel(QtCore.QAbstractListModel):
                 else:
                     raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
             else:
-                if self.__type is None:
-                    __select_uids_and_names: str = '({0})'.format(__select_all_uids_and_names)
-                else:
-                    if self.__type == 'share':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.SHARES_TABLE)
-                    elif self.__type == 'bond':
-                        __select_uids_and_names: str = '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-                    else:
-                        raise ValueError('Неизвестный тип инструмента ({0})!'.format(self.__type))
-
-                __select_statuses_uids: str = '''SELECT \"uid\" FROM \"{0}\" WHERE \"token\" = :token AND 
-                \"status\" = :status'''.format(
-                    MyConnection.INSTRUMENT_STATUS_TABLE
-                )
-
-                if self.__only_with_forecasts:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN 
-                    (SELECT \"a\".\"uid\" FROM {1} AS \"a\" INNER JOIN {2} AS \"b\" ON \"a\".\"uid\" = \"b\".\"uid\") 
-                    ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_statuses_uids),
-                        '({0})'.format(__select_consensuses_uids)
-                    )
-                else:
-                    select_instruments_command: str = '''SELECT \"name\", \"uid\" FROM {0} WHERE \"uid\" IN 
-                    {1} ORDER BY \"name\";'''.format(
-                        __select_uids_and_names,
-                        '({0})'.format(__select_statuses_uids)
-                    )
+                select_instruments_command: str = self.getInstrumentsSelectCommand(self.__type, '\"token\" = :token AND \"status\" = :status', self.__only_with_forecasts)
 
                 db: QtSql.QSqlDatabase = MainConnection.getDatabase()
                 if db.transaction():
@@ -867,10 +785,12 @@ class ForecastsThread(ManagedReceivingThread):
     setProgressBarValue_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(int)  # Сигнал для изменения прогресса в progressBar'е.
     '''-------------------------------------------------------'''
 
-    def __init__(self, token: TokenClass, uids: list[str], parent: QtCore.QObject | None = None):
+    def __init__(self, token: TokenClass, uids: list[str], parent: QtCore.QObject | None = None,
+                 tokens_pool: list[TokenClass] | None = None):
         # super().__init__(token=token, receive_method=InstrumentsService.get_forecast_by.__name__, parent=parent)
         super().__init__(token=token, receive_method='GetForecastBy', parent=parent)
         self.__instruments_uids: list[str] = uids
+        self.__tokens_pool: list[TokenClass] = [] if tokens_pool is None else tokens_pool  # Дополнительные токены для распределения запросов.
 
         '''------------Статистические переменные------------'''
         self.request_count: int = 0  # Общее количество запросов.
@@ -882,60 +802,40 @@ class ForecastsThread(ManagedReceivingThread):
         instruments_count: int = len(self.__instruments_uids)  # Количество инструментов.
         self.setProgressBarRange_signal.emit(0, instruments_count)  # Задаёт минимум и максимум progressBar'а.
 
-        def __ifFirstIteration() -> bool:
-            """Возвращает True, если поток не сделал ни одного запроса. Иначе возвращает False."""
-            return self.request_count > 0
-
-        for i, uid in enumerate(self.__instruments_uids):
-            instrument_number: int = i + 1  # Номер текущего инструмента.
-            self.setProgressBarValue_signal.emit(instrument_number)  # Отображаем прогресс в progressBar.
-
-            try_count: RequestTryClass = RequestTryClass(max_request_try_count=1)
-            response: MyResponse = MyResponse()
-            while try_count and not response.ifDataSuccessfullyReceived():
-                if self.isInterruptionRequested():
-                    break
-
-                self.checkPause()
-
-                """==============================Выполнение запроса=============================="""
-                self.semaphore.acquire(1)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
-
-                '''----------------Подсчёт статистических параметров----------------'''
-                if __ifFirstIteration():  # Не выполняется до второго запроса.
-                    delta: float = (getUtcDateTime() - self.control_point).total_seconds()  # Секунд прошло с последнего запроса.
-                    self.printInConsole('{0} из {1} ({2:.2f}с)'.format(instrument_number, instruments_count, delta))
-                else:
-                    self.printInConsole('{0} из {1}'.format(instrument_number, instruments_count))
-                self.control_point = getUtcDateTime()  # Промежуточная точка отсчёта времени.
-                '''-----------------------------------------------------------------'''
-
-                response = getForecast(token=self.token.token, uid=uid)
-                assert response.request_occurred, 'Запрос прогнозов не был произведён!'
-                self.request_count += 1  # Подсчитываем запрос.
-
-                self.releaseSemaphore_signal.emit(self.semaphore, 1)  # Освобождаем ресурсы семафора из основного потока.
-
-                '''-----------------------Сообщаем об ошибке-----------------------'''
-                if response.request_error_flag:
-                    if not response.request_error.code == StatusCode.NOT_FOUND:
-                        self.printInConsole('RequestError {0}'.format(response.request_error))
-                elif response.exception_flag:
-                    self.printInConsole('Exception {0}'.format(response.exception))
-                elif response.ifDataSuccessfullyReceived():
-                    self.consensuses_count += 1  # Подсчитываем полученный прогноз.
-                '''----------------------------------------------------------------'''
-                """=============================================================================="""
-                try_count += 1
-
-            forecasts: GetForecastResponse | None = response.response_data if response.ifDataSuccessfullyReceived() else None
-            if forecasts is None:
-                if self.isInterruptionRequested():
-                    self.printInConsole('Поток прерван.')
-                    break
-                continue  # Если поток был прерван или если информация не была получена.
+        # NOT_FOUND (у инструмента нет прогнозов) является фатальной ошибкой политики повторов, поэтому повторного запроса не будет.
+        jobs: list[AsyncJob] = [AsyncJob(uid, 'instruments', 'get_forecast_by', {'request': GetForecastRequest(instrument_id=uid)}, max_request_try_count=3) for uid in self.__instruments_uids]
+
+        def __onError(job: AsyncJob, response: MyResponse):
+            """Сообщает об ошибке."""
+            if response.request_error_flag:
+                if not response.request_error.code == StatusCode.NOT_FOUND:
+                    self.printInConsole('RequestError {0}'.format(response.request_error))
+            elif response.exception_flag:
+                self.printInConsole('Exception {0}'.format(response.exception))
+
+        def __onResult(job: AsyncJob, response: MyResponse):
+            """Обрабатывает результаты в порядке завершения запросов."""
+            self.setProgressBarValue_signal.emit(engine.completed_count)  # Отображаем прогресс в progressBar.
+            if not response.ifDataSuccessfullyReceived(): return  # Если поток был прерван или если информация не была получена.
+            self.consensuses_count += 1  # Подсчитываем полученный прогноз.
+            forecasts: GetForecastResponse = response.response_data
             self.forecastsReceived.emit(forecasts)
 
+        engine: AsyncRequestsEngine = AsyncRequestsEngine(token=self.token.token,
+                                                          unary_limit=self.unary_limit,
+                                                          interruption_function=self.isInterruptionRequested,
+                                                          pause_function=self.checkPause,
+                                                          priority=RequestPriority.BACKGROUND,
+                                                          helper_limits=getHelperLimits(self.__tokens_pool, 'GetForecastBy'))
+        engine.run(jobs, __onResult, __onError)
+        self.request_count = engine.request_count  # Общее количество запросов.
+
+        if self.isInterruptionRequested():
+            self.printInConsole('Поток прерван.')
+        self.printInConsole('{0} из {1} за {2:.2f}с (запросов: {3}, повторов: {4}, ожидание повторов: {5:.2f}с).'.format(engine.completed_count, instruments_count, engine.total_time, self.request_count, engine.retry_count, engine.backoff_time))
+        if engine.tokens_count > 1:
+            self.printInConsole('Заданий по токенам: {0}.'.format(', '.join(str(count) for count in engine.getCompletedByTokens())))
+
     @property
     def instruments_count(self) -> int:
         """Количество инструментов."""
@@ -1000,7 +900,7 @@ class ForecastsReceivingGroupBox(QtWidgets.QGroupBox):
         self.titlebar = TitleWithCount(title='ПОЛУЧЕНИЕ ПРОГНОЗОВ', count_text='0', parent=self)
         verticalLayout_main.addLayout(self.titlebar, 0)
 
-        self.token_bar = TokenSelectionBar(tokens_model=tokens_model, parent=self)
+        self.token_bar = TokenSelectionBar(tokens_model=tokens_model, parent=self, pool_option=True)
         verticalLayout_main.addLayout(self.token_bar, 0)
 
         self.progressBar = ProgressThreadManagerBar(parent=self)
@@ -1116,7 +1016,7 @@ class ForecastsReceivingGroupBox(QtWidgets.QGroupBox):
 
                         '''------------------------------------Запуск потока------------------------------------'''
                         assert self.__forecasts_receiving_thread is None
-                        self.__forecasts_receiving_thread = ForecastsThread(token=self.token, uids=self.uids, parent=self)
+                        self.__forecasts_receiving_thread = ForecastsThread(token=self.token, uids=self.uids, parent=self, tokens_pool=self.token_bar.tokens_pool)
 
                         @QtCore.pyqtSlot(int, int)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
                         def __setRange(minimum: int, maximum: int):
@@ -1132,7 +1032,7 @@ class ForecastsReceivingGroupBox(QtWidgets.QGroupBox):
 
                         self.__forecasts_receiving_thread.setProgressBarValue_signal.connect(__setValue)
 
-                        self.__forecasts_receiving_thread.forecastsReceived.connect(MainConnection.insertForecasts)
+                        DatabaseWriterThread.getWriter().connectSignal(self.__forecasts_receiving_thread.forecastsReceived, MainConnection.insertForecasts)
                         self.thread_finished_connection = self.__forecasts_receiving_thread.finished.connect(self.__onFinishedThread)
 
                         self.__forecasts_receiving_thread.start()  # Запускаем поток.
@@ -1339,7 +1239,7 @@ class ForecastsReceivingGroupBox(QtWidgets.QGroupBox):
 
                         '''------------------------------------Запуск потока------------------------------------'''
                         assert self.__forecasts_receiving_thread is None
-                        self.__forecasts_receiving_thread = ForecastsThread(token=self.token, uids=self.uids, parent=self)
+                        self.__forecasts_receiving_thread = ForecastsThread(token=self.token, uids=self.uids, parent=self, tokens_pool=self.token_bar.tokens_pool)
 
                         @QtCore.pyqtSlot(int, int)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
                         def __setRange(minimum: int, maximum: int):
@@ -1355,7 +1255,7 @@ class ForecastsReceivingGroupBox(QtWidgets.QGroupBox):
 
                         self.__forecasts_receiving_thread.setProgressBarValue_signal.connect(__setValue)
 
-                        self.__forecasts_receiving_thread.forecastsReceived.connect(MainConnection.insertForecasts)
+                        DatabaseWriterThread.getWriter().connectSignal(self.__forecasts_receiving_thread.forecastsReceived, MainConnection.insertForecasts)
                         self.thread_finished_connection = self.__forecasts_receiving_thread.finished.connect(self.__onFinishedThread)
 
                         self.__forecasts_receiving_thread.start()  # Запускаем поток.
@@ -2,8 +2,12 @@ from PyQt6 import QtCore, QtWidgets, QtSql
 from AssetsPage import AssetsPage
 from BondsPage import BondsPage
 from CandlesPage import CandlesPage
+from ChangeFeed import ChangeFeed
 from Classes import MyConnection
 from ConsensusesPage import ConsensusesPage
+from DatabaseMaintenance import DatabaseMaintenanceThread
+from DatabaseWriter import DatabaseWriterThread
+from LastPricesRetention import LastPricesRetentionThread
 from LimitsPage import LimitsPage
 from MyDatabase import MainConnection
 from SharesPage import SharesPage
@@ -31,6 +35,22 @@ class InvestmentForm(QtWidgets.QMainWindow):
 
         MainConnection()  # Открываем соединение с базой данных.
 
+        '''---------------Фоновое прореживание истории последних цен---------------'''
+        self.last_prices_retention_thread: LastPricesRetentionThread = LastPricesRetentionThread(parent=self)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.last_prices_retention_thread.stop)
+        self.last_prices_retention_thread.start()
+        '''------------------------------------------------------------------------'''
+
+        '''----------------------Фоновое обслуживание базы данных----------------------'''
+        self.database_maintenance_thread: DatabaseMaintenanceThread = DatabaseMaintenanceThread(parent=self)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.database_maintenance_thread.stop)
+        self.database_maintenance_thread.start()
+        '''----------------------------------------------------------------------------'''
+
+        '''-------------Единственный поток записи данных, получаемых потоками-------------'''
+        QtWidgets.QApplication.instance().aboutToQuit.connect(DatabaseWriterThread.getWriter().stop)
+        '''-------------------------------------------------------------------------------'''
+
         token_model: TokenModel = TokenModel(self)  # Модель токенов.
 
         token_list_model: TokenListModel = TokenListModel()
@@ -87,43 +107,23 @@ class InvestmentForm(QtWidgets.QMainWindow):
         '''====================================================================================='''
 
         '''------------------Подключаем уведомления от бд------------------'''
-        @QtCore.pyqtSlot(str, QtSql.QSqlDriver.NotificationSource, int)
-        def __notificationSlot(name: str, source: QtSql.QSqlDriver.NotificationSource, rowid: int):
-            assert source == QtSql.QSqlDriver.NotificationSource.UnknownSource
-            print('notificationSlot: name = {0}, payload = {1}.'.format(name, rowid))
-
-            if name == MyConnection.CANDLES_TABLE:
-                # self.candlesChanged.emit(payload)
-                self.tab_candles_new.groupBox_candles_view.onCandlesChanges(rowid)
-            elif name == MyConnection.LAST_PRICES_TABLE:
-                self.new_tab_bonds.groupBox_view.sourceModel().onLastPricesChanged(rowid)
+        @QtCore.pyqtSlot(str, list)
+        def __rowsChangedSlot(name: str, rowids: list[int]):
+            if name == MyConnection.LAST_PRICES_TABLE:
+                self.new_tab_bonds.groupBox_view.sourceModel().onLastPricesChanged(rowids)
             elif name == MyConnection.COUPONS_TABLE:
-                self.new_tab_bonds.groupBox_view.sourceModel().onCouponsChanged(rowid)
+                self.new_tab_bonds.groupBox_view.sourceModel().onCouponsChanged(rowids)
             elif name == MyConnection.BONDS_TABLE:
-                self.new_tab_bonds.groupBox_view.sourceModel().onBondsChanged(rowid)
+                self.new_tab_bonds.groupBox_view.sourceModel().onBondsChanged(rowids)
             elif name == MyConnection.TOKENS_TABLE:
-                token_model.onTokensChanged(rowid)
+                for rowid in rowids:
+                    token_model.onTokensChanged(rowid)
             else:
                 raise ValueError('Неверный параметр name ({0})!'.format(name))
 
-        db: QtSql.QSqlDatabase = MainConnection.getDatabase()
-        driver = db.driver()
-        driver.notification.connect(__notificationSlot)
-
-        # subscribe_tokens_flag: bool = driver.subscribeToNotification(MyConnection.TOKENS_TABLE)
-        # assert subscribe_tokens_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}! driver.lastError().text(): \'{1}\'.'.format(MyConnection.TOKENS_TABLE, driver.lastError().text())
-        #
-        # subscribe_candles_flag: bool = driver.subscribeToNotification(MyConnection.CANDLES_TABLE)
-        # assert subscribe_candles_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}! driver.lastError().text(): \'{1}\'.'.format(MyConnection.CANDLES_TABLE, driver.lastError().text())
-        #
-        # subscribe_bonds_flag: bool = driver.subscribeToNotification(MyConnection.BONDS_TABLE)
-        # assert subscribe_bonds_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}! driver.lastError().text(): \'{1}\'.'.format(MyConnection.BONDS_TABLE, driver.lastError().text())
-        #
-        # subscribe_coupons_flag: bool = driver.subscribeToNotification(MyConnection.COUPONS_TABLE)
-        # assert subscribe_coupons_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}! driver.lastError().text(): \'{1}\'.'.format(MyConnection.COUPONS_TABLE, driver.lastError().text())
-        #
-        # subscribe_lp_flag: bool = driver.subscribeToNotification(MyConnection.LAST_PRICES_TABLE)
-        # assert subscribe_lp_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}! driver.lastError().text(): \'{1}\'.'.format(MyConnection.LAST_PRICES_TABLE, driver.lastError().text())
+        change_feed: ChangeFeed = ChangeFeed.getFeed()
+        change_feed.rowsChanged.connect(__rowsChangedSlot)
+        change_feed.watch(MainConnection.getDatabase(), auto_flush=True)  # Изменения, внесённые в главном потоке.
         '''----------------------------------------------------------------'''
 
         # self.candlesChanged.connect(self.tab_candles_new.groupBox_candles_view.onCandlesChanges)
@@ -0,0 +1,46 @@
+"""
+Перенос таблиц истории цен (HistoricCandles и LastPrices) существующего файла БД в отдельный файл истории.
+Приложение выполняет перенос при первом запуске (миграция схемы 4), но при большом объёме истории его удобнее
+выполнить заранее: инструмент также удаляет строки истории удалённых инструментов и сжимает оба файла (VACUUM).
+VACUUM также переводит файлы, созданные до появления PRAGMA auto_vacuum = INCREMENTAL, в этот режим,
+после чего свободные страницы возвращает фоновое обслуживание (DatabaseMaintenance.py).
+Запуск: python HistoryDatabaseMigration.py [путь к файлу БД]
+"""
+import os
+import sys
+from PyQt6 import QtSql
+from MyDatabase import MainConnection
+
+
+def getFileSizeText(file_name: str) -> str:
+    """Возвращает размер файла в МиБ."""
+    return '{0:.1f} МиБ'.format(os.path.getsize(file_name) / 2 ** 20) if os.path.isfile(file_name) else 'нет файла'
+
+
+def main(database_name: str) -> int:
+    if not os.path.isfile(database_name):
+        print('Файл БД \'{0}\' не найден!'.format(database_name))
+        return 1
+
+    MainConnection.DATABASE_NAME = database_name
+    history_name: str = MainConnection.getHistoryDatabaseName()
+    print('До переноса: {0} — {1}, {2} — {3}.'.format(database_name, getFileSizeText(database_name), history_name, getFileSizeText(history_name)))
+
+    MainConnection()  # Открывает соединение и переводит базу данных на текущую схему, перенося таблицы истории цен.
+    print('Удалено строк истории удалённых инструментов: {0}.'.format(MainConnection.deleteHistoryOrphans()))
+
+    '''-----------------------Сжимаем файлы БД-----------------------'''
+    for schema_name in ('main', MainConnection.HISTORY_SCHEMA):
+        vacuum_query = QtSql.QSqlQuery(MainConnection.getDatabase())
+        vacuum_exec_flag: bool = vacuum_query.exec('VACUUM \"{0}\";'.format(schema_name))
+        assert vacuum_exec_flag, vacuum_query.lastError().text()
+        vacuum_query.finish()
+    '''--------------------------------------------------------------'''
+
+    MainConnection.removeConnection()  # Закрытие последнего соединения переносит журнал WAL в файлы БД.
+    print('После переноса: {0} — {1}, {2} — {3}.'.format(database_name, getFileSizeText(database_name), history_name, getFileSizeText(history_name)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else MainConnection.DATABASE_NAME))
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from PyQt6 import QtCore
+from Classes import print_slot
+from DatabaseWriter import DatabaseWriterThread
+from MyDatabase import MainConnection
+from MyDateTime import getUtcDateTime
+
+
+class RetentionPolicy:
+    """Политика хранения истории последних цен: полная детализация за последние full_resolution_days дней,
+    затем по одной цене в час до hourly_days дней, а более старые цены — по одной в день.
+    Каждая часть прореживания выполняется только после idle_delay секунд без записей потока записи."""
+    HOUR: int = 3_600_000_000  # Час, в микросекундах.
+    DAY: int = 24 * HOUR  # Сутки, в микросекундах.
+
+    def __init__(self, full_resolution_days: int = 7, hourly_days: int = 90, check_interval: float = 600.0,
+                 chunk: int = HOUR, idle_delay: float = 5.0, step_pause: int = 50):
+        assert 0 <= full_resolution_days <= hourly_days, 'Цены должны храниться с полной детализацией не дольше, чем по одной в час!'
+        assert chunk > 0 and self.HOUR % chunk == 0, 'Часть прореживания должна делить час без остатка!'
+        self.full_resolution_days: int = full_resolution_days  # Количество дней хранения всех цен.
+        self.hourly_days: int = hourly_days  # Количество дней хранения цен с детализацией по часам.
+        self.check_interval: float = check_interval  # Интервал между проходами прореживания, в секундах.
+        self.chunk: int = chunk  # Длительность части истории, прореживаемой одной транзакцией, в микросекундах.
+        self.idle_delay: float = idle_delay  # Время без записей, после которого прореживается очередная часть, в секундах.
+        self.step_pause: int = step_pause  # Пауза между частями прореживания, в миллисекундах.
+
+    def getLevels(self, now: int) -> tuple[tuple[int, int], ...]:
+        """Возвращает уровни прореживания (граница времени, размер промежутка) от самого грубого к самому подробному.
+        Цены, полученные раньше границы, прореживаются до одной на промежуток."""
+        return (
+            (self.__floorToDay(now - self.hourly_days * self.DAY), self.DAY),
+            (self.__floorToDay(now - self.full_resolution_days * self.DAY), self.HOUR)
+        )
+
+    @classmethod
+    def __floorToDay(cls, time: int) -> int:
+        """Округляет время вниз до начала суток, чтобы границы уровней совпадали с границами промежутков."""
+        return time - time % cls.DAY
+
+
+DEFAULT_RETENTION_POLICY: RetentionPolicy = RetentionPolicy()  # Политика хранения последних цен по умолчанию.
+
+
+class LastPricesRetentionThread(QtCore.QThread):
+    """Фоновый поток прореживания истории последних цен.
+    Каждый проход обрабатывает историю частями длительностью policy.chunk, каждую часть — в отдельной короткой транзакции
+    и только во время простоя потока записи, поэтому прореживание не задерживает запись данных, получаемых потоками."""
+
+    """------------------------Сигналы------------------------"""
+    printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
+    rowsReclaimed: QtCore.pyqtSignal = QtCore.pyqtSignal(int)  # Сигнал, передающий количество строк, удалённых за проход.
+    """-------------------------------------------------------"""
+
+    INTERRUPTION_CHECK_INTERVAL: int = 100  # Интервал проверки прерывания во время ожидания, в миллисекундах.
+
+    def __init__(self, policy: RetentionPolicy | None = None, parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.policy: RetentionPolicy = DEFAULT_RETENTION_POLICY if policy is None else policy
+        self.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
+        self.__watermarks: dict[int, int] = {}  # Время, до которого история уже прорежена, для каждого размера промежутка.
+
+        """------------Статистические переменные------------"""
+        self.passes_count: int = 0  # Количество завершённых проходов.
+        self.reclaimed_count: int = 0  # Общее количество удалённых строк.
+        """-------------------------------------------------"""
+
+    def stop(self):
+        """Прерывает поток и ждёт его завершения."""
+        self.requestInterruption()
+        self.wait()
+
+    def run(self) -> None:
+        def printInConsole(text: str):
+            self.printText_signal.emit('{0}: {1}'.format(LastPricesRetentionThread.__name__, text))
+
+        while not self.isInterruptionRequested():
+            reclaimed: int = self.__downsample()
+            if self.isInterruptionRequested(): break
+            self.passes_count += 1
+            self.reclaimed_count += reclaimed
+            self.rowsReclaimed.emit(reclaimed)
+            if reclaimed > 0:
+                printInConsole('Удалено строк: {0} (всего: {1}).'.format(reclaimed, self.reclaimed_count))
+
+            '''---------------Ожидание следующего прохода---------------'''
+            end_time: QtCore.QDeadlineTimer = QtCore.QDeadlineTimer(int(self.policy.check_interval * 1000))
+            while not end_time.hasExpired() and not self.isInterruptionRequested():
+                self.msleep(self.INTERRUPTION_CHECK_INTERVAL)
+            '''---------------------------------------------------------'''
+
+    def __waitForIdle(self) -> bool:
+        """Ждёт простоя потока записи. Возвращает False, если поток прореживания прерван."""
+        self.msleep(self.policy.step_pause)
+        writer: DatabaseWriterThread = DatabaseWriterThread.getWriter()
+        while not self.isInterruptionRequested():
+            if writer.getIdleSeconds() >= self.policy.idle_delay: return True
+            self.msleep(self.INTERRUPTION_CHECK_INTERVAL)
+        return False
+
+    def __downsample(self) -> int:
+        """Выполняет один проход прореживания и возвращает количество удалённых строк."""
+        now: int = MainConnection.convertDateTimeToMicroseconds(getUtcDateTime())
+        reclaimed: int = 0
+        lower_bound: int | None = None  # Более старые цены уже прорежены более грубым уровнем.
+        for border, bucket in self.policy.getLevels(now):
+            from_time: int | None = self.__watermarks.get(bucket)
+            if from_time is None:
+                from_time = MainConnection.getFirstLastPriceTime(border)
+                if from_time is None:  # Если цен, полученных раньше границы, нет.
+                    lower_bound = border
+                    continue
+                from_time -= from_time % RetentionPolicy.DAY
+            if lower_bound is not None:
+                from_time = max(from_time, lower_bound)
+
+            while from_time < border:
+                to_time: int = min(from_time - from_time % bucket + bucket, border)  # Конец промежутка.
+                """
+                Промежуток прореживается частями от конца к началу: самая поздняя цена инструмента в промежутке
+                к этому времени уже оставлена в более поздней части, поэтому все цены более ранних частей удаляются.
+                """
+                chunk_end: int = to_time
+                while chunk_end > from_time:
+                    if not self.__waitForIdle(): return reclaimed
+                    chunk_start: int = max(chunk_end - self.policy.chunk, from_time)
+                    reclaimed += MainConnection.downsampleLastPrices(chunk_start, chunk_end, bucket)
+                    chunk_end = chunk_start
+                from_time = to_time
+                self.__watermarks[bucket] = from_time
+            lower_bound = border
+        return reclaimed
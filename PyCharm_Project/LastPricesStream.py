@@ -0,0 +1,39 @@
+from __future__ import annotations
+from PyQt6 import QtCore
+from tinkoff.invest import LastPrice
+from Classes import TokenClass
+from MyBondClass import MyBondClass
+from MyShareClass import MyShareClass
+from StreamMultiplexer import StreamMultiplexer, SubscriptionKey, SubscriptionType
+
+
+class LastPricesSubscription(QtCore.QObject):
+    """Подписка на последние цены инструментов через мультиплексор stream-соединений токена.
+    Полученные цены передаются инструментам без сброса моделей."""
+    def __init__(self, token: TokenClass, instruments: list[MyBondClass] | list[MyShareClass], parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.__multiplexer: StreamMultiplexer = StreamMultiplexer.getMultiplexer(token)
+        self.__instruments: dict[str, MyBondClass | MyShareClass] = {instrument.uid: instrument for instrument in instruments}
+        self.__active: bool = False  # Флаг действующей подписки.
+
+    def subscribe(self):
+        """Подписывается на последние цены инструментов."""
+        if self.__active: return
+        self.__multiplexer.lastPricesReceived.connect(self.__applyLastPrices)
+        self.__multiplexer.subscribe(self, [SubscriptionKey(SubscriptionType.LAST_PRICE, uid) for uid in self.__instruments])
+        self.__active = True
+
+    def unsubscribe(self):
+        """Отписывается от последних цен инструментов."""
+        if not self.__active: return
+        self.__multiplexer.unsubscribe(self)
+        self.__multiplexer.lastPricesReceived.disconnect(self.__applyLastPrices)
+        self.__active = False
+
+    @QtCore.pyqtSlot(list)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
+    def __applyLastPrices(self, last_prices: list[LastPrice]):
+        """Передаёт полученные цены инструментам. Выполняется в основном потоке."""
+        for last_price in last_prices:
+            instrument: MyBondClass | MyShareClass | None = self.__instruments.get(last_price.instrument_uid)
+            if instrument is not None:
+                instrument.setLastPrice(last_price)
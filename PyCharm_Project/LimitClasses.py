@@ -1,34 +1,200 @@
-from PyQt6.QtCore import QSemaphore, QTimer, pyqtSignal, pyqtSlot, QObject
-from tinkoff.invest import UnaryLimit, StreamLimit
+import enum
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from grpc import StatusCode
+from PyQt6.QtCore import QSemaphore, pyqtSignal, QObject
+from tinkoff.invest import UnaryLimit, StreamLimit, RequestError
+
+
+@enum.unique  # Декоратор, требующий, чтобы все элементы имели разные значения.
+class RequestPriority(enum.IntEnum):
+    """Приоритет запроса. Чем меньше значение, тем выше приоритет."""
+    INTERACTIVE = 0  # Запросы, которых пользователь ожидает прямо сейчас.
+    VISIBLE_ROWS = 1  # Запросы данных для отображаемых строк.
+    BACKGROUND = 2  # Фоновые запросы.
 
 
 class LimitPerMinuteSemaphore(QObject):
-    """Семафор для ограничения количества запросов в минуту."""
+    """Потокобезопасный ограничитель количества запросов в минуту со скользящим окном.
+    Захваченные ресурсы освобождаются сами по истечении окна, поэтому освобождать их вручную не требуется.
+    Вручную возвращаются только ресурсы, захваченные, но не потраченные на запрос (release)."""
     availableChanged_signal: pyqtSignal = pyqtSignal()
+    WINDOW: float = 60.0  # Длительность окна, в секундах.
+    PRIORITY_WAIT_INTERVAL: float = 0.1  # Максимальный интервал перепроверки очереди приоритетов, в секундах.
 
     def __init__(self, limit_per_minute: int, parent: QObject | None = None):
         super().__init__(parent=parent)
         self.__limit_per_minute: int = limit_per_minute  # Максимальное количество запросов в минуту.
-        self.__semaphore: QSemaphore = QSemaphore(self.__limit_per_minute)
+        self.__condition: threading.Condition = threading.Condition()
+        self.__acquire_times: deque[float] = deque()  # Моменты захвата ресурсов в пределах окна.
+        self.__waiting: list[int] = [0 for _ in RequestPriority]  # Количество ожидающих запросов по приоритетам.
+
+        """---------Данные об ограничении, полученные от сервера---------"""
+        self.__server_remaining: int = 0  # Количество запросов, оставшихся до сброса лимита на сервере.
+        self.__server_reset_at: float | None = None  # Момент сброса лимита на сервере.
+        """--------------------------------------------------------------"""
+
+        """------------Статистические переменные------------"""
+        self.acquired_count: int = 0  # Общее количество захваченных ресурсов.
+        self.wait_time: float = 0.0  # Суммарное время ожидания ресурсов, в секундах.
+        self.adjustments_count: int = 0  # Количество корректировок по данным сервера.
+        self.exhausted_count: int = 0  # Количество полученных RESOURCE_EXHAUSTED.
+        """-------------------------------------------------"""
+
+    def __purge(self, now: float):
+        """Удаляет из окна моменты захвата, которые вышли за его пределы. Вызывается под блокировкой."""
+        while self.__acquire_times and now - self.__acquire_times[0] >= self.WINDOW:
+            self.__acquire_times.popleft()
+
+    def __getWaitTime(self, n: int, now: float) -> float:
+        """Возвращает время (в секундах), через которое станут доступны n ресурсов. Вызывается под блокировкой."""
+        if n > self.__limit_per_minute:
+            raise ValueError('Невозможно захватить {0} ресурсов при лимите {1} запросов в минуту!'.format(n, self.__limit_per_minute))
+        self.__purge(now)
+        excess: int = len(self.__acquire_times) + n - self.__limit_per_minute  # Количество ресурсов, которых не хватает.
+        wait_time: float = 0.0 if excess <= 0 else self.__acquire_times[excess - 1] + self.WINDOW - now
+
+        '''-----------------Учёт ограничения, полученного от сервера-----------------'''
+        if self.__server_reset_at is not None:
+            if now >= self.__server_reset_at:  # Если лимит на сервере уже сброшен.
+                self.__server_reset_at = None
+            elif self.__server_remaining < n:
+                wait_time = max(wait_time, self.__server_reset_at - now)
+        '''--------------------------------------------------------------------------'''
+        return wait_time
+
+    def __hasPriorWaiters(self, priority: RequestPriority) -> bool:
+        """Возвращает True, если есть ожидающие запросы с более высоким приоритетом. Вызывается под блокировкой."""
+        return any(self.__waiting[p] > 0 for p in range(priority))
+
+    def __take(self, n: int, now: float):
+        """Захватывает n ресурсов. Вызывается под блокировкой."""
+        self.__acquire_times.extend([now] * n)
+        self.acquired_count += n
+        if self.__server_reset_at is not None:
+            self.__server_remaining -= n
+
+    @property
+    def limit_per_minute(self) -> int:
+        return self.__limit_per_minute
 
     def available(self) -> int:
-        """Возвращает количество ресурсов, доступных в данный момент семафору."""
-        return self.__semaphore.available()
+        """Возвращает количество ресурсов, доступных в данный момент (уровень заполнения окна).
+        Учитывает количество оставшихся запросов, полученное от сервера."""
+        with self.__condition:
+            now: float = time.monotonic()
+            self.__purge(now)
+            available: int = max(self.__limit_per_minute - len(self.__acquire_times), 0)
+            if self.__server_reset_at is not None and now < self.__server_reset_at:
+                available = min(available, max(self.__server_remaining, 0))
+            return available
 
-    def acquire(self, n: int = ...) -> None:
-        self.__semaphore.acquire(n)
-        self.availableChanged_signal.emit()
+    def getWaitTime(self, n: int = 1) -> float:
+        """Возвращает время (в секундах), через которое станут доступны n ресурсов."""
+        with self.__condition:
+            return self.__getWaitTime(n, time.monotonic())
 
-    def release(self, n: int = ...) -> None:
-        @pyqtSlot()  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
-        def __onRelease():
-            self.__semaphore.release(n)
+    def getQueueDepth(self) -> dict[RequestPriority, int]:
+        """Возвращает количество ожидающих запросов по приоритетам."""
+        with self.__condition:
+            return {priority: self.__waiting[priority] for priority in RequestPriority}
+
+    @contextmanager
+    def waiting(self, priority: RequestPriority):
+        """Учитывает запрос в очереди соответствующего приоритета на время ожидания ресурсов.
+        Используется теми, кто ожидает ресурсы с помощью tryAcquire, не блокируя поток."""
+        with self.__condition:
+            self.__waiting[priority] += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__waiting[priority] -= 1
+                self.__condition.notify_all()  # Запросы с более низким приоритетом могут продолжить.
+
+    def acquire(self, n: int = 1, priority: RequestPriority = RequestPriority.BACKGROUND, timeout: float | None = None) -> bool:
+        """Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов, и захватывает их.
+        Ресурсы достаются запросу только при отсутствии ожидающих запросов с более высоким приоритетом.
+        Если задан timeout (в секундах) и ресурсы не удалось захватить за это время, то возвращает False."""
+        with self.__condition:
+            start: float = time.monotonic()
+            deadline: float | None = None if timeout is None else start + timeout
+            acquired: bool = False
+            self.__waiting[priority] += 1
+            try:
+                while True:
+                    now: float = time.monotonic()
+                    wait_time: float = self.__getWaitTime(n, now)
+                    if not self.__hasPriorWaiters(priority) and wait_time <= 0.0:
+                        self.__take(n, now)
+                        acquired = True
+                        break
+                    if self.__hasPriorWaiters(priority):
+                        wait_time = max(wait_time, self.PRIORITY_WAIT_INTERVAL)
+                    if deadline is not None:
+                        if now >= deadline: break
+                        wait_time = min(wait_time, deadline - now)
+                    self.__condition.wait(wait_time)
+            finally:
+                self.wait_time += time.monotonic() - start
+                self.__waiting[priority] -= 1
+                self.__condition.notify_all()
+        if acquired:
             self.availableChanged_signal.emit()
+        return acquired
 
-        timer: QTimer = QTimer(parent=self)
-        timer.setSingleShot(True)  # Без повторений.
-        timer.timeout.connect(__onRelease)
-        timer.start(120000)  # Запускаем таймер на одну минуту.
+    def adjust(self, remaining: int, reset: float):
+        """Корректирует ограничитель по данным сервера: remaining - количество оставшихся запросов,
+        reset - время (в секундах) до сброса лимита."""
+        with self.__condition:
+            self.__server_remaining = remaining
+            self.__server_reset_at = time.monotonic() + reset
+            self.adjustments_count += 1
+            self.__condition.notify_all()  # Ожидающие потоки должны пересчитать время ожидания.
+        self.availableChanged_signal.emit()
+
+    def updateFromRequestError(self, error: RequestError):
+        """Корректирует ограничитель по метаданным ограничения скорости, переданным вместе с RequestError.
+        При RESOURCE_EXHAUSTED захват ресурсов блокируется до сброса лимита на сервере."""
+        def __toInt(value) -> int | None:
+            try:
+                return None if value is None else int(value)
+            except (TypeError, ValueError):
+                return None
+
+        remaining: int | None = __toInt(getattr(error.metadata, 'ratelimit_remaining', None))
+        reset: int | None = __toInt(getattr(error.metadata, 'ratelimit_reset', None))
+        if error.code == StatusCode.RESOURCE_EXHAUSTED:
+            with self.__condition:
+                self.exhausted_count += 1  # Метод вызывается одновременно из разных потоков.
+            self.adjust(0, self.WINDOW if reset is None else reset)
+        elif remaining is not None and reset is not None:
+            self.adjust(remaining, reset)
+
+    def release(self, n: int = 1):
+        """Возвращает n ресурсов, захваченных, но не потраченных на запрос."""
+        with self.__condition:
+            for _ in range(min(n, len(self.__acquire_times))):
+                self.__acquire_times.pop()
+                self.acquired_count -= 1
+                if self.__server_reset_at is not None:
+                    self.__server_remaining += 1
+            self.__condition.notify_all()  # Ожидающие потоки должны пересчитать время ожидания.
+        self.availableChanged_signal.emit()
+
+    def tryAcquire(self, n: int = 1, priority: RequestPriority = RequestPriority.BACKGROUND) -> bool:
+        """Пытается захватить ресурсы без блокировки. Возвращает True в случае успеха.
+        Если есть ожидающие запросы с более высоким приоритетом, то ресурсы не захватываются."""
+        with self.__condition:
+            now: float = time.monotonic()
+            acquired: bool = not self.__hasPriorWaiters(priority) and self.__getWaitTime(n, now) <= 0.0
+            if acquired:
+                self.__take(n, now)
+        if acquired:
+            self.availableChanged_signal.emit()
+        return acquired
 
 
 class MyMethod:
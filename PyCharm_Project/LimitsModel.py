@@ -1,9 +1,10 @@
 from __future__ import annotations
 import enum
 import typing
-from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, QTimer, pyqtSlot
 from Classes import Column, TokenClass
 from LimitClasses import MyUnaryLimit, MyStreamLimit, MyMethod, LimitPerMinuteSemaphore
+from StreamMultiplexer import StreamMultiplexer
 
 
 class TreeItem:
@@ -94,13 +95,50 @@ class LimitsTreeModel(QAbstractItemModel):
             self.Columns.LIMIT_FIFTH:
                 (Column(header='Имя метода',
                         header_tooltip='Имя метода.'),
-                 Column(data_function=lambda item: 'Доступно: {0}'.format(item.data.semaphore.available())),
+                 Column(data_function=lambda item: self._getStateText(item.data),
+                        tooltip_function=lambda item: self._getStateTooltip(item.data)),
                  Column(data_function=lambda item: item.data.method_name)),
         }
         self._root_item: TreeItem = TreeItem(None, None, [], 0)
         self._token: TokenClass | None = None
         self.setToken(token)
 
+        '''
+        Ресурсы ограничителей освобождаются по истечении времени без каких-либо сигналов,
+        поэтому количество доступных ресурсов периодически обновляется.
+        '''
+        self.__refresh_timer: QTimer = QTimer(self)
+        self.__refresh_timer.timeout.connect(self.__onAvailableChanged)
+        self.__refresh_timer.start(1000)
+
+    def _getStateText(self, limit: MyUnaryLimit | MyStreamLimit) -> str:
+        """Возвращает текущее состояние лимита."""
+        if isinstance(limit, MyUnaryLimit):
+            return 'Доступно: {0}, очередь: {1}'.format(limit.semaphore.available(), '/'.join(str(depth) for depth in limit.semaphore.getQueueDepth().values()))
+        else:
+            return 'Открыто: {0} из {1}'.format(limit.limit - limit.semaphore.available(), limit.limit)
+
+    def _getStateTooltip(self, limit: MyUnaryLimit | MyStreamLimit) -> str:
+        """Возвращает подробное описание текущего состояния лимита."""
+        if isinstance(limit, MyUnaryLimit):
+            return 'Ожидание: {0:.1f} с\nЗахвачено всего: {1}\nВремя ожидания всего: {2:.1f} с\nRESOURCE_EXHAUSTED: {3}\nОчередь (интерактивные/видимые строки/фоновые): {4}'.format(limit.semaphore.getWaitTime(1), limit.semaphore.acquired_count, limit.semaphore.wait_time, limit.semaphore.exhausted_count, '/'.join(str(depth) for depth in limit.semaphore.getQueueDepth().values()))
+        else:
+            text: str = 'Открыто приложением: {0}\nРазрешено: {1}\nОткрыто на момент получения лимитов: {2}'.format(limit.limit - limit.semaphore.available(), limit.limit, limit.open)
+            multiplexer: StreamMultiplexer | None = None if self._token is None else StreamMultiplexer.findMultiplexer(self._token.token)
+            if multiplexer is not None and any(method.method_name == multiplexer.stream_method_name for method in limit.methods):
+                text += '\nСоединений мультиплексора: {0}\nПодписок: {1}\nОжидают размещения: {2}\nПерераспределений: {3}'.format(multiplexer.connections_count, multiplexer.subscriptions_count, multiplexer.pending_count, multiplexer.rebalances_count)
+            return text
+
+    @pyqtSlot()  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
+    def __onAvailableChanged(self):
+        """Обновляет ячейки с количеством доступных ресурсов и открытых stream-соединений."""
+        if self._token is None: return
+        for limit_type_row in (self.RowOrderOfLimitTypes.UNARY_REQUESTS_ROW, self.RowOrderOfLimitTypes.STREAM_CONNECTIONS_ROW):
+            parent: QModelIndex = self.index(limit_type_row, 0, QModelIndex())
+            rows_count: int = self.rowCount(parent)
+            if rows_count > 0:
+                self.dataChanged.emit(self.index(0, self.Columns.LIMIT_FIFTH, parent), self.index(rows_count - 1, self.Columns.LIMIT_FIFTH, parent))
+
     def setToken(self, token: TokenClass | None):
         """Устанавливает токен для отображения лимитов."""
         # def addLimitsChildren(limits_item: TreeItem):
@@ -137,9 +175,8 @@ class LimitsTreeModel(QAbstractItemModel):
 
             '''---------------Подключение слотов для обновления ячеек---------------'''
             for unary_limit_item in self._root_item.child(self.RowOrderOfLimitTypes.UNARY_REQUESTS_ROW).getChildren():
-                index: QModelIndex = self.index(unary_limit_item.row(), self.Columns.LIMIT_FIFTH, QModelIndex())
                 semaphore: LimitPerMinuteSemaphore = unary_limit_item.data.semaphore
-                semaphore.availableChanged_signal.connect(lambda: self.dataChanged.emit(index, index))
+                semaphore.availableChanged_signal.connect(self.__onAvailableChanged)
             '''---------------------------------------------------------------------'''
 
         self.endResetModel()  # Завершает операцию сброса модели.
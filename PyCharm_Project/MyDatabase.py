@@ -1,3 +1,5 @@
+import hashlib
+import typing
 from enum import EnumType
 from PyQt6 import QtSql
 from PyQt6.QtSql import QSqlDatabase, QSqlQuery
@@ -5,8 +7,8 @@ from tinkoff.invest import Bond, LastPrice, Asset, InstrumentLink, AssetInstrume
     InstrumentType, Coupon, Dividend, AccountType, AccountStatus, AccessLevel, SecurityTradingStatus, RealExchange
 from tinkoff.invest.schemas import RiskLevel, ShareType, CouponType, HistoricCandle, CandleInterval, AssetFull, Brand, \
     AssetCurrency, AssetSecurity, GetForecastResponse, ConsensusItem, TargetItem, Recommendation, ConsensusForecastsItem
-from Classes import TokenClass, MyConnection, partition, ConsensusFull, getForecastResponseEq, print_function_runtime, \
-    MyConsensusForecastsItem
+from Classes import TokenClass, MyConnection, ConsensusFull, getForecastResponseEq, print_function_runtime, \
+    MyConsensusForecastsItem, partition
 from MyBondClass import MyBondClass
 from MyMoneyValue import MyMoneyValue
 from MyQuotation import MyQuotation
@@ -16,9 +18,307 @@ from MyShareClass import MyShareClass
 class MainConnection(MyConnection):
     CONNECTION_NAME: str = 'InvestmentViewer'
 
+    '''-------Столбцы цен и времени, хранящиеся в БД в виде целых чисел-------'''
+    QUOTATION_COLUMNS: dict[str, tuple[str, ...]] = {
+        MyConnection.BONDS_TABLE: ('klong', 'kshort', 'dlong', 'dshort', 'dlong_min', 'dshort_min', 'min_price_increment'),
+        MyConnection.SHARES_TABLE: ('klong', 'kshort', 'dlong', 'dshort', 'dlong_min', 'dshort_min', 'min_price_increment'),
+        MyConnection.COUPONS_TABLE: (),
+        MyConnection.LAST_PRICES_TABLE: ('price',),
+        MyConnection.CANDLES_TABLE: ('open', 'high', 'low', 'close')
+    }
+    MONEY_VALUE_COLUMNS: dict[str, tuple[str, ...]] = {
+        MyConnection.BONDS_TABLE: ('nominal', 'initial_nominal', 'placement_price', 'aci_value'),
+        MyConnection.SHARES_TABLE: ('nominal',),
+        MyConnection.COUPONS_TABLE: ('pay_one_bond',),
+        MyConnection.LAST_PRICES_TABLE: (),
+        MyConnection.CANDLES_TABLE: ()
+    }
+    TIME_COLUMNS: dict[str, tuple[str, ...]] = {
+        MyConnection.BONDS_TABLE: (),
+        MyConnection.SHARES_TABLE: (),
+        MyConnection.COUPONS_TABLE: (),
+        MyConnection.LAST_PRICES_TABLE: ('time',),
+        MyConnection.CANDLES_TABLE: ('time',)
+    }  # Столбцы времени, хранящиеся в виде количества микросекунд с начала эпохи.
+    OLD_TABLE_SUFFIX: str = '_old'  # Суффикс, под которым таблица со старой схемой хранится на время миграции.
+    CONTENT_HASH_TABLES: tuple[str, ...] = (MyConnection.BONDS_TABLE, MyConnection.SHARES_TABLE)  # Таблицы, строки которых хранят хеш содержимого.
+    '''-----------------------------------------------------------------------'''
+
+    SCHEMA_VERSION: int = 5  # Версия схемы БД, хранящаяся в PRAGMA user_version. Увеличивается при каждом изменении схемы.
+
     def __init__(self):
         self.open()  # Открываем соединение с базой данных.
-        self.createDataBase()  # Создаёт базу данных.
+        self.bootstrapDataBase()  # Создаёт базу данных или переводит её на текущую схему.
+
+    @staticmethod
+    def __getUserVersion(db: QSqlDatabase) -> int:
+        """Возвращает версию схемы, записанную в базу данных."""
+        query = QSqlQuery(db)
+        exec_flag: bool = query.exec('PRAGMA user_version;')
+        assert exec_flag, query.lastError().text()
+        next_flag: bool = query.next()
+        assert next_flag, query.lastError().text()
+        user_version: int = query.value(0)
+        query.finish()
+        return user_version
+
+    @classmethod
+    def bootstrapDataBase(cls):
+        """Создаёт базу данных или переводит её на текущую схему.
+        Если версия схемы в базе данных совпадает с SCHEMA_VERSION, то DDL-запросы не выполняются.
+        Исключение - отсутствующий файл истории цен (например, удалённый, чтобы освободить место): его таблицы создаются заново."""
+        db: QSqlDatabase = cls.getDatabase()
+        user_version: int = cls.__getUserVersion(db)
+        if user_version == cls.SCHEMA_VERSION:
+            if len(cls.__getHistoryTables(db, cls.HISTORY_SCHEMA)) < len(cls.HISTORY_TABLES):
+                cls.createDataBase()
+            return
+        if user_version > cls.SCHEMA_VERSION:
+            raise SystemError('Версия схемы базы данных ({0}) новее версии схемы приложения ({1})!'.format(user_version, cls.SCHEMA_VERSION))
+
+        cls.migrateDataBase(user_version)  # Переводит таблицы, созданные старыми версиями приложения, на текущую схему.
+        cls.createDataBase()  # Создаёт недостающие таблицы, триггеры и представления.
+
+        query = QSqlQuery(db)
+        exec_flag: bool = query.exec('PRAGMA user_version = {0};'.format(cls.SCHEMA_VERSION))
+        assert exec_flag, query.lastError().text()
+
+    @classmethod
+    def migrateDataBase(cls, user_version: int):
+        """Последовательно выполняет миграции, версии которых больше user_version.
+        Базы данных, созданные до появления версий схемы, имеют версию 0, поэтому каждая миграция
+        проверяет текущую схему и ничего не делает, если переводить нечего."""
+        migrations: tuple[tuple[int, typing.Callable[[], None]], ...] = (
+            (1, cls.__migrateToIntegerColumns),
+            (2, cls.__addContentHashColumns),
+            (4, cls.__moveHistoryTables)
+        )  # Версии без миграций (3 и 5 — вторичные индексы) создаются функцией createDataBase.
+        for migration_version, migration in migrations:
+            if migration_version > user_version:
+                migration()
+
+    @staticmethod
+    def __getColumnsTypes(db: QSqlDatabase, table_name: str) -> dict[str, str]:
+        """Возвращает словарь {название столбца: тип} для таблицы. Если таблицы нет, то словарь пуст."""
+        query = QSqlQuery(db)
+        query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+        exec_flag: bool = query.exec('PRAGMA table_info(\"{0}\");'.format(table_name))
+        assert exec_flag, query.lastError().text()
+        columns: dict[str, str] = {}
+        while query.next():
+            columns[query.value('name')] = query.value('type')
+        return columns
+
+    @classmethod
+    def __getQuotationFromTextSql(cls, text_sql: str) -> str:
+        """Возвращает SQL-выражение, переводящее строку вида 'units.nano' в целое число units * NANO_SCALE + nano."""
+        return '(CAST(substr({0}, 1, instr({0}, \'.\') - 1) AS INTEGER) * {1} + CAST(substr({0}, instr({0}, \'.\') + 1) AS INTEGER))'.format(
+            text_sql,
+            cls.NANO_SCALE
+        )
+
+    @staticmethod
+    def __getMicrosecondsFromTextSql(text_sql: str) -> str:
+        """Возвращает SQL-выражение, переводящее время в формате ISO 8601 в количество микросекунд с начала эпохи.
+        datetime.isoformat записывает дробную часть секунд всегда шестью цифрами."""
+        return '(CAST(strftime(\'%s\', {0}) AS INTEGER) * 1000000 + CASE WHEN instr({0}, \'.\') > 0 THEN CAST(substr({0}, instr({0}, \'.\') + 1, 6) AS INTEGER) ELSE 0 END)'.format(text_sql)
+
+    @classmethod
+    def __migrateToIntegerColumns(cls):
+        """
+        Миграция 1. Переводит столбцы цен, хранившиеся в виде TEXT ('units.nano' и 'units.nano currency'),
+        и столбцы времени, хранившиеся в формате ISO 8601, в целые числа.
+        Таблица со старой схемой переименовывается, создаётся заново и заполняется с пересчётом значений.
+        """
+        db: QSqlDatabase = cls.getDatabase()
+
+        def execute(sql_command: str):
+            query = QSqlQuery(db)
+            exec_flag: bool = query.exec(sql_command)
+            assert exec_flag, query.lastError().text()
+
+        '''--------Представление последних цен заменено таблицей текущих цен--------'''
+        view_query = QSqlQuery(db)
+        view_exec_flag: bool = view_query.exec('SELECT \"name\" FROM \"sqlite_master\" WHERE \"type\" = \'view\' AND \"name\" = \'{0}\';'.format(cls.LAST_PRICES_VIEW))
+        assert view_exec_flag, view_query.lastError().text()
+        last_prices_view_flag: bool = view_query.next()
+        view_query.finish()
+        '''------------------------------------------------------------------------'''
+
+        old_tables: list[str] = [
+            table_name for table_name in cls.QUOTATION_COLUMNS
+            if any(cls.__getColumnsTypes(db, table_name).get(column) == 'TEXT' for column in cls.QUOTATION_COLUMNS[table_name] + cls.MONEY_VALUE_COLUMNS[table_name] + cls.TIME_COLUMNS[table_name])
+        ]
+
+        '''---------------Отключаем внешние ключи на время перестройки таблиц---------------'''
+        """
+        Таблицы перестраиваются по процедуре SQLite (https://www.sqlite.org/lang_altertable.html#otheralter).
+        При включённых внешних ключах переименование таблицы переписывает ссылки дочерних таблиц (Coupons, Dividends)
+        на переименованную таблицу, а её удаление каскадно удаляет их строки. Внутри транзакции PRAGMA foreign_keys
+        не действует, поэтому внешние ключи отключаются до начала транзакций, а после переноса данных
+        проверяются (PRAGMA foreign_key_check) и возвращаются в прежнее состояние.
+        """
+        fk_query = QSqlQuery(db)
+        fk_exec_flag: bool = fk_query.exec('PRAGMA foreign_keys;')
+        assert fk_exec_flag, fk_query.lastError().text()
+        fk_next_flag: bool = fk_query.next()
+        assert fk_next_flag, fk_query.lastError().text()
+        foreign_keys_flag: bool = bool(fk_query.value(0))  # Были ли включены внешние ключи до миграции.
+        fk_query.finish()
+        execute('PRAGMA foreign_keys = OFF;')
+        '''-------------------------------------------------------------------------------'''
+
+        try:
+            '''---------------Переименовываем таблицы со старой схемой---------------'''
+            if old_tables:
+                """
+                legacy_alter_table не даёт SQLite переписать ссылки внешних ключей дочерних таблиц на переименованную таблицу,
+                но только при отключённых внешних ключах. Триггеры будут пересозданы вместе с таблицами.
+                """
+                execute('PRAGMA legacy_alter_table = ON;')
+                if db.transaction():
+                    execute('DROP VIEW IF EXISTS \"{0}\";'.format(cls.LAST_PRICES_VIEW))
+                    for table_name in old_tables:
+                        execute('ALTER TABLE \"{0}\" RENAME TO \"{0}{1}\";'.format(table_name, cls.OLD_TABLE_SUFFIX))
+                    commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+                    assert commit_flag, db.lastError().text()
+                else:
+                    raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
+                execute('PRAGMA legacy_alter_table = OFF;')
+            if old_tables or last_prices_view_flag:
+                cls.createDataBase()
+            '''----------------------------------------------------------------------'''
+
+            '''-------------Переносим данные из таблиц со старой схемой-------------'''
+            for table_name in cls.QUOTATION_COLUMNS:
+                old_table_name: str = '{0}{1}'.format(table_name, cls.OLD_TABLE_SUFFIX)
+                old_columns: dict[str, str] = cls.__getColumnsTypes(db, old_table_name)
+                if not old_columns: continue  # Если таблицы со старой схемой нет.
+
+                new_columns: list[str] = ['\"rowid\"']
+                values: list[str] = ['\"rowid\"']
+                for column, column_type in old_columns.items():
+                    column_sql: str = '\"{0}\"'.format(column)
+                    new_columns.append(column_sql)
+                    if column_type != 'TEXT':
+                        values.append(column_sql)
+                    elif column in cls.QUOTATION_COLUMNS[table_name]:
+                        values.append(cls.__getQuotationFromTextSql(column_sql))
+                    elif column in cls.MONEY_VALUE_COLUMNS[table_name]:
+                        values.append(cls.__getQuotationFromTextSql('substr({0}, 1, instr({0}, \' \') - 1)'.format(column_sql)))
+                        new_columns.append('\"{0}{1}\"'.format(column, cls.CURRENCY_COLUMN_SUFFIX))
+                        values.append('substr({0}, instr({0}, \' \') + 1)'.format(column_sql))
+                    elif column in cls.TIME_COLUMNS[table_name]:
+                        values.append(cls.__getMicrosecondsFromTextSql(column_sql))
+                    else:
+                        values.append(column_sql)
+
+                insert_sql: str = 'INSERT INTO \"{0}\" ({1}) SELECT {2} FROM \"{3}\";'.format(table_name, ', '.join(new_columns), ', '.join(values), old_table_name)
+                drop_sql: str = 'DROP TABLE \"{0}\";'.format(old_table_name)
+                if table_name in cls.HISTORY_TABLES:
+                    """
+                    Новая таблица истории цен находится в файле истории, а таблица со старой схемой - в основном файле.
+                    Строки копируются вместе с rowid, поэтому при повторе после сбоя уже скопированные строки пропускаются.
+                    """
+                    cls.__executeInTransaction(db, (insert_sql.replace('INSERT INTO', 'INSERT OR IGNORE INTO', 1),))
+                    cls.__executeInTransaction(db, (drop_sql,))
+                else:
+                    cls.__executeInTransaction(db, (insert_sql, drop_sql))
+            '''---------------------------------------------------------------------'''
+
+            '''---------------------Проверяем внешние ключи---------------------'''
+            if foreign_keys_flag:
+                fk_check_query = QSqlQuery(db)
+                fk_check_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+                fk_check_exec_flag: bool = fk_check_query.exec('PRAGMA \"main\".foreign_key_check;')
+                assert fk_check_exec_flag, fk_check_query.lastError().text()
+                violations: list[str] = []
+                while fk_check_query.next():
+                    violations.append('{0} (rowid {1}) -> {2}'.format(fk_check_query.value('table'), fk_check_query.value('rowid'), fk_check_query.value('parent')))
+                fk_check_query.finish()
+                if violations:
+                    raise SystemError('После перестройки таблиц нарушены внешние ключи: {0}!'.format(', '.join(violations[:10])))
+            '''-----------------------------------------------------------------'''
+        finally:
+            execute('PRAGMA foreign_keys = {0};'.format('ON' if foreign_keys_flag else 'OFF'))
+
+        '''-------------Заполняем таблицу текущих последних цен-------------'''
+        if last_prices_view_flag:
+            if db.transaction():
+                execute('''INSERT INTO \"{0}\" (\"figi\", \"price\", \"time\", \"instrument_uid\") SELECT \"figi\", \"price\", 
+                MAX(\"time\"), \"instrument_uid\" FROM \"{1}\" GROUP BY \"instrument_uid\" ON CONFLICT(\"instrument_uid\") DO NOTHING;'''.format(
+                    cls.CURRENT_LAST_PRICES_TABLE,
+                    cls.LAST_PRICES_TABLE
+                ))
+                execute('DROP VIEW IF EXISTS \"{0}\";'.format(cls.LAST_PRICES_VIEW))
+                commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+                assert commit_flag, db.lastError().text()
+            else:
+                raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
+        '''-----------------------------------------------------------------'''
+
+    @classmethod
+    def __addContentHashColumns(cls):
+        """Миграция 2. Добавляет столбец хеша содержимого в таблицы инструментов."""
+        db: QSqlDatabase = cls.getDatabase()
+        for table_name in cls.CONTENT_HASH_TABLES:
+            columns: dict[str, str] = cls.__getColumnsTypes(db, table_name)
+            if columns and 'content_hash' not in columns:
+                query = QSqlQuery(db)
+                exec_flag: bool = query.exec('ALTER TABLE \"{0}\" ADD COLUMN \"content_hash\" INTEGER;'.format(table_name))
+                assert exec_flag, query.lastError().text()
+
+    @classmethod
+    def __getHistoryTables(cls, db: QSqlDatabase, schema_name: str) -> list[str]:
+        """Возвращает таблицы истории цен, содержащиеся в файле БД schema_name."""
+        query = QSqlQuery(db)
+        query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+        exec_flag: bool = query.exec('SELECT \"name\" FROM \"{0}\".\"sqlite_master\" WHERE \"type\" = \'table\' AND \"name\" IN ({1});'.format(
+            schema_name,
+            ', '.join('\'{0}\''.format(table_name) for table_name in cls.HISTORY_TABLES)
+        ))
+        assert exec_flag, query.lastError().text()
+        tables: list[str] = []
+        while query.next():
+            tables.append(query.value('name'))
+        query.finish()
+        return tables
+
+    @staticmethod
+    def __executeInTransaction(db: QSqlDatabase, sql_commands: tuple[str, ...]):
+        """Выполняет запросы одной транзакцией.
+        В режиме WAL фиксация транзакции, изменяющей несколько файлов БД, не атомарна: после сбоя
+        изменения одного файла могут сохраниться без изменений другого. Поэтому запросы, изменяющие
+        основной файл и файл истории цен, выполняются разными транзакциями."""
+        if db.transaction():
+            for sql_command in sql_commands:
+                query = QSqlQuery(db)
+                exec_flag: bool = query.exec(sql_command)
+                assert exec_flag, query.lastError().text()
+            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            assert commit_flag, db.lastError().text()
+        else:
+            raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
+
+    @classmethod
+    def __moveHistoryTables(cls):
+        """
+        Миграция 4. Переносит таблицы истории цен из основного файла БД в присоединённый файл истории.
+        Строки копируются вместе с rowid и фиксируются в файле истории до удаления таблицы основного файла.
+        Перенос повторяется, если основной файл всё ещё содержит таблицу, поэтому строки, уже скопированные
+        до сбоя, пропускаются. Освободившиеся страницы основного файла возвращаются файловой системе
+        только после VACUUM (см. HistoryDatabaseMigration.py).
+        """
+        db: QSqlDatabase = cls.getDatabase()
+        main_tables: list[str] = cls.__getHistoryTables(db, 'main')  # Таблицы истории цен, оставшиеся в основном файле.
+        if not main_tables: return
+
+        cls.createDataBase()  # Создаёт таблицы истории цен в файле истории.
+
+        for table_name in main_tables:
+            columns: str = ', '.join(['\"rowid\"'] + ['\"{0}\"'.format(column) for column in cls.__getColumnsTypes(db, table_name)])
+            cls.__executeInTransaction(db, ('INSERT OR IGNORE INTO \"{0}\".\"{1}\" ({2}) SELECT {2} FROM \"main\".\"{1}\";'.format(cls.HISTORY_SCHEMA, table_name, columns),))
+            cls.__executeInTransaction(db, ('DROP TABLE \"main\".\"{0}\";'.format(table_name),))  # Вместе с таблицей удаляются её триггеры.
 
     @classmethod  # Привязывает метод к классу, а не к конкретному экземпляру этого класса.
     def createDataBase(cls):
@@ -191,23 +491,27 @@ class MainConnection(MyConnection):
             \"isin\" TEXT NOT NULL,
             \"lot\" INTEGER NOT NULL,
             \"currency\" TEXT NOT NULL,
-            \"klong\" TEXT NOT NULL,
-            \"kshort\" TEXT NOT NULL,
-            \"dlong\" TEXT NOT NULL,
-            \"dshort\" TEXT NOT NULL,
-            \"dlong_min\" TEXT NOT NULL,
-            \"dshort_min\" TEXT NOT NULL,
+            \"klong\" INTEGER NOT NULL,
+            \"kshort\" INTEGER NOT NULL,
+            \"dlong\" INTEGER NOT NULL,
+            \"dshort\" INTEGER NOT NULL,
+            \"dlong_min\" INTEGER NOT NULL,
+            \"dshort_min\" INTEGER NOT NULL,
             \"short_enabled_flag\" BLOB NOT NULL,
             \"name\" TEXT NOT NULL,
             \"exchange\" TEXT NOT NULL,
             \"coupon_quantity_per_year\" INTEGER NOT NULL,
             \"maturity_date\" TEXT NOT NULL,
-            \"nominal\" TEXT NOT NULL,
-            \"initial_nominal\" TEXT NOT NULL,
+            \"nominal\" INTEGER NOT NULL,
+            \"nominal_currency\" TEXT NOT NULL,
+            \"initial_nominal\" INTEGER NOT NULL,
+            \"initial_nominal_currency\" TEXT NOT NULL,
             \"state_reg_date\" TEXT NOT NULL,
             \"placement_date\" TEXT NOT NULL,
-            \"placement_price\" TEXT NOT NULL,
-            \"aci_value\" TEXT NOT NULL,
+            \"placement_price\" INTEGER NOT NULL,
+            \"placement_price_currency\" TEXT NOT NULL,
+            \"aci_value\" INTEGER NOT NULL,
+            \"aci_value_currency\" TEXT NOT NULL,
             \"country_of_risk\" TEXT NOT NULL,
             \"country_of_risk_name\" TEXT NOT NULL,
             \"sector\" TEXT NOT NULL,
@@ -221,7 +525,7 @@ class MainConnection(MyConnection):
             \"floating_coupon_flag\" BLOB NOT NULL,
             \"perpetual_flag\" BLOB NOT NULL,
             \"amortization_flag\" BLOB NOT NULL,
-            \"min_price_increment\" TEXT NOT NULL,
+            \"min_price_increment\" INTEGER NOT NULL,
             \"api_trade_available_flag\" BLOB NOT NULL,
             \"uid\" TEXT NOT NULL,
             {3},
@@ -236,6 +540,7 @@ class MainConnection(MyConnection):
             \"first_1min_candle_date\" TEXT NOT NULL,
             \"first_1day_candle_date\" TEXT NOT NULL,
             {4},
+            \"content_hash\" INTEGER,
             \"coupons\" TEXT CHECK(\"coupons\" = \'Yes\' OR \"coupons\" = \'No\'),
             UNIQUE (\"uid\"),
             FOREIGN KEY (\"uid\") REFERENCES \"{1}\"(\"uid\") ON DELETE CASCADE
@@ -284,7 +589,8 @@ class MainConnection(MyConnection):
             \"coupon_date\" TEXT NOT NULL,
             \"coupon_number\" INTEGER NOT NULL,
             \"fix_date\" TEXT NOT NULL,
-            \"pay_one_bond\" TEXT NOT NULL,
+            \"pay_one_bond\" INTEGER NOT NULL,
+            \"pay_one_bond_currency\" TEXT NOT NULL,
             {2},
             \"coupon_start_date\" TEXT NOT NULL,
             \"coupon_end_date\" TEXT NOT NULL,
@@ -316,12 +622,12 @@ class MainConnection(MyConnection):
             \"isin\" TEXT NOT NULL,
             \"lot\" INTEGER NOT NULL,
             \"currency\" TEXT NOT NULL,
-            \"klong\" TEXT NOT NULL,
-            \"kshort\" TEXT NOT NULL,
-            \"dlong\" TEXT NOT NULL,
-            \"dshort\" TEXT NOT NULL,
-            \"dlong_min\" TEXT NOT NULL,
-            \"dshort_min\" TEXT NOT NULL,
+            \"klong\" INTEGER NOT NULL,
+            \"kshort\" INTEGER NOT NULL,
+            \"dlong\" INTEGER NOT NULL,
+            \"dshort\" INTEGER NOT NULL,
+            \"dlong_min\" INTEGER NOT NULL,
+            \"dshort_min\" INTEGER NOT NULL,
             \"short_enabled_flag\" BLOB NOT NULL,
             \"name\" TEXT NOT NULL,
             \"exchange\" TEXT NOT NULL, 
@@ -331,14 +637,15 @@ class MainConnection(MyConnection):
             \"country_of_risk_name\" TEXT NOT NULL,
             \"sector\" TEXT NOT NULL,
             \"issue_size_plan\" INTEGER NOT NULL,
-            \"nominal\" TEXT NOT NULL,
+            \"nominal\" INTEGER NOT NULL,
+            \"nominal_currency\" TEXT NOT NULL,
             {2},
             \"otc_flag\" BLOB NOT NULL,
             \"buy_available_flag\" BLOB NOT NULL,
             \"sell_available_flag\" BLOB NOT NULL,
             \"div_yield_flag\" BLOB NOT NULL,
             {4},
-            \"min_price_increment\" TEXT NOT NULL,
+            \"min_price_increment\" INTEGER NOT NULL,
             \"api_trade_available_flag\" BLOB NOT NULL,
             \"uid\" TEXT NOT NULL,
             {3},
@@ -351,6 +658,7 @@ class MainConnection(MyConnection):
             \"liquidity_flag\" BLOB NOT NULL,
             \"first_1min_candle_date\" TEXT NOT NULL,
             \"first_1day_candle_date\" TEXT NOT NULL,
+            \"content_hash\" INTEGER,
             \"dividends\" TEXT CHECK(\"dividends\" = \'Yes\' OR \"dividends\" = \'No\'),
             UNIQUE (\"uid\"),
             FOREIGN KEY (\"uid\") REFERENCES \"{1}\"(\"uid\") ON DELETE CASCADE
@@ -412,15 +720,18 @@ class MainConnection(MyConnection):
             '''-----------------------------------------------------------------'''
 
             '''----------------Создание таблицы последних цен----------------'''
+            """
+            Таблица хранится в файле истории цен. Внешние ключи не действуют между файлами БД,
+            поэтому строки удалённых инструментов удаляются функцией deleteHistoryOrphans.
+            """
             last_prices_query_str: str = '''
-            CREATE TABLE IF NOT EXISTS \"{0}\" (
+            CREATE TABLE IF NOT EXISTS \"{0}\".\"{1}\" (
             \"figi\" TEXT NOT NULL,
-            \"price\" TEXT NOT NULL,
-            \"time\" TEXT NOT NULL,
+            \"price\" INTEGER NOT NULL,
+            \"time\" INTEGER NOT NULL,
             \"instrument_uid\" TEXT NOT NULL,
-            PRIMARY KEY (\"time\", \"instrument_uid\"),
-            FOREIGN KEY (\"instrument_uid\") REFERENCES \"{1}\"(\"uid\") ON DELETE CASCADE
-            );'''.format(MyConnection.LAST_PRICES_TABLE, MyConnection.INSTRUMENT_UIDS_TABLE)
+            PRIMARY KEY (\"time\", \"instrument_uid\")
+            );'''.format(MyConnection.HISTORY_SCHEMA, MyConnection.LAST_PRICES_TABLE)
             last_prices_query = QSqlQuery(db)
             last_prices_prepare_flag: bool = last_prices_query.prepare(last_prices_query_str)
             assert last_prices_prepare_flag, last_prices_query.lastError().text()
@@ -428,35 +739,41 @@ class MainConnection(MyConnection):
             assert last_prices_exec_flag, last_prices_query.lastError().text()
             '''--------------------------------------------------------------'''
 
-            '''---------------Создание представления последних цен---------------'''
-            last_prices_view_query_str: str = '''
-            CREATE VIEW IF NOT EXISTS \"{0}\" (\"figi\", \"price\", \"time\", \"instrument_uid\") AS
-            SELECT {1}.\"figi\" AS \"figi\", {1}.\"price\" AS \"price\", 
-            MAX({1}.\"time\") AS \"time\", {1}.\"instrument_uid\" AS \"instrument_uid\" 
-            FROM {1} GROUP BY {1}.\"instrument_uid\"
-            ;'''.format(MyConnection.LAST_PRICES_VIEW, '\"{0}\"'.format(MyConnection.LAST_PRICES_TABLE))
-            last_prices_view_query = QSqlQuery(db)
-            last_prices_view_prepare_flag: bool = last_prices_view_query.prepare(last_prices_view_query_str)
-            assert last_prices_view_prepare_flag, last_prices_view_query.lastError().text()
-            last_prices_view_exec_flag: bool = last_prices_view_query.exec()
-            assert last_prices_view_exec_flag, last_prices_view_query.lastError().text()
-            '''------------------------------------------------------------------'''
+            '''-------------Создание таблицы текущих последних цен-------------'''
+            """
+            Хранит по одной (самой поздней) последней цене на инструмент. Заполняется функцией addLastPrices вместе
+            с таблицей последних цен, поэтому чтение текущей цены не зависит от объёма накопленной истории цен.
+            """
+            current_last_prices_query_str: str = '''
+            CREATE TABLE IF NOT EXISTS \"{0}\" (
+            \"figi\" TEXT NOT NULL,
+            \"price\" INTEGER NOT NULL,
+            \"time\" INTEGER NOT NULL,
+            \"instrument_uid\" TEXT NOT NULL,
+            PRIMARY KEY (\"instrument_uid\"),
+            FOREIGN KEY (\"instrument_uid\") REFERENCES \"{1}\"(\"uid\") ON DELETE CASCADE
+            );'''.format(MyConnection.CURRENT_LAST_PRICES_TABLE, MyConnection.INSTRUMENT_UIDS_TABLE)
+            current_last_prices_query = QSqlQuery(db)
+            current_last_prices_prepare_flag: bool = current_last_prices_query.prepare(current_last_prices_query_str)
+            assert current_last_prices_prepare_flag, current_last_prices_query.lastError().text()
+            current_last_prices_exec_flag: bool = current_last_prices_query.exec()
+            assert current_last_prices_exec_flag, current_last_prices_query.lastError().text()
+            '''----------------------------------------------------------------'''
 
             '''---------------------Создание таблицы свечей---------------------'''
             candles_query_str: str = '''
-            CREATE TABLE IF NOT EXISTS \"{0}\" (
+            CREATE TABLE IF NOT EXISTS \"{0}\".\"{1}\" (
             \"instrument_id\" TEXT NOT NULL,
             \"interval\" TEXT NOT NULL,
-            \"open\" TEXT NOT NULL,
-            \"high\" TEXT NOT NULL,
-            \"low\" TEXT NOT NULL,
-            \"close\" TEXT NOT NULL,
+            \"open\" INTEGER NOT NULL,
+            \"high\" INTEGER NOT NULL,
+            \"low\" INTEGER NOT NULL,
+            \"close\" INTEGER NOT NULL,
             \"volume\" INTEGER NOT NULL,
-            \"time\" TEXT NOT NULL,
+            \"time\" INTEGER NOT NULL,
             \"is_complete\"	BLOB NOT NULL,
-            UNIQUE (\"instrument_id\", \"interval\", \"time\"),
-            FOREIGN KEY (\"instrument_id\") REFERENCES \"{1}\"(\"uid\") ON DELETE CASCADE
-            );'''.format(MyConnection.CANDLES_TABLE, MyConnection.INSTRUMENT_UIDS_TABLE)
+            UNIQUE (\"instrument_id\", \"interval\", \"time\")
+            );'''.format(MyConnection.HISTORY_SCHEMA, MyConnection.CANDLES_TABLE)  # Таблица хранится в файле истории цен, как и таблица последних цен.
             candles_query = QSqlQuery(db)
             candles_prepare_flag: bool = candles_query.prepare(candles_query_str)
             assert candles_prepare_flag, candles_query.lastError().text()
@@ -668,6 +985,21 @@ class MainConnection(MyConnection):
             assert instruments_status_exec_flag, instruments_status_query.lastError().text()
             '''------------------------------------------------------------------------------'''
 
+            '''------------------Индекс таблицы запросов инструментов------------------'''
+            """
+            Уникальный индекс (token, status, uid) не используется запросами, отбирающими инструменты только по статусу.
+            Отдельный индекс по uid не создаётся: он не нужен ни одному запросу, а запросы DISTINCT uid по токену
+            начинают полностью просматривать таблицу по нему вместо поиска по токену.
+            """
+            instruments_status_index_query = QSqlQuery(db)
+            instruments_status_index_prepare_flag: bool = instruments_status_index_query.prepare(
+                'CREATE INDEX IF NOT EXISTS \"{0}\" ON \"{1}\"(\"status\", \"uid\");'.format(MyConnection.INSTRUMENTS_STATUS_STATUS_INDEX, MyConnection.INSTRUMENT_STATUS_TABLE)
+            )
+            assert instruments_status_index_prepare_flag, instruments_status_index_query.lastError().text()
+            instruments_status_index_exec_flag: bool = instruments_status_index_query.exec()
+            assert instruments_status_index_exec_flag, instruments_status_index_query.lastError().text()
+            '''-----------------------------------------------------------------------'''
+
             """==============================Новые таблицы прогнозов=============================="""
             recommendation_column_name: str = '\"recommendation\"'
             recommendation_check_str: str | None = getCheckConstraintForColumnFromEnum(recommendation_column_name, Recommendation)
@@ -730,6 +1062,19 @@ class MainConnection(MyConnection):
             target_items_exec_flag: bool = target_items_query.exec()
             assert target_items_exec_flag, target_items_query.lastError().text()
             '''--------------------------------------------------------------------------'''
+
+            '''-----------------Индекс таблицы прогнозов по консенсус-прогнозу-----------------'''
+            target_items_index_query = QSqlQuery(db)
+            target_items_index_prepare_flag: bool = target_items_index_query.prepare(
+                'CREATE INDEX IF NOT EXISTS \"{0}\" ON \"{1}\"(\"instrument_uid\", \"consensus_number\");'.format(
+                    MyConnection.TARGET_ITEMS_CONSENSUS_INDEX,
+                    MyConnection.TARGET_ITEMS_TABLE
+                )
+            )
+            assert target_items_index_prepare_flag, target_items_index_query.lastError().text()
+            target_items_index_exec_flag: bool = target_items_index_query.exec()
+            assert target_items_index_exec_flag, target_items_index_query.lastError().text()
+            '''--------------------------------------------------------------------------------'''
             """==================================================================================="""
 
             '''----------------------Создание таблицы консенсус-прогнозов----------------------'''
@@ -763,6 +1108,23 @@ class MainConnection(MyConnection):
             assert consensus_forecasts_exec_flag, consensus_forecasts_query.lastError().text()
             '''--------------------------------------------------------------------------------'''
 
+            '''-----------Индексы поиска консенсус-прогнозов по uid инструментов-----------'''
+            """
+            Первичный ключ таблицы AssetInstruments начинается с uid актива, поэтому поиск по uid инструмента
+            без отдельного индекса просматривает всю таблицу. Индекс консенсус-прогнозов по активу и времени
+            создания находит последний консенсус-прогноз актива без группировки всей таблицы.
+            """
+            for index_command in (
+                'CREATE INDEX IF NOT EXISTS \"{0}\" ON \"{1}\"(\"uid\");'.format(MyConnection.ASSET_INSTRUMENTS_UID_INDEX, MyConnection.ASSET_INSTRUMENTS_TABLE),
+                'CREATE INDEX IF NOT EXISTS \"{0}\" ON \"{1}\"(\"asset_uid\", \"created_at\");'.format(MyConnection.CONSENSUS_FORECASTS_ASSET_INDEX, MyConnection.CONSENSUS_FORECASTS_TABLE)
+            ):
+                forecasts_index_query = QSqlQuery(db)
+                forecasts_index_prepare_flag: bool = forecasts_index_query.prepare(index_command)
+                assert forecasts_index_prepare_flag, forecasts_index_query.lastError().text()
+                forecasts_index_exec_flag: bool = forecasts_index_query.exec()
+                assert forecasts_index_exec_flag, forecasts_index_query.lastError().text()
+            '''----------------------------------------------------------------------------'''
+
             commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
         else:
@@ -846,41 +1208,100 @@ class MainConnection(MyConnection):
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    '''---------------Обновление инструментов по хешу содержимого---------------'''
+    @staticmethod
+    def __getContentHash(*rows: tuple) -> int:
+        """Возвращает 64-битный хеш содержимого строк инструмента, помещающийся в столбец INTEGER."""
+        digest: bytes = hashlib.blake2b(repr(rows).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, byteorder='big', signed=True)
+
+    CONTENT_HASH_SELECT: str = 'SELECT \"uid\", \"content_hash\" FROM \"{{0}}\" WHERE \"uid\" IN {0};'.format(
+        MyConnection.getValuesTable(':uids')
+    )  # Хеши содержимого инструментов таблицы {0} (одной из CONTENT_HASH_TABLES).
+
+    @classmethod
+    def __getChangedUids(cls, db: QSqlDatabase, table_name: str, content_hashes: dict[str, int]) -> set[str]:
+        """Возвращает uid инструментов, хеш содержимого которых отличается от хранящегося в таблице или отсутствует."""
+        changed_uids: set[str] = set(content_hashes)
+        hash_query: QSqlQuery = cls.getPreparedQuery(db, cls.CONTENT_HASH_SELECT.format(table_name))
+        hash_query.bindValue(':uids', MyConnection.convertValuesToJson(content_hashes))
+        hash_exec_flag: bool = hash_query.exec()
+        assert hash_exec_flag, hash_query.lastError().text()
+        while hash_query.next():
+            uid: str = hash_query.value('uid')
+            if hash_query.value('content_hash') == content_hashes[uid]:
+                changed_uids.discard(uid)
+        hash_query.finish()
+        return changed_uids
+
+    INSTRUMENTS_STATUS_SELECT: str = '''SELECT \"{0}\".\"uid\" FROM \"{0}\", \"{1}\" WHERE \"{0}\".\"token\" = :token AND 
+    \"{0}\".\"status\" = :status AND \"{0}\".\"uid\" = \"{1}\".\"uid\" AND \"{1}\".\"instrument_type\" = :instrument_type;'''.format(
+        MyConnection.INSTRUMENT_STATUS_TABLE,
+        MyConnection.INSTRUMENT_UIDS_TABLE
+    )  # Инструменты типа :instrument_type, соответствующие токену и статусу.
+
+    @staticmethod
+    def getInstrumentsStatusDeleteCommand(uids_count: int) -> str:
+        """Возвращает запрос удаления строк токена и статуса (первые два позиционных параметра) с uids_count позиционными параметрами uid."""
+        return 'DELETE FROM \"{0}\" WHERE \"token\" = ? AND \"status\" = ? AND \"uid\" IN ({1});'.format(
+            MyConnection.INSTRUMENT_STATUS_TABLE,
+            ', '.join('?' * uids_count)
+        )
+
+    @classmethod
+    def __updateInstrumentsStatus(cls, db: QSqlDatabase, token: str, instrument_status: InstrumentStatus, instrument_type: str, uids: list[str]):
+        """Приводит список инструментов типа instrument_type, соответствующих токену и статусу, к переданному списку uid.
+        Удаляются и добавляются только изменившиеся строки таблицы запросов инструментов."""
+        '''---------------Получаем текущий список инструментов---------------'''
+        current_uids_query: QSqlQuery = cls.getPreparedQuery(db, cls.INSTRUMENTS_STATUS_SELECT)
+        current_uids_query.bindValue(':token', token)
+        current_uids_query.bindValue(':status', instrument_status.name)
+        current_uids_query.bindValue(':instrument_type', instrument_type)
+        current_uids_exec_flag: bool = current_uids_query.exec()
+        assert current_uids_exec_flag, current_uids_query.lastError().text()
+        current_uids: set[str] = set()
+        while current_uids_query.next():
+            current_uids.add(current_uids_query.value('uid'))
+        current_uids_query.finish()
+        '''------------------------------------------------------------------'''
+
+        '''-----------Удаляем инструменты, которых больше нет в списке-----------'''
+        removed_uids: list[str] = list(current_uids.difference(uids))
+        for uids_chunk in partition(removed_uids, cls.VARIABLE_LIMIT - 2):
+            delete_query = QSqlQuery(db)
+            delete_prepare_flag: bool = delete_query.prepare(cls.getInstrumentsStatusDeleteCommand(len(uids_chunk)))
+            assert delete_prepare_flag, delete_query.lastError().text()
+            delete_query.bindValue(0, token)
+            delete_query.bindValue(1, instrument_status.name)
+            for i, uid in enumerate(uids_chunk, start=2):
+                delete_query.bindValue(i, uid)
+            delete_exec_flag: bool = delete_query.exec()
+            assert delete_exec_flag, delete_query.lastError().text()
+        '''----------------------------------------------------------------------'''
+
+        '''--------------------Добавляем новые инструменты--------------------'''
+        added_rows: list[tuple] = [(token, instrument_status.name, uid) for uid in dict.fromkeys(uids) if uid not in current_uids]
+        cls.bulkInsert(db, MyConnection.INSTRUMENT_STATUS_TABLE, ('token', 'status', 'uid'), added_rows)
+        '''-------------------------------------------------------------------'''
+    '''-------------------------------------------------------------------------'''
+
     @classmethod
     def addBonds(cls, token: str, instrument_status: InstrumentStatus, bonds: list[Bond]):
-        """Добавляет облигации в таблицу облигаций."""
+        """Добавляет облигации в таблицу облигаций.
+        Записываются только облигации, хеш содержимого которых изменился."""
         if bonds:  # Если список облигаций не пуст.
             db: QSqlDatabase = cls.getDatabase()
             if db.transaction():
-                VARIABLES_COUNT: int = 51  # Количество variables в каждом insert.
-                bonds_in_pack: int = int(cls.VARIABLE_LIMIT / VARIABLES_COUNT)
-                assert bonds_in_pack > 0
-
-                bonds_insert_sql_command_begin: str = '''INSERT INTO \"{0}\"(
-                \"figi\", \"ticker\", \"class_code\", \"isin\", \"lot\", \"currency\", \"klong\", \"kshort\", \"dlong\", 
-                \"dshort\", \"dlong_min\", \"dshort_min\", \"short_enabled_flag\", \"name\", \"exchange\", 
-                \"coupon_quantity_per_year\", \"maturity_date\", \"nominal\", \"initial_nominal\", \"state_reg_date\", 
-                \"placement_date\", \"placement_price\", \"aci_value\", \"country_of_risk\", \"country_of_risk_name\", 
-                \"sector\", \"issue_kind\", \"issue_size\", \"issue_size_plan\", \"trading_status\", \"otc_flag\", 
-                \"buy_available_flag\", \"sell_available_flag\", \"floating_coupon_flag\", \"perpetual_flag\", 
-                \"amortization_flag\", \"min_price_increment\", \"api_trade_available_flag\", \"uid\", 
-                \"real_exchange\", \"position_uid\", \"asset_uid\", \"for_iis_flag\", \"for_qual_investor_flag\", 
-                \"weekend_flag\", \"blocked_tca_flag\", \"subordinated_flag\", \"liquidity_flag\", 
-                \"first_1min_candle_date\", \"first_1day_candle_date\", \"risk_level\") VALUES '''.format(
-                    MyConnection.BONDS_TABLE
-                )
-
-                bonds_insert_sql_command_middle: str = '''(:figi{0}, :ticker{0}, :class_code{0}, :isin{0}, :lot{0}, 
-                :currency{0}, :klong{0}, :kshort{0}, :dlong{0}, :dshort{0}, :dlong_min{0}, :dshort_min{0}, 
-                :short_enabled_flag{0}, :name{0}, :exchange{0}, :coupon_quantity_per_year{0}, :maturity_date{0}, 
-                :nominal{0}, :initial_nominal{0}, :state_reg_date{0}, :placement_date{0}, :placement_price{0}, 
-                :aci_value{0}, :country_of_risk{0}, :country_of_risk_name{0}, :sector{0}, :issue_kind{0}, 
-                :issue_size{0}, :issue_size_plan{0}, :trading_status{0}, :otc_flag{0}, :buy_available_flag{0}, 
-                :sell_available_flag{0}, :floating_coupon_flag{0}, :perpetual_flag{0}, :amortization_flag{0}, 
-                :min_price_increment{0}, :api_trade_available_flag{0}, :uid{0}, :real_exchange{0}, :position_uid{0}, 
-                :asset_uid{0}, :for_iis_flag{0}, :for_qual_investor_flag{0}, :weekend_flag{0}, :blocked_tca_flag{0}, 
-                :subordinated_flag{0}, :liquidity_flag{0}, :first_1min_candle_date{0}, :first_1day_candle_date{0}, 
-                :risk_level{0})'''
+                bonds_columns: tuple[str, ...] = ('figi', 'ticker', 'class_code', 'isin', 'lot', 'currency', 'klong',
+                    'kshort', 'dlong', 'dshort', 'dlong_min', 'dshort_min', 'short_enabled_flag', 'name', 'exchange',
+                    'coupon_quantity_per_year', 'maturity_date', 'nominal', 'initial_nominal', 'state_reg_date',
+                    'placement_date', 'placement_price', 'aci_value', 'country_of_risk', 'country_of_risk_name', 'sector',
+                    'issue_kind', 'issue_size', 'issue_size_plan', 'trading_status', 'otc_flag', 'buy_available_flag',
+                    'sell_available_flag', 'floating_coupon_flag', 'perpetual_flag', 'amortization_flag',
+                    'min_price_increment', 'api_trade_available_flag', 'uid', 'real_exchange', 'position_uid', 'asset_uid',
+                    'for_iis_flag', 'for_qual_investor_flag', 'weekend_flag', 'blocked_tca_flag', 'subordinated_flag',
+                    'liquidity_flag', 'first_1min_candle_date', 'first_1day_candle_date', 'risk_level', 'nominal_currency',
+                    'initial_nominal_currency', 'placement_price_currency', 'aci_value_currency', 'content_hash')
 
                 bonds_insert_sql_command_end: str = ''' ON CONFLICT(\"uid\") DO UPDATE SET \"figi\" = {0}.\"figi\", 
                 \"ticker\" = {0}.\"ticker\", \"class_code\" = {0}.\"class_code\", \"isin\" = {0}.\"isin\", \"lot\" = 
@@ -905,160 +1326,62 @@ class MainConnection(MyConnection):
                 \"weekend_flag\" = {0}.\"weekend_flag\", \"blocked_tca_flag\" = {0}.\"blocked_tca_flag\", 
                 \"subordinated_flag\" = {0}.\"subordinated_flag\", \"liquidity_flag\" = {0}.\"liquidity_flag\", 
                 \"first_1min_candle_date\" = {0}.\"first_1min_candle_date\", \"first_1day_candle_date\" = 
-                {0}.\"first_1day_candle_date\", \"risk_level\" = {0}.\"risk_level\" WHERE \"figi\" != {0}.\"figi\" OR 
-                \"ticker\" != {0}.\"ticker\" OR \"class_code\" != {0}.\"class_code\" OR \"isin\" != {0}.\"isin\" OR 
-                \"lot\" != {0}.\"lot\" OR \"currency\" != {0}.\"currency\" OR \"klong\" != {0}.\"klong\" OR 
-                \"kshort\" != {0}.\"kshort\" OR \"dlong\" != {0}.\"dlong\" OR \"dshort\" != {0}.\"dshort\" OR 
-                \"dlong_min\" != {0}.\"dlong_min\" OR \"dshort_min\" != {0}.\"dshort_min\" OR \"short_enabled_flag\" != 
-                {0}.\"short_enabled_flag\" OR \"name\" != {0}.\"name\" OR \"exchange\" != {0}.\"exchange\" OR 
-                \"coupon_quantity_per_year\" != {0}.\"coupon_quantity_per_year\" OR \"maturity_date\" != 
-                {0}.\"maturity_date\" OR \"nominal\" != {0}.\"nominal\" OR \"initial_nominal\" != 
-                {0}.\"initial_nominal\" OR \"state_reg_date\" != {0}.\"state_reg_date\" OR \"placement_date\" != 
-                {0}.\"placement_date\" OR \"placement_price\" != {0}.\"placement_price\" OR \"aci_value\" != 
-                {0}.\"aci_value\" OR \"country_of_risk\" != {0}.\"country_of_risk\" OR \"country_of_risk_name\" != 
-                {0}.\"country_of_risk_name\" OR \"sector\" != {0}.\"sector\" OR \"issue_kind\" != {0}.\"issue_kind\" OR 
-                \"issue_size\" != {0}.\"issue_size\" OR \"issue_size_plan\" != {0}.\"issue_size_plan\" OR 
-                \"trading_status\" != {0}.\"trading_status\" OR \"otc_flag\" != {0}.\"otc_flag\" OR 
-                \"buy_available_flag\" != {0}.\"buy_available_flag\" OR \"sell_available_flag\" != 
-                {0}.\"sell_available_flag\" OR \"floating_coupon_flag\" != {0}.\"floating_coupon_flag\" OR 
-                \"perpetual_flag\" != {0}.\"perpetual_flag\" OR \"amortization_flag\" != {0}.\"amortization_flag\" OR 
-                \"min_price_increment\" != {0}.\"min_price_increment\" OR \"api_trade_available_flag\" != 
-                {0}.\"api_trade_available_flag\" OR \"real_exchange\" != {0}.\"real_exchange\" OR \"position_uid\" != 
-                {0}.\"position_uid\" OR \"asset_uid\" != {0}.\"asset_uid\" OR \"for_iis_flag\" != {0}.\"for_iis_flag\" 
-                OR \"for_qual_investor_flag\" != {0}.\"for_qual_investor_flag\" OR \"weekend_flag\" != 
-                {0}.\"weekend_flag\" OR \"blocked_tca_flag\" != {0}.\"blocked_tca_flag\" OR \"subordinated_flag\" != 
-                {0}.\"subordinated_flag\" OR \"liquidity_flag\" != {0}.\"liquidity_flag\" OR \"first_1min_candle_date\" 
-                != {0}.\"first_1min_candle_date\" OR \"first_1day_candle_date\" != {0}.\"first_1day_candle_date\" OR 
-                \"risk_level\" != {0}.\"risk_level\";'''.format('\"excluded\"')
-
-                bonds_packs: list[list[Bond]] = partition(bonds, bonds_in_pack)
-                for pack in bonds_packs:
-                    '''-----------Создание sql-запроса для текущей части вставляемых облигаций-----------'''
-                    bonds_insert_sql_command: str = bonds_insert_sql_command_begin
-                    for i in range(len(pack)):
-                        if i > 0: bonds_insert_sql_command += ', '  # Если добавляемая облигация не первая.
-                        bonds_insert_sql_command += bonds_insert_sql_command_middle.format(i)
-                    bonds_insert_sql_command += bonds_insert_sql_command_end
-                    '''----------------------------------------------------------------------------------'''
-
-                    query = QSqlQuery(db)
-                    bonds_insert_prepare_flag: bool = query.prepare(bonds_insert_sql_command)
-                    assert bonds_insert_prepare_flag, query.lastError().text()
-
-                    for i, bond in enumerate(pack):
-                        query.bindValue(':figi{0}'.format(i), bond.figi)
-                        query.bindValue(':ticker{0}'.format(i), bond.ticker)
-                        query.bindValue(':class_code{0}'.format(i), bond.class_code)
-                        query.bindValue(':isin{0}'.format(i), bond.isin)
-                        query.bindValue(':lot{0}'.format(i), bond.lot)
-                        query.bindValue(':currency{0}'.format(i), bond.currency)
-                        query.bindValue(':klong{0}'.format(i), MyQuotation.__repr__(bond.klong))
-                        query.bindValue(':kshort{0}'.format(i), MyQuotation.__repr__(bond.kshort))
-                        query.bindValue(':dlong{0}'.format(i), MyQuotation.__repr__(bond.dlong))
-                        query.bindValue(':dshort{0}'.format(i), MyQuotation.__repr__(bond.dshort))
-                        query.bindValue(':dlong_min{0}'.format(i), MyQuotation.__repr__(bond.dlong_min))
-                        query.bindValue(':dshort_min{0}'.format(i), MyQuotation.__repr__(bond.dshort_min))
-                        query.bindValue(':short_enabled_flag{0}'.format(i), bond.short_enabled_flag)
-                        query.bindValue(':name{0}'.format(i), bond.name)
-                        query.bindValue(':exchange{0}'.format(i), bond.exchange)
-                        query.bindValue(':coupon_quantity_per_year{0}'.format(i), bond.coupon_quantity_per_year)
-                        query.bindValue(':maturity_date{0}'.format(i), MyConnection.convertDateTimeToText(bond.maturity_date))
-                        query.bindValue(':nominal{0}'.format(i), MyMoneyValue.__repr__(bond.nominal))
-                        query.bindValue(':initial_nominal{0}'.format(i), MyMoneyValue.__repr__(bond.initial_nominal))
-                        query.bindValue(':state_reg_date{0}'.format(i), MyConnection.convertDateTimeToText(bond.state_reg_date))
-                        query.bindValue(':placement_date{0}'.format(i), MyConnection.convertDateTimeToText(bond.placement_date))
-                        query.bindValue(':placement_price{0}'.format(i), MyMoneyValue.__repr__(bond.placement_price))
-                        query.bindValue(':aci_value{0}'.format(i), MyMoneyValue.__repr__(bond.aci_value))
-                        query.bindValue(':country_of_risk{0}'.format(i), bond.country_of_risk)
-                        query.bindValue(':country_of_risk_name{0}'.format(i), bond.country_of_risk_name)
-                        query.bindValue(':sector{0}'.format(i), bond.sector)
-                        query.bindValue(':issue_kind{0}'.format(i), bond.issue_kind)
-                        query.bindValue(':issue_size{0}'.format(i), bond.issue_size)
-                        query.bindValue(':issue_size_plan{0}'.format(i), bond.issue_size_plan)
-                        query.bindValue(':trading_status{0}'.format(i), bond.trading_status.name)
-                        query.bindValue(':otc_flag{0}'.format(i), bond.otc_flag)
-                        query.bindValue(':buy_available_flag{0}'.format(i), bond.buy_available_flag)
-                        query.bindValue(':sell_available_flag{0}'.format(i), bond.sell_available_flag)
-                        query.bindValue(':floating_coupon_flag{0}'.format(i), bond.floating_coupon_flag)
-                        query.bindValue(':perpetual_flag{0}'.format(i), bond.perpetual_flag)
-                        query.bindValue(':amortization_flag{0}'.format(i), bond.amortization_flag)
-                        query.bindValue(':min_price_increment{0}'.format(i), MyQuotation.__repr__(bond.min_price_increment))
-                        query.bindValue(':api_trade_available_flag{0}'.format(i), bond.api_trade_available_flag)
-                        query.bindValue(':uid{0}'.format(i), bond.uid)
-                        query.bindValue(':real_exchange{0}'.format(i), bond.real_exchange.name)
-                        query.bindValue(':position_uid{0}'.format(i), bond.position_uid)
-                        query.bindValue(':asset_uid{0}'.format(i), bond.asset_uid)
-                        query.bindValue(':for_iis_flag{0}'.format(i), bond.for_iis_flag)
-                        query.bindValue(':for_qual_investor_flag{0}'.format(i), bond.for_qual_investor_flag)
-                        query.bindValue(':weekend_flag{0}'.format(i), bond.weekend_flag)
-                        query.bindValue(':blocked_tca_flag{0}'.format(i), bond.blocked_tca_flag)
-                        query.bindValue(':subordinated_flag{0}'.format(i), bond.subordinated_flag)
-                        query.bindValue(':liquidity_flag{0}'.format(i), bond.liquidity_flag)
-                        query.bindValue(':first_1min_candle_date{0}'.format(i), MyConnection.convertDateTimeToText(bond.first_1min_candle_date))
-                        query.bindValue(':first_1day_candle_date{0}'.format(i), MyConnection.convertDateTimeToText(bond.first_1day_candle_date))
-                        query.bindValue(':risk_level{0}'.format(i), bond.risk_level.name)
-
-                    bonds_insert_exec_flag: bool = query.exec()
-                    assert bonds_insert_exec_flag, query.lastError().text()
+                {0}.\"first_1day_candle_date\", \"risk_level\" = {0}.\"risk_level\", \"nominal_currency\" = 
+                {0}.\"nominal_currency\", \"initial_nominal_currency\" = {0}.\"initial_nominal_currency\", 
+                \"placement_price_currency\" = {0}.\"placement_price_currency\", \"aci_value_currency\" = 
+                {0}.\"aci_value_currency\", \"content_hash\" = {0}.\"content_hash\" WHERE 
+                \"content_hash\" IS NOT {0}.\"content_hash\"'''.format('\"excluded\"')
+
+                bonds_rows: dict[str, tuple] = {bond.uid: (
+                    bond.figi, bond.ticker, bond.class_code, bond.isin, bond.lot, bond.currency,
+                    MyConnection.convertQuotationToInteger(bond.klong),
+                    MyConnection.convertQuotationToInteger(bond.kshort),
+                    MyConnection.convertQuotationToInteger(bond.dlong),
+                    MyConnection.convertQuotationToInteger(bond.dshort),
+                    MyConnection.convertQuotationToInteger(bond.dlong_min),
+                    MyConnection.convertQuotationToInteger(bond.dshort_min),
+                    bond.short_enabled_flag, bond.name, bond.exchange, bond.coupon_quantity_per_year,
+                    MyConnection.convertDateTimeToText(bond.maturity_date),
+                    MyConnection.convertQuotationToInteger(bond.nominal),
+                    MyConnection.convertQuotationToInteger(bond.initial_nominal),
+                    MyConnection.convertDateTimeToText(bond.state_reg_date),
+                    MyConnection.convertDateTimeToText(bond.placement_date),
+                    MyConnection.convertQuotationToInteger(bond.placement_price),
+                    MyConnection.convertQuotationToInteger(bond.aci_value),
+                    bond.country_of_risk, bond.country_of_risk_name, bond.sector, bond.issue_kind, bond.issue_size,
+                    bond.issue_size_plan, bond.trading_status.name, bond.otc_flag, bond.buy_available_flag,
+                    bond.sell_available_flag, bond.floating_coupon_flag, bond.perpetual_flag, bond.amortization_flag,
+                    MyConnection.convertQuotationToInteger(bond.min_price_increment),
+                    bond.api_trade_available_flag, bond.uid, bond.real_exchange.name, bond.position_uid,
+                    bond.asset_uid, bond.for_iis_flag, bond.for_qual_investor_flag, bond.weekend_flag,
+                    bond.blocked_tca_flag, bond.subordinated_flag, bond.liquidity_flag,
+                    MyConnection.convertDateTimeToText(bond.first_1min_candle_date),
+                    MyConnection.convertDateTimeToText(bond.first_1day_candle_date),
+                    bond.risk_level.name, bond.nominal.currency, bond.initial_nominal.currency,
+                    bond.placement_price.currency, bond.aci_value.currency
+                ) for bond in bonds}
+                brands_rows: dict[str, tuple] = {bond.uid: (bond.uid, bond.brand.logo_name, bond.brand.logo_base_color, bond.brand.text_color) for bond in bonds}
+
+                '''-------------Отбираем облигации, содержимое которых изменилось-------------'''
+                content_hashes: dict[str, int] = {uid: cls.__getContentHash(row, brands_rows[uid]) for uid, row in bonds_rows.items()}
+                changed_uids: set[str] = cls.__getChangedUids(db, MyConnection.BONDS_TABLE, content_hashes)
+                '''---------------------------------------------------------------------------'''
+
+                changed_bonds_rows: list[tuple] = [row + (content_hashes[uid],) for uid, row in bonds_rows.items() if uid in changed_uids]
+                cls.bulkInsert(db, MyConnection.BONDS_TABLE, bonds_columns, changed_bonds_rows, bonds_insert_sql_command_end)
 
                 """===============Добавляем данные о бренде в таблицу данных о брендах==============="""
-                brand_data_command: str = '''INSERT INTO {0} (\"instrument_uid\", \"logo_name\", \"logo_base_color\", 
-                \"text_color\") VALUES (:uid, :logo_name, :logo_base_color, :text_color) ON CONFLICT(\"instrument_uid\") 
-                DO UPDATE SET \"logo_name\" = {1}.\"logo_name\", \"logo_base_color\" = {1}.\"logo_base_color\", 
-                \"text_color\" = {1}.\"text_color\" WHERE \"logo_name\" != {1}.\"logo_name\" OR \"logo_base_color\" != 
-                {1}.\"logo_base_color\" OR \"text_color\" != {1}.\"text_color\";'''.format(
-                    '\"{0}\"'.format(MyConnection.BRANDS_DATA_TABLE),
-                    '\"excluded\"'
-                )
+                brand_data_conflict_clause: str = ''' ON CONFLICT(\"instrument_uid\") DO UPDATE SET \"logo_name\" = 
+                {0}.\"logo_name\", \"logo_base_color\" = {0}.\"logo_base_color\", \"text_color\" = {0}.\"text_color\" WHERE 
+                \"logo_name\" != {0}.\"logo_name\" OR \"logo_base_color\" != {0}.\"logo_base_color\" OR \"text_color\" != 
+                {0}.\"text_color\"'''.format('\"excluded\"')
 
-                for bond in bonds:
-                    brand_data_query = QSqlQuery(db)
-                    brand_data_prepare_flag: bool = brand_data_query.prepare(brand_data_command)
-                    assert brand_data_prepare_flag, brand_data_query.lastError().text()
-                    brand_data_query.bindValue(':uid', bond.uid)
-                    brand_data_query.bindValue(':logo_name', bond.brand.logo_name)
-                    brand_data_query.bindValue(':logo_base_color', bond.brand.logo_base_color)
-                    brand_data_query.bindValue(':text_color', bond.brand.text_color)
-                    brand_data_exec_flag: bool = brand_data_query.exec()
-                    assert brand_data_exec_flag, brand_data_query.lastError().text()
+                changed_brands_rows: list[tuple] = [row for uid, row in brands_rows.items() if uid in changed_uids]
+                cls.bulkInsert(db, MyConnection.BRANDS_DATA_TABLE, ('instrument_uid', 'logo_name', 'logo_base_color', 'text_color'), changed_brands_rows, brand_data_conflict_clause)
                 """=================================================================================="""
 
                 """===============Добавляем облигации в таблицу запросов инструментов==============="""
-                '''--------------Удаляем облигации из таблицы запросов инструментов--------------'''
-                bonds_uids_select: str = 'SELECT \"uid\" FROM \"{0}\" WHERE \"{0}\".\"instrument_type\" = \'{1}\''.format(
-                    MyConnection.INSTRUMENT_UIDS_TABLE,
-                    'bond'
-                )
-
-                instruments_status_delete_sql_command: str = '''DELETE FROM \"{0}\" WHERE \"token\" = :token AND 
-                \"status\" = :status AND \"uid\" in ({1});'''.format(
-                    MyConnection.INSTRUMENT_STATUS_TABLE,
-                    bonds_uids_select
-                )
-
-                instruments_status_delete_query = QSqlQuery(db)
-                instruments_status_delete_prepare_flag: bool = instruments_status_delete_query.prepare(instruments_status_delete_sql_command)
-                assert instruments_status_delete_prepare_flag, instruments_status_delete_query.lastError().text()
-                instruments_status_delete_query.bindValue(':token', token)
-                instruments_status_delete_query.bindValue(':status', instrument_status.name)
-                instruments_status_delete_exec_flag: bool = instruments_status_delete_query.exec()
-                assert instruments_status_delete_exec_flag, instruments_status_delete_query.lastError().text()
-                '''------------------------------------------------------------------------------'''
-
-                '''-------------Добавляем облигации в таблицу запросов инструментов-------------'''
-                instruments_status_insert_sql_command: str = '''INSERT INTO \"{0}\" (\"token\", \"status\", \"uid\") 
-                VALUES (:token, :status, :uid);'''.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-
-                for bond in bonds:
-                    instruments_status_insert_query = QSqlQuery(db)
-                    instruments_status_insert_prepare_flag: bool = instruments_status_insert_query.prepare(instruments_status_insert_sql_command)
-                    assert instruments_status_insert_prepare_flag, instruments_status_insert_query.lastError().text()
-                    instruments_status_insert_query.bindValue(':token', token)
-                    instruments_status_insert_query.bindValue(':status', instrument_status.name)
-                    instruments_status_insert_query.bindValue(':uid', bond.uid)
-                    instruments_status_insert_exec_flag: bool = instruments_status_insert_query.exec()
-                    assert instruments_status_insert_exec_flag, instruments_status_insert_query.lastError().text()
-                '''-----------------------------------------------------------------------------'''
+                cls.__updateInstrumentsStatus(db, token, instrument_status, 'bond', [bond.uid for bond in bonds])
                 """================================================================================="""
 
                 commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
@@ -1066,6 +1389,13 @@ class MainConnection(MyConnection):
             else:
                 raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    DIVIDENDS_SELECT: str = '''SELECT \"dividend_net\", \"payment_date\", \"declared_date\", \"last_buy_date\", 
+    \"dividend_type\", \"record_date\", \"regularity\", \"close_price\", \"yield_value\", \"created_at\" FROM \"{0}\" 
+    WHERE \"instrument_uid\" = :share_uid;'''.format(MyConnection.DIVIDENDS_TABLE)  # Дивиденды акции.
+    COUPONS_SELECT: str = '''SELECT \"figi\", \"coupon_date\", \"coupon_number\", \"fix_date\", \"pay_one_bond\", 
+    \"pay_one_bond_currency\", \"coupon_type\", \"coupon_start_date\", \"coupon_end_date\", \"coupon_period\" FROM \"{0}\" 
+    WHERE \"instrument_uid\" = :bond_uid;'''.format(MyConnection.COUPONS_TABLE)  # Купоны облигации.
+
     @classmethod
     def getMyInstrument(cls, uid: str) -> MyShareClass | MyBondClass | None:
         type_sql_command: str = 'SELECT \"instrument_type\" FROM \"{0}\" WHERE \"uid\" = :uid;'.format(MyConnection.INSTRUMENT_UIDS_TABLE)
@@ -1102,8 +1432,8 @@ class MainConnection(MyConnection):
                     {0}.\"min_price_increment\", {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", 
                     {0}.\"position_uid\", {0}.\"asset_uid\", {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\",
                     {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", {0}.\"liquidity_flag\", 
-                    {0}.\"first_1min_candle_date\", {0}.\"first_1day_candle_date\", {0}.\"dividends\" 
-                    FROM {0} WHERE {0}.\"uid\" = :uid;'''.format('\"{0}\"'.format(MyConnection.SHARES_TABLE))
+                    {0}.\"first_1min_candle_date\", {0}.\"first_1day_candle_date\", {0}.\"nominal_currency\", 
+                    {0}.\"dividends\" FROM {0} WHERE {0}.\"uid\" = :uid;'''.format('\"{0}\"'.format(MyConnection.SHARES_TABLE))
 
                     share_query = QtSql.QSqlQuery(db)
                     share_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
@@ -1127,14 +1457,9 @@ class MainConnection(MyConnection):
 
                     '''--------------------------Получаем дивиденды акций--------------------------'''
                     if dividends_flag:
-                        dividends_sql_command: str = '''SELECT \"dividend_net\", \"payment_date\", \"declared_date\", 
-                        \"last_buy_date\", \"dividend_type\", \"record_date\", \"regularity\", \"close_price\", 
-                        \"yield_value\", \"created_at\" FROM \"{0}\" WHERE \"instrument_uid\" = :share_uid;
-                        '''.format(MyConnection.DIVIDENDS_TABLE)
-
                         dividends_query = QtSql.QSqlQuery(db)
                         dividends_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                        dividends_prepare_flag: bool = dividends_query.prepare(dividends_sql_command)
+                        dividends_prepare_flag: bool = dividends_query.prepare(cls.DIVIDENDS_SELECT)
                         assert dividends_prepare_flag, dividends_query.lastError().text()
                         dividends_query.bindValue(':share_uid', uid)
                         dividends_exec_flag: bool = dividends_query.exec()
@@ -1165,7 +1490,8 @@ class MainConnection(MyConnection):
                     \"min_price_increment\", \"api_trade_available_flag\", \"uid\", \"real_exchange\", \"position_uid\",
                     \"asset_uid\", \"for_iis_flag\", \"for_qual_investor_flag\", \"weekend_flag\", \"blocked_tca_flag\",
                     \"subordinated_flag\", \"liquidity_flag\", \"first_1min_candle_date\", \"first_1day_candle_date\",
-                    \"risk_level\", \"coupons\" FROM \"{0}\" WHERE \"uid\" = :uid;'''.format(MyConnection.BONDS_TABLE)
+                    \"risk_level\", \"nominal_currency\", \"initial_nominal_currency\", \"placement_price_currency\",
+                    \"aci_value_currency\", \"coupons\" FROM \"{0}\" WHERE \"uid\" = :uid;'''.format(MyConnection.BONDS_TABLE)
 
                     bond_query = QtSql.QSqlQuery(db)
                     bond_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
@@ -1190,14 +1516,9 @@ class MainConnection(MyConnection):
 
                     '''--------------------------Получаем купоны облигации--------------------------'''
                     if coupons_flag:
-                        coupons_sql_command: str = '''SELECT \"figi\", \"coupon_date\", \"coupon_number\", \"fix_date\",
-                        \"pay_one_bond\", \"coupon_type\", \"coupon_start_date\", \"coupon_end_date\", \"coupon_period\"
-                        FROM {0} WHERE \"instrument_uid\" = :bond_uid;
-                        '''.format(MyConnection.COUPONS_TABLE)
-
                         coupons_query = QtSql.QSqlQuery(db)
                         coupons_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                        coupons_prepare_flag: bool = coupons_query.prepare(coupons_sql_command)
+                        coupons_prepare_flag: bool = coupons_query.prepare(cls.COUPONS_SELECT)
                         assert coupons_prepare_flag, coupons_query.lastError().text()
                         coupons_query.bindValue(':bond_uid', uid)
                         coupons_exec_flag: bool = coupons_query.exec()
@@ -1229,150 +1550,84 @@ class MainConnection(MyConnection):
 
     @classmethod
     def addShares(cls, token: str, instrument_status: InstrumentStatus, shares: list[Share]):
-        """Добавляет акции в таблицу акций."""
+        """Добавляет акции в таблицу акций.
+        Записываются только акции, хеш содержимого которых изменился."""
         if shares:  # Если список акций не пуст.
-            sql_command: str = '''INSERT INTO \"{0}\" (\"figi\", \"ticker\", \"class_code\", \"isin\", \"lot\", 
-            \"currency\", \"klong\", \"kshort\", \"dlong\", \"dshort\", \"dlong_min\", \"dshort_min\", 
-            \"short_enabled_flag\", \"name\", \"exchange\", \"ipo_date\", \"issue_size\", \"country_of_risk\", 
-            \"country_of_risk_name\", \"sector\", \"issue_size_plan\", \"nominal\", \"trading_status\", \"otc_flag\", 
-            \"buy_available_flag\", \"sell_available_flag\", \"div_yield_flag\", \"share_type\", 
-            \"min_price_increment\", \"api_trade_available_flag\", \"uid\", \"real_exchange\", \"position_uid\", 
-            \"asset_uid\", \"for_iis_flag\", \"for_qual_investor_flag\", \"weekend_flag\", \"blocked_tca_flag\", 
-            \"liquidity_flag\", \"first_1min_candle_date\", \"first_1day_candle_date\") VALUES (:figi, :ticker, 
-            :class_code, :isin, :lot, :currency, :klong, :kshort, :dlong, :dshort, :dlong_min, :dshort_min, 
-            :short_enabled_flag, :name, :exchange, :ipo_date, :issue_size, :country_of_risk, :country_of_risk_name, 
-            :sector, :issue_size_plan, :nominal, :trading_status, :otc_flag, :buy_available_flag, :sell_available_flag, 
-            :div_yield_flag, :share_type, :min_price_increment, :api_trade_available_flag, :uid, :real_exchange, 
-            :position_uid, :asset_uid, :for_iis_flag, :for_qual_investor_flag, :weekend_flag, :blocked_tca_flag, 
-            :liquidity_flag, :first_1min_candle_date, :first_1day_candle_date) ON CONFLICT(\"uid\") DO UPDATE SET 
-            \"figi\" = {1}.\"figi\", \"ticker\" = {1}.\"ticker\", \"class_code\" = {1}.\"class_code\", \"isin\" = 
-            {1}.\"isin\", \"lot\" = {1}.\"lot\", \"currency\" = {1}.\"currency\", \"klong\" = {1}.\"klong\", \"kshort\" 
-            = {1}.\"kshort\", \"dlong\" = {1}.\"dlong\", \"dshort\" = {1}.\"dshort\", \"dlong_min\" = {1}.\"dlong_min\", 
-            \"dshort_min\" = {1}.\"dshort_min\", \"short_enabled_flag\" = {1}.\"short_enabled_flag\", \"name\" = 
-            {1}.\"name\", \"exchange\" = {1}.\"exchange\", \"exchange\" = {1}.\"exchange\", \"ipo_date\" = 
-            {1}.\"ipo_date\", \"issue_size\" = {1}.\"issue_size\", \"country_of_risk\" = {1}.\"country_of_risk\", 
-            \"country_of_risk_name\" = {1}.\"country_of_risk_name\", \"sector\" = {1}.\"sector\", \"issue_size_plan\" = 
-            {1}.\"issue_size_plan\", \"nominal\" = {1}.\"nominal\", \"trading_status\" = {1}.\"trading_status\", 
-            \"otc_flag\" = {1}.\"otc_flag\", \"buy_available_flag\" = {1}.\"buy_available_flag\", 
-            \"sell_available_flag\" = {1}.\"sell_available_flag\", \"div_yield_flag\" = {1}.\"div_yield_flag\", 
-            \"share_type\" = {1}.\"share_type\", \"min_price_increment\" = {1}.\"min_price_increment\", 
-            \"api_trade_available_flag\" = {1}.\"api_trade_available_flag\", \"real_exchange\" = {1}.\"real_exchange\", 
-            \"position_uid\" = {1}.\"position_uid\", \"asset_uid\" = {1}.\"asset_uid\", \"for_iis_flag\" = 
-            {1}.\"for_iis_flag\", \"for_qual_investor_flag\" = {1}.\"for_qual_investor_flag\", \"weekend_flag\" = 
-            {1}.\"weekend_flag\", \"blocked_tca_flag\" = {1}.\"blocked_tca_flag\", \"liquidity_flag\" = 
-            {1}.\"liquidity_flag\", \"first_1min_candle_date\" = {1}.\"first_1min_candle_date\", 
-            \"first_1day_candle_date\" = {1}.\"first_1day_candle_date\";'''.format(
-                MyConnection.SHARES_TABLE,
-                '\"excluded\"'
-            )
-
-            brand_data_command: str = '''INSERT INTO {0} (\"instrument_uid\", \"logo_name\", \"logo_base_color\", 
-            \"text_color\") VALUES (:uid, :logo_name, :logo_base_color, :text_color) ON CONFLICT(\"instrument_uid\") 
-            DO UPDATE SET \"logo_name\" = {1}.\"logo_name\", \"logo_base_color\" = {1}.\"logo_base_color\", 
-            \"text_color\" = {1}.\"text_color\" WHERE \"logo_name\" != {1}.\"logo_name\" OR \"logo_base_color\" != 
-            {1}.\"logo_base_color\" OR \"text_color\" != {1}.\"text_color\";'''.format(
-                '\"{0}\"'.format(MyConnection.BRANDS_DATA_TABLE),
-                '\"excluded\"'
-            )
+            shares_columns: tuple[str, ...] = ('figi', 'ticker', 'class_code', 'isin', 'lot', 'currency', 'klong',
+                'kshort', 'dlong', 'dshort', 'dlong_min', 'dshort_min', 'short_enabled_flag', 'name', 'exchange',
+                'ipo_date', 'issue_size', 'country_of_risk', 'country_of_risk_name', 'sector', 'issue_size_plan',
+                'nominal', 'trading_status', 'otc_flag', 'buy_available_flag', 'sell_available_flag', 'div_yield_flag',
+                'share_type', 'min_price_increment', 'api_trade_available_flag', 'uid', 'real_exchange', 'position_uid',
+                'asset_uid', 'for_iis_flag', 'for_qual_investor_flag', 'weekend_flag', 'blocked_tca_flag',
+                'liquidity_flag', 'first_1min_candle_date', 'first_1day_candle_date', 'nominal_currency', 'content_hash')
+
+            shares_conflict_clause: str = ''' ON CONFLICT(\"uid\") DO UPDATE SET 
+            \"figi\" = {0}.\"figi\", \"ticker\" = {0}.\"ticker\", \"class_code\" = {0}.\"class_code\", \"isin\" = 
+            {0}.\"isin\", \"lot\" = {0}.\"lot\", \"currency\" = {0}.\"currency\", \"klong\" = {0}.\"klong\", \"kshort\" 
+            = {0}.\"kshort\", \"dlong\" = {0}.\"dlong\", \"dshort\" = {0}.\"dshort\", \"dlong_min\" = {0}.\"dlong_min\", 
+            \"dshort_min\" = {0}.\"dshort_min\", \"short_enabled_flag\" = {0}.\"short_enabled_flag\", \"name\" = 
+            {0}.\"name\", \"exchange\" = {0}.\"exchange\", \"exchange\" = {0}.\"exchange\", \"ipo_date\" = 
+            {0}.\"ipo_date\", \"issue_size\" = {0}.\"issue_size\", \"country_of_risk\" = {0}.\"country_of_risk\", 
+            \"country_of_risk_name\" = {0}.\"country_of_risk_name\", \"sector\" = {0}.\"sector\", \"issue_size_plan\" = 
+            {0}.\"issue_size_plan\", \"nominal\" = {0}.\"nominal\", \"trading_status\" = {0}.\"trading_status\", 
+            \"otc_flag\" = {0}.\"otc_flag\", \"buy_available_flag\" = {0}.\"buy_available_flag\", 
+            \"sell_available_flag\" = {0}.\"sell_available_flag\", \"div_yield_flag\" = {0}.\"div_yield_flag\", 
+            \"share_type\" = {0}.\"share_type\", \"min_price_increment\" = {0}.\"min_price_increment\", 
+            \"api_trade_available_flag\" = {0}.\"api_trade_available_flag\", \"real_exchange\" = {0}.\"real_exchange\", 
+            \"position_uid\" = {0}.\"position_uid\", \"asset_uid\" = {0}.\"asset_uid\", \"for_iis_flag\" = 
+            {0}.\"for_iis_flag\", \"for_qual_investor_flag\" = {0}.\"for_qual_investor_flag\", \"weekend_flag\" = 
+            {0}.\"weekend_flag\", \"blocked_tca_flag\" = {0}.\"blocked_tca_flag\", \"liquidity_flag\" = 
+            {0}.\"liquidity_flag\", \"first_1min_candle_date\" = {0}.\"first_1min_candle_date\", 
+            \"first_1day_candle_date\" = {0}.\"first_1day_candle_date\", \"nominal_currency\" = 
+            {0}.\"nominal_currency\", \"content_hash\" = {0}.\"content_hash\" WHERE 
+            \"content_hash\" IS NOT {0}.\"content_hash\"'''.format('\"excluded\"')
+
+            brand_data_conflict_clause: str = ''' ON CONFLICT(\"instrument_uid\") DO UPDATE SET \"logo_name\" = 
+            {0}.\"logo_name\", \"logo_base_color\" = {0}.\"logo_base_color\", \"text_color\" = {0}.\"text_color\" WHERE 
+            \"logo_name\" != {0}.\"logo_name\" OR \"logo_base_color\" != {0}.\"logo_base_color\" OR \"text_color\" != 
+            {0}.\"text_color\"'''.format('\"excluded\"')
 
             db: QSqlDatabase = cls.getDatabase()
             if db.transaction():
-                for share in shares:
-                    query = QSqlQuery(db)
-                    prepare_flag: bool = query.prepare(sql_command)
-                    assert prepare_flag, query.lastError().text()
-
-                    query.bindValue(':figi', share.figi)
-                    query.bindValue(':ticker', share.ticker)
-                    query.bindValue(':class_code', share.class_code)
-                    query.bindValue(':isin', share.isin)
-                    query.bindValue(':lot', share.lot)
-                    query.bindValue(':currency', share.currency)
-                    query.bindValue(':klong', MyQuotation.__repr__(share.klong))
-                    query.bindValue(':kshort', MyQuotation.__repr__(share.kshort))
-                    query.bindValue(':dlong', MyQuotation.__repr__(share.dlong))
-                    query.bindValue(':dshort', MyQuotation.__repr__(share.dshort))
-                    query.bindValue(':dlong_min', MyQuotation.__repr__(share.dlong_min))
-                    query.bindValue(':dshort_min', MyQuotation.__repr__(share.dshort_min))
-                    query.bindValue(':short_enabled_flag', share.short_enabled_flag)
-                    query.bindValue(':name', share.name)
-                    query.bindValue(':exchange', share.exchange)
-                    query.bindValue(':ipo_date', MyConnection.convertDateTimeToText(share.ipo_date))
-                    query.bindValue(':issue_size', share.issue_size)
-                    query.bindValue(':country_of_risk', share.country_of_risk)
-                    query.bindValue(':country_of_risk_name', share.country_of_risk_name)
-                    query.bindValue(':sector', share.sector)
-                    query.bindValue(':issue_size_plan', share.issue_size_plan)
-                    query.bindValue(':nominal', MyMoneyValue.__repr__(share.nominal))
-                    query.bindValue(':trading_status', share.trading_status.name)
-                    query.bindValue(':otc_flag', share.otc_flag)
-                    query.bindValue(':buy_available_flag', share.buy_available_flag)
-                    query.bindValue(':sell_available_flag', share.sell_available_flag)
-                    query.bindValue(':div_yield_flag', share.div_yield_flag)
-                    query.bindValue(':share_type', share.share_type.name)
-                    query.bindValue(':min_price_increment', MyQuotation.__repr__(share.min_price_increment))
-                    query.bindValue(':api_trade_available_flag', share.api_trade_available_flag)
-                    query.bindValue(':uid', share.uid)
-                    query.bindValue(':real_exchange', share.real_exchange.name)
-                    query.bindValue(':position_uid', share.position_uid)
-                    query.bindValue(':asset_uid', share.asset_uid)
-                    query.bindValue(':for_iis_flag', share.for_iis_flag)
-                    query.bindValue(':for_qual_investor_flag', share.for_qual_investor_flag)
-                    query.bindValue(':weekend_flag', share.weekend_flag)
-                    query.bindValue(':blocked_tca_flag', share.blocked_tca_flag)
-                    query.bindValue(':liquidity_flag', share.liquidity_flag)
-                    query.bindValue(':first_1min_candle_date', MyConnection.convertDateTimeToText(share.first_1min_candle_date))
-                    query.bindValue(':first_1day_candle_date', MyConnection.convertDateTimeToText(share.first_1day_candle_date))
-
-                    exec_flag: bool = query.exec()
-                    assert exec_flag, query.lastError().text()
-
-                    """===============Добавляем данные о бренде в таблицу данных о брендах==============="""
-                    brand_data_query = QSqlQuery(db)
-                    brand_data_prepare_flag: bool = brand_data_query.prepare(brand_data_command)
-                    assert brand_data_prepare_flag, brand_data_query.lastError().text()
-                    brand_data_query.bindValue(':uid', share.uid)
-                    brand_data_query.bindValue(':logo_name', share.brand.logo_name)
-                    brand_data_query.bindValue(':logo_base_color', share.brand.logo_base_color)
-                    brand_data_query.bindValue(':text_color', share.brand.text_color)
-                    brand_data_exec_flag: bool = brand_data_query.exec()
-                    assert brand_data_exec_flag, brand_data_query.lastError().text()
-                    """=================================================================================="""
+                shares_rows: dict[str, tuple] = {share.uid: (
+                    share.figi, share.ticker, share.class_code, share.isin, share.lot, share.currency,
+                    MyConnection.convertQuotationToInteger(share.klong),
+                    MyConnection.convertQuotationToInteger(share.kshort),
+                    MyConnection.convertQuotationToInteger(share.dlong),
+                    MyConnection.convertQuotationToInteger(share.dshort),
+                    MyConnection.convertQuotationToInteger(share.dlong_min),
+                    MyConnection.convertQuotationToInteger(share.dshort_min),
+                    share.short_enabled_flag, share.name, share.exchange,
+                    MyConnection.convertDateTimeToText(share.ipo_date),
+                    share.issue_size, share.country_of_risk, share.country_of_risk_name, share.sector,
+                    share.issue_size_plan, MyConnection.convertQuotationToInteger(share.nominal),
+                    share.trading_status.name, share.otc_flag, share.buy_available_flag, share.sell_available_flag,
+                    share.div_yield_flag, share.share_type.name,
+                    MyConnection.convertQuotationToInteger(share.min_price_increment),
+                    share.api_trade_available_flag, share.uid, share.real_exchange.name, share.position_uid,
+                    share.asset_uid, share.for_iis_flag, share.for_qual_investor_flag, share.weekend_flag,
+                    share.blocked_tca_flag, share.liquidity_flag,
+                    MyConnection.convertDateTimeToText(share.first_1min_candle_date),
+                    MyConnection.convertDateTimeToText(share.first_1day_candle_date),
+                    share.nominal.currency
+                ) for share in shares}
+                brands_rows: dict[str, tuple] = {share.uid: (share.uid, share.brand.logo_name, share.brand.logo_base_color, share.brand.text_color) for share in shares}
+
+                '''-------------Отбираем акции, содержимое которых изменилось-------------'''
+                content_hashes: dict[str, int] = {uid: cls.__getContentHash(row, brands_rows[uid]) for uid, row in shares_rows.items()}
+                changed_uids: set[str] = cls.__getChangedUids(db, MyConnection.SHARES_TABLE, content_hashes)
+                '''-----------------------------------------------------------------------'''
+
+                changed_shares_rows: list[tuple] = [row + (content_hashes[uid],) for uid, row in shares_rows.items() if uid in changed_uids]
+                cls.bulkInsert(db, MyConnection.SHARES_TABLE, shares_columns, changed_shares_rows, shares_conflict_clause)
 
-                """=================Добавляем акции в таблицу запросов инструментов================="""
-                '''----------------Удаляем акции из таблицы запросов инструментов----------------'''
-                shares_uids_select: str = '''SELECT \"uid\" FROM \"{0}\" WHERE \"{0}\".\"instrument_type\" = \'{1}\'
-                '''.format(MyConnection.INSTRUMENT_UIDS_TABLE, 'share')
-
-                instruments_status_delete_sql_command: str = '''DELETE FROM \"{0}\" WHERE \"token\" = :token AND 
-                \"status\" = :status AND \"uid\" in ({1});'''.format(
-                    MyConnection.INSTRUMENT_STATUS_TABLE,
-                    shares_uids_select
-                )
+                """===============Добавляем данные о бренде в таблицу данных о брендах==============="""
+                changed_brands_rows: list[tuple] = [row for uid, row in brands_rows.items() if uid in changed_uids]
+                cls.bulkInsert(db, MyConnection.BRANDS_DATA_TABLE, ('instrument_uid', 'logo_name', 'logo_base_color', 'text_color'), changed_brands_rows, brand_data_conflict_clause)
+                """=================================================================================="""
 
-                instruments_status_delete_query = QSqlQuery(db)
-                instruments_status_delete_prepare_flag: bool = instruments_status_delete_query.prepare(instruments_status_delete_sql_command)
-                assert instruments_status_delete_prepare_flag, instruments_status_delete_query.lastError().text()
-                instruments_status_delete_query.bindValue(':token', token)
-                instruments_status_delete_query.bindValue(':status', instrument_status.name)
-                instruments_status_delete_exec_flag: bool = instruments_status_delete_query.exec()
-                assert instruments_status_delete_exec_flag, instruments_status_delete_query.lastError().text()
-                '''------------------------------------------------------------------------------'''
-
-                '''---------------Добавляем акции в таблицу запросов инструментов---------------'''
-                instruments_status_insert_sql_command: str = '''INSERT INTO \"{0}\" (\"token\", \"status\", \"uid\") 
-                VALUES (:token, :status, :uid);'''.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-
-                for share in shares:
-                    instruments_status_insert_query = QSqlQuery(db)
-                    instruments_status_insert_prepare_flag: bool = instruments_status_insert_query.prepare(instruments_status_insert_sql_command)
-                    assert instruments_status_insert_prepare_flag, instruments_status_insert_query.lastError().text()
-                    instruments_status_insert_query.bindValue(':token', token)
-                    instruments_status_insert_query.bindValue(':status', instrument_status.name)
-                    instruments_status_insert_query.bindValue(':uid', share.uid)
-                    instruments_status_insert_exec_flag: bool = instruments_status_insert_query.exec()
-                    assert instruments_status_insert_exec_flag, instruments_status_insert_query.lastError().text()
-                '''-----------------------------------------------------------------------------'''
+                """=================Добавляем акции в таблицу запросов инструментов================="""
+                cls.__updateInstrumentsStatus(db, token, instrument_status, 'share', [share.uid for share in shares])
                 """================================================================================="""
 
                 commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
@@ -1384,135 +1639,289 @@ class MainConnection(MyConnection):
     def addLastPrices(cls, last_prices: list[LastPrice]):
         """Добавляет последние цены в таблицу последних цен."""
         if last_prices:  # Если список последних цен не пуст.
-            '''---------------------Создание SQL-строки---------------------'''
-            sql_command_middle: str = '(:figi{0}, :price{0}, :time{0}, :instrument_uid{0})'
-            sql_command: str = 'INSERT INTO \"{0}\" (\"figi\", \"price\", \"time\", \"instrument_uid\") VALUES '.format(MyConnection.LAST_PRICES_TABLE)
-            for i in range(len(last_prices)):
-                if i > 0: sql_command += ', '  # Если добавляемая последняя цена не первая.
-                sql_command += sql_command_middle.format(i)
-            sql_command += ''' ON CONFLICT(\"time\", \"instrument_uid\") DO UPDATE SET \"figi\" = \"excluded\".\"figi\", \"price\" = \"excluded\".\"price\" 
-            WHERE \"figi\" != \"excluded\".\"figi\" OR \"price\" != \"excluded\".\"price\";'''
-            '''-------------------------------------------------------------'''
+            conflict_clause: str = ''' ON CONFLICT(\"time\", \"instrument_uid\") DO UPDATE SET \"figi\" = \"excluded\".\"figi\", \"price\" = \"excluded\".\"price\" 
+            WHERE \"figi\" != \"excluded\".\"figi\" OR \"price\" != \"excluded\".\"price\"'''
 
             db: QSqlDatabase = cls.getDatabase()
-            if db.transaction():
-                query = QSqlQuery(db)
-                prepare_flag: bool = query.prepare(sql_command)
-                assert prepare_flag, query.lastError().text()
-
-                for i, lp in enumerate(last_prices):
-                    query.bindValue(':figi{0}'.format(i), lp.figi)
-                    query.bindValue(':price{0}'.format(i), MyQuotation.__repr__(lp.price))
-                    query.bindValue(':time{0}'.format(i), MyConnection.convertDateTimeToText(dt=lp.time, timespec='microseconds'))
-                    query.bindValue(':instrument_uid{0}'.format(i), lp.instrument_uid)
-
-                exec_flag: bool = query.exec()
-                assert exec_flag, query.lastError().text()
+            if cls.beginTransaction(db):
+                rows: list[tuple] = [(
+                    lp.figi,
+                    MyConnection.convertQuotationToInteger(lp.price),
+                    MyConnection.convertDateTimeToMicroseconds(lp.time),
+                    lp.instrument_uid
+                ) for lp in last_prices]
+                cls.bulkInsert(db, MyConnection.LAST_PRICES_TABLE, ('figi', 'price', 'time', 'instrument_uid'), rows, conflict_clause)
+
+                '''---------------Обновляем таблицу текущих последних цен---------------'''
+                """
+                Таблица последних цен хранится в файле истории цен, а триггер не может изменять таблицы другого файла БД,
+                поэтому текущие цены обновляются здесь же. Текущая цена заменяется только ценой с не меньшим временем.
+                """
+                current_conflict_clause: str = ''' ON CONFLICT(\"instrument_uid\") DO UPDATE SET \"figi\" = \"excluded\".\"figi\", 
+                \"price\" = \"excluded\".\"price\", \"time\" = \"excluded\".\"time\" WHERE \"excluded\".\"time\" >= \"{0}\".\"time\"'''.format(
+                    MyConnection.CURRENT_LAST_PRICES_TABLE
+                )
+                cls.bulkInsert(db, MyConnection.CURRENT_LAST_PRICES_TABLE, ('figi', 'price', 'time', 'instrument_uid'), rows, current_conflict_clause)
+                '''---------------------------------------------------------------------'''
 
-                commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+                commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
                 assert commit_flag, db.lastError().text()
             else:
                 raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
-    @staticmethod
-    def addAssetInstrument(db: QSqlDatabase, asset_uid: str, instrument: AssetInstrument):
-        """Добавляет идентификаторы инструмента актива в таблицу идентификаторов инструментов активов."""
-
-        def addInstrumentLinks(instrument_uid: str, links: list[InstrumentLink]):
-            """Добавляет связанные инструменты в таблицу связей инструментов."""
-            if links:  # Если список связанных инструментов не пуст.
-                '''---------------------Создание SQL-запроса---------------------'''
-                insert_link_sql_command: str = 'INSERT OR IGNORE INTO \"{0}\" (\"asset_uid\", \"asset_instrument_uid\", \"type\", \"linked_instrument_uid\") VALUES '.format(MyConnection.INSTRUMENT_LINKS_TABLE)
-                for j in range(len(links)):
-                    if j > 0: insert_link_sql_command += ', '  # Если добавляемая связь не первая.
-                    insert_link_sql_command += '(:asset_uid{0}, :asset_instrument_uid{0}, :type{0}, :linked_instrument_uid{0})'.format(j)
-                insert_link_sql_command += ';'
-                '''--------------------------------------------------------------'''
-
-                insert_link_query = QSqlQuery(db)
-                insert_link_prepare_flag: bool = insert_link_query.prepare(insert_link_sql_command)
-                assert insert_link_prepare_flag, insert_link_query.lastError().text()
-
-                for j, link in enumerate(links):
-                    insert_link_query.bindValue(':asset_uid{0}'.format(j), asset_uid)
-                    insert_link_query.bindValue(':asset_instrument_uid{0}'.format(j), instrument_uid)
-                    insert_link_query.bindValue(':type{0}'.format(j), link.type)
-                    insert_link_query.bindValue(':linked_instrument_uid{0}'.format(j), link.instrument_uid)
-
-                insert_link_exec_flag: bool = insert_link_query.exec()
-                assert insert_link_exec_flag, insert_link_query.lastError().text()
-
-        insert_ai_query_str: str = '''INSERT INTO \"{0}\" (\"asset_uid\", \"uid\", \"figi\", \"instrument_type\", 
-        \"ticker\", \"class_code\", \"instrument_kind\", \"position_uid\") VALUES (:asset_uid, :uid, :figi, 
-        :instrument_type, :ticker, :class_code, :instrument_kind, :position_uid);'''.format(
-            MyConnection.ASSET_INSTRUMENTS_TABLE
-        )
+    FIRST_LAST_PRICE_TIME_SELECT: str = 'SELECT MIN(\"time\") AS \"first_time\" FROM \"{0}\" WHERE \"time\" < :to_time;'.format(MyConnection.LAST_PRICES_TABLE)
 
-        insert_ai_query = QSqlQuery(db)
-        insert_ai_prepare_flag: bool = insert_ai_query.prepare(insert_ai_query_str)
-        assert insert_ai_prepare_flag, insert_ai_query.lastError().text()
+    @classmethod
+    def getFirstLastPriceTime(cls, to_time: int) -> int | None:
+        """Возвращает время (в микросекундах) самой ранней последней цены, полученной раньше to_time.
+        Если таких цен нет, то возвращает None."""
+        db: QSqlDatabase = cls.getDatabase()
+        query = QSqlQuery(db)
+        query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+        prepare_flag: bool = query.prepare(cls.FIRST_LAST_PRICE_TIME_SELECT)
+        assert prepare_flag, query.lastError().text()
+        query.bindValue(':to_time', to_time)
+        exec_flag: bool = query.exec()
+        assert exec_flag, query.lastError().text()
+        first_time: int | None = query.value('first_time') if query.next() else None
+        return None if first_time == '' else first_time  # NULL может вернуться в виде пустой строки.
+
+    LAST_PRICES_DOWNSAMPLE_DELETE: str = '''DELETE FROM \"{0}\" WHERE \"time\" >= :from_time AND \"time\" < :to_time AND \"rowid\" NOT IN (
+    SELECT \"kept_rowid\" FROM (SELECT \"rowid\" AS \"kept_rowid\", MAX(\"time\") FROM \"{0}\"
+    WHERE \"time\" >= :from_time AND \"time\" < :bucket_end GROUP BY \"instrument_uid\", \"time\" / :bucket)
+    );'''.format(MyConnection.LAST_PRICES_TABLE)
 
-        insert_ai_query.bindValue(':asset_uid', asset_uid)
-        insert_ai_query.bindValue(':uid', instrument.uid)
-        insert_ai_query.bindValue(':figi', instrument.figi)
-        insert_ai_query.bindValue(':instrument_type', instrument.instrument_type)
-        insert_ai_query.bindValue(':ticker', instrument.ticker)
-        insert_ai_query.bindValue(':class_code', instrument.class_code)
-        insert_ai_query.bindValue(':instrument_kind', instrument.instrument_kind.name)
-        insert_ai_query.bindValue(':position_uid', instrument.position_uid)
+    @classmethod
+    def downsampleLastPrices(cls, from_time: int, to_time: int, bucket: int) -> int:
+        """
+        Прореживает последние цены, полученные в интервале [from_time, to_time), который не выходит за пределы одного промежутка
+        длительностью bucket (в микросекундах): для каждого инструмента удаляет цены интервала, кроме самой поздней цены промежутка.
+        Самая поздняя цена ищется до конца промежутка, поэтому промежуток можно прореживать частями от конца к началу,
+        и каждая часть удаляется короткой транзакцией. Возвращает количество удалённых строк.
+        """
+        bucket_end: int = from_time - from_time % bucket + bucket  # Конец промежутка, содержащего from_time.
+        assert to_time <= bucket_end, 'Интервал прореживания должен находиться в пределах одного промежутка!'
 
-        insert_ai_exec_flag: bool = insert_ai_query.exec()
-        assert insert_ai_exec_flag, insert_ai_query.lastError().text()
+        db: QSqlDatabase = cls.getDatabase()
+        if db.transaction():
+            query = QSqlQuery(db)
+            prepare_flag: bool = query.prepare(cls.LAST_PRICES_DOWNSAMPLE_DELETE)
+            assert prepare_flag, query.lastError().text()
+            query.bindValue(':from_time', from_time)
+            query.bindValue(':to_time', to_time)
+            query.bindValue(':bucket_end', bucket_end)
+            query.bindValue(':bucket', bucket)
+            exec_flag: bool = query.exec()
+            assert exec_flag, query.lastError().text()
+            deleted_count: int = query.numRowsAffected()
 
-        addInstrumentLinks(instrument.uid, instrument.links)  # Добавляем связанные инструменты в таблицу связей инструментов.
+            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            assert commit_flag, db.lastError().text()
+            return deleted_count
+        else:
+            raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
+
+    '''-------------------------Обслуживание базы данных-------------------------'''
+    """
+    Запись в базу данных блокирует остальных писателей до фиксации транзакции, поэтому обслуживание
+    (см. DatabaseMaintenance.py) разбито на короткие транзакции: строки для удаления отбираются читающими
+    запросами по диапазонам rowid, а удаляются и освобождают страницы небольшими частями.
+    Каждая строка диапазона проверяется поиском её инструмента по первичному ключу InstrumentUniqueIdentifiers,
+    поэтому ни один запрос не просматривает таблицу истории цен целиком.
+    """
+    ORPHANS_CHUNK_SIZE: int = 5000  # Размер диапазона rowid строк истории цен, проверяемых одним запросом и удаляемых одной транзакцией.
+    ANALYSIS_LIMIT: int = 400  # Количество строк индекса, просматриваемых ANALYZE (PRAGMA analysis_limit).
+    HISTORY_MAX_ROWID_SELECT: str = 'SELECT MAX(\"rowid\") AS \"max_rowid\" FROM \"{0}\";'  # Наибольший rowid таблицы истории цен {0}.
+    HISTORY_ORPHANS_SELECT: str = '''SELECT \"rowid\" FROM \"{{0}}\" WHERE \"rowid\" > :from_rowid AND \"rowid\" <= :to_rowid
+    AND NOT EXISTS (SELECT 1 FROM \"{0}\" WHERE \"{0}\".\"uid\" = \"{{0}}\".\"{{1}}\");'''.format(
+        MyConnection.INSTRUMENT_UIDS_TABLE
+    )  # Строки диапазона rowid таблицы истории цен {0} с uid инструмента в столбце {1}, отсутствующего в таблице InstrumentUniqueIdentifiers.
+    HISTORY_ORPHANS_DELETE: str = '''DELETE FROM \"{{0}}\" WHERE \"rowid\" IN {0}
+    AND NOT EXISTS (SELECT 1 FROM \"{1}\" WHERE \"{1}\".\"uid\" = \"{{0}}\".\"{{1}}\");'''.format(
+        MyConnection.getValuesTable(':rowids'),
+        MyConnection.INSTRUMENT_UIDS_TABLE
+    )
 
     @classmethod
-    def addAssets(cls, assets: list[Asset]):
-        """Добавляет активы в таблицу активов."""
-        if assets:  # Если список активов не пуст.
-            db: QSqlDatabase = cls.getDatabase()
-            if db.transaction():
-                def insertAsset(asset: Asset):
-                    """Добавляет актив в таблицу активов."""
-                    insert_asset_sql_command: str = '''
-                    INSERT INTO \"{0}\" (\"uid\", \"type\", \"name\") VALUES (:uid, :type, :name) 
-                    ON CONFLICT(\"uid\") DO UPDATE SET \"type\" = {1}.\"type\", \"name\" = {1}.\"name\";
-                    '''.format(MyConnection.ASSETS_TABLE, '\"excluded\"')
+    def getHistoryMaxRowid(cls, table_name: str) -> int:
+        """Возвращает наибольший rowid таблицы истории цен (0, если таблица пуста)."""
+        db: QSqlDatabase = cls.getDatabase()
+        query: QSqlQuery = cls.getPreparedQuery(db, cls.HISTORY_MAX_ROWID_SELECT.format(table_name))
+        exec_flag: bool = query.exec()
+        assert exec_flag, query.lastError().text()
+        next_flag: bool = query.next()
+        assert next_flag, query.lastError().text()
+        max_rowid = query.value('max_rowid')
+        query.finish()
+        return 0 if max_rowid is None or max_rowid == '' else int(max_rowid)
+
+    @classmethod
+    def getHistoryRowidRanges(cls, table_name: str) -> list[tuple[int, int]]:
+        """Возвращает диапазоны rowid (from_rowid, to_rowid] таблицы истории цен по ORPHANS_CHUNK_SIZE строк.
+        Строки, добавленные после вызова функции, принадлежат существующим инструментам и в диапазоны не попадают."""
+        max_rowid: int = cls.getHistoryMaxRowid(table_name)
+        return [(from_rowid, min(from_rowid + cls.ORPHANS_CHUNK_SIZE, max_rowid)) for from_rowid in range(0, max_rowid, cls.ORPHANS_CHUNK_SIZE)]
+
+    @classmethod
+    def getHistoryOrphanRowids(cls, table_name: str, from_rowid: int, to_rowid: int) -> list[int]:
+        """Возвращает rowid строк диапазона (from_rowid, to_rowid] таблицы истории цен,
+        инструменты которых отсутствуют в таблице InstrumentUniqueIdentifiers."""
+        db: QSqlDatabase = cls.getDatabase()
+        query: QSqlQuery = cls.getPreparedQuery(db, cls.HISTORY_ORPHANS_SELECT.format(table_name, MyConnection.HISTORY_TABLES[table_name]))
+        query.bindValue(':from_rowid', from_rowid)
+        query.bindValue(':to_rowid', to_rowid)
+        exec_flag: bool = query.exec()
+        assert exec_flag, query.lastError().text()
+        rowids: list[int] = []
+        while query.next():
+            rowids.append(query.value('rowid'))
+        query.finish()
+        return rowids
+
+    @classmethod
+    def deleteHistoryOrphanRows(cls, table_name: str, rowids: list[int]) -> int:
+        """Удаляет строки таблицы истории цен с переданными rowid, если их инструменты всё ещё отсутствуют
+        в таблице InstrumentUniqueIdentifiers. Возвращает количество удалённых строк."""
+        db: QSqlDatabase = cls.getDatabase()
+        if db.transaction():
+            query: QSqlQuery = cls.getPreparedQuery(db, cls.HISTORY_ORPHANS_DELETE.format(table_name, MyConnection.HISTORY_TABLES[table_name]))
+            query.bindValue(':rowids', MyConnection.convertValuesToJson(rowids))
+            exec_flag: bool = query.exec()
+            assert exec_flag, query.lastError().text()
+            deleted_count: int = query.numRowsAffected()
 
-                    insert_asset_query = QSqlQuery(db)
-                    insert_asset_prepare_flag: bool = insert_asset_query.prepare(insert_asset_sql_command)
-                    assert insert_asset_prepare_flag, insert_asset_query.lastError().text()
+            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            assert commit_flag, db.lastError().text()
+            return deleted_count
+        else:
+            raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
-                    insert_asset_query.bindValue(':uid', asset.uid)
-                    insert_asset_query.bindValue(':type', asset.type.name)
-                    insert_asset_query.bindValue(':name', asset.name)
+    @classmethod
+    def deleteHistoryOrphans(cls) -> int:
+        """
+        Удаляет из таблиц истории цен строки инструментов, отсутствующих в таблице InstrumentUniqueIdentifiers.
+        Внешние ключи не действуют между файлами БД, поэтому эта очистка заменяет каскадное удаление.
+        Возвращает количество удалённых строк.
+        """
+        deleted_count: int = 0
+        for table_name in MyConnection.HISTORY_TABLES:
+            for from_rowid, to_rowid in cls.getHistoryRowidRanges(table_name):
+                rowids: list[int] = cls.getHistoryOrphanRowids(table_name, from_rowid, to_rowid)
+                if rowids: deleted_count += cls.deleteHistoryOrphanRows(table_name, rowids)
+        return deleted_count
+
+    @classmethod
+    def getPragmaValue(cls, schema_name: str, pragma: str) -> int:
+        """Возвращает целочисленное значение PRAGMA файла БД schema_name (например, page_size или freelist_count)."""
+        db: QSqlDatabase = cls.getDatabase()
+        query: QSqlQuery = cls.getPreparedQuery(db, 'PRAGMA \"{0}\".{1};'.format(schema_name, pragma))
+        exec_flag: bool = query.exec()
+        assert exec_flag, query.lastError().text()
+        next_flag: bool = query.next()
+        assert next_flag, query.lastError().text()
+        value: int = query.value(0)
+        query.finish()
+        return value
+
+    @classmethod
+    def optimizeSchema(cls, schema_name: str):
+        """
+        Обновляет статистику планировщика запросов файла БД schema_name.
+        Если файл ещё ни разу не анализировался, то выполняет ANALYZE, иначе - PRAGMA optimize, которая анализирует
+        только таблицы, заметно изменившиеся с прошлого анализа. PRAGMA analysis_limit ограничивает время анализа.
+        """
+        db: QSqlDatabase = cls.getDatabase()
+        limit_query = QSqlQuery(db)
+        limit_exec_flag: bool = limit_query.exec('PRAGMA analysis_limit = {0};'.format(cls.ANALYSIS_LIMIT))
+        assert limit_exec_flag, limit_query.lastError().text()
 
-                    insert_asset_exec_flag: bool = insert_asset_query.exec()
-                    assert insert_asset_exec_flag, insert_asset_query.lastError().text()
+        stat_query = QSqlQuery(db)
+        stat_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+        stat_exec_flag: bool = stat_query.exec('SELECT \"name\" FROM \"{0}\".\"sqlite_master\" WHERE \"name\" = \'sqlite_stat1\';'.format(schema_name))
+        assert stat_exec_flag, stat_query.lastError().text()
+        analyzed_flag: bool = stat_query.next()
+        stat_query.finish()
+
+        optimize_query = QSqlQuery(db)  # Флаг 0x10000 проверяет все таблицы файла, а не только использованные соединением обслуживания.
+        optimize_exec_flag: bool = optimize_query.exec('PRAGMA \"{0}\".optimize(0x10002);'.format(schema_name) if analyzed_flag else 'ANALYZE \"{0}\";'.format(schema_name))
+        assert optimize_exec_flag, optimize_query.lastError().text()
+
+    @classmethod
+    def incrementalVacuum(cls, schema_name: str, pages: int) -> int:
+        """
+        Возвращает файловой системе до pages свободных страниц файла БД schema_name одной транзакцией.
+        Каждый шаг PRAGMA incremental_vacuum освобождает одну страницу, а драйвер выполняет один шаг за вызов exec(),
+        поэтому запрос выполняется по разу на страницу. Возвращает количество оставшихся свободных страниц.
+        Работает только в файлах с PRAGMA auto_vacuum = INCREMENTAL.
+        """
+        freelist_count: int = cls.getPragmaValue(schema_name, 'freelist_count')
+        db: QSqlDatabase = cls.getDatabase()
+        if db.transaction():
+            query: QSqlQuery = cls.getPreparedQuery(db, 'PRAGMA \"{0}\".incremental_vacuum(1);'.format(schema_name))
+            for _ in range(min(pages, freelist_count)):
+                exec_flag: bool = query.exec()
+                assert exec_flag, query.lastError().text()
+            query.finish()
+
+            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            assert commit_flag, db.lastError().text()
+        else:
+            raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
+        return cls.getPragmaValue(schema_name, 'freelist_count')
+
+    @classmethod
+    def checkpoint(cls, schema_name: str):
+        """Переносит журнал WAL в файл БД schema_name, не ожидая читателей и писателей (PASSIVE).
+        Файл БД уменьшается только после переноса журнала."""
+        db: QSqlDatabase = cls.getDatabase()
+        query = QSqlQuery(db)
+        exec_flag: bool = query.exec('PRAGMA \"{0}\".wal_checkpoint(PASSIVE);'.format(schema_name))
+        assert exec_flag, query.lastError().text()
+        query.finish()
+    '''--------------------------------------------------------------------------'''
 
-                    for instrument in asset.instruments:
-                        MainConnection.addAssetInstrument(db, asset.uid, instrument)  # Добавляем идентификаторы инструмента актива в таблицу идентификаторов инструментов активов.
+    @classmethod
+    def addAssetInstruments(cls, db: QSqlDatabase, asset_instruments: list[tuple[str, AssetInstrument]]):
+        """Добавляет идентификаторы инструментов активов (пары uid актива и инструмента) в таблицу идентификаторов
+        инструментов активов, а их связанные инструменты - в таблицу связей инструментов.
+        Должна вызываться внутри транзакции вызывающего метода."""
+        asset_instruments_rows: list[tuple] = [(
+            asset_uid, instrument.uid, instrument.figi, instrument.instrument_type, instrument.ticker,
+            instrument.class_code, instrument.instrument_kind.name, instrument.position_uid
+        ) for asset_uid, instrument in asset_instruments]
+        cls.bulkInsert(db, MyConnection.ASSET_INSTRUMENTS_TABLE, ('asset_uid', 'uid', 'figi', 'instrument_type', 'ticker', 'class_code', 'instrument_kind', 'position_uid'), asset_instruments_rows)
+
+        links_rows: list[tuple] = [
+            (asset_uid, instrument.uid, link.type, link.instrument_uid)
+            for asset_uid, instrument in asset_instruments for link in instrument.links
+        ]
+        cls.bulkInsert(db, MyConnection.INSTRUMENT_LINKS_TABLE, ('asset_uid', 'asset_instrument_uid', 'type', 'linked_instrument_uid'), links_rows, ' ON CONFLICT DO NOTHING')
 
-                for a in assets:
-                    insertAsset(a)  # Добавляем актив в таблицу активов.
+    @classmethod
+    def addAssets(cls, assets: list[Asset]):
+        """Добавляет активы в таблицу активов."""
+        if assets:  # Если список активов не пуст.
+            db: QSqlDatabase = cls.getDatabase()
+            if db.transaction():
+                assets_conflict_clause: str = ' ON CONFLICT(\"uid\") DO UPDATE SET \"type\" = {0}.\"type\", \"name\" = {0}.\"name\"'.format('\"excluded\"')
+                cls.bulkInsert(db, MyConnection.ASSETS_TABLE, ('uid', 'type', 'name'), [(asset.uid, asset.type.name, asset.name) for asset in assets], assets_conflict_clause)
+                cls.addAssetInstruments(db, [(asset.uid, instrument) for asset in assets for instrument in asset.instruments])  # Добавляем идентификаторы инструментов активов в таблицу идентификаторов инструментов активов.
 
                 commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
                 assert commit_flag, db.lastError().text()
             else:
                 raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    CANDLES_SELECT: str = '''SELECT \"open\", \"high\", \"low\", \"close\", \"volume\", \"time\", \"is_complete\" 
+    FROM \"{0}\" WHERE \"instrument_id\" = :uid and \"interval\" = :interval;'''.format(MyConnection.CANDLES_TABLE)
+
     @classmethod
     def getCandles(cls, uid: str, interval: CandleInterval) -> list[HistoricCandle]:
         db: QtSql.QSqlDatabase = cls.getDatabase()
         if db.transaction():
-            __select_candles_command: str = '''SELECT \"open\", \"high\", \"low\", \"close\", \"volume\", \"time\", 
-            \"is_complete\" FROM \"{0}\" WHERE \"instrument_id\" = :uid and \"interval\" = :interval;'''.format(
-                MyConnection.CANDLES_TABLE
-            )
-
             candles_query = QtSql.QSqlQuery(db)
             candles_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            candles_prepare_flag: bool = candles_query.prepare(__select_candles_command)
+            candles_prepare_flag: bool = candles_query.prepare(cls.CANDLES_SELECT)
             assert candles_prepare_flag, candles_query.lastError().text()
             candles_query.bindValue(':uid', uid)
             candles_query.bindValue(':interval', interval.name)
@@ -1530,19 +1939,17 @@ class MainConnection(MyConnection):
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    CONSENSUS_ITEMS_SELECT: str = '''SELECT \"instrument_uid\", \"ticker\", \"recommendation\", \"currency\", 
+    \"current_price\", \"consensus\", \"min_target\", \"max_target\", \"price_change\", \"price_change_rel\" FROM \"{0}\" 
+    WHERE \"instrument_uid\" = :instrument_uid;'''.format(MyConnection.CONSENSUS_ITEMS_TABLE)
+
     @classmethod
     def getConsensusItems(cls, instrument_uid: str) -> list[ConsensusItem]:
         db: QtSql.QSqlDatabase = cls.getDatabase()
         if db.transaction():
-            __select_consensuses_command: str = '''SELECT \"instrument_uid\", \"ticker\", \"recommendation\", 
-            \"currency\", \"current_price\", \"consensus\", \"min_target\", \"max_target\", \"price_change\", 
-            \"price_change_rel\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid;'''.format(
-                MyConnection.CONSENSUS_ITEMS_TABLE
-            )
-
             consensuses_query = QtSql.QSqlQuery(db)
             consensuses_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            consensuses_prepare_flag: bool = consensuses_query.prepare(__select_consensuses_command)
+            consensuses_prepare_flag: bool = consensuses_query.prepare(cls.CONSENSUS_ITEMS_SELECT)
             assert consensuses_prepare_flag, consensuses_query.lastError().text()
             consensuses_query.bindValue(':instrument_uid', instrument_uid)
             consensuses_exec_flag: bool = consensuses_query.exec()
@@ -1559,19 +1966,22 @@ class MainConnection(MyConnection):
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    TARGET_ITEMS_SELECT: str = '''SELECT \"instrument_uid\", \"ticker\", \"company\", \"recommendation\", 
+    \"recommendation_date\", \"currency\", \"current_price\", \"target_price\", \"price_change\", \"price_change_rel\", 
+    \"show_name\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid;'''.format(MyConnection.TARGET_ITEMS_TABLE)
+    CONSENSUS_TARGETS_SELECT: str = '''SELECT \"instrument_uid\", \"ticker\", \"company\", \"recommendation\", 
+    \"recommendation_date\", \"currency\", \"current_price\", \"target_price\", \"price_change\", \"price_change_rel\", 
+    \"show_name\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid AND \"consensus_number\" = :consensus_number;'''.format(
+        MyConnection.TARGET_ITEMS_TABLE
+    )  # Прогнозы одного консенсус-прогноза.
+
     @classmethod
     def getTargetItems(cls, instrument_uid: str) -> list[TargetItem]:
         db: QtSql.QSqlDatabase = cls.getDatabase()
         if db.transaction():
-            __select_targets_command: str = '''SELECT \"instrument_uid\", \"ticker\", \"company\", \"recommendation\", 
-            \"recommendation_date\", \"currency\", \"current_price\", \"target_price\", \"price_change\", 
-            \"price_change_rel\", \"show_name\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid;'''.format(
-                MyConnection.TARGET_ITEMS_TABLE
-            )
-
             targets_query = QtSql.QSqlQuery(db)
             targets_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            targets_prepare_flag: bool = targets_query.prepare(__select_targets_command)
+            targets_prepare_flag: bool = targets_query.prepare(cls.TARGET_ITEMS_SELECT)
             assert targets_prepare_flag, targets_query.lastError().text()
             targets_query.bindValue(':instrument_uid', instrument_uid)
             targets_exec_flag: bool = targets_query.exec()
@@ -1588,18 +1998,11 @@ class MainConnection(MyConnection):
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
-    @staticmethod
-    def __getTargets(db: QtSql.QSqlDatabase, uid: str, number: int) -> list[TargetItem]:
-        __select_targets_command: str = '''SELECT \"instrument_uid\", \"ticker\", \"company\", \"recommendation\", 
-        \"recommendation_date\", \"currency\", \"current_price\", \"target_price\", \"price_change\", 
-        \"price_change_rel\", \"show_name\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid AND 
-        \"consensus_number\" = :consensus_number;'''.format(
-            MyConnection.TARGET_ITEMS_TABLE
-        )
-
+    @classmethod
+    def __getTargets(cls, db: QtSql.QSqlDatabase, uid: str, number: int) -> list[TargetItem]:
         targets_query = QtSql.QSqlQuery(db)
         targets_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-        targets_prepare_flag: bool = targets_query.prepare(__select_targets_command)
+        targets_prepare_flag: bool = targets_query.prepare(cls.CONSENSUS_TARGETS_SELECT)
         assert targets_prepare_flag, targets_query.lastError().text()
         targets_query.bindValue(':instrument_uid', uid)
         targets_query.bindValue(':consensus_number', number)
@@ -1645,19 +2048,18 @@ class MainConnection(MyConnection):
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    LAST_CONSENSUS_FULLS_SELECT: str = '''SELECT \"instrument_uid\", \"consensus_number\", \"ticker\", \"recommendation\", 
+    \"currency\", \"current_price\", \"consensus\", \"min_target\", \"max_target\", \"price_change\", \"price_change_rel\" 
+    FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid AND \"consensus_number\" = (SELECT MAX(\"consensus_number\") 
+    FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid);'''.format(MyConnection.CONSENSUS_ITEMS_TABLE)
+
     @classmethod
     def getLastConsensusFulls(cls, instrument_uid: str) -> list[ConsensusFull]:
         db: QtSql.QSqlDatabase = cls.getDatabase()
         if db.transaction():
-            __select_last_consensuses: str = '''SELECT \"instrument_uid\", \"consensus_number\", \"ticker\", 
-            \"recommendation\", \"currency\", \"current_price\", \"consensus\", \"min_target\", \"max_target\", 
-            \"price_change\", \"price_change_rel\" FROM \"{0}\" WHERE \"instrument_uid\" = :instrument_uid AND 
-            \"consensus_number\" = (SELECT MAX(\"consensus_number\") FROM \"{0}\" WHERE \"instrument_uid\" = 
-            :instrument_uid);'''.format(MyConnection.CONSENSUS_ITEMS_TABLE)
-
             consensuses_query = QtSql.QSqlQuery(db)
             consensuses_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            consensuses_prepare_flag: bool = consensuses_query.prepare(__select_last_consensuses)
+            consensuses_prepare_flag: bool = consensuses_query.prepare(cls.LAST_CONSENSUS_FULLS_SELECT)
             assert consensuses_prepare_flag, consensuses_query.lastError().text()
             consensuses_query.bindValue(':instrument_uid', instrument_uid)
             consensuses_exec_flag: bool = consensuses_query.exec()
@@ -1678,32 +2080,42 @@ class MainConnection(MyConnection):
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    '''-------------------------Консенсус-прогнозы переданных инструментов-------------------------'''
+    """
+    Инструменты отбираются по индексу AssetInstruments_uid_index, а их консенсус-прогнозы - по индексу
+    ConsensusForecasts_asset_index. Последний консенсус-прогноз актива находится поиском по этому же индексу,
+    поэтому запрос не группирует всю таблицу консенсус-прогнозов.
+    """
+    CONSENSUSES_FORECASTS_SELECT: str = '''SELECT {0}.\"uid\", {0}.\"asset_uid\", {1}.\"uid\" AS \"instrument_uid\", 
+    {1}.\"ticker\", \"created_at\", \"best_target_price\", \"best_target_low\", \"best_target_high\", 
+    \"total_buy_recommend\", \"total_hold_recommend\", \"total_sell_recommend\", \"currency\", \"consensus\", 
+    \"prognosis_date\" FROM {0} INNER JOIN {1} ON {0}.\"asset_uid\" = {1}.\"asset_uid\" 
+    WHERE {1}.\"uid\" IN {2};'''.format(
+        '\"{0}\"'.format(MyConnection.CONSENSUS_FORECASTS_TABLE),
+        '\"{0}\"'.format(MyConnection.ASSET_INSTRUMENTS_TABLE),
+        MyConnection.getValuesTable(':instruments_uids')
+    )
+    LAST_CONSENSUSES_FORECASTS_SELECT: str = '''SELECT {2}.\"uid\", {2}.\"asset_uid\", {3}.\"uid\" AS \"instrument_uid\", 
+    {3}.\"ticker\", {2}.\"created_at\", \"best_target_price\", \"best_target_low\", \"best_target_high\", 
+    \"total_buy_recommend\", \"total_hold_recommend\", \"total_sell_recommend\", \"currency\", \"consensus\", 
+    \"prognosis_date\" FROM {1} AS {3} INNER JOIN {0} AS {2} ON {2}.\"uid\" = (SELECT \"uid\" FROM {0} 
+    WHERE \"asset_uid\" = {3}.\"asset_uid\" ORDER BY \"created_at\" DESC LIMIT 1) 
+    WHERE {3}.\"uid\" IN {4};'''.format(
+        '\"{0}\"'.format(MyConnection.CONSENSUS_FORECASTS_TABLE),
+        '\"{0}\"'.format(MyConnection.ASSET_INSTRUMENTS_TABLE),
+        '\"CF\"',
+        '\"AI\"',
+        MyConnection.getValuesTable(':instruments_uids')
+    )
+
     @classmethod
     @print_function_runtime
     def getConsensusesForecastsItems(cls, instruments_uids: list[str]) -> list[MyConsensusForecastsItem]:
         if instruments_uids:
-            __IN_LIST: str = '('
-            for i, uid in enumerate(instruments_uids):
-                if i > 0: __IN_LIST += ', '
-                __IN_LIST += '\'{0}\''.format(uid)
-            __IN_LIST += ')'
-
-            __sql_command: str = '''SELECT {0}.\"uid\", {0}.\"asset_uid\", {1}.\"uid\" AS \"instrument_uid\", 
-            {1}.\"ticker\", \"created_at\", \"best_target_price\", \"best_target_low\", \"best_target_high\", 
-            \"total_buy_recommend\", \"total_hold_recommend\", \"total_sell_recommend\", \"currency\", \"consensus\", 
-            \"prognosis_date\" FROM {0} INNER JOIN {1} ON {0}.\"asset_uid\" = {1}.\"asset_uid\" 
-            WHERE \"instrument_uid\" IN {2};'''.format(
-                '\"{0}\"'.format(MyConnection.CONSENSUS_FORECASTS_TABLE),
-                '\"{0}\"'.format(MyConnection.ASSET_INSTRUMENTS_TABLE),
-                __IN_LIST
-            )
-
             db: QtSql.QSqlDatabase = cls.getDatabase()
             if db.transaction():
-                cfi_query = QtSql.QSqlQuery(db)
-                cfi_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                cfi_prepare_flag: bool = cfi_query.prepare(__sql_command)
-                assert cfi_prepare_flag, cfi_query.lastError().text()
+                cfi_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, cls.CONSENSUSES_FORECASTS_SELECT)
+                cfi_query.bindValue(':instruments_uids', MyConnection.convertValuesToJson(instruments_uids))
                 cfi_exec_flag: bool = cfi_query.exec()
                 assert cfi_exec_flag, cfi_query.lastError().text()
 
@@ -1714,6 +2126,7 @@ class MainConnection(MyConnection):
                     cfi: ConsensusForecastsItem = MyConnection.getConsensusForecastsItem(cfi_query)
                     consensuses.append(
                         MyConsensusForecastsItem(consensus=cfi, instrument_uid=instrument_uid, ticker=ticker))
+                cfi_query.finish()
 
                 commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
                 assert commit_flag, db.lastError().text()
@@ -1728,33 +2141,10 @@ class MainConnection(MyConnection):
     @print_function_runtime
     def getLastConsensusesForecastsItems(cls, instruments_uids: list[str]) -> list[MyConsensusForecastsItem]:
         if instruments_uids:
-            __IN_LIST: str = '('
-            for i, uid in enumerate(instruments_uids):
-                if i > 0: __IN_LIST += ', '
-                __IN_LIST += '\'{0}\''.format(uid)
-            __IN_LIST += ')'
-
-            __sql_command: str = '''SELECT \"uid\", {2}.\"asset_uid\", \"instrument_uid\", \"ticker\", \"created_at\", 
-            \"best_target_price\", \"best_target_low\", \"best_target_high\", \"total_buy_recommend\", 
-            \"total_hold_recommend\", \"total_sell_recommend\", \"currency\", \"consensus\", \"prognosis_date\" FROM 
-            (SELECT \"uid\", \"asset_uid\", MAX(\"created_at\") AS \"created_at\", \"best_target_price\", 
-            \"best_target_low\", \"best_target_high\", \"total_buy_recommend\", \"total_hold_recommend\", 
-            \"total_sell_recommend\", \"currency\", \"consensus\", \"prognosis_date\" FROM {0} GROUP BY \"asset_uid\") 
-            AS {2} INNER JOIN (SELECT \"uid\" AS \"instrument_uid\", \"ticker\", \"asset_uid\" FROM {1} 
-            WHERE \"uid\" IN {4}) AS {3} ON {2}.\"asset_uid\" = {3}.\"asset_uid\";'''.format(
-                '\"{0}\"'.format(MyConnection.CONSENSUS_FORECASTS_TABLE),
-                '\"{0}\"'.format(MyConnection.ASSET_INSTRUMENTS_TABLE),
-                '\"CF\"',
-                '\"AI\"',
-                __IN_LIST
-            )
-
             db: QtSql.QSqlDatabase = cls.getDatabase()
             if db.transaction():
-                cfi_query = QtSql.QSqlQuery(db)
-                cfi_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                cfi_prepare_flag: bool = cfi_query.prepare(__sql_command)
-                assert cfi_prepare_flag, cfi_query.lastError().text()
+                cfi_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, cls.LAST_CONSENSUSES_FORECASTS_SELECT)
+                cfi_query.bindValue(':instruments_uids', MyConnection.convertValuesToJson(instruments_uids))
                 cfi_exec_flag: bool = cfi_query.exec()
                 assert cfi_exec_flag, cfi_query.lastError().text()
 
@@ -1764,6 +2154,7 @@ class MainConnection(MyConnection):
                     ticker: str = cfi_query.value('ticker')
                     cfi: ConsensusForecastsItem = MyConnection.getConsensusForecastsItem(cfi_query)
                     consensuses.append(MyConsensusForecastsItem(consensus=cfi, instrument_uid=instrument_uid, ticker=ticker))
+                cfi_query.finish()
 
                 commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
                 assert commit_flag, db.lastError().text()
@@ -1773,59 +2164,50 @@ class MainConnection(MyConnection):
                 raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
         else:
             return []
+    '''-------------------------------------------------------------------------------------------'''
 
     @classmethod
     def insertHistoricCandles(cls, uid: str, interval: CandleInterval, candles: list[HistoricCandle]):
         """Добавляет свечи в таблицу исторических свечей."""
         if candles:  # Если список не пуст.
-            sql_command: str = '''INSERT INTO \"{0}\" (\"instrument_id\", \"interval\", \"open\", \"high\", \"low\", 
-            \"close\", \"volume\", \"time\", \"is_complete\") VALUES '''.format(MyConnection.CANDLES_TABLE)
-            for i in range(len(candles)):
-                if i > 0: sql_command += ', '  # Если добавляемая свеча не первая.
-                sql_command += '(:uid, :interval, :open{0}, :high{0}, :low{0}, :close{0}, :volume{0}, :time{0}, :is_complete{0})'.format(i)
-            sql_command += ''' ON CONFLICT (\"instrument_id\", \"interval\", \"time\") DO UPDATE SET \"open\" = 
+            conflict_clause: str = ''' ON CONFLICT (\"instrument_id\", \"interval\", \"time\") DO UPDATE SET \"open\" = 
             \"excluded\".\"open\", \"high\" = \"excluded\".\"high\", \"low\" = \"excluded\".\"low\", \"close\" = 
             \"excluded\".\"close\", \"volume\" = \"excluded\".\"volume\", \"is_complete\" = 
             \"excluded\".\"is_complete\" WHERE \"excluded\".\"open\" != \"open\" OR \"excluded\".\"high\" != \"high\" 
             OR \"excluded\".\"low\" != \"low\" OR \"excluded\".\"close\" != \"close\" OR \"excluded\".\"volume\" != 
-            \"volume\" OR \"excluded\".\"is_complete\" != \"is_complete\";'''
+            \"volume\" OR \"excluded\".\"is_complete\" != \"is_complete\"'''
 
             db: QtSql.QSqlDatabase = cls.getDatabase()
-            if db.transaction():
-                query = QtSql.QSqlQuery(db)
-                prepare_flag: bool = query.prepare(sql_command)
-                assert prepare_flag, query.lastError().text()
-
-                query.bindValue(':uid', uid)
-                query.bindValue(':interval', interval.name)
-                for i, candle in enumerate(candles):
-                    query.bindValue(':open{0}'.format(i), MyQuotation.__repr__(candle.open))
-                    query.bindValue(':high{0}'.format(i), MyQuotation.__repr__(candle.high))
-                    query.bindValue(':low{0}'.format(i), MyQuotation.__repr__(candle.low))
-                    query.bindValue(':close{0}'.format(i), MyQuotation.__repr__(candle.close))
-                    query.bindValue(':volume{0}'.format(i), candle.volume)
-                    query.bindValue(':time{0}'.format(i), MyConnection.convertDateTimeToText(candle.time))
-                    query.bindValue(':is_complete{0}'.format(i), MyConnection.convertBoolToBlob(candle.is_complete))
-
-                exec_flag: bool = query.exec()
-                assert exec_flag, query.lastError().text()
-
-                commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            if cls.beginTransaction(db):
+                rows: list[tuple] = [(
+                    uid,
+                    interval.name,
+                    MyConnection.convertQuotationToInteger(candle.open),
+                    MyConnection.convertQuotationToInteger(candle.high),
+                    MyConnection.convertQuotationToInteger(candle.low),
+                    MyConnection.convertQuotationToInteger(candle.close),
+                    candle.volume,
+                    MyConnection.convertDateTimeToMicroseconds(candle.time),
+                    MyConnection.convertBoolToBlob(candle.is_complete)
+                ) for candle in candles]
+                cls.bulkInsert(db, MyConnection.CANDLES_TABLE, ('instrument_id', 'interval', 'open', 'high', 'low', 'close', 'volume', 'time', 'is_complete'), rows, conflict_clause)
+
+                commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
                 assert commit_flag, db.lastError().text()
             else:
                 raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    DIVIDENDS_DELETE: str = 'DELETE FROM \"{0}\" WHERE \"instrument_uid\" = :share_uid;'.format(MyConnection.DIVIDENDS_TABLE)
+
     @classmethod
     def setDividends(cls, uid: str, dividends: list[Dividend]):
         """Обновляет купоны с переданным instrument_uid в таблице купонов."""
         db: QtSql.QSqlDatabase = cls.getDatabase()
-        if db.transaction():
+        if cls.beginTransaction(db):
             def setDividendsColumnValue(value: str):
                 """Заполняет столбец dividends значением."""
                 update_dividends_command: str = 'UPDATE \"{0}\" SET \"dividends\" = :dividends WHERE \"uid\" = :uid;'.format(MyConnection.SHARES_TABLE)
-                dividends_query = QtSql.QSqlQuery(db)
-                dividends_prepare_flag: bool = dividends_query.prepare(update_dividends_command)
-                assert dividends_prepare_flag, dividends_query.lastError().text()
+                dividends_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, update_dividends_command)
                 dividends_query.bindValue(':dividends', value)
                 dividends_query.bindValue(':uid', uid)
                 dividends_exec_flag: bool = dividends_query.exec()
@@ -1833,10 +2215,7 @@ class MainConnection(MyConnection):
 
             if dividends:  # Если список дивидендов не пуст.
                 '''----Удаляет из таблицы дивидендов все дивиденды, имеющие переданный uid----'''
-                delete_dividends_command: str = 'DELETE FROM \"{0}\" WHERE \"instrument_uid\" = :share_uid;'.format(MyConnection.DIVIDENDS_TABLE)
-                delete_dividends_query = QtSql.QSqlQuery(db)
-                delete_dividends_prepare_flag: bool = delete_dividends_query.prepare(delete_dividends_command)
-                assert delete_dividends_prepare_flag, delete_dividends_query.lastError().text()
+                delete_dividends_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, cls.DIVIDENDS_DELETE)
                 delete_dividends_query.bindValue(':share_uid', uid)
                 delete_dividends_exec_flag: bool = delete_dividends_query.exec()
                 assert delete_dividends_exec_flag, delete_dividends_query.lastError().text()
@@ -1849,11 +2228,8 @@ class MainConnection(MyConnection):
                 :payment_date, :declared_date, :last_buy_date, :dividend_type, :record_date, :regularity, 
                 :close_price, :yield_value, :created_at);'''.format(MyConnection.DIVIDENDS_TABLE)
 
+                add_dividends_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, add_dividends_command)
                 for dividend in dividends:
-                    add_dividends_query = QtSql.QSqlQuery(db)
-                    add_dividends_prepare_flag: bool = add_dividends_query.prepare(add_dividends_command)
-                    assert add_dividends_prepare_flag, add_dividends_query.lastError().text()
-
                     add_dividends_query.bindValue(':share_uid', uid)
                     add_dividends_query.bindValue(':dividend_net', MyMoneyValue.__repr__(dividend.dividend_net))
                     add_dividends_query.bindValue(':payment_date', MyConnection.convertDateTimeToText(dividend.payment_date))
@@ -1874,22 +2250,22 @@ class MainConnection(MyConnection):
             else:
                 setDividendsColumnValue('No')  # Заполняем столбец dividends значением.
 
-            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
+    COUPONS_DELETE: str = 'DELETE FROM \"{0}\" WHERE \"instrument_uid\" = :bond_uid;'.format(MyConnection.COUPONS_TABLE)
+
     @classmethod
     def setCoupons(cls, uid: str, coupons: list[Coupon]):
         """Обновляет купоны с переданным figi в таблице купонов."""
         db: QtSql.QSqlDatabase = cls.getDatabase()
-        if db.transaction():
+        if cls.beginTransaction(db):
             def setCouponsColumnValue(value: str):
                 """Заполняет столбец coupons значением."""
                 update_coupons_query_str: str = 'UPDATE \"{0}\" SET \"coupons\" = :coupons WHERE \"uid\" = :bond_uid;'.format(MyConnection.BONDS_TABLE)
-                coupons_query = QtSql.QSqlQuery(db)
-                coupons_prepare_flag: bool = coupons_query.prepare(update_coupons_query_str)
-                assert coupons_prepare_flag, coupons_query.lastError().text()
+                coupons_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, update_coupons_query_str)
                 coupons_query.bindValue(':coupons', value)
                 coupons_query.bindValue(':bond_uid', uid)
                 coupons_exec_flag: bool = coupons_query.exec()
@@ -1897,51 +2273,37 @@ class MainConnection(MyConnection):
 
             if coupons:  # Если список купонов не пуст.
                 '''----Удаляет из таблицы купонов все купоны, имеющие переданный uid----'''
-                delete_coupons_query_str: str = 'DELETE FROM \"{0}\" WHERE \"instrument_uid\" = :bond_uid;'.format(MyConnection.COUPONS_TABLE)
-                delete_coupons_query = QtSql.QSqlQuery(db)
-                delete_coupons_prepare_flag: bool = delete_coupons_query.prepare(delete_coupons_query_str)
-                assert delete_coupons_prepare_flag, delete_coupons_query.lastError().text()
+                delete_coupons_query: QtSql.QSqlQuery = cls.getPreparedQuery(db, cls.COUPONS_DELETE)
                 delete_coupons_query.bindValue(':bond_uid', uid)
                 delete_coupons_exec_flag: bool = delete_coupons_query.exec()
                 assert delete_coupons_exec_flag, delete_coupons_query.lastError().text()
                 '''---------------------------------------------------------------------'''
 
                 '''---------------------------Добавляет купоны в таблицу купонов---------------------------'''
-                add_coupons_command: str = '''INSERT INTO \"{0}\" (\"instrument_uid\", \"figi\", \"coupon_date\", 
-                \"coupon_number\", \"fix_date\", \"pay_one_bond\", \"coupon_type\", \"coupon_start_date\", 
-                \"coupon_end_date\", \"coupon_period\") VALUES '''.format(MyConnection.COUPONS_TABLE)
-                for i in range(len(coupons)):
-                    if i > 0: add_coupons_command += ', '  # Если добавляемый купон не первый.
-                    add_coupons_command += '''(:bond_uid{0}, :figi{0}, :coupon_date{0}, :coupon_number{0}, 
-                    :fix_date{0}, :pay_one_bond{0}, :coupon_type{0}, :coupon_start_date{0}, :coupon_end_date{0}, 
-                    :coupon_period{0})'''.format(i)
-                add_coupons_command += ';'
-
-                add_coupons_query = QtSql.QSqlQuery(db)
-                add_coupons_prepare_flag: bool = add_coupons_query.prepare(add_coupons_command)
-                assert add_coupons_prepare_flag, add_coupons_query.lastError().text()
-
-                for i, coupon in enumerate(coupons):
-                    add_coupons_query.bindValue(':bond_uid{0}'.format(i), uid)
-                    add_coupons_query.bindValue(':figi{0}'.format(i), coupon.figi)
-                    add_coupons_query.bindValue(':coupon_date{0}'.format(i), MyConnection.convertDateTimeToText(coupon.coupon_date))
-                    add_coupons_query.bindValue(':coupon_number{0}'.format(i), coupon.coupon_number)
-                    add_coupons_query.bindValue(':fix_date{0}'.format(i), MyConnection.convertDateTimeToText(coupon.fix_date))
-                    add_coupons_query.bindValue(':pay_one_bond{0}'.format(i), MyMoneyValue.__repr__(coupon.pay_one_bond))
-                    add_coupons_query.bindValue(':coupon_type{0}'.format(i), coupon.coupon_type.name)
-                    add_coupons_query.bindValue(':coupon_start_date{0}'.format(i), MyConnection.convertDateTimeToText(coupon.coupon_start_date))
-                    add_coupons_query.bindValue(':coupon_end_date{0}'.format(i), MyConnection.convertDateTimeToText(coupon.coupon_end_date))
-                    add_coupons_query.bindValue(':coupon_period{0}'.format(i), coupon.coupon_period)
-
-                add_coupons_exec_flag: bool = add_coupons_query.exec()
-                assert add_coupons_exec_flag, add_coupons_query.lastError().text()
+                coupons_columns: tuple[str, ...] = ('instrument_uid', 'figi', 'coupon_date', 'coupon_number', 'fix_date',
+                                                    'pay_one_bond', 'coupon_type', 'coupon_start_date', 'coupon_end_date',
+                                                    'coupon_period', 'pay_one_bond_currency')
+                coupons_rows: list[tuple] = [(
+                    uid,
+                    coupon.figi,
+                    MyConnection.convertDateTimeToText(coupon.coupon_date),
+                    coupon.coupon_number,
+                    MyConnection.convertDateTimeToText(coupon.fix_date),
+                    MyConnection.convertQuotationToInteger(coupon.pay_one_bond),
+                    coupon.coupon_type.name,
+                    MyConnection.convertDateTimeToText(coupon.coupon_start_date),
+                    MyConnection.convertDateTimeToText(coupon.coupon_end_date),
+                    coupon.coupon_period,
+                    coupon.pay_one_bond.currency
+                ) for coupon in coupons]
+                cls.bulkInsert(db, MyConnection.COUPONS_TABLE, coupons_columns, coupons_rows)
                 '''----------------------------------------------------------------------------------------'''
 
                 setCouponsColumnValue('Yes')  # Заполняем столбец coupons значением.
             else:
                 setCouponsColumnValue('No')  # Заполняем столбец coupons значением.
 
-            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
@@ -1949,120 +2311,67 @@ class MainConnection(MyConnection):
     @classmethod
     def insertAssetFull(cls, assetfull: AssetFull):
         """Добавляет AssetFull в таблицу активов."""
-        insert_asset_sql_command: str = '''INSERT INTO \"{0}\" (\"uid\", \"type\", \"name\", \"name_brief\", 
-        \"description\", \"deleted_at\", \"required_tests\", \"gos_reg_code\", \"cfi\", \"code_nsd\", \"status\", 
-        \"brand_uid\", \"updated_at\", \"br_code\", \"br_code_name\") VALUES (:uid, :type, :name, :name_brief, 
-        :description, :deleted_at, :required_tests, :gos_reg_code, :cfi, :code_nsd, :status, :brand_uid, 
-        :updated_at, :br_code, :br_code_name) ON CONFLICT(\"uid\") DO UPDATE SET \"type\" = {1}.\"type\", \"name\" 
-        = {1}.\"name\", \"name_brief\" = {1}.\"name_brief\", \"description\" = {1}.\"description\", \"deleted_at\" = 
-        {1}.\"deleted_at\", \"required_tests\" = {1}.\"required_tests\", \"gos_reg_code\" = {1}.\"gos_reg_code\", 
-        \"cfi\" = {1}.\"cfi\", \"code_nsd\" = {1}.\"code_nsd\", \"status\" = {1}.\"status\", \"brand_uid\" = 
-        {1}.\"brand_uid\", \"updated_at\" = {1}.\"updated_at\", \"br_code\" = {1}.\"br_code\", \"br_code_name\" = 
-        {1}.\"br_code_name\";'''.format(MyConnection.ASSETS_TABLE, '\"excluded\"')
-
-        insert_brands_command: str = '''INSERT INTO \"{0}\" (\"uid\", \"name\", \"description\", \"info\", \"company\", 
-        \"sector\", \"country_of_risk\", \"country_of_risk_name\") VALUES (:uid, :name, :description, :info, :company, 
-        :sector, :country_of_risk, :country_of_risk_name) ON CONFLICT (\"uid\") DO UPDATE SET \"name\" = {1}.\"name\", 
-        \"description\" = {1}.\"description\", \"info\" = {1}.\"info\", \"company\" = {1}.\"company\", \"sector\" = 
-        {1}.\"sector\", \"country_of_risk\" = {1}.\"country_of_risk\", \"country_of_risk_name\" = 
-        {1}.\"country_of_risk_name\";'''.format(MyConnection.BRANDS_TABLE, '\"excluded\"')
-
-        insert_asset_currency_command: str = '''INSERT INTO \"{0}\" (\"asset_uid\", \"base_currency\") VALUES 
-        (:asset_uid, :asset_currency) ON CONFLICT(\"asset_uid\") DO UPDATE SET \"base_currency\" = 
-        {1}.\"base_currency\";'''.format(
-            MyConnection.ASSET_CURRENCIES_TABLE,
-            '\"excluded\"'
+        assets_columns: tuple[str, ...] = ('uid', 'type', 'name', 'name_brief', 'description', 'deleted_at',
+                                           'required_tests', 'gos_reg_code', 'cfi', 'code_nsd', 'status', 'brand_uid',
+                                           'updated_at', 'br_code', 'br_code_name')
+        assets_conflict_clause: str = ' ON CONFLICT(\"uid\") DO UPDATE SET {0}'.format(
+            ', '.join('\"{0}\" = \"excluded\".\"{0}\"'.format(column) for column in assets_columns[1:])
+        )
+
+        brands_columns: tuple[str, ...] = ('uid', 'name', 'description', 'info', 'company', 'sector', 'country_of_risk', 'country_of_risk_name')
+        brands_conflict_clause: str = ' ON CONFLICT(\"uid\") DO UPDATE SET {0}'.format(
+            ', '.join('\"{0}\" = \"excluded\".\"{0}\"'.format(column) for column in brands_columns[1:])
+        )
+
+        asset_currencies_conflict_clause: str = ' ON CONFLICT(\"asset_uid\") DO UPDATE SET \"base_currency\" = \"excluded\".\"base_currency\"'
+
+        asset_securities_columns: tuple[str, ...] = ('asset_uid', 'isin', 'type', 'instrument_kind')
+        asset_securities_conflict_clause: str = ' ON CONFLICT(\"asset_uid\") DO UPDATE SET {0}'.format(
+            ', '.join('\"{0}\" = \"excluded\".\"{0}\"'.format(column) for column in asset_securities_columns[1:])
         )
 
         db: QSqlDatabase = cls.getDatabase()
-        if db.transaction():
-            def insertBrand(brand: Brand):
-                """Добавляет брэнд в таблицу брэндов."""
-                insert_brands_query = QSqlQuery(db)
-                insert_brands_prepare_flag: bool = insert_brands_query.prepare(insert_brands_command)
-                assert insert_brands_prepare_flag, insert_brands_query.lastError().text()
-                insert_brands_query.bindValue(':uid', brand.uid)
-                insert_brands_query.bindValue(':name', brand.name)
-                insert_brands_query.bindValue(':description', brand.description)
-                insert_brands_query.bindValue(':info', brand.info)
-                insert_brands_query.bindValue(':company', brand.company)
-                insert_brands_query.bindValue(':sector', brand.sector)
-                insert_brands_query.bindValue(':country_of_risk', brand.country_of_risk)
-                insert_brands_query.bindValue(':country_of_risk_name', brand.country_of_risk_name)
-                insert_brands_exec_flag: bool = insert_brands_query.exec()
-                assert insert_brands_exec_flag, insert_brands_query.lastError().text()
-
-            insertBrand(assetfull.brand)  # Добавляем брэнд в таблицу брэндов.
+        if cls.beginTransaction(db):
+            '''------------------Добавляем брэнд в таблицу брэндов------------------'''
+            brand: Brand = assetfull.brand
+            cls.bulkInsert(db, MyConnection.BRANDS_TABLE, brands_columns, [(
+                brand.uid, brand.name, brand.description, brand.info, brand.company, brand.sector,
+                brand.country_of_risk, brand.country_of_risk_name
+            )], brands_conflict_clause)
+            '''---------------------------------------------------------------------'''
 
             '''------------------Добавляем AssetFull в таблицу активов------------------'''
-            insert_asset_query = QSqlQuery(db)
-            insert_asset_prepare_flag: bool = insert_asset_query.prepare(insert_asset_sql_command)
-            assert insert_asset_prepare_flag, insert_asset_query.lastError().text()
-
-            insert_asset_query.bindValue(':uid', assetfull.uid)
-            insert_asset_query.bindValue(':type', assetfull.type.name)
-            insert_asset_query.bindValue(':name', assetfull.name)
-            insert_asset_query.bindValue(':name_brief', assetfull.name_brief)
-            insert_asset_query.bindValue(':description', assetfull.description)
-            insert_asset_query.bindValue(':deleted_at', MyConnection.convertDateTimeToText(assetfull.deleted_at))
-            insert_asset_query.bindValue(':required_tests', MyConnection.convertStrListToStr(assetfull.required_tests))
-            insert_asset_query.bindValue(':gos_reg_code', assetfull.gos_reg_code)
-            insert_asset_query.bindValue(':cfi', assetfull.cfi)
-            insert_asset_query.bindValue(':code_nsd', assetfull.code_nsd)
-            insert_asset_query.bindValue(':status', assetfull.status)
-            insert_asset_query.bindValue(':brand_uid', assetfull.brand.uid)
-            insert_asset_query.bindValue(':updated_at', MyConnection.convertDateTimeToText(dt=assetfull.updated_at, timespec='microseconds'))
-            insert_asset_query.bindValue(':br_code', assetfull.br_code)
-            insert_asset_query.bindValue(':br_code_name', assetfull.br_code_name)
-
-            insert_asset_exec_flag: bool = insert_asset_query.exec()
-            assert insert_asset_exec_flag, insert_asset_query.lastError().text()
+            cls.bulkInsert(db, MyConnection.ASSETS_TABLE, assets_columns, [(
+                assetfull.uid, assetfull.type.name, assetfull.name, assetfull.name_brief, assetfull.description,
+                MyConnection.convertDateTimeToText(assetfull.deleted_at),
+                MyConnection.convertStrListToStr(assetfull.required_tests), assetfull.gos_reg_code, assetfull.cfi,
+                assetfull.code_nsd, assetfull.status, assetfull.brand.uid,
+                MyConnection.convertDateTimeToText(dt=assetfull.updated_at, timespec='microseconds'),
+                assetfull.br_code, assetfull.br_code_name
+            )], assets_conflict_clause)
             '''-------------------------------------------------------------------------'''
 
             '''---Если тип актива соответствует валюте, то добавляем валюту в таблицу валют активов---'''
             if assetfull.type is AssetType.ASSET_TYPE_CURRENCY:
-                def insertAssetCurrency(asset_uid: str, asset_currency: AssetCurrency):
-                    """Добавляет валюту в таблицу валют активов."""
-                    insert_asset_currency_query = QSqlQuery(db)
-                    insert_asset_currency_prepare_flag: bool = insert_asset_currency_query.prepare(insert_asset_currency_command)
-                    assert insert_asset_currency_prepare_flag, insert_asset_currency_query.lastError().text()
-                    insert_asset_currency_query.bindValue(':asset_uid', asset_uid)
-                    insert_asset_currency_query.bindValue(':asset_currency', asset_currency.base_currency)
-                    insert_asset_currency_exec_flag: bool = insert_asset_currency_query.exec()
-                    assert insert_asset_currency_exec_flag, insert_asset_currency_query.lastError().text()
-
-                insertAssetCurrency(assetfull.uid, assetfull.currency)  # Добавляем валюту в таблицу валют активов.
+                asset_currency: AssetCurrency = assetfull.currency
+                cls.bulkInsert(db, MyConnection.ASSET_CURRENCIES_TABLE, ('asset_uid', 'base_currency'), [(assetfull.uid, asset_currency.base_currency)], asset_currencies_conflict_clause)
             else:
                 assert assetfull.currency is None, 'Если тип актива не соответствует валюте, то поле \"currency\" должно иметь значение None, а получено {0}!'.format(assetfull.currency)
             '''---------------------------------------------------------------------------------------'''
 
             '''--Если тип актива соответствует ценной бумаге, то добавляем ценную бумагу в таблицу ценных бумаг--'''
             if assetfull.type is AssetType.ASSET_TYPE_SECURITY:
-                def insertAssetSecurity(asset_uid: str, security: AssetSecurity):
-                    """Добавляет ценную бумагу в таблицу ценных бумаг активов."""
-                    insert_asset_security_sql_command: str = '''INSERT INTO \"{0}\" (\"asset_uid\", \"isin\", \"type\", 
-                    \"instrument_kind\") VALUES (:asset_uid, :isin, :type, :instrument_kind) ON CONFLICT(\"asset_uid\") 
-                    DO UPDATE SET \"isin\" = {1}.\"isin\", \"type\" = {1}.\"type\", \"instrument_kind\" = 
-                    {1}.\"instrument_kind\";'''.format(MyConnection.ASSET_SECURITIES_TABLE, '\"excluded\"')
-                    insert_asset_security_query = QSqlQuery(db)
-                    insert_asset_security_prepare_flag: bool = insert_asset_security_query.prepare(insert_asset_security_sql_command)
-                    assert insert_asset_security_prepare_flag, insert_asset_security_query.lastError().text()
-                    insert_asset_security_query.bindValue(':asset_uid', asset_uid)
-                    insert_asset_security_query.bindValue(':isin', security.isin)
-                    insert_asset_security_query.bindValue(':type', security.type)
-                    insert_asset_security_query.bindValue(':instrument_kind', security.instrument_kind.name)
-                    insert_asset_security_exec_flag: bool = insert_asset_security_query.exec()
-                    assert insert_asset_security_exec_flag, insert_asset_security_query.lastError().text()
-
-                insertAssetSecurity(assetfull.uid, assetfull.security)
+                security: AssetSecurity = assetfull.security
+                cls.bulkInsert(db, MyConnection.ASSET_SECURITIES_TABLE, asset_securities_columns, [(
+                    assetfull.uid, security.isin, security.type, security.instrument_kind.name
+                )], asset_securities_conflict_clause)
             else:
                 assert assetfull.security is None, 'Если тип актива не соответствует ценной бумаге, то поле \"security\" должно иметь значение None, а получено {0}!'.format(assetfull.security)
             '''--------------------------------------------------------------------------------------------------'''
 
-            for instrument in assetfull.instruments:
-                MainConnection.addAssetInstrument(db, assetfull.uid, instrument)  # Добавляем идентификаторы инструмента актива в таблицу идентификаторов инструментов активов.
+            cls.addAssetInstruments(db, [(assetfull.uid, instrument) for instrument in assetfull.instruments])  # Добавляем идентификаторы инструментов актива в таблицу идентификаторов инструментов активов.
 
-            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
@@ -2070,7 +2379,7 @@ class MainConnection(MyConnection):
     @classmethod
     def insertForecasts(cls, forecast: GetForecastResponse):
         db: QSqlDatabase = cls.getDatabase()
-        if db.transaction():
+        if cls.beginTransaction(db):
             def getLastConsensusFull(instrument_uid: str) -> ConsensusFull | None:
                 # __select_last_consensus: str = '''SELECT \"instrument_uid\", MAX(\"consensus_number\") AS
                 # \"consensus_number\", \"ticker\", \"recommendation\", \"currency\", \"current_price\", \"consensus\",
@@ -2111,62 +2420,37 @@ class MainConnection(MyConnection):
             if last_consensus_full is None:
                 new_consensus_number: int = 0
             elif getForecastResponseEq(forecast, last_consensus_full):
-                commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+                commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
                 assert commit_flag, db.lastError().text()
                 return
             else:
                 new_consensus_number: int = last_consensus_full.number + 1
 
-            __insert_consensus_command: str = '''INSERT INTO \"{0}\" (\"instrument_uid\", \"consensus_number\", 
-            \"ticker\", \"recommendation\", \"currency\", \"current_price\", \"consensus\", \"min_target\", 
-            \"max_target\", \"price_change\", \"price_change_rel\") VALUES (:instrument_uid, :consensus_number, :ticker, 
-            :recommendation, :currency, :current_price, :consensus, :min_target, :max_target, :price_change, 
-            :price_change_rel);'''.format(MyConnection.CONSENSUS_ITEMS_TABLE)
-
-            insert_consensus_query = QtSql.QSqlQuery(db)
-            insert_consensus_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            insert_consensus_prepare_flag: bool = insert_consensus_query.prepare(__insert_consensus_command)
-            assert insert_consensus_prepare_flag, insert_consensus_query.lastError().text()
-            insert_consensus_query.bindValue(':instrument_uid', forecast.consensus.uid)
-            insert_consensus_query.bindValue(':consensus_number', new_consensus_number)
-            insert_consensus_query.bindValue(':ticker', forecast.consensus.ticker)
-            insert_consensus_query.bindValue(':recommendation', forecast.consensus.recommendation.name)
-            insert_consensus_query.bindValue(':currency', forecast.consensus.currency)
-            insert_consensus_query.bindValue(':current_price', MyQuotation.__repr__(forecast.consensus.current_price))
-            insert_consensus_query.bindValue(':consensus', MyQuotation.__repr__(forecast.consensus.consensus))
-            insert_consensus_query.bindValue(':min_target', MyQuotation.__repr__(forecast.consensus.min_target))
-            insert_consensus_query.bindValue(':max_target', MyQuotation.__repr__(forecast.consensus.max_target))
-            insert_consensus_query.bindValue(':price_change', MyQuotation.__repr__(forecast.consensus.price_change))
-            insert_consensus_query.bindValue(':price_change_rel', MyQuotation.__repr__(forecast.consensus.price_change_rel))
-            insert_consensus_exec_flag: bool = insert_consensus_query.exec()
-            assert insert_consensus_exec_flag, insert_consensus_query.lastError().text()
-
-            __insert_target_command: str = '''INSERT INTO \"{0}\" (\"instrument_uid\", \"consensus_number\", \"ticker\", 
-            \"company\", \"recommendation\", \"recommendation_date\", \"currency\", \"current_price\", \"target_price\", 
-            \"price_change\", \"price_change_rel\", \"show_name\") VALUES (:instrument_uid, :consensus_number, :ticker, 
-            :company, :recommendation, :recommendation_date, :currency, :current_price, :target_price, :price_change, 
-            :price_change_rel, :show_name);'''.format(MyConnection.TARGET_ITEMS_TABLE)
-
-            for target in forecast.targets:
-                insert_target_query = QSqlQuery(db)
-                insert_target_prepare_flag: bool = insert_target_query.prepare(__insert_target_command)
-                assert insert_target_prepare_flag, insert_target_query.lastError().text()
-                insert_target_query.bindValue(':instrument_uid', target.uid)
-                insert_target_query.bindValue(':consensus_number', new_consensus_number)
-                insert_target_query.bindValue(':ticker', target.ticker)
-                insert_target_query.bindValue(':company', target.company)
-                insert_target_query.bindValue(':recommendation', target.recommendation.name)
-                insert_target_query.bindValue(':recommendation_date', MyConnection.convertDateTimeToText(target.recommendation_date))
-                insert_target_query.bindValue(':currency', target.currency)
-                insert_target_query.bindValue(':current_price', MyQuotation.__repr__(target.current_price))
-                insert_target_query.bindValue(':target_price', MyQuotation.__repr__(target.target_price))
-                insert_target_query.bindValue(':price_change', MyQuotation.__repr__(target.price_change))
-                insert_target_query.bindValue(':price_change_rel', MyQuotation.__repr__(target.price_change_rel))
-                insert_target_query.bindValue(':show_name', target.show_name)
-                insert_target_exec_flag: bool = insert_target_query.exec()
-                assert insert_target_exec_flag, insert_target_query.lastError().text()
-
-            commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
+            consensus: ConsensusItem = forecast.consensus
+            cls.bulkInsert(db, MyConnection.CONSENSUS_ITEMS_TABLE, (
+                'instrument_uid', 'consensus_number', 'ticker', 'recommendation', 'currency', 'current_price',
+                'consensus', 'min_target', 'max_target', 'price_change', 'price_change_rel'
+            ), [(
+                consensus.uid, new_consensus_number, consensus.ticker, consensus.recommendation.name,
+                consensus.currency, MyQuotation.__repr__(consensus.current_price),
+                MyQuotation.__repr__(consensus.consensus), MyQuotation.__repr__(consensus.min_target),
+                MyQuotation.__repr__(consensus.max_target), MyQuotation.__repr__(consensus.price_change),
+                MyQuotation.__repr__(consensus.price_change_rel)
+            )])
+
+            targets_rows: list[tuple] = [(
+                target.uid, new_consensus_number, target.ticker, target.company, target.recommendation.name,
+                MyConnection.convertDateTimeToText(target.recommendation_date), target.currency,
+                MyQuotation.__repr__(target.current_price), MyQuotation.__repr__(target.target_price),
+                MyQuotation.__repr__(target.price_change), MyQuotation.__repr__(target.price_change_rel),
+                target.show_name
+            ) for target in forecast.targets]
+            cls.bulkInsert(db, MyConnection.TARGET_ITEMS_TABLE, (
+                'instrument_uid', 'consensus_number', 'ticker', 'company', 'recommendation', 'recommendation_date',
+                'currency', 'current_price', 'target_price', 'price_change', 'price_change_rel', 'show_name'
+            ), targets_rows)
+
+            commit_flag: bool = cls.commitTransaction(db)  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
@@ -2175,40 +2459,22 @@ class MainConnection(MyConnection):
     def insertConsensusForecasts(cls, consensuses: list[ConsensusForecastsItem]):
         db: QSqlDatabase = cls.getDatabase()
         if db.transaction():
-            __insert_command: str = '''INSERT INTO \"{0}\" (\"uid\", \"asset_uid\", \"created_at\", 
-            \"best_target_price\", \"best_target_low\", \"best_target_high\", \"total_buy_recommend\", 
-            \"total_hold_recommend\", \"total_sell_recommend\", \"currency\", \"consensus\", \"prognosis_date\") VALUES 
-            (:uid, :asset_uid, :created_at, :best_target_price, :best_target_low, :best_target_high, 
-            :total_buy_recommend, :total_hold_recommend, :total_sell_recommend, :currency, :consensus, :prognosis_date) 
-            ON CONFLICT(\"uid\") DO UPDATE SET \"asset_uid\" = {1}.\"asset_uid\", \"created_at\" = {1}.\"created_at\", 
-            \"best_target_price\" = {1}.\"best_target_price\", \"best_target_low\" = {1}.\"best_target_low\", 
-            \"best_target_high\" = {1}.\"best_target_high\", \"total_buy_recommend\" = {1}.\"total_buy_recommend\", 
-            \"total_hold_recommend\" = {1}.\"total_hold_recommend\", \"total_sell_recommend\" = 
-            {1}.\"total_sell_recommend\", \"currency\" = {1}.\"currency\", \"consensus\" = {1}.\"consensus\", 
-            \"prognosis_date\" = {1}.\"prognosis_date\";'''.format(
-                MyConnection.CONSENSUS_FORECASTS_TABLE,
-                '\"excluded\"'
+            consensus_forecasts_columns: tuple[str, ...] = (
+                'uid', 'asset_uid', 'created_at', 'best_target_price', 'best_target_low', 'best_target_high',
+                'total_buy_recommend', 'total_hold_recommend', 'total_sell_recommend', 'currency', 'consensus',
+                'prognosis_date'
             )
-
-            for consensus in consensuses:
-                insert_query = QtSql.QSqlQuery(db)
-                insert_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                insert_prepare_flag: bool = insert_query.prepare(__insert_command)
-                assert insert_prepare_flag, insert_query.lastError().text()
-                insert_query.bindValue(':uid', consensus.uid)
-                insert_query.bindValue(':asset_uid', consensus.asset_uid)
-                insert_query.bindValue(':created_at', MyConnection.convertDateTimeToText(consensus.created_at))
-                insert_query.bindValue(':best_target_price', MyQuotation.__repr__(consensus.best_target_price))
-                insert_query.bindValue(':best_target_low', MyQuotation.__repr__(consensus.best_target_low))
-                insert_query.bindValue(':best_target_high', MyQuotation.__repr__(consensus.best_target_high))
-                insert_query.bindValue(':total_buy_recommend', consensus.total_buy_recommend)
-                insert_query.bindValue(':total_hold_recommend', consensus.total_hold_recommend)
-                insert_query.bindValue(':total_sell_recommend', consensus.total_sell_recommend)
-                insert_query.bindValue(':currency', consensus.currency)
-                insert_query.bindValue(':consensus', consensus.consensus.name)
-                insert_query.bindValue(':prognosis_date', MyConnection.convertDateTimeToText(consensus.prognosis_date))
-                insert_exec_flag: bool = insert_query.exec()
-                assert insert_exec_flag, insert_query.lastError().text()
+            conflict_clause: str = ' ON CONFLICT(\"uid\") DO UPDATE SET {0}'.format(
+                ', '.join('\"{0}\" = \"excluded\".\"{0}\"'.format(column) for column in consensus_forecasts_columns[1:])
+            )
+            rows: list[tuple] = [(
+                consensus.uid, consensus.asset_uid, MyConnection.convertDateTimeToText(consensus.created_at),
+                MyQuotation.__repr__(consensus.best_target_price), MyQuotation.__repr__(consensus.best_target_low),
+                MyQuotation.__repr__(consensus.best_target_high), consensus.total_buy_recommend,
+                consensus.total_hold_recommend, consensus.total_sell_recommend, consensus.currency,
+                consensus.consensus.name, MyConnection.convertDateTimeToText(consensus.prognosis_date)
+            ) for consensus in consensuses]
+            cls.bulkInsert(db, MyConnection.CONSENSUS_FORECASTS_TABLE, consensus_forecasts_columns, rows, conflict_clause)
 
             commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
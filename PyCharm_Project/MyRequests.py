@@ -1,18 +1,78 @@
 from __future__ import annotations
+import random
+import threading
+import time
 from datetime import datetime
-from tinkoff.invest import RequestError, Account, Client, UnaryLimit, StreamLimit, GetUserTariffResponse, \
+from typing import Callable
+from grpc import StatusCode
+from tinkoff.invest import RequestError, Account, UnaryLimit, StreamLimit, GetUserTariffResponse, \
     InstrumentStatus, Share, LastPrice, Dividend, Bond, InstrumentType, Asset, AssetFull, HistoricCandle, \
     CandleInterval, Coupon
 from tinkoff.invest.schemas import GetForecastRequest, GetForecastResponse, GetConsensusForecastsRequest, \
     GetConsensusForecastsResponse, Page
-from tinkoff.invest.services import InstrumentsService
+from tinkoff.invest.services import InstrumentsService, Services
+from ClientsPool import ClientsPool, PooledChannel
+
+
+class RetryPolicy:
+    """Политика повторных попыток запроса: экспоненциальная задержка со случайным разбросом,
+    ограничение количества попыток и разделение кодов ошибок на допускающие повтор и фатальные."""
+    FATAL_CODES: frozenset[StatusCode] = frozenset({
+        StatusCode.INVALID_ARGUMENT,
+        StatusCode.NOT_FOUND,
+        StatusCode.ALREADY_EXISTS,
+        StatusCode.PERMISSION_DENIED,
+        StatusCode.FAILED_PRECONDITION,
+        StatusCode.OUT_OF_RANGE,
+        StatusCode.UNIMPLEMENTED,
+        StatusCode.UNAUTHENTICATED
+    })  # Коды ошибок, при которых повторять запрос бессмысленно.
+
+    def __init__(self, base_delay: float = 0.5, factor: float = 2.0, max_delay: float = 30.0, jitter: float = 0.5,
+                 max_attempts: int = 10, fatal_codes: frozenset[StatusCode] | None = None):
+        assert max_attempts > 0, 'Количество попыток запроса должно быть положительным!'
+        self.base_delay: float = base_delay  # Задержка перед первой повторной попыткой, в секундах.
+        self.factor: float = factor  # Множитель задержки.
+        self.max_delay: float = max_delay  # Максимальная задержка, в секундах.
+        self.jitter: float = jitter  # Доля случайного разброса задержки (от 0 до 1).
+        self.max_attempts: int = max_attempts  # Максимальное количество попыток запроса, если вызывающий код его не задал.
+        self.fatal_codes: frozenset[StatusCode] = self.FATAL_CODES if fatal_codes is None else fatal_codes
+
+        '''------------Статистические переменные------------'''
+        self.__lock: threading.Lock = threading.Lock()
+        self.retry_count: int = 0  # Общее количество повторных попыток.
+        self.backoff_time: float = 0.0  # Общее время ожидания перед повторными попытками, в секундах.
+        '''-------------------------------------------------'''
+
+    def isFatal(self, response: MyResponse) -> bool:
+        """Возвращает True, если после такого ответа повторять запрос не нужно."""
+        return bool(response.request_error_flag) and response.request_error.code in self.fatal_codes
+
+    def getDelay(self, retry_number: int) -> float:
+        """Возвращает задержку (в секундах) перед повторной попыткой с номером retry_number (начиная с 1)."""
+        delay: float = min(self.base_delay * (self.factor ** (retry_number - 1)), self.max_delay)
+        return delay * (1.0 - self.jitter * random.random())
+
+    def registerBackoff(self, delay: float):
+        """Учитывает повторную попытку и время ожидания перед ней."""
+        with self.__lock:
+            self.retry_count += 1
+            self.backoff_time += delay
+
+
+DEFAULT_RETRY_POLICY: RetryPolicy = RetryPolicy()  # Политика повторных попыток по умолчанию.
 
 
 class RequestTryClass:
     """Класс для контроля количества попыток получения ответа на запрос."""
-    def __init__(self, max_request_try_count: int = -1):
+    INTERRUPTION_CHECK_INTERVAL: float = 0.1  # Интервал проверки прерывания во время ожидания, в секундах.
+
+    def __init__(self, max_request_try_count: int = -1, policy: RetryPolicy | None = None):
         self.__request_try_count: int = 0  # Количество произведённых попыток запроса.
-        self.__max_request_try_count: int = max_request_try_count  # Максимальное количество попыток запроса.
+        self.__policy: RetryPolicy = DEFAULT_RETRY_POLICY if policy is None else policy  # Политика повторных попыток.
+        self.__max_request_try_count: int = self.__policy.max_attempts if max_request_try_count < 0 else max_request_try_count  # Максимальное количество попыток запроса.
+        self.__fatal: bool = False  # Флаг фатальной ошибки.
+        self.backoff_time: float = 0.0  # Время ожидания перед повторными попытками, в секундах.
 
     def __iadd__(self, other: int) -> RequestTryClass:
         """self += other"""
@@ -21,8 +81,44 @@ class RequestTryClass:
 
     def __bool__(self) -> bool:
         """Возвращает True, если количество произведённых попыток запроса меньше максимального, иначе возвращает False.
-        Если максимальное количество попыток запроса меньше нуля, то всегда возвращает True."""
-        return True if self.__max_request_try_count < 0 else self.__request_try_count < self.__max_request_try_count
+        Если максимальное количество попыток запроса меньше нуля, то оно ограничивается политикой (RetryPolicy.max_attempts).
+        После фатальной ошибки всегда возвращает False."""
+        if self.__fatal:
+            return False
+        return self.__request_try_count < self.__max_request_try_count
+
+    @property
+    def retry_count(self) -> int:
+        """Количество повторных попыток."""
+        return max(self.__request_try_count - 1, 0)
+
+    def registerResponse(self, response: MyResponse):
+        """Учитывает произведённую попытку запроса и определяет, допускает ли ответ повтор."""
+        self.__request_try_count += 1
+        if not response.ifDataSuccessfullyReceived() and self.__policy.isFatal(response):
+            self.__fatal = True
+
+    def getBackoffDelay(self) -> float:
+        """Возвращает задержку (в секундах) перед следующей попыткой. Перед первой попыткой задержки нет."""
+        return 0.0 if self.__request_try_count == 0 else self.__policy.getDelay(self.__request_try_count)
+
+    def registerBackoff(self, delay: float):
+        """Учитывает время ожидания перед повторной попыткой."""
+        self.backoff_time += delay
+        self.__policy.registerBackoff(delay)
+
+    def backoff(self, interruption_function: Callable[[], bool] | None = None):
+        """Блокирует вызов на время задержки перед повторной попыткой.
+        Ожидание прекращается досрочно, если interruption_function возвращает True."""
+        delay: float = self.getBackoffDelay()
+        if delay <= 0.0: return
+        end_time: float = time.monotonic() + delay
+        while True:
+            remaining: float = end_time - time.monotonic()
+            if remaining <= 0.0 or (interruption_function is not None and interruption_function()):
+                break
+            time.sleep(min(remaining, self.INTERRUPTION_CHECK_INTERVAL))
+        self.registerBackoff(delay - max(end_time - time.monotonic(), 0.0))
 
 
 class MyResponse:
@@ -54,320 +150,97 @@ class MyResponse:
             return False
 
 
-def getAccounts(token: str, show_unauthenticated_error: bool = True) -> MyResponse:
-    """Получает и возвращает список счетов."""
-    accounts: list[Account] = []
+def _sendRequest(token: str, method_name: str, request: Callable[[Services], ...], default=None) -> MyResponse:
+    """Выполняет запрос через канал из пула ClientsPool и возвращает результат в виде MyResponse."""
+    response_data = default
     request_occurred: bool = False  # Флаг произведённого запроса.
     exception_flag: bool | None = None  # Флаг наличия исключения.
     exception: Exception | None = None  # Исключение.
     request_error_flag: bool | None = None  # Флаг наличия RequestError.
     request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            accounts = client.users.get_accounts().accounts
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-            # if show_unauthenticated_error:
-            #     self.showRequestError('get_accounts()', error)  # Отображает исключение RequestError.
-            # elif not ifTokenIsUnauthenticated(error):  # Если токен прошёл проверку подлинности.
-            #     self.showRequestError('get_accounts()', error)  # Отображает исключение RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-            # self.showException('get_accounts()', error)  # Отображает исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_accounts()', request_occurred, accounts, exception_flag, exception, request_error_flag, request_error)
+    channel: PooledChannel = ClientsPool.acquire(token)
+    start_time: float = time.perf_counter()
+    try:
+        response_data = request(channel.services)
+    except RequestError as error:
+        request_error_flag = True  # Флаг наличия RequestError.
+        request_error = error  # RequestError.
+    except Exception as error:
+        exception_flag = True  # Флаг наличия исключения.
+        exception = error  # Исключение.
+    else:  # Если исключения не было.
+        exception_flag = False  # Флаг наличия исключения.
+        request_error_flag = False  # Флаг наличия RequestError.
+    request_occurred = True  # Флаг произведённого запроса.
+    ClientsPool.release(token, channel, time.perf_counter() - start_time, request_error if request_error_flag else exception)
+    return MyResponse(method_name=method_name,
+                      request_occurred=request_occurred,
+                      response_data=response_data,
+                      exception_flag=exception_flag,
+                      exception=exception,
+                      request_error_flag=request_error_flag,
+                      request_error=request_error)
+
+
+def getAccounts(token: str, show_unauthenticated_error: bool = True) -> MyResponse:
+    """Получает и возвращает список счетов."""
+    return _sendRequest(token, 'get_accounts()', lambda client: client.users.get_accounts().accounts, [])
 
 
 def getUserTariff(token: str, show_unauthenticated_error: bool = True) -> MyResponse:
     """Получает и возвращает текущие лимиты пользователя."""
-    unary_limits: list[UnaryLimit] = []  # Список лимитов пользователя по unary-запросам.
-    stream_limits: list[StreamLimit] = []  # Список лимитов пользователей для stream-соединений.
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            user_tariff_response: GetUserTariffResponse = client.users.get_user_tariff()
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-            # if show_unauthenticated_error:
-            #     self.showRequestError('get_user_tariff()', error)  # Отображает исключение RequestError.
-            # elif not ifTokenIsUnauthenticated(error):  # Если токен прошёл проверку подлинности.
-            #     self.showRequestError('get_user_tariff()', error)  # Отображает исключение RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-            # self.showException('get_user_tariff()', error)  # Отображает исключение.
-        else:  # Если исключения не было.
-            unary_limits = user_tariff_response.unary_limits
-            stream_limits = user_tariff_response.stream_limits
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_user_tariff()', request_occurred, (unary_limits, stream_limits), exception_flag, exception, request_error_flag, request_error)
+    def __request(client: Services) -> tuple[list[UnaryLimit], list[StreamLimit]]:
+        user_tariff_response: GetUserTariffResponse = client.users.get_user_tariff()
+        return user_tariff_response.unary_limits, user_tariff_response.stream_limits
+
+    return _sendRequest(token, 'get_user_tariff()', __request, ([], []))
 
 
 def getShares(token: str, instrument_status: InstrumentStatus) -> MyResponse:
     """Получает и возвращает список акций."""
-    shares_list: list[Share] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            shares_list = client.instruments.shares(instrument_status=instrument_status).instruments
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('shares()', request_occurred, shares_list, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'shares()', lambda client: client.instruments.shares(instrument_status=instrument_status).instruments, [])
 
 
 def getBonds(token: str, instrument_status: InstrumentStatus) -> MyResponse:
     """Получает и возвращает список облигаций."""
-    bonds_list: list[Bond] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            bonds_list = client.instruments.bonds(instrument_status=instrument_status).instruments
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('bonds()', request_occurred, bonds_list, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'bonds()', lambda client: client.instruments.bonds(instrument_status=instrument_status).instruments, [])
 
 
 def getLastPrices(token: str, instrument_uid: list[str] | None = None) -> MyResponse:
     """Получает и возвращает список цен последних сделок."""
-    last_prices: list[LastPrice] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            last_prices = client.market_data.get_last_prices(instrument_id=instrument_uid).last_prices
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_last_prices()', request_occurred, last_prices, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'get_last_prices()', lambda client: client.market_data.get_last_prices(instrument_id=instrument_uid).last_prices, [])
 
 
 def getCoupons(token: str, figi: str = "", from_: datetime | None = None, to: datetime | None = None, instrument_id: str = "") -> MyResponse:
     """Получает и возвращает список купонов облигации."""
-    coupons: list[Coupon] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            coupons = client.instruments.get_bond_coupons(figi=figi, from_=from_, to=to, instrument_id=instrument_id).events
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_bond_coupons()', request_occurred, coupons, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'get_bond_coupons()', lambda client: client.instruments.get_bond_coupons(figi=figi, from_=from_, to=to, instrument_id=instrument_id).events, [])
 
 
 def getDividends(token: str, figi: str = "", from_: datetime | None = None, to: datetime | None = None, instrument_id: str = "") -> MyResponse:
     """Получает и возвращает список дивидендов."""
-    dividends: list[Dividend] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            dividends = client.instruments.get_dividends(figi=figi, from_=from_, to=to, instrument_id=instrument_id).dividends
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_dividends()', request_occurred, dividends, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'get_dividends()', lambda client: client.instruments.get_dividends(figi=figi, from_=from_, to=to, instrument_id=instrument_id).dividends, [])
 
 
 def getAssets(token: str, instruments_type: InstrumentType) -> MyResponse:
     """Получает и возвращает список активов."""
-    assets: list[Asset] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            assets = client.instruments.get_assets().assets
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_assets()', request_occurred, assets, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'get_assets()', lambda client: client.instruments.get_assets().assets, [])
 
 
 def getAssetBy(token: str, asset_uid: str) -> MyResponse:
     """Получает и возвращает данные об активе."""
-    asset_full: AssetFull | None = None
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            asset_full = client.instruments.get_asset_by(id=asset_uid)
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse('get_asset_by()', request_occurred, asset_full, exception_flag, exception, request_error_flag, request_error)
+    return _sendRequest(token, 'get_asset_by()', lambda client: client.instruments.get_asset_by(id=asset_uid))
 
 
 def getCandles(token: str, uid: str, interval: CandleInterval, from_: datetime | None = None, to: datetime | None = None) -> MyResponse:
     """Получает и возвращает список исторических свечей инструмента."""
-    candles: list[HistoricCandle] = []
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            candles = client.market_data.get_candles(from_=from_, to=to, interval=interval, instrument_id=uid).candles
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse(method_name='get_candles()',
-                      request_occurred=request_occurred,
-                      response_data=candles,
-                      exception_flag=exception_flag,
-                      exception=exception,
-                      request_error_flag=request_error_flag,
-                      request_error=request_error)
+    return _sendRequest(token, 'get_candles()', lambda client: client.market_data.get_candles(from_=from_, to=to, interval=interval, instrument_id=uid).candles, [])
 
 
 def getForecast(token: str, uid: str) -> MyResponse:
     """Получает и возвращает прогнозы инвестдомов по инструменту."""
-    forecasts: GetForecastResponse | None = None
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            forecasts = client.instruments.get_forecast_by(request=GetForecastRequest(instrument_id=uid))
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse(method_name=InstrumentsService.get_forecast_by.__name__,
-                      request_occurred=request_occurred,
-                      response_data=forecasts,
-                      exception_flag=exception_flag,
-                      exception=exception,
-                      request_error_flag=request_error_flag,
-                      request_error=request_error)
+    return _sendRequest(token, InstrumentsService.get_forecast_by.__name__, lambda client: client.instruments.get_forecast_by(request=GetForecastRequest(instrument_id=uid)))
 
 
 def getConsensusForecasts(token: str, page: Page | None) -> MyResponse:
     """Получает и возвращает консенсус-прогнозы."""
-    forecasts: GetConsensusForecastsResponse | None = None
-    request_occurred: bool = False  # Флаг произведённого запроса.
-    exception_flag: bool | None = None  # Флаг наличия исключения.
-    exception: Exception | None = None  # Исключение.
-    request_error_flag: bool | None = None  # Флаг наличия RequestError.
-    request_error: RequestError | None = None  # RequestError.
-    with Client(token) as client:
-        try:
-            forecasts = client.instruments.get_consensus_forecasts(request=GetConsensusForecastsRequest(paging=page))
-        except RequestError as error:
-            request_error_flag = True  # Флаг наличия RequestError.
-            request_error = error  # RequestError.
-        except Exception as error:
-            exception_flag = True  # Флаг наличия исключения.
-            exception = error  # Исключение.
-        else:  # Если исключения не было.
-            exception_flag = False  # Флаг наличия исключения.
-            request_error_flag = False  # Флаг наличия RequestError.
-        request_occurred = True  # Флаг произведённого запроса.
-    return MyResponse(method_name=InstrumentsService.get_consensus_forecasts.__name__,
-                      request_occurred=request_occurred,
-                      response_data=forecasts,
-                      exception_flag=exception_flag,
-                      exception=exception,
-                      request_error_flag=request_error_flag,
-                      request_error=request_error)
+    return _sendRequest(token, InstrumentsService.get_consensus_forecasts.__name__, lambda client: client.instruments.get_consensus_forecasts(request=GetConsensusForecastsRequest(paging=page)))
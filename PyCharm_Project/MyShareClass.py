@@ -1,11 +1,15 @@
+from PyQt6 import QtCore
 from tinkoff.invest import Share, Dividend, LastPrice, HistoricCandle
 from MyLastPrice import MyLastPrice
 from MyMoneyValue import MyMoneyValue
 
 
-class MyShareClass:
+class MyShareClass(QtCore.QObject):
     """Мой класс акций."""
-    def __init__(self, share: Share, last_price: LastPrice | None = None, dividends: list[Dividend] | None = None, candles: list[HistoricCandle] | None = None):
+    lastPriceChanged_signal: QtCore.pyqtSignal = QtCore.pyqtSignal()  # Сигнал, испускаемый при изменении последней цены.
+
+    def __init__(self, share: Share, last_price: LastPrice | None = None, dividends: list[Dividend] | None = None, candles: list[HistoricCandle] | None = None, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
         self.share: Share = share
         self.last_price: LastPrice | None = last_price
         self.__dividends: list[Dividend] | None = dividends  # Дивиденды.
@@ -27,6 +31,18 @@ class MyShareClass:
         """Возвращает инструмент (акцию), хранящийся в классе."""
         return self.share
 
+    def setLastPrice(self, last_price: LastPrice | None):
+        """Назначает последнюю цену акции."""
+        if last_price is None:
+            if self.last_price is not None:
+                self.last_price = last_price
+                self.lastPriceChanged_signal.emit()  # Испускаем сигнал о том, что последняя цена была изменена.
+        else:
+            assert self.share.uid == last_price.instrument_uid, 'Uid-идентификаторы акции и последней цены должны совпадать (\'{0}\' и \'{1}\')!'.format(self.share.uid, last_price.instrument_uid)
+            if self.last_price is None or not MyLastPrice.__eq__(last_price, self.last_price):
+                self.last_price = last_price
+                self.lastPriceChanged_signal.emit()  # Испускаем сигнал о том, что последняя цена была изменена.
+
     def getLastPrice(self) -> MyMoneyValue | None:
         """Рассчитывает последнюю цену одной акции."""
         # Валюта акции содержится как в currency, так и в nominal.currency. Откуда брать валюту?
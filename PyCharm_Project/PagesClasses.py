@@ -4,6 +4,7 @@ from PyQt6 import QtCore, QtWidgets, QtGui
 from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
 from tinkoff.invest import InstrumentStatus, Share, Bond, LastPrice
 from Classes import TokenClass, partition, TITLE_FONT
+from LimitClasses import LimitPerMinuteSemaphore, RequestPriority
 from MyBondClass import MyBondClass
 from MyDatabase import MainConnection
 from MyDateTime import getMoscowDateTime, getCountOfDaysBetweenTwoDates
@@ -314,6 +315,12 @@ class GroupBox_InstrumentsRequest(QtWidgets.QGroupBox):
         self.comboBox_token.setCurrentIndex(0)
         horizontalLayout_token.addWidget(self.comboBox_token)
 
+        horizontalLayout_token.addSpacing(4)
+
+        self.checkBox_tokens_pool = QtWidgets.QCheckBox(text='Все токены', parent=self)
+        self.checkBox_tokens_pool.setToolTip('Распределять запросы между всеми токенами пропорционально их оставшимся лимитам.')
+        horizontalLayout_token.addWidget(self.checkBox_tokens_pool)
+
         horizontalLayout_token.addStretch(1)
 
         verticalLayout_main.addLayout(horizontalLayout_token, 0)
@@ -359,6 +366,12 @@ class GroupBox_InstrumentsRequest(QtWidgets.QGroupBox):
         """Возвращает выбранный в ComboBox'е токен."""
         return self.comboBox_token.currentData(role=Qt.ItemDataRole.UserRole)
 
+    def getTokensPool(self) -> list[TokenClass]:
+        """Возвращает дополнительные токены, между которыми распределяются запросы выбранного токена."""
+        if not self.checkBox_tokens_pool.isChecked(): return []
+        token_list_model = self.comboBox_token.model()
+        return token_list_model.getTokensPool(self.getCurrentToken()) if isinstance(token_list_model, TokenListModel) else []
+
     def getCurrentStatus(self) -> InstrumentStatus:
         """Возвращает выбранный в ComboBox'е статус."""
         def getInstrumentStatus(status: str) -> InstrumentStatus:
@@ -721,6 +734,9 @@ def zipWithLastPrices3000(token: TokenClass, class_list: list[Share] | list[Bond
     return result_list_parts
 
 
+LAST_PRICES_MAX_WAIT: float = 1.0  # Наибольшее время ожидания лимита запросом последних цен в потоке графического интерфейса, в секундах.
+
+
 def zipWithLastPrices(token: TokenClass, class_list: list[Share] | list[Bond]) -> list[tuple[Share, LastPrice | None]] | list[tuple[Bond, LastPrice | None]]:
     """Возвращает список пар акций и последних цен или облигаций и последних цен."""
     '''
@@ -729,12 +745,26 @@ def zipWithLastPrices(token: TokenClass, class_list: list[Share] | list[Bond]) -
     то следует пропустить запрос цен последних сделок.
     '''
     if class_list:  # Если список не пуст.
-        current_try_count: RequestTryClass = RequestTryClass()
+        """
+        Функция выполняется в потоке графического интерфейса. Пользователь ожидает цены, поэтому запрос
+        ждёт ресурс с приоритетом INTERACTIVE и получает его раньше фоновых запросов, но не дольше LAST_PRICES_MAX_WAIT.
+        Если ресурс не освободится за это время, то цены не запрашиваются, и в консоль выводится сообщение.
+        Задержка между попытками не выполняется, чтобы не блокировать графический интерфейс.
+        """
+        semaphore: LimitPerMinuteSemaphore | None = token.unary_limits_manager.getSemaphore('GetLastPrices')
+        current_try_count: RequestTryClass = RequestTryClass(2)
         last_prices_response: MyResponse = MyResponse()
         while current_try_count and not last_prices_response.ifDataSuccessfullyReceived():
+            if semaphore is not None:
+                wait_time: float = semaphore.getWaitTime(1)
+                if wait_time > LAST_PRICES_MAX_WAIT or not semaphore.acquire(1, RequestPriority.INTERACTIVE, LAST_PRICES_MAX_WAIT):
+                    print('Последние цены {0} инструментов не запрошены: лимит GetLastPrices освободится через {1:.1f} с.'.format(len(class_list), wait_time))
+                    break
             last_prices_response = getLastPrices(token.token, [cls.uid for cls in class_list])
             assert last_prices_response.request_occurred, 'Запрос последних цен не был произведён!'
-            current_try_count += 1
+            if last_prices_response.request_error_flag and semaphore is not None:
+                semaphore.updateFromRequestError(last_prices_response.request_error)  # Корректируем ограничитель по данным сервера.
+            current_try_count.registerResponse(last_prices_response)
 
         if last_prices_response.ifDataSuccessfullyReceived():  # Если список последних цен был получен.
             last_prices: list[LastPrice] = last_prices_response.response_data
@@ -0,0 +1,143 @@
+"""
+Проверка планов SQL-запросов приложения (EXPLAIN QUERY PLAN).
+Проверяются те же строки запросов, которые выполняет приложение (атрибуты классов и функции, формирующие запросы),
+поэтому запросы и их проверка не расходятся. Запросы с переменным количеством параметров проверяются с двумя параметрами.
+Без аргумента схема создаётся функцией MainConnection.createDataBase во временном файле БД с присоединённым файлом истории цен.
+Статистики ANALYZE в новом файле нет, поэтому планировщик считает все таблицы большими, как в рабочей базе данных.
+С аргументом планы строятся по переданному файлу БД и его файлу истории цен (открытым только для чтения) с их статистикой.
+Скрипт завершается с кодом 1, если какой-либо запрос полностью просматривает одну из таблиц WATCHED_TABLES.
+Запуск: python QueryPlanCheck.py [путь к файлу БД]
+"""
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from CandlesChart import CandlesChart
+from Classes import MyConnection
+from DatabaseWidgets import ComboBox_Status, ComboBox_InstrumentType, ComboBox_Instrument
+from ForecastsPage import InstrumentsModel
+from MyDatabase import MainConnection
+from new_BondsModel import BondsModel
+
+WATCHED_TABLES: tuple[str, ...] = (
+    MyConnection.COUPONS_TABLE, MyConnection.DIVIDENDS_TABLE, MyConnection.INSTRUMENT_STATUS_TABLE,
+    MyConnection.CONSENSUS_ITEMS_TABLE, MyConnection.TARGET_ITEMS_TABLE, MyConnection.CONSENSUS_FORECASTS_TABLE,
+    MyConnection.ASSET_INSTRUMENTS_TABLE, MyConnection.CANDLES_TABLE, MyConnection.LAST_PRICES_TABLE
+)
+VARIABLES_COUNT: int = 2  # Количество параметров запросов с переменным количеством параметров.
+
+
+def getStatements() -> list[tuple[str, str]]:
+    """Возвращает запросы приложения (название, SQL-запрос)."""
+    statements: list[tuple[str, str]] = [
+        ('BondsModel.update', BondsModel.getBondsSelectCommand(None)),
+        ('BondsModel.updateBondRows (rowid)', BondsModel.getRowidsSelectCommand(VARIABLES_COUNT)),
+        ('BondsModel.updateBondRows (фильтр)', BondsModel.getFilterSelectCommand(VARIABLES_COUNT, None)),
+        ('BondsModel.updateCouponsRows', BondsModel.getCouponsSelectCommand(VARIABLES_COUNT)),
+        ('BondsModel.updateLastPricesRows', BondsModel.getLastPricesSelectCommand(VARIABLES_COUNT)),
+        ('MainConnection.getMyInstrument (купоны)', MainConnection.COUPONS_SELECT),
+        ('MainConnection.getMyInstrument (дивиденды)', MainConnection.DIVIDENDS_SELECT),
+        ('MainConnection.setCoupons (удаление)', MainConnection.COUPONS_DELETE),
+        ('MainConnection.setDividends (удаление)', MainConnection.DIVIDENDS_DELETE),
+        ('MainConnection.__updateInstrumentsStatus', MainConnection.INSTRUMENTS_STATUS_SELECT),
+        ('MainConnection.__updateInstrumentsStatus (удаление)', MainConnection.getInstrumentsStatusDeleteCommand(VARIABLES_COUNT)),
+        ('ComboBox_Status.TokenStatusesModel', ComboBox_Status.TokenStatusesModel.SQL_COMMAND),
+        ('ComboBox_InstrumentType (токен)', ComboBox_InstrumentType.InstrumentsTypeModel.TOKEN_SQL_COMMAND),
+        ('ComboBox_InstrumentType (токен и статус)', ComboBox_InstrumentType.InstrumentsTypeModel.TOKEN_STATUS_SQL_COMMAND),
+        ('ComboBox_Instrument (токен)', ComboBox_Instrument.InstrumentsModel.getTypeInstrumentsSelectCommand('bond', False)),
+        ('ComboBox_Instrument (токен и статус)', ComboBox_Instrument.InstrumentsModel.getTypeInstrumentsSelectCommand('bond', True)),
+        ('ForecastsPage (статус)', InstrumentsModel.getInstrumentsSelectCommand('share', '\"status\" = :status', False)),
+        ('ForecastsPage (токен, статус и прогнозы)', InstrumentsModel.getInstrumentsSelectCommand(None, '\"token\" = :token AND \"status\" = :status', True)),
+        ('MainConnection.getConsensusItems', MainConnection.CONSENSUS_ITEMS_SELECT),
+        ('MainConnection.getLastConsensusFulls', MainConnection.LAST_CONSENSUS_FULLS_SELECT),
+        ('MainConnection.getTargetItems', MainConnection.TARGET_ITEMS_SELECT),
+        ('MainConnection.__getTargets', MainConnection.CONSENSUS_TARGETS_SELECT),
+        ('MainConnection.getConsensusesForecastsItems', MainConnection.CONSENSUSES_FORECASTS_SELECT),
+        ('MainConnection.getLastConsensusesForecastsItems', MainConnection.LAST_CONSENSUSES_FORECASTS_SELECT),
+        ('MainConnection.getCandles', MainConnection.CANDLES_SELECT),
+        ('MainConnection.getFirstLastPriceTime', MainConnection.FIRST_LAST_PRICE_TIME_SELECT),
+        ('MainConnection.downsampleLastPrices', MainConnection.LAST_PRICES_DOWNSAMPLE_DELETE),
+        ('CandlesChart (окно графика)', CandlesChart.CANDLES_SQL_COMMAND)
+    ]
+    for table_name in MainConnection.CONTENT_HASH_TABLES:
+        statements.append(('MainConnection.__getChangedUids ({0})'.format(table_name), MainConnection.CONTENT_HASH_SELECT.format(table_name)))
+    for table_name, column_name in MyConnection.HISTORY_TABLES.items():
+        statements.append(('MainConnection.getHistoryMaxRowid ({0})'.format(table_name), MainConnection.HISTORY_MAX_ROWID_SELECT.format(table_name)))
+        statements.append(('MainConnection.getHistoryOrphanRowids ({0})'.format(table_name), MainConnection.HISTORY_ORPHANS_SELECT.format(table_name, column_name)))
+        statements.append(('MainConnection.deleteHistoryOrphanRows ({0})'.format(table_name), MainConnection.HISTORY_ORPHANS_DELETE.format(table_name, column_name)))
+    return statements
+
+
+PARAMETERS: dict[str, object] = {
+    'token': 'token', 'status': 'INSTRUMENT_STATUS_BASE', 'instrument_type': 'bond', 'share_uid': 'share', 'bond_uid': 'bond',
+    'instrument_uid': 'share', 'instrument_id': 'share', 'uid': 'share', 'consensus_number': 1, 'interval': 'CANDLE_INTERVAL_1_MIN',
+    'min_time': 0, 'max_time': 10 ** 15, 'uids': '[\"bond\", \"share\"]', 'instruments_uids': '[\"bond\", \"share\"]', 'rowids': '[1, 2]',
+    'from_rowid': 0, 'to_rowid': 5000, 'to_time': 10 ** 15, 'from_time': 0, 'bucket_end': 3_600_000_000, 'bucket': 3_600_000_000
+}  # Значения именованных параметров. Позиционные параметры получают значение 1.
+
+
+def createDatabase(directory: str):
+    """Создаёт в каталоге directory файл БД и файл истории цен со схемой приложения."""
+    MainConnection.DATABASE_NAME = os.path.join(directory, os.path.basename(MainConnection.DATABASE_NAME))
+    MainConnection.open()
+    MainConnection.createDataBase()
+    MainConnection.removeConnection()
+
+
+def connectReadOnly() -> sqlite3.Connection:
+    """Открывает файл БД MainConnection.DATABASE_NAME и присоединяет его файл истории цен только для чтения."""
+    connection: sqlite3.Connection = sqlite3.connect('file:{0}?mode=ro'.format(MainConnection.DATABASE_NAME), uri=True)
+    history_name: str = MainConnection.getHistoryDatabaseName()
+    if os.path.isfile(history_name):
+        connection.execute('ATTACH DATABASE ? AS \"{0}\";'.format(MyConnection.HISTORY_SCHEMA), ('file:{0}?mode=ro'.format(history_name),))
+    return connection
+
+
+def getFullScans(connection: sqlite3.Connection, sql_command: str) -> tuple[list[str], list[str]]:
+    """Возвращает план запроса и полные просмотры таблиц из WATCHED_TABLES."""
+    parameters: tuple | dict = (1,) * sql_command.count('?') if '?' in sql_command else PARAMETERS
+    plan: list[str] = [row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + sql_command, parameters)]
+    full_scans: list[str] = []
+    for detail in plan:
+        match = re.match(r'SCAN (?:TABLE )?\"?(\w+)\"?', detail)
+        if match is not None and match.group(1) in WATCHED_TABLES:
+            full_scans.append(detail)
+    return plan, full_scans
+
+
+def main(database_name: str | None) -> int:
+    directory: str | None = None
+    if database_name is None:
+        directory = tempfile.mkdtemp()
+        createDatabase(directory)
+    else:
+        MainConnection.DATABASE_NAME = database_name
+
+    statements: list[tuple[str, str]] = getStatements()
+    connection: sqlite3.Connection = connectReadOnly()
+    failed_count: int = 0
+    try:
+        for title, sql_command in statements:
+            try:
+                plan, full_scans = getFullScans(connection, sql_command)
+            except sqlite3.Error as error:
+                failed_count += 1
+                print('ОШИБКА {0}: {1}.'.format(title, error))
+                continue
+            if full_scans:
+                failed_count += 1
+                print('ОШИБКА {0}: {1}.'.format(title, '; '.join(full_scans)))
+            else:
+                print('OK {0}: {1}.'.format(title, '; '.join(plan)))
+    finally:
+        connection.close()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+    print('Запросов: {0}, с полным просмотром таблиц: {1}.'.format(len(statements), failed_count))
+    return 1 if failed_count > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None))
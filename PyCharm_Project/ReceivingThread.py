@@ -1,6 +1,6 @@
 from PyQt6 import QtCore
 from Classes import print_slot, TokenClass
-from LimitClasses import LimitPerMinuteSemaphore
+from LimitClasses import LimitPerMinuteSemaphore, MyUnaryLimit
 from MyDateTime import getMoscowDateTime
 
 
@@ -8,7 +8,6 @@ class ReceivingThread(QtCore.QThread):
     """Поток получения данных."""
 
     printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
-    releaseSemaphore_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(LimitPerMinuteSemaphore, int)  # Сигнал для освобождения ресурсов семафора из основного потока.
 
     def __init__(self, token: TokenClass, receive_method: str, parent: QtCore.QObject | None = None):
         super().__init__(parent=parent)
@@ -17,14 +16,8 @@ class ReceivingThread(QtCore.QThread):
         self.__receive_method: str = receive_method
 
         '''---------------------------------Семафор---------------------------------'''
-        self.semaphore: LimitPerMinuteSemaphore | None = self.__token.unary_limits_manager.getSemaphore(self.__receive_method)
-
-        if self.semaphore is not None:
-            @QtCore.pyqtSlot(LimitPerMinuteSemaphore, int)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
-            def __releaseSemaphore(semaphore: LimitPerMinuteSemaphore, n: int):
-                semaphore.release(n)
-
-            self.releaseSemaphore_signal.connect(__releaseSemaphore)  # Освобождаем ресурсы семафора из основного потока.
+        self.unary_limit: MyUnaryLimit | None = self.__token.unary_limits_manager.getMyUnaryLimit(self.__receive_method)
+        self.semaphore: LimitPerMinuteSemaphore | None = None if self.unary_limit is None else self.unary_limit.semaphore
         '''-------------------------------------------------------------------------'''
 
         self.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
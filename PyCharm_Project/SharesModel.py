@@ -135,6 +135,9 @@ class SharesModel(QAbstractTableModel):
         """Устанавливает данные модели."""
         self.beginResetModel()  # Начинает операцию сброса модели.
         self.share_class_list = shares_class_list
+        for row, share_class in enumerate(self.share_class_list):
+            source_index: QModelIndex = self.index(row, self.Columns.LOT_LAST_PRICE)
+            share_class.lastPriceChanged_signal.connect(lambda index=source_index: self.dataChanged.emit(index, index))  # Подключаем слот обновления.
         self.endResetModel()  # Завершает операцию сброса модели.
 
     def getShare(self, row: int) -> MyShareClass | None:
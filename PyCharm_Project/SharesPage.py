@@ -4,8 +4,10 @@ from PyQt6 import QtCore, QtWidgets
 from PyQt6.QtCore import pyqtSlot
 from tinkoff.invest import Share, InstrumentStatus, ShareType, Dividend
 from Classes import TokenClass, TITLE_FONT
+from DatabaseWriter import DatabaseWriterThread
 from DividendsModel import DividendsModel, DividendsProxyModel
 from DividendsThread import DividendsThread
+from LastPricesStream import LastPricesSubscription
 from MyDatabase import MainConnection
 from MyDateTime import getMoscowDateTime
 from MyRequests import MyResponse, getShares, RequestTryClass
@@ -384,6 +386,7 @@ class SharesPage(QtWidgets.QWidget):
         self.token: TokenClass | None = None
         self.shares: list[Share] = []
         self.dividends_thread: DividendsThread | None = None  # Поток получения дивидендов.
+        self.last_prices_subscription: LastPricesSubscription | None = None  # Подписка на последние цены.
         """-----------------------------------------------------------------------"""
 
         self.groupBox_request.currentTokenChanged.connect(self.onTokenChanged)
@@ -394,6 +397,7 @@ class SharesPage(QtWidgets.QWidget):
         def onFilterChanged():
             """Функция, выполняемая при изменении фильтра."""
             self._stopDividendsThread()  # Останавливаем поток получения дивидендов.
+            self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
             token: TokenClass | None = self.token
             if token is None:
                 self.shares = []
@@ -417,6 +421,7 @@ class SharesPage(QtWidgets.QWidget):
                 self.groupBox_dividends.setData(None)  # Сбрасываем модель дивидендов.
                 if share_class_list:  # Если список не пуст.
                     self._startDividendsThread(token, share_class_list)  # Запускает поток получения дивидендов.
+                    self._startLastPricesStream(token, share_class_list)  # Подписывается на последние цены акций.
 
         # Фильтры инструментов.
         self.groupBox_filters.groupBox_instruments_filters.comboBox_api_trade_available_flag.currentIndexChanged.connect(lambda index: onFilterChanged())
@@ -463,6 +468,7 @@ class SharesPage(QtWidgets.QWidget):
     def onStatusChanged(self, instrument_status: InstrumentStatus):
         """Функция, выполняемая при изменении выбранного статуса инструмента."""
         self._stopDividendsThread()  # Останавливаем поток получения дивидендов.
+        self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
         token: TokenClass | None = self.token
         if token is None:
             '''
@@ -489,6 +495,7 @@ class SharesPage(QtWidgets.QWidget):
                 self.groupBox_dividends.setData(None)  # Сбрасываем модель дивидендов.
                 if share_class_list:  # Если список не пуст.
                     self._startDividendsThread(token, share_class_list)  # Запускает поток получения дивидендов.
+                    self._startLastPricesStream(token, share_class_list)  # Подписывается на последние цены акций.
             else:
                 self.__reset()  # Сбрасывает акции.
 
@@ -496,6 +503,7 @@ class SharesPage(QtWidgets.QWidget):
     def onTokenReset(self):
         """Функция, выполняемая при выборе пустого значения вместо токена."""
         self._stopDividendsThread()  # Останавливаем поток получения дивидендов.
+        self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
         self.token = None
         self.__reset()  # Сбрасывает акции.
 
@@ -503,14 +511,16 @@ class SharesPage(QtWidgets.QWidget):
     def onTokenChanged(self, token: TokenClass, instrument_status: InstrumentStatus):
         """Функция, выполняемая при изменении выбранного токена."""
         self._stopDividendsThread()  # Останавливаем поток получения дивидендов.
+        self._stopLastPricesStream()  # Останавливаем подписку на последние цены.
         self.token = token
 
         shares_try_count: RequestTryClass = RequestTryClass(2)
         shares_response: MyResponse = MyResponse()
         while shares_try_count and not shares_response.ifDataSuccessfullyReceived():
+            shares_try_count.backoff()  # Задержка перед повторной попыткой.
             shares_response: MyResponse = getShares(token.token, instrument_status)  # Получение акций.
             assert shares_response.request_occurred, 'Запрос акций не был произведён.'
-            shares_try_count += 1
+            shares_try_count.registerResponse(shares_response)
 
         if shares_response.ifDataSuccessfullyReceived():  # Если список акций был получен.
             shares: list[Share] = shares_response.response_data  # Получаем список акций.
@@ -526,6 +536,7 @@ class SharesPage(QtWidgets.QWidget):
             self.groupBox_dividends.setData(None)  # Сбрасываем модель дивидендов.
             if share_class_list:  # Если список не пуст.
                 self._startDividendsThread(token, share_class_list)  # Запускает поток получения дивидендов.
+                self._startLastPricesStream(token, share_class_list)  # Подписывается на последние цены акций.
         else:
             self.__reset()  # Сбрасывает акции.
 
@@ -533,7 +544,8 @@ class SharesPage(QtWidgets.QWidget):
         """Запускает поток получения дивидендов."""
         assert self.dividends_thread is None, 'Поток заполнения дивидендов должен быть завершён!'
 
-        self.dividends_thread = DividendsThread(token_class=token, share_class_list=share_class_list, parent=self)
+        self.dividends_thread = DividendsThread(token_class=token, share_class_list=share_class_list, parent=self,
+                                               tokens_pool=self.groupBox_request.getTokensPool())
         """---------------------Подключаем сигналы потока к слотам---------------------"""
         self.dividends_thread.printText_signal.connect(print)  # Сигнал для отображения сообщений в консоли.
 
@@ -543,9 +555,8 @@ class SharesPage(QtWidgets.QWidget):
         # self.dividends_thread.showRequestError_signal.connect(self.showRequestError)
         # self.dividends_thread.showException_signal.connect(self.showException)
 
-        self.dividends_thread.dividendsReceived.connect(MainConnection.setDividends)
+        DatabaseWriterThread.getWriter().connectSignal(self.dividends_thread.dividendsReceived, MainConnection.setDividends)
 
-        self.dividends_thread.releaseSemaphore_signal.connect(lambda semaphore, n: semaphore.release(n))  # Освобождаем ресурсы семафора из основного потока.
 
         self.dividends_thread.started.connect(lambda: print('{0}: Поток запущен. ({1})'.format(DividendsThread.__name__, getMoscowDateTime())))
         self.dividends_thread.finished.connect(lambda: print('{0}: Поток завершён. ({1})'.format(DividendsThread.__name__, getMoscowDateTime())))
@@ -558,3 +569,15 @@ class SharesPage(QtWidgets.QWidget):
             self.dividends_thread.requestInterruption()  # Сообщаем потоку о том, что надо завершиться.
             self.dividends_thread.wait()  # Ждём завершения потока.
             self.dividends_thread = None
+
+    def _startLastPricesStream(self, token: TokenClass, share_class_list: list[MyShareClass]):
+        """Подписывается на последние цены акций."""
+        assert self.last_prices_subscription is None, 'Подписка на последние цены должна быть отменена!'
+        self.last_prices_subscription = LastPricesSubscription(token=token, instruments=share_class_list, parent=self)
+        self.last_prices_subscription.subscribe()
+
+    def _stopLastPricesStream(self):
+        """Отменяет подписку на последние цены."""
+        if self.last_prices_subscription is not None:  # Если подписка была создана.
+            self.last_prices_subscription.unsubscribe()
+            self.last_prices_subscription = None
@@ -0,0 +1,351 @@
+from __future__ import annotations
+import asyncio
+import dataclasses
+import enum
+import queue
+import time
+import typing
+from PyQt6 import QtCore
+from tinkoff.invest import AsyncClient, Candle, CandleInstrument, CandleInterval, HistoricCandle, InfoInstrument, \
+    LastPrice, LastPriceInstrument, RequestError, SubscriptionInterval, TradingStatus
+from tinkoff.invest.async_services import AsyncServices
+from Classes import TokenClass, print_slot
+from DatabaseWriter import DatabaseWriterThread
+from LimitClasses import MyStreamLimit
+from MyDatabase import MainConnection
+from MyDateTime import getMoscowDateTime
+
+
+def getSubscriptionInterval(interval: CandleInterval) -> SubscriptionInterval | None:
+    """Возвращает интервал подписки, соответствующий интервалу свечей. Если подписка на интервал невозможна, то возвращает None."""
+    match interval:
+        case CandleInterval.CANDLE_INTERVAL_1_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_MINUTE
+        case CandleInterval.CANDLE_INTERVAL_5_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_FIVE_MINUTES
+        case CandleInterval.CANDLE_INTERVAL_15_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_FIFTEEN_MINUTES
+        case CandleInterval.CANDLE_INTERVAL_HOUR: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_HOUR
+        case CandleInterval.CANDLE_INTERVAL_DAY: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_DAY
+        case CandleInterval.CANDLE_INTERVAL_2_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_2_MIN
+        case CandleInterval.CANDLE_INTERVAL_3_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_3_MIN
+        case CandleInterval.CANDLE_INTERVAL_10_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_10_MIN
+        case CandleInterval.CANDLE_INTERVAL_30_MIN: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_30_MIN
+        case CandleInterval.CANDLE_INTERVAL_2_HOUR: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_2_HOUR
+        case CandleInterval.CANDLE_INTERVAL_4_HOUR: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_4_HOUR
+        case CandleInterval.CANDLE_INTERVAL_WEEK: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_WEEK
+        case CandleInterval.CANDLE_INTERVAL_MONTH: return SubscriptionInterval.SUBSCRIPTION_INTERVAL_MONTH
+        case _: return None
+
+
+def getCandleInterval(subscription_interval: SubscriptionInterval) -> CandleInterval | None:
+    """Возвращает интервал свечей, соответствующий интервалу подписки."""
+    for interval in CandleInterval:
+        if getSubscriptionInterval(interval) == subscription_interval:
+            return interval
+    return None
+
+
+@enum.unique  # Декоратор, требующий, чтобы все элементы имели разные значения.
+class SubscriptionType(enum.Enum):
+    """Тип подписки."""
+    LAST_PRICE = 'last_price'
+    CANDLE = 'candle'
+    TRADING_STATUS = 'trading_status'
+
+
+class SubscriptionKey(typing.NamedTuple):
+    """Ключ подписки: тип, uid инструмента и интервал (только для свечей)."""
+    type: SubscriptionType
+    instrument_uid: str
+    interval: CandleInterval = CandleInterval.CANDLE_INTERVAL_UNSPECIFIED
+
+
+class StreamConnection:
+    """Одно stream-соединение MarketDataStream и размещённые в нём подписки."""
+    def __init__(self, client: AsyncServices):
+        self.stream = client.create_market_data_stream()
+        self.keys: set[SubscriptionKey] = set()  # Подписки, размещённые в соединении.
+        self.task: asyncio.Task | None = None  # Задача получения данных из соединения.
+
+    def subscribe(self, keys: list[SubscriptionKey]):
+        """Добавляет подписки в соединение."""
+        self.keys.update(keys)
+        last_prices, candles, statuses = self.__getInstruments(keys)
+        if last_prices: self.stream.last_price.subscribe(last_prices)
+        if candles: self.stream.candles.subscribe(candles)
+        if statuses: self.stream.info.subscribe(statuses)
+
+    def unsubscribe(self, keys: list[SubscriptionKey]):
+        """Удаляет подписки из соединения."""
+        self.keys.difference_update(keys)
+        last_prices, candles, statuses = self.__getInstruments(keys)
+        if last_prices: self.stream.last_price.unsubscribe(last_prices)
+        if candles: self.stream.candles.unsubscribe(candles)
+        if statuses: self.stream.info.unsubscribe(statuses)
+
+    @staticmethod
+    def __getInstruments(keys: list[SubscriptionKey]) -> tuple[list[LastPriceInstrument], list[CandleInstrument], list[InfoInstrument]]:
+        """Разделяет подписки по типам."""
+        last_prices: list[LastPriceInstrument] = [LastPriceInstrument(instrument_id=key.instrument_uid) for key in keys if key.type is SubscriptionType.LAST_PRICE]
+        candles: list[CandleInstrument] = [CandleInstrument(instrument_id=key.instrument_uid, interval=getSubscriptionInterval(key.interval)) for key in keys if key.type is SubscriptionType.CANDLE]
+        statuses: list[InfoInstrument] = [InfoInstrument(instrument_id=key.instrument_uid) for key in keys if key.type is SubscriptionType.TRADING_STATUS]
+        return last_prices, candles, statuses
+
+
+class StreamMultiplexer(QtCore.QThread):
+    """Мультиплексор подписок MarketDataStream одного токена.
+    Размещает подписки разных страниц (последние цены, свечи, торговые статусы) в как можно меньшем количестве
+    stream-соединений, не превышая лимит MyStreamLimit, и перераспределяет их при отписке.
+    Полученные данные накапливаются и передаются пакетами."""
+    stream_method_name: str = 'MarketDataStream'
+    MAX_SUBSCRIPTIONS_PER_STREAM: int = 300  # Максимальное количество подписок в одном stream-соединении.
+    FLUSH_INTERVAL: float = 1.0  # Интервал (в секундах) между передачами накопленных данных.
+    INTERRUPTION_CHECK_INTERVAL: float = 0.1  # Интервал (в секундах) проверки команд и прерывания потока.
+    RECONNECT_DELAY: float = 5.0  # Задержка (в секундах) перед повторным размещением подписок оборвавшегося соединения.
+
+    printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
+    lastPricesReceived: QtCore.pyqtSignal = QtCore.pyqtSignal(list)  # Сигнал, передающий пакет последних цен (list[LastPrice]).
+    candlesReceived: QtCore.pyqtSignal = QtCore.pyqtSignal(str, CandleInterval, list)  # Сигнал, передающий пакет свечей (list[HistoricCandle]).
+    tradingStatusesReceived: QtCore.pyqtSignal = QtCore.pyqtSignal(list)  # Сигнал, передающий пакет торговых статусов (list[TradingStatus]).
+
+    __multiplexers: dict[str, StreamMultiplexer] = {}  # Мультиплексоры токенов.
+
+    @classmethod
+    def getMultiplexer(cls, token: TokenClass) -> StreamMultiplexer:
+        """Возвращает мультиплексор токена, при необходимости создавая его. Вызывается в основном потоке."""
+        multiplexer: StreamMultiplexer | None = cls.__multiplexers.get(token.token)
+        if multiplexer is None:
+            multiplexer = StreamMultiplexer(token)
+            cls.__multiplexers[token.token] = multiplexer
+        return multiplexer
+
+    @classmethod
+    def findMultiplexer(cls, token: str) -> StreamMultiplexer | None:
+        """Возвращает мультиплексор токена, если он был создан."""
+        return cls.__multiplexers.get(token)
+
+    @classmethod
+    def stopAll(cls):
+        """Закрывает stream-соединения всех мультиплексоров."""
+        for multiplexer in cls.__multiplexers.values():
+            multiplexer.requestInterruption()  # Сообщаем потоку о том, что надо завершиться.
+            multiplexer.wait()  # Ждём завершения потока.
+
+    def __init__(self, token: TokenClass, parent: QtCore.QObject | None = None):
+        super().__init__(parent=parent)
+        self.__token: TokenClass = token
+        self.__subscribers: dict[SubscriptionKey, set[int]] = {}  # Подписчики каждой подписки (используется в основном потоке).
+        self.__commands: queue.SimpleQueue[tuple[bool, SubscriptionKey]] = queue.SimpleQueue()  # Команды подписки (True) и отписки (False).
+
+        '''---------Переменные, используемые в потоке мультиплексора---------'''
+        self.__connections: list[StreamConnection] = []  # Открытые stream-соединения.
+        self.__pending: list[SubscriptionKey] = []  # Подписки, для которых не хватило stream-соединений.
+        self.__pending_time: float = 0.0  # Момент, раньше которого не следует размещать ожидающие подписки.
+        self.__last_prices: dict[str, LastPrice] = {}  # Последние цены, накопленные с момента последней передачи.
+        self.__trading_statuses: dict[str, TradingStatus] = {}  # Торговые статусы, накопленные с момента последней передачи.
+        self.__forming_candles: dict[tuple[str, CandleInterval], HistoricCandle] = {}  # Последние (формирующиеся) свечи.
+        self.__candles: dict[tuple[str, CandleInterval], dict[float, HistoricCandle]] = {}  # Свечи, накопленные с момента последней передачи.
+        '''------------------------------------------------------------------'''
+
+        '''------------Статистические переменные------------'''
+        self.connections_count: int = 0  # Количество открытых stream-соединений.
+        self.subscriptions_count: int = 0  # Количество размещённых подписок.
+        self.pending_count: int = 0  # Количество подписок, для которых не хватило stream-соединений.
+        self.rebalances_count: int = 0  # Количество перераспределений подписок.
+        self.ticks_count: int = 0  # Количество полученных сообщений.
+        '''-------------------------------------------------'''
+
+        DatabaseWriterThread.getWriter().connectSignal(self.lastPricesReceived, MainConnection.addLastPrices)  # Пакетная запись в таблицу последних цен.
+        DatabaseWriterThread.getWriter().connectSignal(self.candlesReceived, MainConnection.insertHistoricCandles)  # Пакетная запись в таблицу исторических свечей.
+        self.printText_signal.connect(print_slot)  # Сигнал для отображения сообщений в консоли.
+        self.started.connect(lambda: print('{0}: Поток запущен. ({1})'.format(self.__class__.__name__, getMoscowDateTime())))
+        self.finished.connect(lambda: print('{0}: Поток завершён. ({1})'.format(self.__class__.__name__, getMoscowDateTime())))
+
+    @property
+    def token(self) -> TokenClass:
+        return self.__token
+
+    def printInConsole(self, text: str):
+        self.printText_signal.emit('{0}: {1}'.format(self.__class__.__name__, text))
+
+    def subscribe(self, subscriber: QtCore.QObject, keys: typing.Iterable[SubscriptionKey]):
+        """Добавляет подписки подписчика. Вызывается в основном потоке."""
+        for key in keys:
+            subscribers: set[int] = self.__subscribers.setdefault(key, set())
+            if not subscribers:  # Если подписка ещё не размещена.
+                self.__commands.put((True, key))
+            subscribers.add(id(subscriber))
+        if not self.isRunning():
+            self.start()  # Запускаем поток.
+
+    def unsubscribe(self, subscriber: QtCore.QObject, keys: typing.Iterable[SubscriptionKey] | None = None):
+        """Удаляет подписки подписчика (по умолчанию все). Вызывается в основном потоке."""
+        for key in list(self.__subscribers) if keys is None else keys:
+            subscribers: set[int] | None = self.__subscribers.get(key)
+            if subscribers is None or id(subscriber) not in subscribers: continue
+            subscribers.remove(id(subscriber))
+            if not subscribers:  # Если у подписки не осталось подписчиков.
+                self.__subscribers.pop(key)
+                self.__commands.put((False, key))
+
+    def run(self) -> None:
+        stream_limit: MyStreamLimit | None = self.__token.getMyStreamLimit(self.stream_method_name)
+        if stream_limit is None:
+            self.printInConsole('Лимит для метода {0} не найден.'.format(self.stream_method_name))
+            return
+        asyncio.run(self.__main(stream_limit))
+        self.printInConsole('Получено сообщений: {0}, перераспределений подписок: {1}.'.format(self.ticks_count, self.rebalances_count))
+
+    async def __main(self, stream_limit: MyStreamLimit):
+        async with AsyncClient(self.__token.token) as client:
+            flush_time: float = time.monotonic() + self.FLUSH_INTERVAL  # Момент следующей передачи накопленных данных.
+            while not self.isInterruptionRequested():
+                self.__processCommands(client, stream_limit)
+                await asyncio.sleep(self.INTERRUPTION_CHECK_INTERVAL)
+                if time.monotonic() >= flush_time:
+                    self.__flush()
+                    flush_time = time.monotonic() + self.FLUSH_INTERVAL
+            tasks: list[asyncio.Task] = [connection.task for connection in self.__connections]
+            for connection in list(self.__connections):
+                self.__closeConnection(connection, stream_limit)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.__flush()
+        self.__pending.clear()
+        self.__updateStatistics()
+
+    def __processCommands(self, client: AsyncServices, stream_limit: MyStreamLimit):
+        """Выполняет накопленные команды подписки и отписки, размещает ожидающие подписки и перераспределяет соединения."""
+        changes: dict[SubscriptionKey, bool] = {}  # Итоговые изменения подписок. Подписка и последующая отписка взаимно уничтожаются.
+        while True:
+            try:
+                subscribe_flag, key = self.__commands.get_nowait()
+            except queue.Empty:
+                break
+            if changes.get(key, subscribe_flag) != subscribe_flag:
+                changes.pop(key)
+            else:
+                changes[key] = subscribe_flag
+        added: list[SubscriptionKey] = [key for key, subscribe_flag in changes.items() if subscribe_flag]
+        removed: list[SubscriptionKey] = [key for key, subscribe_flag in changes.items() if not subscribe_flag]
+
+        '''-------------------------Обработка оборвавшихся соединений-------------------------'''
+        for connection in [connection for connection in self.__connections if connection.task.done()]:
+            self.__pending.extend(connection.keys)
+            self.__closeConnection(connection, stream_limit)
+            self.__pending_time = time.monotonic() + self.RECONNECT_DELAY
+        '''-----------------------------------------------------------------------------------'''
+
+        if removed:
+            removed_set: set[SubscriptionKey] = set(removed)
+            self.__pending = [key for key in self.__pending if key not in removed_set]
+            for connection in self.__connections:
+                connection_keys: list[SubscriptionKey] = [key for key in removed if key in connection.keys]
+                if connection_keys: connection.unsubscribe(connection_keys)
+            for key in removed:
+                if key.type is SubscriptionType.CANDLE:
+                    self.__forming_candles.pop((key.instrument_uid, key.interval), None)
+            self.__rebalance(stream_limit)
+
+        self.__pending.extend(added)
+        if self.__pending and time.monotonic() >= self.__pending_time:
+            self.__place(client, stream_limit)
+
+        if added or removed:
+            self.__updateStatistics()
+
+    def __place(self, client: AsyncServices, stream_limit: MyStreamLimit):
+        """Размещает ожидающие подписки: сначала в наиболее заполненные соединения, затем в новые, пока позволяет лимит."""
+        keys: list[SubscriptionKey] = self.__pending
+        self.__pending = []
+        for connection in sorted(self.__connections, key=lambda c: len(c.keys), reverse=True):
+            free: int = self.MAX_SUBSCRIPTIONS_PER_STREAM - len(connection.keys)
+            if free > 0 and keys:
+                connection.subscribe(keys[:free])
+                keys = keys[free:]
+        while keys:
+            if not stream_limit.semaphore.tryAcquire(1):
+                self.__pending = keys
+                self.printInConsole('Нет доступных stream-соединений. Ожидают размещения подписок: {0}.'.format(len(keys)))
+                break
+            connection: StreamConnection = StreamConnection(client)
+            connection.subscribe(keys[:self.MAX_SUBSCRIPTIONS_PER_STREAM])
+            keys = keys[self.MAX_SUBSCRIPTIONS_PER_STREAM:]
+            connection.task = asyncio.create_task(self.__listen(connection))
+            self.__connections.append(connection)
+
+    def __rebalance(self, stream_limit: MyStreamLimit):
+        """Закрывает лишние соединения, перенося их подписки в оставшиеся соединения."""
+        for connection in [connection for connection in self.__connections if not connection.keys]:
+            self.__closeConnection(connection, stream_limit)
+        while len(self.__connections) > 1:
+            subscriptions_count: int = sum(len(connection.keys) for connection in self.__connections)
+            needed_count: int = -(-subscriptions_count // self.MAX_SUBSCRIPTIONS_PER_STREAM)  # Необходимое количество соединений.
+            if len(self.__connections) <= needed_count: break
+            source: StreamConnection = min(self.__connections, key=lambda c: len(c.keys))
+            keys: list[SubscriptionKey] = list(source.keys)
+            for connection in sorted(self.__connections, key=lambda c: len(c.keys), reverse=True):
+                free: int = self.MAX_SUBSCRIPTIONS_PER_STREAM - len(connection.keys)
+                if connection is not source and free > 0 and keys:
+                    connection.subscribe(keys[:free])  # Подписываемся до закрытия исходного соединения, чтобы не терять данные.
+                    keys = keys[free:]
+            assert not keys, 'Подписки должны помещаться в оставшиеся соединения!'
+            source.keys.clear()
+            self.__closeConnection(source, stream_limit)
+            self.rebalances_count += 1
+
+    def __closeConnection(self, connection: StreamConnection, stream_limit: MyStreamLimit):
+        """Закрывает stream-соединение и освобождает ресурс лимита."""
+        self.__connections.remove(connection)
+        connection.stream.stop()
+        connection.task.cancel()
+        stream_limit.semaphore.release(1)  # Освобождаем stream-соединение.
+
+    def __updateStatistics(self):
+        self.connections_count = len(self.__connections)
+        self.subscriptions_count = sum(len(connection.keys) for connection in self.__connections)
+        self.pending_count = len(self.__pending)
+
+    def __onCandle(self, candle: Candle):
+        """Учитывает обновление свечи. Получение свечи с более поздним временем завершает предыдущую свечу."""
+        interval: CandleInterval | None = getCandleInterval(candle.interval)
+        if interval is None: return
+        candle_key: tuple[str, CandleInterval] = (candle.instrument_uid, interval)
+        buffer: dict[float, HistoricCandle] = self.__candles.setdefault(candle_key, {})
+        forming_candle: HistoricCandle | None = self.__forming_candles.get(candle_key)
+        if forming_candle is not None and candle.time > forming_candle.time:
+            completed_candle: HistoricCandle = dataclasses.replace(forming_candle, is_complete=True)
+            buffer[completed_candle.time.timestamp()] = completed_candle
+        historic_candle: HistoricCandle = HistoricCandle(open=candle.open, high=candle.high, low=candle.low,
+                                                         close=candle.close, volume=candle.volume, time=candle.time,
+                                                         is_complete=False)
+        self.__forming_candles[candle_key] = historic_candle
+        buffer[historic_candle.time.timestamp()] = historic_candle
+
+    def __flush(self):
+        """Передаёт накопленные данные пакетами."""
+        if self.__last_prices:
+            self.lastPricesReceived.emit(list(self.__last_prices.values()))
+            self.__last_prices.clear()
+        for (instrument_uid, interval), buffer in self.__candles.items():
+            if buffer:
+                self.candlesReceived.emit(instrument_uid, interval, [buffer[key] for key in sorted(buffer)])
+        self.__candles.clear()
+        if self.__trading_statuses:
+            self.tradingStatusesReceived.emit(list(self.__trading_statuses.values()))
+            self.__trading_statuses.clear()
+
+    async def __listen(self, connection: StreamConnection):
+        """Получает данные из stream-соединения и накапливает их."""
+        try:
+            async for market_data in connection.stream:
+                if market_data.last_price is not None:
+                    self.__last_prices[market_data.last_price.instrument_uid] = market_data.last_price
+                elif market_data.candle is not None:
+                    self.__onCandle(market_data.candle)
+                elif market_data.trading_status is not None:
+                    self.__trading_statuses[market_data.trading_status.instrument_uid] = market_data.trading_status
+                else:
+                    continue
+                self.ticks_count += 1
+        except RequestError as error:
+            self.printInConsole('RequestError {0}'.format(error))
+        except Exception as error:
+            self.printInConsole('Exception {0}'.format(error))
@@ -255,3 +255,8 @@ class TokenListModel(QIdentityProxyModel):
 
     def getToken(self, row: int) -> TokenClass | None:
         return None if row == 0 else self.sourceModel().getTokenClass(row - 1)
+
+    def getTokensPool(self, token: TokenClass | None) -> list[TokenClass]:
+        """Возвращает остальные токены, между которыми можно распределить запросы выбранного токена."""
+        if token is None: return []
+        return [token_class for token_class in self.sourceModel().getTokens() if token_class.token != token.token]
@@ -163,7 +163,7 @@ class GroupBox_NewToken(QtWidgets.QGroupBox):
         while accounts_try_count and not accounts_response.ifDataSuccessfullyReceived():
             accounts_response = getAccounts(text, False)  # Получаем список счетов.
             assert accounts_response.request_occurred, 'Запрос счетов не был произведён.'
-            accounts_try_count += 1
+            accounts_try_count.registerResponse(accounts_response)
         accounts_list: list[Account] = accounts_response.response_data if accounts_response.ifDataSuccessfullyReceived() else []
         '''----------------------------------------------------------------'''
 
@@ -207,7 +207,7 @@ class GroupBox_NewToken(QtWidgets.QGroupBox):
         while limits_try_count and not limits_response.ifDataSuccessfullyReceived():
             limits_response = getUserTariff(self.__current_token.token)
             assert limits_response.request_occurred, 'Запрос лимитов не был произведён.'
-            limits_try_count += 1
+            limits_try_count.registerResponse(limits_response)
 
         if limits_response.ifDataSuccessfullyReceived():
             unary_limits, stream_limits = limits_response.response_data
@@ -1,5 +1,7 @@
 from PyQt6 import QtWidgets
+from ClientsPool import ClientsPool
 from Form import InvestmentForm
+from StreamMultiplexer import StreamMultiplexer
 
 
 if __name__ == '__main__':
@@ -7,6 +9,8 @@ if __name__ == '__main__':
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName('InvestmentViewer')
     app.setOrganizationName('Ferrus Company')
+    app.aboutToQuit.connect(ClientsPool.closeAll)  # Закрываем grpc-каналы пула при выходе.
+    app.aboutToQuit.connect(StreamMultiplexer.stopAll)  # Закрываем stream-соединения при выходе.
     window = InvestmentForm()
     window.show()
     sys.exit(app.exec())
@@ -5,7 +5,7 @@ from PyQt6.QtCore import QAbstractTableModel, QObject, QModelIndex, QSortFilterP
 from decimal import Decimal
 from tinkoff.invest import InstrumentStatus, Bond, Quotation
 from tinkoff.invest.schemas import RiskLevel, LastPrice, Coupon
-from Classes import MyConnection, Column, TokenClass, reportTradingStatus
+from Classes import MyConnection, Column, TokenClass, reportTradingStatus, partition
 from MyBondClass import MyBondClass, MyBond, TINKOFF_COMMISSION, MyCoupon, NDFL, DAYS_IN_YEAR
 from MyDatabase import MainConnection
 from MyDateTime import reportSignificantInfoFromDateTime, ifDateTimeIsEmpty, reportDateIfOnlyDate, getUtcDateTime, getCountOfDaysBetweenTwoDateTimes
@@ -516,25 +516,25 @@ class BondsModel(QAbstractTableModel):
         # assert subscribe_lp_flag, 'Не удалось подписаться на уведомления об изменении таблицы {0}!'.format(MyConnection.LAST_PRICES_TABLE)
         # '''----------------------------------------------------------------------------------'''
 
-    def onBondsChanged(self, rowid: int):
-        self.bond_notifications_count += 1
+    def onBondsChanged(self, rowids: list[int]):
+        self.bond_notifications_count += len(rowids)
         if self.__token is not None:
             begin_datetime: datetime = getUtcDateTime()
-            self.updateBondRow(rowid)
+            self.updateBondRows(rowids)
             self.bond_notifications_seconds += (getUtcDateTime() - begin_datetime).total_seconds()
 
-    def onCouponsChanged(self, rowid: int):
-        self.coupons_notifications_count += 1
+    def onCouponsChanged(self, rowids: list[int]):
+        self.coupons_notifications_count += len(rowids)
         if self.__token is not None:
             begin_datetime: datetime = getUtcDateTime()
-            self.updateCouponsRow(rowid)
+            self.updateCouponsRows(rowids)
             self.coupons_notifications_seconds += (getUtcDateTime() - begin_datetime).total_seconds()
 
-    def onLastPricesChanged(self, rowid: int):
-        self.lp_notifications_count += 1
+    def onLastPricesChanged(self, rowids: list[int]):
+        self.lp_notifications_count += len(rowids)
         if self.__token is not None:
             begin_datetime: datetime = getUtcDateTime()
-            self.updateLastPricesRow(rowid)
+            self.updateLastPricesRows(rowids)
             self.lp_notifications_seconds += (getUtcDateTime() - begin_datetime).total_seconds()
 
     def getBondNotificationAverageTime(self) -> float:
@@ -546,6 +546,138 @@ class BondsModel(QAbstractTableModel):
     def getLpNotificationAverageTime(self) -> float:
         return self.lp_notifications_seconds / self.lp_notifications_count
 
+    '''---------------Запросы модели (также проверяются скриптом QueryPlanCheck.py)---------------'''
+    @staticmethod
+    def getBondsSelectCommand(sql_condition: str | None) -> str:
+        """Возвращает запрос облигаций, соответствующих токену :token и статусу :status, вместе с их последними ценами."""
+        bonds_select: str = '''
+        SELECT {0}.\"rowid\", {0}.\"figi\", {0}.\"ticker\", {0}.\"class_code\", {0}.\"isin\", {0}.\"lot\", 
+        {0}.\"currency\", {0}.\"klong\", {0}.\"kshort\", {0}.\"dlong\", {0}.\"dshort\", {0}.\"dlong_min\", 
+        {0}.\"dshort_min\", {0}.\"short_enabled_flag\", {0}.\"name\", {0}.\"exchange\", 
+        {0}.\"coupon_quantity_per_year\", {0}.\"maturity_date\", {0}.\"nominal\", {0}.\"initial_nominal\", 
+        {0}.\"state_reg_date\", {0}.\"placement_date\", {0}.\"placement_price\", {0}.\"aci_value\", 
+        {0}.\"country_of_risk\", {0}.\"country_of_risk_name\", {0}.\"sector\", {0}.\"issue_kind\", 
+        {0}.\"issue_size\", {0}.\"issue_size_plan\", {0}.\"trading_status\", {0}.\"otc_flag\", 
+        {0}.\"buy_available_flag\", {0}.\"sell_available_flag\", {0}.\"floating_coupon_flag\", 
+        {0}.\"perpetual_flag\", {0}.\"amortization_flag\", {0}.\"min_price_increment\", 
+        {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", {0}.\"position_uid\", 
+        {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\", {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", 
+        {0}.\"subordinated_flag\", {0}.\"liquidity_flag\", {0}.\"first_1min_candle_date\", 
+        {0}.\"first_1day_candle_date\", {0}.\"risk_level\", 
+        {0}.\"nominal_currency\", {0}.\"initial_nominal_currency\", 
+        {0}.\"placement_price_currency\", {0}.\"aci_value_currency\", {0}.\"coupons\"
+        FROM {1}, {0}
+        WHERE {1}.\"token\" = :token AND {1}.\"status\" = :status AND {1}.\"uid\" = {0}.\"uid\"{2}'''.format(
+            '\"{0}\"'.format(MyConnection.BONDS_TABLE),
+            '\"{0}\"'.format(MyConnection.INSTRUMENT_STATUS_TABLE),
+            '' if sql_condition is None else ' AND {0}'.format(sql_condition)
+        )
+
+        return '''
+        SELECT {1}.\"rowid\", {1}.\"figi\", {1}.\"ticker\", {1}.\"class_code\", {1}.\"isin\", {1}.\"lot\", {1}.\"currency\", 
+        {1}.\"klong\", {1}.\"kshort\", {1}.\"dlong\", {1}.\"dshort\", {1}.\"dlong_min\", {1}.\"dshort_min\", 
+        {1}.\"short_enabled_flag\", {1}.\"name\", {1}.\"exchange\", {1}.\"coupon_quantity_per_year\", 
+        {1}.\"maturity_date\", {1}.\"nominal\", {1}.\"initial_nominal\", {1}.\"state_reg_date\", 
+        {1}.\"placement_date\", {1}.\"placement_price\", {1}.\"aci_value\", {1}.\"country_of_risk\", 
+        {1}.\"country_of_risk_name\", {1}.\"sector\", {1}.\"issue_kind\", {1}.\"issue_size\", 
+        {1}.\"issue_size_plan\", {1}.\"trading_status\", {1}.\"otc_flag\", {1}.\"buy_available_flag\", 
+        {1}.\"sell_available_flag\", {1}.\"floating_coupon_flag\", {1}.\"perpetual_flag\", 
+        {1}.\"amortization_flag\", {1}.\"min_price_increment\", {1}.\"api_trade_available_flag\", {1}.\"uid\", 
+        {1}.\"real_exchange\", {1}.\"position_uid\", {1}.\"for_iis_flag\", {1}.\"for_qual_investor_flag\", 
+        {1}.\"weekend_flag\", {1}.\"blocked_tca_flag\", {1}.\"subordinated_flag\", {1}.\"liquidity_flag\", 
+        {1}.\"first_1min_candle_date\", {1}.\"first_1day_candle_date\", {1}.\"risk_level\", 
+        {1}.\"nominal_currency\", {1}.\"initial_nominal_currency\", 
+        {1}.\"placement_price_currency\", {1}.\"aci_value_currency\", {1}.\"coupons\",
+        {2}.\"figi\" AS \"lp_figi\", {2}.\"price\" AS \"lp_price\", {2}.\"time\" AS \"lp_time\", 
+        {2}.\"instrument_uid\" AS \"lp_instrument_uid\"
+        FROM ({0}) AS {1} INNER JOIN {2} ON {1}.\"uid\" = {2}.\"instrument_uid\" 
+        ;'''.format(
+            bonds_select,
+            '\"B\"',
+            '\"{0}\"'.format(MyConnection.CURRENT_LAST_PRICES_TABLE)
+        )
+
+    @staticmethod
+    def getRowidsSelectCommand(rowids_count: int) -> str:
+        """Возвращает запрос uid облигаций по rowids_count позиционным параметрам rowid."""
+        return '''SELECT {0}.\"rowid\", {0}.\"uid\" FROM {0} WHERE {0}.\"rowid\" IN ({1});'''.format(
+            '\"{0}\"'.format(MyConnection.BONDS_TABLE),
+            ', '.join('?' * rowids_count)
+        )
+
+    @staticmethod
+    def getFilterSelectCommand(uids_count: int, sql_condition: str | None) -> str:
+        """Возвращает запрос облигаций по uids_count позиционным параметрам uid, соответствующих фильтру sql_condition,
+        токену и статусу (два последних позиционных параметра)."""
+        status_uid_select: str = '''SELECT \"uid\" FROM \"{0}\" WHERE \"{0}\".\"token\" = ? AND 
+        \"{0}\".\"status\" = ?'''.format(MyConnection.INSTRUMENT_STATUS_TABLE)
+
+        filter_bond_uid_select: str = '''SELECT {0}.\"rowid\", {0}.\"figi\", {0}.\"ticker\", {0}.\"class_code\", 
+        {0}.\"isin\", {0}.\"lot\", {0}.\"currency\", {0}.\"klong\", {0}.\"kshort\", {0}.\"dlong\", 
+        {0}.\"dshort\", {0}.\"dlong_min\", {0}.\"dshort_min\", {0}.\"short_enabled_flag\", {0}.\"name\", 
+        {0}.\"exchange\", {0}.\"coupon_quantity_per_year\", {0}.\"maturity_date\", {0}.\"nominal\", 
+        {0}.\"initial_nominal\", {0}.\"state_reg_date\", {0}.\"placement_date\", {0}.\"placement_price\", 
+        {0}.\"aci_value\", {0}.\"country_of_risk\", {0}.\"country_of_risk_name\", {0}.\"sector\", 
+        {0}.\"issue_kind\", {0}.\"issue_size\", {0}.\"issue_size_plan\", {0}.\"trading_status\", 
+        {0}.\"otc_flag\", {0}.\"buy_available_flag\", {0}.\"sell_available_flag\", {0}.\"floating_coupon_flag\", 
+        {0}.\"perpetual_flag\", {0}.\"amortization_flag\", {0}.\"min_price_increment\", 
+        {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", {0}.\"position_uid\", 
+        {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\", {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", 
+        {0}.\"subordinated_flag\", {0}.\"liquidity_flag\", {0}.\"first_1min_candle_date\", 
+        {0}.\"first_1day_candle_date\", {0}.\"risk_level\", 
+        {0}.\"nominal_currency\", {0}.\"initial_nominal_currency\", 
+        {0}.\"placement_price_currency\", {0}.\"aci_value_currency\", {0}.\"coupons\" 
+        FROM {0} WHERE {0}.\"uid\" IN ({1}){2}'''.format(
+            '\"{0}\"'.format(MyConnection.BONDS_TABLE),
+            ', '.join('?' * uids_count),
+            '' if sql_condition is None else ' AND {0}'.format(sql_condition)
+        )
+
+        return '''SELECT {0}.\"rowid\", {0}.\"figi\", {0}.\"ticker\", 
+        {0}.\"class_code\", {0}.\"isin\", {0}.\"lot\", {0}.\"currency\", {0}.\"klong\", {0}.\"kshort\", 
+        {0}.\"dlong\", {0}.\"dshort\", {0}.\"dlong_min\", {0}.\"dshort_min\", {0}.\"short_enabled_flag\", 
+        {0}.\"name\", {0}.\"exchange\", {0}.\"coupon_quantity_per_year\", {0}.\"maturity_date\", 
+        {0}.\"nominal\", {0}.\"initial_nominal\", {0}.\"state_reg_date\", {0}.\"placement_date\", 
+        {0}.\"placement_price\", {0}.\"aci_value\", {0}.\"country_of_risk\", {0}.\"country_of_risk_name\", 
+        {0}.\"sector\", {0}.\"issue_kind\", {0}.\"issue_size\", {0}.\"issue_size_plan\", {0}.\"trading_status\", 
+        {0}.\"otc_flag\", {0}.\"buy_available_flag\", {0}.\"sell_available_flag\", {0}.\"floating_coupon_flag\", 
+        {0}.\"perpetual_flag\", {0}.\"amortization_flag\", {0}.\"min_price_increment\", 
+        {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", {0}.\"position_uid\", 
+        {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\", {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", 
+        {0}.\"subordinated_flag\", {0}.\"liquidity_flag\", {0}.\"first_1min_candle_date\", 
+        {0}.\"first_1day_candle_date\", {0}.\"risk_level\", 
+        {0}.\"nominal_currency\", {0}.\"initial_nominal_currency\", 
+        {0}.\"placement_price_currency\", {0}.\"aci_value_currency\", {0}.\"coupons\" 
+        FROM ({1}) AS {0} WHERE {0}.\"uid\" IN ({2});'''.format(
+            '\"B\"',
+            filter_bond_uid_select,
+            status_uid_select
+        )
+
+    @staticmethod
+    def getCouponsSelectCommand(rowids_count: int) -> str:
+        """Возвращает запрос всех купонов облигаций, которым принадлежат строки таблицы купонов с rowids_count позиционными параметрами rowid."""
+        return '''SELECT {0}.\"instrument_uid\", {0}.\"figi\", {0}.\"coupon_date\", 
+        {0}.\"coupon_number\", {0}.\"fix_date\", {0}.\"pay_one_bond\", {0}.\"pay_one_bond_currency\", 
+        {0}.\"coupon_type\", {0}.\"coupon_start_date\", 
+        {0}.\"coupon_end_date\", {0}.\"coupon_period\" 
+        FROM {0} WHERE {0}.\"instrument_uid\" IN (SELECT \"instrument_uid\" FROM {0} WHERE \"rowid\" IN ({1}))
+        ORDER BY {0}.\"instrument_uid\", {0}.\"coupon_number\";'''.format(
+            '\"{0}\"'.format(MyConnection.COUPONS_TABLE),
+            ', '.join('?' * rowids_count)
+        )
+
+    @staticmethod
+    def getLastPricesSelectCommand(rowids_count: int) -> str:
+        """Возвращает запрос актуальных цен инструментов, которым принадлежат строки таблицы последних цен с rowids_count позиционными параметрами rowid."""
+        return '''SELECT \"figi\", \"price\", \"time\", \"instrument_uid\" FROM \"{0}\"
+        WHERE \"instrument_uid\" IN (SELECT \"instrument_uid\" FROM \"{1}\" WHERE \"rowid\" IN ({2}));'''.format(
+            MyConnection.CURRENT_LAST_PRICES_TABLE,
+            MyConnection.LAST_PRICES_TABLE,
+            ', '.join('?' * rowids_count)
+        )
+    '''-------------------------------------------------------------------------------------------'''
+
     def update(self, token: TokenClass | None, instrument_status: InstrumentStatus, sql_condition: str | None):
         """Обновляет данные модели в соответствии с переданными параметрами запроса к БД."""
         self.beginResetModel()  # Начинаем операцию сброса модели.
@@ -572,48 +704,7 @@ class BondsModel(QAbstractTableModel):
             self.__rows.clear()  # Очищаем список с удалением всех строк.
 
             '''---------------------------------------Создание запроса к БД---------------------------------------'''
-            bonds_select: str = '''
-            SELECT {0}.\"rowid\", {0}.\"figi\", {0}.\"ticker\", {0}.\"class_code\", {0}.\"isin\", {0}.\"lot\", 
-            {0}.\"currency\", {0}.\"klong\", {0}.\"kshort\", {0}.\"dlong\", {0}.\"dshort\", {0}.\"dlong_min\", 
-            {0}.\"dshort_min\", {0}.\"short_enabled_flag\", {0}.\"name\", {0}.\"exchange\", 
-            {0}.\"coupon_quantity_per_year\", {0}.\"maturity_date\", {0}.\"nominal\", {0}.\"initial_nominal\", 
-            {0}.\"state_reg_date\", {0}.\"placement_date\", {0}.\"placement_price\", {0}.\"aci_value\", 
-            {0}.\"country_of_risk\", {0}.\"country_of_risk_name\", {0}.\"sector\", {0}.\"issue_kind\", 
-            {0}.\"issue_size\", {0}.\"issue_size_plan\", {0}.\"trading_status\", {0}.\"otc_flag\", 
-            {0}.\"buy_available_flag\", {0}.\"sell_available_flag\", {0}.\"floating_coupon_flag\", 
-            {0}.\"perpetual_flag\", {0}.\"amortization_flag\", {0}.\"min_price_increment\", 
-            {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", {0}.\"position_uid\", 
-            {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\", {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", 
-            {0}.\"subordinated_flag\", {0}.\"liquidity_flag\", {0}.\"first_1min_candle_date\", 
-            {0}.\"first_1day_candle_date\", {0}.\"risk_level\", {0}.\"coupons\"
-            FROM {1}, {0}
-            WHERE {1}.\"token\" = :token AND {1}.\"status\" = :status AND {1}.\"uid\" = {0}.\"uid\"{2}'''.format(
-                '\"{0}\"'.format(MyConnection.BONDS_TABLE),
-                '\"{0}\"'.format(MyConnection.INSTRUMENT_STATUS_TABLE),
-                '' if sql_condition is None else ' AND {0}'.format(sql_condition)
-            )
-
-            sql_command: str = '''
-            SELECT {1}.\"rowid\", {1}.\"figi\", {1}.\"ticker\", {1}.\"class_code\", {1}.\"isin\", {1}.\"lot\", {1}.\"currency\", 
-            {1}.\"klong\", {1}.\"kshort\", {1}.\"dlong\", {1}.\"dshort\", {1}.\"dlong_min\", {1}.\"dshort_min\", 
-            {1}.\"short_enabled_flag\", {1}.\"name\", {1}.\"exchange\", {1}.\"coupon_quantity_per_year\", 
-            {1}.\"maturity_date\", {1}.\"nominal\", {1}.\"initial_nominal\", {1}.\"state_reg_date\", 
-            {1}.\"placement_date\", {1}.\"placement_price\", {1}.\"aci_value\", {1}.\"country_of_risk\", 
-            {1}.\"country_of_risk_name\", {1}.\"sector\", {1}.\"issue_kind\", {1}.\"issue_size\", 
-            {1}.\"issue_size_plan\", {1}.\"trading_status\", {1}.\"otc_flag\", {1}.\"buy_available_flag\", 
-            {1}.\"sell_available_flag\", {1}.\"floating_coupon_flag\", {1}.\"perpetual_flag\", 
-            {1}.\"amortization_flag\", {1}.\"min_price_increment\", {1}.\"api_trade_available_flag\", {1}.\"uid\", 
-            {1}.\"real_exchange\", {1}.\"position_uid\", {1}.\"for_iis_flag\", {1}.\"for_qual_investor_flag\", 
-            {1}.\"weekend_flag\", {1}.\"blocked_tca_flag\", {1}.\"subordinated_flag\", {1}.\"liquidity_flag\", 
-            {1}.\"first_1min_candle_date\", {1}.\"first_1day_candle_date\", {1}.\"risk_level\", {1}.\"coupons\",
-            {2}.\"figi\" AS \"lp_figi\", {2}.\"price\" AS \"lp_price\", {2}.\"time\" AS \"lp_time\", 
-            {2}.\"instrument_uid\" AS \"lp_instrument_uid\"
-            FROM ({0}) AS {1} INNER JOIN {2} ON {1}.\"uid\" = {2}.\"instrument_uid\" 
-            ;'''.format(
-                bonds_select,
-                '\"B\"',
-                '\"{0}\"'.format(MyConnection.LAST_PRICES_VIEW)
-            )
+            sql_command: str = self.getBondsSelectCommand(sql_condition)
             '''---------------------------------------------------------------------------------------------------'''
 
             db: QtSql.QSqlDatabase = MainConnection.getDatabase()
@@ -632,18 +723,12 @@ class BondsModel(QAbstractTableModel):
                     def getLastPrice() -> LastPrice:
                         """Создаёт и возвращает экземпляр класса LastPrice."""
                         figi: str = query.value('lp_figi')
-                        price_str: str = query.value('lp_price')
-                        time_str: str = query.value('lp_time')
+                        price_value: int = query.value('lp_price')
+                        time_value: int = query.value('lp_time')
                         instrument_uid: str = query.value('lp_instrument_uid')
 
-                        try:
-                            price: Quotation = MyConnection.convertTextToQuotation(price_str)
-                        except AttributeError:
-                            raise AttributeError('getLastPrice: figi = \'{0}\', price = \'{1}\', time = \'{2}\', instrument_uid = \'{3}\'.'.format(figi, price_str, time_str, instrument_uid))
-                        try:
-                            time: datetime = MyConnection.convertTextToDateTime(time_str)
-                        except ValueError:
-                            raise ValueError('getLastPrice: figi = \'{0}\', price = \'{1}\', time = \'{2}\', instrument_uid = \'{3}\'.'.format(figi, price_str, time_str, instrument_uid))
+                        price: Quotation = MyConnection.convertIntegerToQuotation(price_value)
+                        time: datetime = MyConnection.convertMicrosecondsToDateTime(time_value)
                         return LastPrice(figi=figi, price=price, time=time, instrument_uid=instrument_uid)
 
                     def getCoupons(bond_uid: str) -> list[Coupon] | None:
@@ -653,13 +738,11 @@ class BondsModel(QAbstractTableModel):
                             if coupons_value == 'Yes':
                                 '''------------------Извлекаем купоны из таблицы купонов------------------'''
                                 coupons_sql_command: str = '''SELECT \"figi\", \"coupon_date\", \"coupon_number\", 
-                                \"fix_date\", \"pay_one_bond\", \"coupon_type\", \"coupon_start_date\", 
+                                \"fix_date\", \"pay_one_bond\", \"pay_one_bond_currency\", 
+                                \"coupon_type\", \"coupon_start_date\", 
                                 \"coupon_end_date\", \"coupon_period\" FROM {0} WHERE {0}.\"instrument_uid\" = :bond_uid
                                 ;'''.format('\"{0}\"'.format(MyConnection.COUPONS_TABLE))
-                                coupons_query = QtSql.QSqlQuery(db)
-                                coupons_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                                coupons_prepare_flag: bool = coupons_query.prepare(coupons_sql_command)
-                                assert coupons_prepare_flag, coupons_query.lastError().text()
+                                coupons_query: QtSql.QSqlQuery = MyConnection.getPreparedQuery(db, coupons_sql_command)
                                 coupons_query.bindValue(':bond_uid', bond_uid)
                                 coupons_exec_flag: bool = coupons_query.exec()
                                 assert coupons_exec_flag, coupons_query.lastError().text()
@@ -669,6 +752,7 @@ class BondsModel(QAbstractTableModel):
                                 while coupons_query.next():
                                     coupon: Coupon = MyConnection.getCurrentCoupon(coupons_query)
                                     coupons_list.append(coupon)
+                                coupons_query.finish()
 
                                 assert len(coupons_list) > 0, 'Столбец \"coupons\" в таблице {0} имеет значение \'Yes\' для uid = \'{2}\', но таблица {1} не содержит купонов с этим uid!'.format(
                                     '\"{0}\"'.format(MyConnection.BONDS_TABLE),
@@ -745,277 +829,226 @@ class BondsModel(QAbstractTableModel):
         else:
             raise SystemError('Модель облигаций содержит несколько облигаций с одинаковым uid (\'{0}\')!'.format(uid))
 
-    def updateBondRow(self, rowid: int):
-        """Обновляет все необходимые данные при изменении строки таблицы облигаций."""
-        rowid_select: str = '''SELECT {0}.\"uid\" FROM {0} WHERE {0}.\"rowid\" = :rowid;'''.format(
-            '\"{0}\"'.format(MyConnection.BONDS_TABLE)
-        )
-
+    def __appendBondRow(self, bond_row: BondRow):
+        """Добавляет строку в конец модели и подключает слоты обновления к сигналам облигации."""
+        first: int = len(self.__rows)
+        self.beginInsertRows(QModelIndex(), first, first)
+        self.__rows.append(bond_row)
+        '''---------------------Подключение слотов обновления к сигналам облигации---------------------'''
+        columns_count: int = len(self.columns)
+        if columns_count > 0:
+            first_row_index: QModelIndex = self.index(first, 0)
+            last_row_index: QModelIndex = self.index(first, (columns_count - 1))
+            bond_changed_connection: QtCore.QMetaObject.Connection = \
+                bond_row.bond_class.bondChanged_signal.connect(lambda: self.dataChanged.emit(first_row_index, last_row_index))  # Подключаем слот обновления.
+            bond_row.appendBondChangedConnection(bond_changed_connection)
+            for column, bond_column in enumerate(self.columns):
+                if bond_column.dependsOnCoupons():
+                    source_index: QModelIndex = self.index(first, column)
+                    coupons_changed_connection: QtCore.QMetaObject.Connection = \
+                        bond_row.bond_class.couponsChanged_signal.connect(lambda: self.dataChanged.emit(source_index, source_index))  # Подключаем слот обновления.
+                    bond_row.appendCouponsChangedConnection(coupons_changed_connection)
+                if bond_column.dependsOnLastPrice():
+                    source_index: QModelIndex = self.index(first, column)
+                    last_price_changed_connection: QtCore.QMetaObject.Connection = \
+                        bond_row.bond_class.lastPriceChanged_signal.connect(lambda: self.dataChanged.emit(source_index, source_index))  # Подключаем слот обновления.
+                    bond_row.appendLastPriceChangedConnection(last_price_changed_connection)
+        '''--------------------------------------------------------------------------------------------'''
+        self.endInsertRows()
+
+    def __removeBondRow(self, row_index: int) -> BondRow:
+        """Удаляет строку из модели и отключает все её соединения."""
+        self.beginRemoveRows(QModelIndex(), row_index, row_index)
+        deleted_row: BondsModel.BondRow = self.__rows.pop(row_index)
+        deleted_row.disconnectAllConnections()  # Отключаем и удаляем все соединения.
+        self.endRemoveRows()
+        return deleted_row
+
+    @staticmethod
+    def __getCoupons(db: QtSql.QSqlDatabase, bond_uid: str) -> list[Coupon]:
+        """Извлекает купоны облигации из таблицы купонов."""
+        coupons_sql_command: str = '''SELECT {0}.\"figi\", {0}.\"coupon_date\", 
+        {0}.\"coupon_number\", {0}.\"fix_date\", {0}.\"pay_one_bond\", {0}.\"pay_one_bond_currency\", 
+        {0}.\"coupon_type\", 
+        {0}.\"coupon_start_date\", {0}.\"coupon_end_date\", {0}.\"coupon_period\" 
+        FROM {0} WHERE {0}.\"instrument_uid\" = :bond_uid;
+        '''.format('\"{0}\"'.format(MyConnection.COUPONS_TABLE))
+
+        coupons_query: QtSql.QSqlQuery = MyConnection.getPreparedQuery(db, coupons_sql_command)
+        coupons_query.bindValue(':bond_uid', bond_uid)
+        coupons_exec_flag: bool = coupons_query.exec()
+        assert coupons_exec_flag, coupons_query.lastError().text()
+
+        coupons: list[Coupon] = []
+        while coupons_query.next():
+            coupons.append(MyConnection.getCurrentCoupon(coupons_query))
+        coupons_query.finish()
+        return coupons
+
+    def updateBondRows(self, rowids: list[int]):
+        """Обновляет все необходимые данные при изменении строк таблицы облигаций.
+        Строки обрабатываются группами, не превышающими лимит переменных, по два запроса на группу."""
         db: QtSql.QSqlDatabase = MainConnection.getDatabase()
         if db.transaction():
-            '''-----------Пробуем получить облигацию по rowid-----------'''
-            rowid_query = QtSql.QSqlQuery(db)
-            rowid_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            rowid_prepare_flag: bool = rowid_query.prepare(rowid_select)
-            assert rowid_prepare_flag, rowid_query.lastError().text()
-            rowid_query.bindValue(':rowid', rowid)
-            rowid_exec_flag: bool = rowid_query.exec()
-            assert rowid_exec_flag, rowid_query.lastError().text()
-            '''---------------------------------------------------------'''
-
-            '''-----------Извлекаем облигацию из query-----------'''
-            rows_count: int = 0
-            changed_rowid_uid: str
-            while rowid_query.next():
-                rows_count += 1
-                assert rows_count < 2, 'Не должно быть нескольких строк с одним и тем же rowid ({0})!'.format(rowid)
-                changed_rowid_uid = rowid_query.value('uid')
-            '''--------------------------------------------------'''
-
-            if rows_count == 0:
-                """Если строки rowid не было найдено в бд, то она была удалена."""
-                row_index: int | None = self.__findRowIndexWithBondRowid(rowid)
-                if row_index is not None:
-                    self.beginRemoveRows(QModelIndex(), row_index, row_index)
-                    deleted_row: BondsModel.BondRow = self.__rows.pop(row_index)
-                    deleted_row.disconnectAllConnections()  # Отключаем и удаляем все соединения.
-                    self.endRemoveRows()
-                    print('Облигация \'{0}\' удалена из модели облигаций. Время: {1:.2f}c.'.format(deleted_row.bond.uid, self.getBondNotificationAverageTime()))
-            else:
-                """Если облигация была получена."""
-                '''----------------Проверяем облигацию на статус и фильтры----------------'''
-                status_uid_select: str = '''SELECT \"uid\" FROM \"{0}\" WHERE \"{0}\".\"token\" = :token AND 
-                \"{0}\".\"status\" = :status'''.format(MyConnection.INSTRUMENT_STATUS_TABLE)
-
-                filter_bond_uid_select: str = '''SELECT {0}.\"rowid\", {0}.\"figi\", {0}.\"ticker\", {0}.\"class_code\", 
-                {0}.\"isin\", {0}.\"lot\", {0}.\"currency\", {0}.\"klong\", {0}.\"kshort\", {0}.\"dlong\", 
-                {0}.\"dshort\", {0}.\"dlong_min\", {0}.\"dshort_min\", {0}.\"short_enabled_flag\", {0}.\"name\", 
-                {0}.\"exchange\", {0}.\"coupon_quantity_per_year\", {0}.\"maturity_date\", {0}.\"nominal\", 
-                {0}.\"initial_nominal\", {0}.\"state_reg_date\", {0}.\"placement_date\", {0}.\"placement_price\", 
-                {0}.\"aci_value\", {0}.\"country_of_risk\", {0}.\"country_of_risk_name\", {0}.\"sector\", 
-                {0}.\"issue_kind\", {0}.\"issue_size\", {0}.\"issue_size_plan\", {0}.\"trading_status\", 
-                {0}.\"otc_flag\", {0}.\"buy_available_flag\", {0}.\"sell_available_flag\", {0}.\"floating_coupon_flag\", 
-                {0}.\"perpetual_flag\", {0}.\"amortization_flag\", {0}.\"min_price_increment\", 
-                {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", {0}.\"position_uid\", 
-                {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\", {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", 
-                {0}.\"subordinated_flag\", {0}.\"liquidity_flag\", {0}.\"first_1min_candle_date\", 
-                {0}.\"first_1day_candle_date\", {0}.\"risk_level\", {0}.\"coupons\" 
-                FROM {0} WHERE {0}.\"uid\" = :bond_uid{1}'''.format(
-                    '\"{0}\"'.format(MyConnection.BONDS_TABLE),
-                    '' if self.__sql_condition is None else ' AND {0}'.format(self.__sql_condition)
-                )
-
-                filter_query_sql_command: str = '''SELECT {0}.\"rowid\", {0}.\"figi\", {0}.\"ticker\", 
-                {0}.\"class_code\", {0}.\"isin\", {0}.\"lot\", {0}.\"currency\", {0}.\"klong\", {0}.\"kshort\", 
-                {0}.\"dlong\", {0}.\"dshort\", {0}.\"dlong_min\", {0}.\"dshort_min\", {0}.\"short_enabled_flag\", 
-                {0}.\"name\", {0}.\"exchange\", {0}.\"coupon_quantity_per_year\", {0}.\"maturity_date\", 
-                {0}.\"nominal\", {0}.\"initial_nominal\", {0}.\"state_reg_date\", {0}.\"placement_date\", 
-                {0}.\"placement_price\", {0}.\"aci_value\", {0}.\"country_of_risk\", {0}.\"country_of_risk_name\", 
-                {0}.\"sector\", {0}.\"issue_kind\", {0}.\"issue_size\", {0}.\"issue_size_plan\", {0}.\"trading_status\", 
-                {0}.\"otc_flag\", {0}.\"buy_available_flag\", {0}.\"sell_available_flag\", {0}.\"floating_coupon_flag\", 
-                {0}.\"perpetual_flag\", {0}.\"amortization_flag\", {0}.\"min_price_increment\", 
-                {0}.\"api_trade_available_flag\", {0}.\"uid\", {0}.\"real_exchange\", {0}.\"position_uid\", 
-                {0}.\"for_iis_flag\", {0}.\"for_qual_investor_flag\", {0}.\"weekend_flag\", {0}.\"blocked_tca_flag\", 
-                {0}.\"subordinated_flag\", {0}.\"liquidity_flag\", {0}.\"first_1min_candle_date\", 
-                {0}.\"first_1day_candle_date\", {0}.\"risk_level\", {0}.\"coupons\" 
-                FROM ({1}) AS {0} WHERE {0}.\"uid\" IN ({2});'''.format(
-                    '\"B\"',
-                    filter_bond_uid_select,
-                    status_uid_select
-                )
+            for rowids_chunk in partition(rowids, MyConnection.VARIABLE_LIMIT - 2):
+                '''-----------Получаем uid облигаций по rowid-----------'''
+                rowid_select: str = self.getRowidsSelectCommand(len(rowids_chunk))
+                rowid_query = QtSql.QSqlQuery(db)
+                rowid_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+                rowid_prepare_flag: bool = rowid_query.prepare(rowid_select)
+                assert rowid_prepare_flag, rowid_query.lastError().text()
+                for i, rowid in enumerate(rowids_chunk):
+                    rowid_query.bindValue(i, rowid)
+                rowid_exec_flag: bool = rowid_query.exec()
+                assert rowid_exec_flag, rowid_query.lastError().text()
+
+                changed_uids: dict[int, str] = {}  # Uid облигаций, найденных по rowid.
+                while rowid_query.next():
+                    changed_uids[rowid_query.value('rowid')] = rowid_query.value('uid')
+                '''-----------------------------------------------------'''
+
+                '''---------Удаляем из модели облигации, удалённые из бд---------'''
+                for rowid in rowids_chunk:
+                    if rowid not in changed_uids:
+                        """Если строки rowid не было найдено в бд, то она была удалена."""
+                        row_index: int | None = self.__findRowIndexWithBondRowid(rowid)
+                        if row_index is not None:
+                            deleted_row: BondsModel.BondRow = self.__removeBondRow(row_index)
+                            print('Облигация \'{0}\' удалена из модели облигаций. Время: {1:.2f}c.'.format(deleted_row.bond.uid, self.getBondNotificationAverageTime()))
+                '''--------------------------------------------------------------'''
+
+                if not changed_uids: continue
+
+                '''----------------Проверяем облигации на статус и фильтры----------------'''
+                filter_query_sql_command: str = self.getFilterSelectCommand(len(changed_uids), self.__sql_condition)
 
                 filter_query = QtSql.QSqlQuery(db)
                 filter_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
                 filter_prepare_flag: bool = filter_query.prepare(filter_query_sql_command)
                 assert filter_prepare_flag, filter_query.lastError().text()
-                filter_query.bindValue(':bond_uid', changed_rowid_uid)
-                filter_query.bindValue(':token', self.__token.token)
-                filter_query.bindValue(':status', self.__instrument_status.name)
+                """Позиционные параметры привязываются в порядке их следования в запросе."""
+                for i, uid in enumerate(changed_uids.values()):
+                    filter_query.bindValue(i, uid)
+                filter_query.bindValue(len(changed_uids), self.__token.token)
+                filter_query.bindValue(len(changed_uids) + 1, self.__instrument_status.name)
                 filter_exec_flag: bool = filter_query.exec()
                 assert filter_exec_flag, filter_query.lastError().text()
                 '''-----------------------------------------------------------------------'''
 
-                '''-----------Извлекаем облигацию из query-----------'''
-                coupons_flag: bool
-                rows_count: int = 0
+                '''-----------Извлекаем облигации из query-----------'''
+                filtered_bonds: dict[str, tuple[int, Bond, bool]] = {}  # Rowid, облигация и флаг наличия купонов для каждого uid.
                 while filter_query.next():
-                    rows_count += 1
-                    assert rows_count < 2, 'Не должно быть нескольких строк с одним и тем же uid ({0})!'.format(changed_rowid_uid)
                     new_filtered_bond: Bond = MyConnection.getCurrentBond(query=filter_query)
-                    coupons_flag = MyConnection.convertCouponsFlagToBool(filter_query.value('coupons'))
-                    new_filtered_bond_rowid: int = filter_query.value('rowid')
+                    assert new_filtered_bond.uid not in filtered_bonds, 'Не должно быть нескольких строк с одним и тем же uid ({0})!'.format(new_filtered_bond.uid)
+                    filtered_bonds[new_filtered_bond.uid] = (
+                        filter_query.value('rowid'),
+                        new_filtered_bond,
+                        MyConnection.convertCouponsFlagToBool(filter_query.value('coupons'))
+                    )
                 '''--------------------------------------------------'''
 
-                row_index: int | None = self.__findRowIndexWithBondUid(changed_rowid_uid)
-                if rows_count == 0:
-                    """Если ни одной облигации не получено, то облигация не соответствует параметрам запроса."""
-                    if row_index is not None:
-                        self.beginRemoveRows(QModelIndex(), row_index, row_index)
-                        deleted_row: BondsModel.BondRow = self.__rows.pop(row_index)
-                        deleted_row.disconnectAllConnections()  # Отключаем и удаляем все соединения.
-                        self.endRemoveRows()
-
-                        if deleted_row is not None:
+                for changed_uid in changed_uids.values():
+                    row_index: int | None = self.__findRowIndexWithBondUid(changed_uid)
+                    filtered_bond: tuple[int, Bond, bool] | None = filtered_bonds.get(changed_uid)
+                    if filtered_bond is None:
+                        """Если облигация не получена, то она не соответствует параметрам запроса."""
+                        if row_index is not None:
+                            deleted_row: BondsModel.BondRow = self.__removeBondRow(row_index)
                             print('Облигация \'{0}\' обновилась и больше не соответствует фильтрам. Облигация удалена из модели облигаций. Время: {1:.2f}c.'.format(deleted_row.bond.uid, self.getBondNotificationAverageTime()))
-                else:
-                    """Если облигация была получена, то она должна присутствовать в модели."""
-                    if row_index is None:
-                        """Если облигации с таким uid нет в модели, то добавляем её."""
-
-                        '''--------------------------Получаем купоны облигации--------------------------'''
-                        if coupons_flag:
-                            coupons_sql_command: str = '''SELECT {0}.\"figi\", {0}.\"coupon_date\", 
-                            {0}.\"coupon_number\", {0}.\"fix_date\", {0}.\"pay_one_bond\", {0}.\"coupon_type\", 
-                            {0}.\"coupon_start_date\", {0}.\"coupon_end_date\", {0}.\"coupon_period\" 
-                            FROM {0} WHERE {0}.\"instrument_uid\" = :bond_uid;
-                            '''.format('\"{0}\"'.format(MyConnection.COUPONS_TABLE))
-
-                            coupons_query = QtSql.QSqlQuery(db)
-                            coupons_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-                            coupons_prepare_flag: bool = coupons_query.prepare(coupons_sql_command)
-                            assert coupons_prepare_flag, coupons_query.lastError().text()
-                            coupons_query.bindValue(':bond_uid', changed_rowid_uid)
-                            coupons_exec_flag: bool = coupons_query.exec()
-                            assert coupons_exec_flag, coupons_query.lastError().text()
-
-                            coupons: list[Coupon] = []
-                            while coupons_query.next():
-                                coupons.append(MyConnection.getCurrentCoupon(coupons_query))
-                            assert len(coupons) > 0
-                        else:
-                            coupons: None = None
-                        '''-----------------------------------------------------------------------------'''
-
-                        inserting_bond_class: MyBondClass = MyBondClass(bond=new_filtered_bond,
-                                                                        last_price=MyConnection.getLastPrice(db, changed_rowid_uid),
-                                                                        coupons=coupons)
-                        inserting_row: BondsModel.BondRow = BondsModel.BondRow(rowid=new_filtered_bond_rowid,
-                                                                               bond_class=inserting_bond_class)
-                        first: int = len(self.__rows)
-                        self.beginInsertRows(QModelIndex(), first, first)
-                        self.__rows.append(inserting_row)
-                        '''---------------------Подключение слотов обновления к сигналам облигации---------------------'''
-                        columns_count: int = len(self.columns)
-                        if columns_count > 0:
-                            first_row_index: QModelIndex = self.index(first, 0)
-                            last_row_index: QModelIndex = self.index(first, (columns_count - 1))
-                            bond_changed_connection: QtCore.QMetaObject.Connection = \
-                                self.__rows[first].bond_class.bondChanged_signal.connect(lambda: self.dataChanged.emit(first_row_index, last_row_index))  # Подключаем слот обновления.
-                            self.__rows[first].appendBondChangedConnection(bond_changed_connection)
-                            for column, bond_column in enumerate(self.columns):
-                                if bond_column.dependsOnCoupons():
-                                    source_index: QModelIndex = self.index(first, column)
-                                    coupons_changed_connection: QtCore.QMetaObject.Connection = \
-                                        self.__rows[first].bond_class.couponsChanged_signal.connect(lambda: self.dataChanged.emit(source_index, source_index))  # Подключаем слот обновления.
-                                    self.__rows[first].appendCouponsChangedConnection(coupons_changed_connection)
-                                if bond_column.dependsOnLastPrice():
-                                    source_index: QModelIndex = self.index(first, column)
-                                    last_price_changed_connection: QtCore.QMetaObject.Connection = \
-                                        self.__rows[first].bond_class.lastPriceChanged_signal.connect(lambda: self.dataChanged.emit(source_index, source_index))  # Подключаем слот обновления.
-                                    self.__rows[first].appendLastPriceChangedConnection(last_price_changed_connection)
-                        '''--------------------------------------------------------------------------------------------'''
-                        self.endInsertRows()
-                        print('Добавлена облигация \'{0}\' в модель облигаций. Время: {1:.2f}c.'.format(new_filtered_bond.uid, self.getBondNotificationAverageTime()))
                     else:
-                        """Если облигация с таким uid есть в модели, то её следует обновить."""
-                        self.__rows[row_index].bond_class.updateBond(new_filtered_bond)
-                        print('Облигация \'{0}\' в модели облигаций обновлена. Время: {1:.2f}c.'.format(changed_rowid_uid, self.getBondNotificationAverageTime()))
+                        """Если облигация была получена, то она должна присутствовать в модели."""
+                        new_filtered_bond_rowid, new_filtered_bond, coupons_flag = filtered_bond
+                        if row_index is None:
+                            """Если облигации с таким uid нет в модели, то добавляем её."""
+                            if coupons_flag:
+                                coupons: list[Coupon] | None = self.__getCoupons(db, changed_uid)
+                                assert len(coupons) > 0
+                            else:
+                                coupons: list[Coupon] | None = None
+                            inserting_bond_class: MyBondClass = MyBondClass(bond=new_filtered_bond,
+                                                                            last_price=MyConnection.getLastPrice(db, changed_uid),
+                                                                            coupons=coupons)
+                            self.__appendBondRow(BondsModel.BondRow(rowid=new_filtered_bond_rowid, bond_class=inserting_bond_class))
+                            print('Добавлена облигация \'{0}\' в модель облигаций. Время: {1:.2f}c.'.format(changed_uid, self.getBondNotificationAverageTime()))
+                        else:
+                            """Если облигация с таким uid есть в модели, то её следует обновить."""
+                            self.__rows[row_index].bond_class.updateBond(new_filtered_bond)
 
             commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
-    def updateCouponsRow(self, rowid: int):
-        """Обновляет все необходимые данные при изменении строки таблицы купонов."""
-        rowid_select_str: str = '''SELECT {0}.\"instrument_uid\", {0}.\"figi\", {0}.\"coupon_date\", 
-        {0}.\"coupon_number\", {0}.\"fix_date\", {0}.\"pay_one_bond\", {0}.\"coupon_type\", {0}.\"coupon_start_date\", 
-        {0}.\"coupon_end_date\", {0}.\"coupon_period\" 
-        FROM {0} WHERE {0}.\"rowid\" = :rowid;'''.format('\"{0}\"'.format(MyConnection.COUPONS_TABLE))
-
+    def updateCouponsRows(self, rowids: list[int]):
+        """Обновляет купоны облигаций модели при изменении строк таблицы купонов.
+        Купоны каждой затронутой облигации извлекаются целиком одним запросом на группу rowid.
+        Удаление купонов без последующей вставки не отображается, так как по rowid удалённой строки
+        нельзя определить облигацию."""
         db: QtSql.QSqlDatabase = MainConnection.getDatabase()
         if db.transaction():
-            '''-----------Пробуем получить купон по rowid-----------'''
-            rowid_query = QtSql.QSqlQuery(db)
-            rowid_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            rowid_prepare_flag: bool = rowid_query.prepare(rowid_select_str)
-            assert rowid_prepare_flag, rowid_query.lastError().text()
-            rowid_query.bindValue(':rowid', rowid)
-            rowid_exec_flag: bool = rowid_query.exec()
-            assert rowid_exec_flag, rowid_query.lastError().text()
-            '''-----------------------------------------------------'''
-
-            '''-----------------Извлекаем купон из query-----------------'''
-            rows_count: int = 0
-            while rowid_query.next():
-                rows_count += 1
-                if rows_count > 1:
-                    raise SystemError('Не должно быть нескольких строк с одним и тем же rowid ({0})!'.format(rowid))
-                coupon: Coupon = self._getCurrentCoupon(rowid_query)
-                coupon_instrument_uid: str = rowid_query.value('instrument_uid')
-            '''----------------------------------------------------------'''
+            coupons_dict: dict[str, list[Coupon]] = {}  # Купоны затронутых облигаций.
+            for rowids_chunk in partition(rowids, MyConnection.VARIABLE_LIMIT):
+                coupons_select: str = self.getCouponsSelectCommand(len(rowids_chunk))
+                coupons_query = QtSql.QSqlQuery(db)
+                coupons_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+                coupons_prepare_flag: bool = coupons_query.prepare(coupons_select)
+                assert coupons_prepare_flag, coupons_query.lastError().text()
+                for i, rowid in enumerate(rowids_chunk):
+                    coupons_query.bindValue(i, rowid)
+                coupons_exec_flag: bool = coupons_query.exec()
+                assert coupons_exec_flag, coupons_query.lastError().text()
+
+                '''-----------------Извлекаем купоны из query-----------------'''
+                chunk_coupons_dict: dict[str, list[Coupon]] = {}
+                while coupons_query.next():
+                    chunk_coupons_dict.setdefault(coupons_query.value('instrument_uid'), []).append(MyConnection.getCurrentCoupon(coupons_query))
+                coupons_dict.update(chunk_coupons_dict)  # Купоны облигации всегда извлекаются целиком.
+                '''-----------------------------------------------------------'''
 
             commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
 
-            bond_index: int | None = self.__findRowIndexWithBondUid(coupon_instrument_uid)
-            if bond_index is None:
-                """Купон не имеет отношения к облигациям в модели облигаций."""
-                pass  # Ничего не делаем.
-            else:
-                if rows_count == 0:
-                    """Если купон не был получен, то он был удалён."""
-                    self.__rows[bond_index].bond_class.removeCoupons(coupon.coupon_number)
-                else:
-                    """Если купон был получен."""
-                    self.__rows[bond_index].bond_class.upsertCoupon(coupon)  # Обновляем список купонов облигации.
+            rows_indexes: dict[str, int] = {row.bond.uid: i for i, row in enumerate(self.__rows)}
+            for bond_uid, coupons in coupons_dict.items():
+                bond_index: int | None = rows_indexes.get(bond_uid)
+                if bond_index is not None:  # Купоны, не имеющие отношения к облигациям в модели, пропускаются.
+                    self.__rows[bond_index].bond_class.setCoupons(coupons)  # Обновляем список купонов облигации.
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
-    def updateLastPricesRow(self, rowid: int):
-        """Обновляет все необходимые данные при изменении строки таблицы последних цен."""
-        lp_select_command: str = 'SELECT \"instrument_uid\" FROM \"{0}\" WHERE \"rowid\" = :rowid;'.format(MyConnection.LAST_PRICES_TABLE)
-
+    def updateLastPricesRows(self, rowids: list[int]):
+        """Обновляет актуальные цены облигаций модели при изменении строк таблицы последних цен."""
         db: QtSql.QSqlDatabase = MainConnection.getDatabase()
         if db.transaction():
-            lp_select_query = QtSql.QSqlQuery(db)
-            lp_select_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
-            lp_select_prepare_flag: bool = lp_select_query.prepare(lp_select_command)
-            assert lp_select_prepare_flag, lp_select_query.lastError().text()
-            lp_select_query.bindValue(':rowid', rowid)
-            lp_select_exec_flag: bool = lp_select_query.exec()
-            assert lp_select_exec_flag, lp_select_query.lastError().text()
-
-            '''----------Извлекаем последнюю цену из query----------'''
-            lp_count: int = 0
-            while lp_select_query.next():
-                lp_count += 1
-                if lp_count > 1:
-                    raise SystemError('Не должно быть нескольких строк с одним и тем же rowid ({0})!'.format(rowid))
-                lp_instrument_uid: str = lp_select_query.value('instrument_uid')
-            '''-----------------------------------------------------'''
-
-            if lp_count == 0:
-                """Если последняя цена была удалена."""
-                raise SystemError('Пока не реализовано!')
-                ...
-            else:
-                """Если последняя цена найдена."""
-                bond_index: int | None = self.__findRowIndexWithBondUid(lp_instrument_uid)
-                if bond_index is None:
-                    """Последняя цена не имеет отношения к облигациям в модели облигаций."""
-                    pass  # Ничего не делаем.
-                    print('LastPrices notification: Последняя цена не имеет отношения к облигациям в модели облигаций. Время: {0:.2f}c.'.format(self.getLpNotificationAverageTime()))
-                else:
-                    view_last_price: LastPrice | None = MyConnection.getLastPrice(db, lp_instrument_uid)
-                    if view_last_price is None:
-                        raise SystemError('Если у инструмента есть хотя бы одна цена, то её не может не быть в представлении!')
-                    else:
-                        self.__rows[bond_index].bond_class.setLastPrice(view_last_price)
-                        print('LastPricesNotification: Актуальная цена обновлена. Время: {0:.2f}c.'.format(self.getLpNotificationAverageTime()))
+            last_prices: list[LastPrice] = []
+            for rowids_chunk in partition(rowids, MyConnection.VARIABLE_LIMIT):
+                lp_select_query = QtSql.QSqlQuery(db)
+                lp_select_query.setForwardOnly(True)  # Возможно, это ускоряет извлечение данных.
+                lp_select_prepare_flag: bool = lp_select_query.prepare(self.getLastPricesSelectCommand(len(rowids_chunk)))
+                assert lp_select_prepare_flag, lp_select_query.lastError().text()
+                for i, rowid in enumerate(rowids_chunk):
+                    lp_select_query.bindValue(i, rowid)
+                lp_select_exec_flag: bool = lp_select_query.exec()
+                assert lp_select_exec_flag, lp_select_query.lastError().text()
+
+                '''----------Извлекаем актуальные цены из query----------'''
+                while lp_select_query.next():
+                    last_prices.append(LastPrice(
+                        figi=lp_select_query.value('figi'),
+                        price=MyConnection.getQuotationValue(lp_select_query, 'price'),
+                        time=MyConnection.convertMicrosecondsToDateTime(lp_select_query.value('time')),
+                        instrument_uid=lp_select_query.value('instrument_uid')
+                    ))
+                '''------------------------------------------------------'''
 
             commit_flag: bool = db.commit()  # Фиксирует транзакцию в базу данных.
             assert commit_flag, db.lastError().text()
+
+            rows_indexes: dict[str, int] = {row.bond.uid: i for i, row in enumerate(self.__rows)}
+            for last_price in last_prices:
+                bond_index: int | None = rows_indexes.get(last_price.instrument_uid)
+                if bond_index is not None:  # Цены, не имеющие отношения к облигациям в модели, пропускаются.
+                    self.__rows[bond_index].bond_class.setLastPrice(last_price)
         else:
             raise SystemError('Не получилось начать транзакцию! db.lastError().text(): \'{0}\'.'.format(db.lastError().text()))
 
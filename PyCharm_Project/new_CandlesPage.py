@@ -6,9 +6,11 @@ from PyQt6 import QtCore, QtWidgets, QtSql, QtCharts
 from tinkoff.invest import HistoricCandle, CandleInterval
 from tinkoff.invest.utils import candle_interval_to_timedelta
 from CandlesChart import GroupBox_Chart
+from CandlesStream import CandlesSubscription
 from Classes import TokenClass, MyConnection, Column, print_slot
 from DatabaseWidgets import GroupBox_InstrumentSelection, TokenSelectionBar
-from LimitClasses import LimitPerMinuteSemaphore
+from DatabaseWriter import DatabaseWriterThread
+from LimitClasses import LimitPerMinuteSemaphore, RequestPriority
 from MyBondClass import MyBondClass
 from MyDatabase import MainConnection
 from MyDateTime import ifDateTimeIsEmpty, getUtcDateTime, getMoscowDateTime
@@ -124,6 +126,8 @@ def getMaxInterval(interval: CandleInterval) -> timedelta:
 
 
 class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
+    streamCandlesReceived: QtCore.pyqtSignal = QtCore.pyqtSignal(str, CandleInterval, list)  # Сигнал, передающий свечи, полученные из подписки.
+
     class CandlesThread(QtCore.QThread):
         """Поток получения исторических свечей."""
 
@@ -132,7 +136,6 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
         candlesReceived: QtCore.pyqtSignal = QtCore.pyqtSignal(str, CandleInterval, list)
 
         printText_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(str)  # Сигнал для отображения сообщений в консоли.
-        releaseSemaphore_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(LimitPerMinuteSemaphore, int)  # Сигнал для освобождения ресурсов семафора из основного потока.
 
         '''-----------------Сигналы progressBar'а-----------------'''
         setProgressBarRange_signal: QtCore.pyqtSignal = QtCore.pyqtSignal(int, int)  # Сигнал для установления минимума и максимума progressBar'а заполнения купонов.
@@ -147,13 +150,6 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
             self.__interval: CandleInterval = interval
             self.semaphore: LimitPerMinuteSemaphore | None = self.token.unary_limits_manager.getSemaphore(self.receive_candles_method_name)
 
-            if self.semaphore is not None:
-                @QtCore.pyqtSlot(LimitPerMinuteSemaphore, int)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
-                def __releaseSemaphore(semaphore: LimitPerMinuteSemaphore, n: int):
-                    semaphore.release(n)
-
-                self.releaseSemaphore_signal.connect(__releaseSemaphore)  # Освобождаем ресурсы семафора из основного потока.
-
             '''------------Статистические переменные------------'''
             self.request_count: int = 0  # Общее количество запросов.
             self._success_request_count: int = 0  # Количество успешных запросов.
@@ -233,6 +229,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                         try_count: RequestTryClass = RequestTryClass()
                         response: MyResponse = MyResponse()
                         while try_count and not response.ifDataSuccessfullyReceived():
+                            try_count.backoff(self.isInterruptionRequested)  # Задержка перед повторной попыткой.
                             if self.isInterruptionRequested():
                                 printInConsole('Поток прерван.')
                                 break
@@ -240,7 +237,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                             checkPause()
 
                             """==============================Выполнение запроса=============================="""
-                            self.semaphore.acquire(1)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
+                            self.semaphore.acquire(1, RequestPriority.BACKGROUND)  # Блокирует вызов до тех пор, пока не будет доступно достаточно ресурсов.
 
                             '''----------------Подсчёт статистических параметров----------------'''
                             if ifFirstIteration():  # Не выполняется до второго запроса.
@@ -259,16 +256,15 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
                             assert response.request_occurred, 'Запрос свечей не был произведён.'
                             self.request_count += 1  # Подсчитываем запрос.
 
-                            self.releaseSemaphore_signal.emit(self.semaphore, 1)  # Освобождаем ресурсы семафора из основного потока.
-
                             '''-----------------------Сообщаем об ошибке-----------------------'''
                             if response.request_error_flag:
+                                self.semaphore.updateFromRequestError(response.request_error)  # Корректируем ограничитель по данным сервера.
                                 printInConsole('RequestError {0}'.format(response.request_error))
                             elif response.exception_flag:
                                 printInConsole('Exception {0}'.format(response.exception))
                             '''----------------------------------------------------------------'''
                             """=============================================================================="""
-                            try_count += 1
+                            try_count.registerResponse(response)
 
                         if response.ifDataSuccessfullyReceived():
                             self._success_request_count += 1  # Подсчитываем успешный запрос.
@@ -492,7 +488,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
 
                         self.__candles_receiving_thread.setProgressBarValue_signal.connect(__setValue)
 
-                        self.__candles_receiving_thread.candlesReceived.connect(MainConnection.insertHistoricCandles)
+                        DatabaseWriterThread.getWriter().connectSignal(self.__candles_receiving_thread.candlesReceived, MainConnection.insertHistoricCandles)
 
                         self.thread_finished_connection = self.__candles_receiving_thread.finished.connect(lambda: self.setStatus(token=self.token, instrument=self.instrument, interval=self.interval, status=self.ThreadStatus.FINISHED))
                         '''----------------------------------------------------------------------------'''
@@ -592,6 +588,7 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
 
         self.__candles_receiving_thread: GroupBox_CandlesReceiving.CandlesThread | None = None
         self.__thread_status: GroupBox_CandlesReceiving.ThreadStatus = self.ThreadStatus.START_NOT_POSSIBLE
+        self.__candles_subscription: CandlesSubscription | None = None  # Подписка на свечи.
 
         super().__init__(parent=parent)
 
@@ -633,6 +630,13 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
         verticalLayout_main.addLayout(horizontalLayout, 0)
         '''--------------------------------------------------------------------'''
 
+        '''--------------------------Подписка на свечи--------------------------'''
+        self.checkBox_stream = QtWidgets.QCheckBox(text='Получать свечи в реальном времени', parent=self)
+        self.checkBox_stream.setToolTip('Подписка на формирующиеся и завершённые свечи выбранного инструмента и интервала.\nСвечи записываются в базу данных и добавляются на график без повторной загрузки.')
+        self.checkBox_stream.stateChanged.connect(lambda state: self.__updateStream())
+        verticalLayout_main.addWidget(self.checkBox_stream, 0)
+        '''--------------------------------------------------------------------'''
+
         verticalLayout_main.addStretch(1)
 
         self.start_thread_connection: QtCore.QMetaObject.Connection = QtCore.QMetaObject.Connection()
@@ -661,6 +665,17 @@ class GroupBox_CandlesReceiving(QtWidgets.QGroupBox):
     def __onParameterChanged(self, token: TokenClass | None, instrument: MyShareClass | MyBondClass | None, interval: CandleInterval):
         status = self.ThreadStatus.START_NOT_POSSIBLE if self.token is None or self.instrument is None else self.ThreadStatus.START_POSSIBLE
         self.setStatus(token=token, instrument=instrument, interval=interval, status=status)
+        self.__updateStream()
+
+    def __updateStream(self):
+        """Перезапускает подписку на свечи в соответствии с текущими токеном, инструментом и интервалом."""
+        if self.__candles_subscription is not None:
+            self.__candles_subscription.unsubscribe()
+            self.__candles_subscription = None
+        if self.checkBox_stream.isChecked() and self.token is not None and self.instrument is not None:
+            self.__candles_subscription = CandlesSubscription(token=self.token, instrument_uid=self.instrument.uid, interval=self.interval, parent=self)
+            self.__candles_subscription.candlesReceived.connect(self.streamCandlesReceived.emit)
+            self.__candles_subscription.subscribe()
 
     @property
     def token(self) -> TokenClass | None:
@@ -868,7 +883,8 @@ class CandlesViewAndGraphic(QtWidgets.QWidget):
             return self.__historic_candle
 
     class __CandlesQueryModel(QtSql.QSqlQueryModel):
-        __select_candles_command: str = 'SELECT \"open\", \"high\", \"low\", \"close\", \"volume\", \"time\", \"is_complete\" FROM \"'+MyConnection.CANDLES_TABLE+'\" WHERE \"instrument_id\" = \'{uid}\' and \"interval\" = \'{interval}\';'
+        # Цены и время хранятся в БД в виде целых чисел, поэтому для отображения они переводятся в SQL-запросе.
+        __select_candles_command: str = 'SELECT \"open\" / '+str(MyConnection.NANO_SCALE)+'.0 AS \"open\", \"high\" / '+str(MyConnection.NANO_SCALE)+'.0 AS \"high\", \"low\" / '+str(MyConnection.NANO_SCALE)+'.0 AS \"low\", \"close\" / '+str(MyConnection.NANO_SCALE)+'.0 AS \"close\", \"volume\", strftime(\'%Y-%m-%d %H:%M:%f\', \"time\" / 1000000.0, \'unixepoch\') AS \"time\", \"is_complete\" FROM \"'+MyConnection.CANDLES_TABLE+'\" WHERE \"instrument_id\" = \'{uid}\' and \"interval\" = \'{interval}\';'
 
         def __init__(self, instrument_uid: str | None, interval: CandleInterval, parent: QtCore.QObject | None = None):
             # self.__columns: tuple[Column, ...] = (
@@ -1178,6 +1194,11 @@ class CandlesViewAndGraphic(QtWidgets.QWidget):
     def setInstrumentUid(self, instrument_uid: str | None = None):
         self.instrument_uid = instrument_uid
 
+    @QtCore.pyqtSlot(str, CandleInterval, list)  # Декоратор, который помечает функцию как qt-слот и ускоряет её выполнение.
+    def appendCandles(self, instrument_uid: str, interval: CandleInterval, candles: list[HistoricCandle]):
+        """Добавляет на график свечи, полученные из подписки."""
+        self.groupBox_chart.appendCandles(instrument_uid, interval, candles)
+
     # @QtCore.pyqtSlot(int)
     # def onCandlesChanges(self, rowid: int):
     #     db: QtSql.QSqlDatabase = MainConnection.getDatabase()
@@ -1289,6 +1310,7 @@ class CandlesPage_new(QtWidgets.QWidget):
         self.groupBox_instrument.bondSelected.connect(__onInstrumentSelected)
         self.groupBox_instrument.shareSelected.connect(__onInstrumentSelected)
         self.groupBox_instrument.instrumentReset.connect(__onInstrumentSelected)
+        self.groupBox_candles_receiving.streamCandlesReceived.connect(self.groupBox_candles_view.appendCandles)
 
         self.setEnabled(True)
 
@@ -48,12 +48,14 @@ class BondColumn(Column):
                  background_function=lambda bond_class, *args: BondColumn.PERPETUAL_COLOR if bond_class.bond.perpetual_flag and ifDateTimeIsEmpty(bond_class.bond.maturity_date) else BondColumn.MATURITY_COLOR if MyBond.ifBondIsMaturity(bond_class.bond) else QVariant(),
                  foreground_function=None,
                  lessThan=None, sort_role: Qt.ItemDataRole = Qt.ItemDataRole.UserRole,
-                 date_dependence: bool = False, entered_datetime: datetime | None = None, coupon_dependence: bool = False):
+                 date_dependence: bool = False, entered_datetime: datetime | None = None, coupon_dependence: bool = False,
+                 last_price_dependence: bool = False):
         super().__init__(header, header_tooltip, data_function, display_function, tooltip_function,
                          background_function, foreground_function, lessThan, sort_role)
         self._date_dependence: bool = date_dependence  # Флаг зависимости от даты.
         self._entered_datetime: datetime | None = entered_datetime  # Дата расчёта.
         self._coupon_dependence: bool = coupon_dependence  # Флаг зависимости от купонов.
+        self._last_price_dependence: bool = last_price_dependence  # Флаг зависимости от последней цены.
 
     def dependsOnEnteredDate(self) -> bool:
         """Возвращает True, если значение столбца зависит от выбранной даты. Иначе возвращает False."""
@@ -63,6 +65,10 @@ class BondColumn(Column):
         """Зависит ли значение столбца от купонов."""
         return self._coupon_dependence
 
+    def dependsOnLastPrice(self) -> bool:
+        """Зависит ли значение столбца от последней цены."""
+        return self._last_price_dependence
+
 
 def showCalculatedACI(bond_class: MyBondClass, entered_datetime: datetime) -> str | QVariant:
     """Функция для отображения рассчитанного НКД."""
@@ -419,6 +425,7 @@ class BondsModel(QtCore.QAbstractTableModel):
                            data_function=lambda bond_class: bond_class.getLotLastPrice(),
                            display_function=lambda bond_class: bond_class.reportLotLastPrice(),
                            tooltip_function=lambda bond_class: 'Нет данных.' if bond_class.last_price is None else 'last_price:\nfigi = {0},\nprice = {1},\ntime = {2},\ninstrument_uid = {3}.\n\nlot = {4}'.format(bond_class.last_price.figi, MyQuotation.__str__(bond_class.last_price.price, 2), bond_class.last_price.time, bond_class.last_price.instrument_uid, bond_class.bond.lot),
+                           last_price_dependence=True,
                            sort_role=Qt.ItemDataRole.UserRole,
                            lessThan=lessThan_MyMoneyValue_or_None),
             self.Columns.BOND_NKD:
@@ -505,6 +512,7 @@ class BondsModel(QtCore.QAbstractTableModel):
                            tooltip_function=reportAbsoluteProfitCalculation,
                            date_dependence=True,
                            coupon_dependence=True,
+                           last_price_dependence=True,
                            sort_role=Qt.ItemDataRole.UserRole,
                            lessThan=lessThan_MyMoneyValue_or_None),
             self.Columns.DATE_RELATIVE_PROFIT:
@@ -514,6 +522,7 @@ class BondsModel(QtCore.QAbstractTableModel):
                            display_function=showRelativeProfit,
                            date_dependence=True,
                            coupon_dependence=True,
+                           last_price_dependence=True,
                            sort_role=Qt.ItemDataRole.UserRole,
                            lessThan=lessThan_Decimal_or_None),
             self.Columns.DATE_ANNUAL_PROFIT:
@@ -523,6 +532,7 @@ class BondsModel(QtCore.QAbstractTableModel):
                            display_function=showAnnualProfit,
                            date_dependence=True,
                            coupon_dependence=True,
+                           last_price_dependence=True,
                            sort_role=Qt.ItemDataRole.UserRole,
                            lessThan=lessThan_Decimal_or_None),
             self.Columns.BOND_RISK_LEVEL:
@@ -564,6 +574,9 @@ class BondsModel(QtCore.QAbstractTableModel):
                     source_index: QtCore.QModelIndex = self.index(row, column)
                     # bond_class.couponsChanged_signal.connect(lambda: self.dataChanged.emit(source_index, source_index))  # Подключаем слот обновления.
                     bond_class.couponsChanged_signal.connect(update_class(self, source_index, source_index))  # Подключаем слот обновления.
+                if bond_column.dependsOnLastPrice():
+                    last_price_index: QtCore.QModelIndex = self.index(row, column)
+                    bond_class.lastPriceChanged_signal.connect(update_class(self, last_price_index, last_price_index))  # Подключаем слот обновления.
         self.endResetModel()  # Завершает операцию сброса модели.
 
     def setDateTime(self, entered_datetime: datetime):